@@ -0,0 +1,65 @@
+"""
+Measure the import time of the mistapi package and of the generated API tree.
+
+Each scenario runs in a fresh interpreter, several times, and the median wall
+time and the number of mistapi.api modules loaded are reported.
+
+Usage:
+    python scripts/benchmark_import_time.py [--runs 10]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import mistapi": "import mistapi",
+    "import mistapi.api": "import mistapi.api",
+    "one endpoint module": "from mistapi.api.v1.orgs import devices",
+    "orgs + sites packages": "from mistapi.api.v1 import orgs, sites",
+    "whole API tree": (
+        "import pkgutil, importlib, mistapi.api\n"
+        "for m in pkgutil.walk_packages(mistapi.api.__path__, 'mistapi.api.'):\n"
+        "    importlib.import_module(m.name)"
+    ),
+}
+
+RUNNER = """
+import json, sys, time
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+elapsed = time.perf_counter() - start
+modules = [m for m in sys.modules if m.startswith("mistapi.api")]
+print(json.dumps({{"elapsed": elapsed, "modules": len(modules)}}))
+"""
+
+
+def _run(code: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(code=code)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<25} {'median (ms)':>12} {'min (ms)':>10} {'api modules':>12}")
+    for name, code in SCENARIOS.items():
+        results = [_run(code) for _ in range(args.runs)]
+        times = [r["elapsed"] * 1000 for r in results]
+        print(
+            f"{name:<25} {statistics.median(times):>12.1f} {min(times):>10.1f} "
+            f"{results[-1]['modules']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Measure the throughput (chunks/second) of the VT100 screen rendering used by
+the screen-mode device utilities (``top``, ``monitor interface``).
+
+The chunks are read from a capture file (one JSON string per line: the "raw"
+field of each command output message), or generated as a Junos ``top``
+refreshed in place when no capture is provided.
+
+Usage:
+    python scripts/benchmark_vt100.py [--capture top.jsonl] [--frames 500]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from mistapi.device_utils.__tools.__ws_wrapper import _VT100Screen
+
+
+def _generate(frames: int, rows: int, cols: int, chunk_size: int = 512) -> list[str]:
+    rnd = random.Random(0)
+    stream = ["\x1b[H\x1b[2J"]
+    for frame in range(frames):
+        stream.append("\x1b[H")
+        stream.append(
+            f"last pid: {4000 + frame};  load averages:  0.{rnd.randint(10, 99)}"
+            f",  0.42,  0.40  up 12+03:14:{frame % 60:02d}\x1b[K\r\n"
+        )
+        stream.append(
+            f"CPU: {rnd.randint(0, 30)}.0% user,  0.0% nice,  2.1% system\x1b[K\r\n"
+        )
+        for r in range(2, rows - 1):
+            pid = 1000 + r
+            cpu = rnd.random() * 5 if rnd.random() < 0.3 else 0.0
+            line = f"{pid:>5} root  20  0   512M  128M select  1  12:{r:02d} {cpu:5.2f}% proc{r}"
+            stream.append(f"\x1b[{r + 1};1H{line[:cols]}\x1b[K")
+        stream.append(f"\x1b[{rows};1H\x1b[1m--More--\x1b[0m")
+    text = "".join(stream)
+    # websocket messages cut the stream anywhere, even inside a sequence
+    return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def _render_every_chunk(chunks: list[str], rows: int, cols: int) -> None:
+    screen = _VT100Screen(rows=rows, cols=cols)
+    for chunk in chunks:
+        screen.feed(chunk)
+        screen.render()
+
+
+def _full_render_every_chunk(chunks: list[str], rows: int, cols: int) -> None:
+    # rendering of all the cells after each chunk, without dirty-row tracking
+    screen = _VT100Screen(rows=rows, cols=cols)
+    for chunk in chunks:
+        screen.feed(chunk)
+        lines = ["".join(row).rstrip() for row in screen.grid]
+        while lines and not lines[-1]:
+            lines.pop()
+        "\n".join(lines)
+
+
+def _render_on_change(chunks: list[str], rows: int, cols: int) -> None:
+    screen = _VT100Screen(rows=rows, cols=cols)
+    for chunk in chunks:
+        screen.feed(chunk)
+        if screen.changed:
+            screen.render()
+
+
+def _render_diff(chunks: list[str], rows: int, cols: int) -> None:
+    screen = _VT100Screen(rows=rows, cols=cols)
+    for chunk in chunks:
+        screen.feed(chunk)
+        screen.render_diff()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capture", help="file with one JSON string per line")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    scenarios = {
+        "feed + full render (no tracking)": _full_render_every_chunk,
+        "feed + render()": _render_every_chunk,
+        "feed + render() on change": _render_on_change,
+        "feed + render_diff()": _render_diff,
+    }
+    for rows, cols in ((24, 80), (60, 200)):
+        if args.capture:
+            with open(args.capture, encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+        else:
+            chunks = _generate(args.frames, rows, cols)
+        print(f"\n{len(chunks)} chunks, {rows}x{cols} screen")
+        print(f"{'scenario':<36} {'chunks/s':>12}")
+        for name, scenario in scenarios.items():
+            durations = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                scenario(chunks, rows, cols)
+                durations.append(time.perf_counter() - start)
+            print(f"{name:<36} {len(chunks) / statistics.median(durations):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
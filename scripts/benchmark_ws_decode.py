@@ -0,0 +1,133 @@
+"""
+Measure the decoding throughput (messages/second) of the WebSocket receive
+path, with and without the payload decoding of `set_payload_decoding()`.
+
+The frames are read from a capture file (one raw WebSocket frame per line, as
+received from the Mist Cloud), or generated when no capture is provided.
+
+Usage:
+    python scripts/benchmark_ws_decode.py [--capture frames.jsonl] [--count 20000]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from unittest.mock import Mock
+
+from mistapi import __json
+from mistapi.websockets.__ws_client import _MistWebsocket
+
+
+def _generate(count: int) -> list[str]:
+    rnd = random.Random(0)
+    frames = []
+    for i in range(count):
+        site = f"site-{i % 50}"
+        if i % 2:
+            channel = f"/sites/{site}/stats/devices"
+            data = {
+                "mac": f"5c5b35{i:06x}",
+                "name": f"ap-{i}",
+                "type": "ap",
+                "model": "AP45",
+                "status": "connected",
+                "uptime": rnd.randint(0, 10**6),
+                "last_seen": time.time(),
+                "num_clients": rnd.randint(0, 80),
+                "radio_stat": {
+                    band: {"channel": rnd.randint(1, 165), "power": 17, "util": 12}
+                    for band in ("band_24", "band_5", "band_6")
+                },
+                "port_stat": {
+                    f"eth{p}": {"up": True, "rx_bytes": rnd.randint(0, 10**9)}
+                    for p in range(2)
+                },
+            }
+        else:
+            channel = f"/sites/{site}/stats/clients"
+            data = {
+                "mac": f"a4c3f0{i:06x}",
+                "hostname": f"client-{i}",
+                "ip": f"10.0.{i % 255}.{i % 253}",
+                "ssid": "corp",
+                "ap_mac": f"5c5b35{i % 1000:06x}",
+                "band": "5",
+                "channel": 36,
+                "rssi": -rnd.randint(30, 90),
+                "snr": rnd.randint(5, 60),
+                "tx_bps": rnd.randint(0, 10**7),
+                "rx_bps": rnd.randint(0, 10**7),
+                "last_seen": time.time(),
+            }
+        frames.append(
+            json.dumps({"event": "data", "channel": channel, "data": json.dumps(data)})
+        )
+    return frames
+
+
+def _client(data_type=None, enabled=False) -> _MistWebsocket:
+    client = _MistWebsocket(Mock(), channels=["/bench"])
+    if enabled:
+        client.set_payload_decoding(data_type=data_type)
+    return client
+
+
+def _envelope_only(frames: list[str]) -> None:
+    client = _client()
+    for frame in frames:
+        client._parse_message(frame)
+
+
+def _envelope_then_consumer(frames: list[str]) -> None:
+    client = _client()
+    for frame in frames:
+        msg = client._parse_message(frame)
+        json.loads(msg["data"])
+
+
+def _decoded(frames: list[str], data_type=None) -> None:
+    client = _client(data_type=data_type, enabled=True)
+    for frame in frames:
+        client._parse_message(frame)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capture", help="file with one raw frame per line")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, encoding="utf-8") as f:
+            frames = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        frames = _generate(args.count)
+
+    scenarios = {
+        "envelope only (json)": lambda: _envelope_only(frames),
+        "envelope + consumer json.loads": lambda: _envelope_then_consumer(frames),
+        f"set_payload_decoding() ({__json.JSON_BACKEND})": lambda: _decoded(frames),
+    }
+    try:
+        import msgspec  # noqa: F401
+
+        scenarios['set_payload_decoding("auto")'] = lambda: _decoded(frames, "auto")
+    except ImportError:
+        pass
+
+    print(f"{len(frames)} frames, JSON backend: {__json.JSON_BACKEND}")
+    print(f"{'scenario':<40} {'msgs/s':>12}")
+    for name, scenario in scenarios.items():
+        durations = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            scenario()
+            durations.append(time.perf_counter() - start)
+        print(f"{name:<40} {len(frames) / statistics.median(durations):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
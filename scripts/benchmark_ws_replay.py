@@ -0,0 +1,87 @@
+"""
+Measure the throughput (messages/second) of the whole WebSocket pipeline
+(receive -> decode -> queue -> callback) by replaying a recording at max speed,
+without connecting to the Mist Cloud.
+
+The recording is created with mistapi.websockets.replay.StreamRecorder, or
+generated when no recording is provided.
+
+Usage:
+    python scripts/benchmark_ws_replay.py [--recording devices.mwsr] [--count 20000]
+"""
+
+import argparse
+import os
+import tempfile
+from unittest.mock import Mock
+
+from benchmark_ws_decode import _generate
+
+from mistapi.websockets.__ws_client import _MistWebsocket
+from mistapi.websockets.replay import StreamRecorder, read_recording, replay_into
+
+
+def _session() -> Mock:
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["replay"]
+    session._apitoken_index = 0
+    session._session.cookies = []
+    return session
+
+
+def _run(recording: str, decode: str | None, batch: bool) -> dict:
+    client = _MistWebsocket(_session(), channels=["/bench"], throughput_log_interval=0)
+    replay_into(client, recording, speed=None)
+    if decode:
+        client.set_payload_decoding(data_type=None if decode == "dict" else decode)
+    if batch:
+        client.on_batch(lambda messages: None, max_items=500, max_latency_ms=10)
+    else:
+        client.on_message(lambda message: None)
+    client.connect(run_in_background=False)
+    client.disconnect(wait=True)
+    return client.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recording", help="recording file to replay")
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    recording = args.recording
+    if recording is None:
+        fd, recording = tempfile.mkstemp(suffix=".mwsr")
+        os.close(fd)
+        os.unlink(recording)
+        with StreamRecorder(recording) as recorder:
+            for frame in _generate(args.count):
+                recorder.write(frame)
+    frames = sum(1 for _ in read_recording(recording))
+
+    scenarios = {
+        "on_message": (None, False),
+        "on_message + decoding": ("dict", False),
+        "on_batch + decoding": ("dict", True),
+    }
+    try:
+        import msgspec  # noqa: F401
+
+        scenarios['on_batch + decoding("auto")'] = ("auto", True)
+    except ImportError:
+        pass
+
+    print(f"{frames} frames replayed from {recording}")
+    print(f"{'scenario':<40} {'msgs/s':>12}")
+    for name, (decode, batch) in scenarios.items():
+        stats = _run(recording, decode, batch)
+        rate = stats["messages_processed"] / stats["uptime"]
+        print(f"{name:<40} {rate:>12,.0f}")
+
+    if args.recording is None:
+        os.unlink(recording)
+
+
+if __name__ == "__main__":
+    main()
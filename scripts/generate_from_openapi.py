@@ -33,7 +33,9 @@ DEPRECATED_METHODS = {
     },
 }
 
-# Template for __init__.py files in generated packages
+# Template for __init__.py files in generated packages.
+# The submodules are loaded on first access (PEP 562), so importing a package
+# does not import the whole generated API tree.
 INIT_TEMPLATE = """'''
 --------------------------------------------------------------------------------
 ------------------------- Mist API Python CLI Session --------------------------
@@ -46,13 +48,30 @@ INIT_TEMPLATE = """'''
 --------------------------------------------------------------------------------
 '''
 
-from {path_import} import (
-{function_imports}
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from {path_import} import (
+{function_imports},
+    )
 
 __all__ = [
-{all_imports}
+{all_imports},
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{{__name__}}.{{name}}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
 """
 
 # Template for individual Python API files
@@ -1315,7 +1334,10 @@ def _create_init_file(
                 f.write(
                     INIT_TEMPLATE.format(
                         path_import=".".join(path_import),
-                        function_imports=",\r\n".join(module_data["function_imports"]),
+                        function_imports=",\r\n".join(
+                            f"    {function_import}"
+                            for function_import in module_data["function_imports"]
+                        ),
                         all_imports=",\r\n".join(module_data["all_imports"]),
                     )
                 )
@@ -17,6 +17,7 @@ This module manages API requests with Mist Cloud. It is used to
 import json
 import os
 import re
+import socket
 import threading
 import time
 import urllib.parse
@@ -24,11 +25,24 @@ from collections.abc import Callable
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 from mistapi.__api_response import APIResponse
 from mistapi.__logger import logger
 from mistapi.__models.privilege import Privileges
+from mistapi.__response_cache import (
+    CacheEntry,
+    MemoryCache,
+    ResponseCache,
+    SQLiteCache,
+    cache_key,
+)
+
+# Headers holding the authentication, snapshotted for each request attempt
+_AUTH_HEADERS = ("Authorization", "X-CSRFToken")
 
 
 def _apitoken_sanitizer(apitoken: str) -> str:
@@ -51,6 +65,130 @@ def _apitoken_sanitizer(apitoken: str) -> str:
     return f"{apitoken[:4]}...{apitoken[-4:]}"
 
 
+class _TokenBucket:
+    """
+    Thread-safe token bucket used to pace the API requests sent with one API
+    Token (or one login/password session).
+
+    The bucket is refilled continuously at `rate` tokens per second, up to
+    `capacity` tokens. A reservation may bring the bucket below zero: the
+    caller must then wait until the deficit is refilled before sending its
+    request, so concurrent callers are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def available(self) -> float:
+        """Return the number of requests that can be sent without waiting"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def reserve(self) -> float:
+        """Reserve one request and return the delay (s) to wait before sending it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def drain(self) -> None:
+        """Empty the bucket (e.g. when the Mist Cloud reported a HTTP 429)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+
+def _keepalive_socket_options(
+    idle: int, interval: int, count: int
+) -> list[tuple[int, int, int]]:
+    """
+    Return the socket options enabling the TCP keepalive probes, with the
+    timers supported by the current platform.
+
+    PARAMS
+    -----------
+    idle : int
+        seconds of inactivity before sending the first probe
+    interval : int
+        seconds between two probes
+    count : int
+        number of unanswered probes before closing the connection
+
+    RETURN
+    -----------
+    list
+        socket options, as expected by urllib3
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count))
+    return options
+
+
+class _MistHTTPAdapter(HTTPAdapter):
+    """
+    requests HTTPAdapter used by the API sessions. Adds the TCP keepalive
+    socket options to the pooled connections, so idle connections are kept
+    open through NAT/firewalls, and reports the connection reuse metrics.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["_socket_options"]
+
+    def __init__(
+        self, socket_options: list[tuple[int, int, int]] | None = None, **kwargs
+    ) -> None:
+        # must be set before HTTPAdapter.__init__(), which creates the pool manager
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        if self._socket_options:
+            kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if self._socket_options:
+            proxy_kwargs["socket_options"] = self._socket_options
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+    def connection_stats(self) -> dict[str, int]:
+        """
+        Return the number of connections opened and of requests sent by the
+        connection pools of this adapter
+        """
+        managers = [self.poolmanager, *self.proxy_manager.values()]
+        stats = {"pools": 0, "connections_created": 0, "requests": 0}
+        for manager in managers:
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                stats["pools"] += 1
+                stats["connections_created"] += pool.num_connections
+                stats["requests"] += pool.num_requests
+        return stats
+
+
 class APIRequest:
     """
     Class handling API Request to the Mist Cloud
@@ -58,15 +196,33 @@ class APIRequest:
 
     _MAX_429_RETRIES: int = 3
     _DEFAULT_RETRY_AFTER: int = 5
+    _TCP_KEEPALIVE_IDLE: int = 60
+    _TCP_KEEPALIVE_INTERVAL: int = 15
+    _TCP_KEEPALIVE_COUNT: int = 4
+    _CONNECTION_RETRY_BACKOFF: float = 0.5
 
     def __init__(self) -> None:
         self._cloud_uri: str = ""
+        self._pool_connections: int = 10
+        self._pool_maxsize: int = 10
+        self._pool_block: bool = False
+        self._tcp_keepalive: bool = True
+        self._connection_retries: int = 0
+        self._http_adapter: _MistHTTPAdapter | None = None
         self._session = requests.session()
+        self._mount_http_adapter(self._session)
         self.privileges: Privileges = Privileges([])
         self._count: int = 0
         self._apitoken: list[str] = []
         self._apitoken_index: int = -1
         self._token_lock: threading.Lock = threading.Lock()
+        self._keep_raw_data: bool = True
+        self._rate_limit: int | None = None
+        self._rate_limit_burst: int = 1
+        self._rate_limit_buckets: dict[str, _TokenBucket] = {}
+        self._csrf_cookie: str | None = None
+        self._response_cache: ResponseCache | None = None
+        self._cache_ttl: float = 0
 
     def get_request_count(self):
         """
@@ -107,8 +263,27 @@ class APIRequest:
                 f"apirequest:sending request to proxy server {re.sub(pwd_regex, ':*********@', self._session.proxies['https'])}"
             )
 
-    def _next_apitoken(self) -> None:
+    def _next_apitoken(self, failed_index: int | None = None) -> None:
+        """
+        Rotate to the next API Token.
+
+        PARAMS
+        -----------
+        failed_index : int, default None
+            index of the API Token that received the HTTP 429. When another
+            request already rotated away from this API Token, the current one
+            is kept, so concurrent rate-limited requests rotate only once
+        """
         with self._token_lock:
+            if failed_index is None:
+                failed_index = self._apitoken_index
+            if self._rate_limit:
+                self._get_rate_limit_bucket(failed_index).drain()
+            if failed_index != self._apitoken_index:
+                logger.debug(
+                    "apirequest:_next_apitoken:API Token already rotated by another request"
+                )
+                return
             logger.info("apirequest:_next_apitoken:rotating API Token")
             masked = _apitoken_sanitizer(self._apitoken[self._apitoken_index])
             logger.debug(
@@ -119,11 +294,19 @@ class APIRequest:
             new_index = self._apitoken_index + 1
             if new_index >= len(self._apitoken):
                 new_index = 0
+            if self._rate_limit:
+                # the current token is exhausted: use the token with the most
+                # remaining budget instead of the next one
+                candidates = [
+                    i for i in range(len(self._apitoken)) if i != self._apitoken_index
+                ]
+                if candidates:
+                    new_index = max(
+                        candidates,
+                        key=lambda i: self._get_rate_limit_bucket(i).available(),
+                    )
             if self._apitoken_index != new_index:
-                self._apitoken_index = new_index
-                self._session.headers.update(
-                    {"Authorization": "Token " + self._apitoken[self._apitoken_index]}
-                )
+                self._set_apitoken_index(new_index)
                 masked = _apitoken_sanitizer(self._apitoken[self._apitoken_index])
                 logger.debug(
                     "apirequest:_next_apitoken:new API Token is %s",
@@ -145,6 +328,406 @@ class APIRequest:
                     "(comma separated list) to avoid this issue."
                 )
 
+    def _set_apitoken_index(self, index: int) -> None:
+        """Set the API Token used for the next requests. Must hold _token_lock"""
+        self._apitoken_index = index
+        self._session.headers.update(
+            {"Authorization": "Token " + self._apitoken[self._apitoken_index]}
+        )
+
+    def _auth_snapshot(self, index: int | None = None) -> tuple[int, dict[str, str]]:
+        """
+        Return the index of the API Token and a copy of the authentication
+        headers to send with one request attempt. The copy is taken under
+        the token lock, so a request never mixes the headers of two
+        rotations and in-flight requests are not affected by a rotation.
+        Shared by the sync and async transports.
+
+        PARAMS
+        -----------
+        index : int, default None
+            index of the API Token to use (e.g. the one reserved by the rate
+            limiter). None uses the current API Token
+        """
+        with self._token_lock:
+            session_headers = self._session.headers
+            headers = {
+                key: session_headers[key]
+                for key in _AUTH_HEADERS
+                if session_headers.get(key)
+            }
+            if index is None or not 0 <= index < len(self._apitoken):
+                return self._apitoken_index, headers
+            headers["Authorization"] = "Token " + self._apitoken[index]
+            return index, headers
+
+    def _sync_csrftoken(self, resp) -> None:
+        """
+        Update the CSRF Token header when the Mist Cloud sent a new CSRF
+        cookie (login/password sessions only)
+        """
+        if not self._csrf_cookie:
+            return
+        csrftoken = resp.cookies.get(self._csrf_cookie)
+        if csrftoken and csrftoken != self._session.headers.get("X-CSRFToken"):
+            with self._token_lock:
+                self._session.headers["X-CSRFToken"] = csrftoken
+            logger.debug("apirequest:_sync_csrftoken:CSRF Token updated")
+
+    ####################################
+    # CONNECTION POOL
+    def set_connection_pool(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: bool = True,
+        connection_retries: int = 0,
+    ) -> None:
+        """
+        Configure the HTTP connection pool of the session. The pool keeps the
+        connections to the Mist Cloud open between requests, so each request
+        does not pay a new TCP/TLS handshake. When the session is shared by
+        multiple threads, `pool_maxsize` should be at least the number of
+        threads, otherwise the extra connections are closed after each
+        request.
+
+        PARAMS
+        -----------
+        pool_connections : int, default 10
+            Number of connection pools (one per host) to cache
+        pool_maxsize : int, default 10
+            Maximum number of connections kept open for reuse, per host
+        pool_block : bool, default False
+            If True, a request waits for a free connection when `pool_maxsize`
+            connections are in use, instead of opening a new (not reusable)
+            connection
+        tcp_keepalive : bool, default True
+            Enable the TCP keepalive probes on the connections, so idle
+            connections are not silently dropped by NAT devices or firewalls
+        connection_retries : int, default 0
+            Number of times a request is retried when the connection fails or
+            is reset by the peer. Read errors are only retried for idempotent
+            methods (GET, PUT, DELETE)
+        """
+        if pool_connections < 1:
+            raise ValueError("pool_connections must be >= 1")
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be >= 1")
+        if connection_retries < 0:
+            raise ValueError("connection_retries must be >= 0")
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._tcp_keepalive = tcp_keepalive
+        self._connection_retries = connection_retries
+        self._mount_http_adapter(self._session)
+        logger.info(
+            "apirequest:set_connection_pool:pool_maxsize=%s, pool_block=%s, "
+            "tcp_keepalive=%s, connection_retries=%s",
+            pool_maxsize,
+            pool_block,
+            tcp_keepalive,
+            connection_retries,
+        )
+
+    def _mount_http_adapter(self, session: requests.Session) -> None:
+        """
+        Mount a HTTPAdapter configured with the connection pool settings on
+        the session passed in parameter
+        """
+        socket_options = None
+        if self._tcp_keepalive:
+            socket_options = (
+                HTTPConnection.default_socket_options
+                + _keepalive_socket_options(
+                    self._TCP_KEEPALIVE_IDLE,
+                    self._TCP_KEEPALIVE_INTERVAL,
+                    self._TCP_KEEPALIVE_COUNT,
+                )
+            )
+        max_retries = Retry(
+            total=self._connection_retries,
+            connect=self._connection_retries,
+            read=self._connection_retries,
+            status=0,
+            other=0,
+            backoff_factor=self._CONNECTION_RETRY_BACKOFF,
+            raise_on_status=False,
+        )
+        self._http_adapter = _MistHTTPAdapter(
+            socket_options=socket_options,
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+            max_retries=max_retries,
+        )
+        session.mount("https://", self._http_adapter)
+        session.mount("http://", self._http_adapter)
+
+    def get_connection_stats(self) -> dict[str, int]:
+        """
+        Get the connection reuse metrics of the current HTTP session. A low
+        `connections_reused` compared to `requests` usually means that
+        `pool_maxsize` is lower than the number of concurrent threads.
+
+        RETURN
+        -----------
+        dict
+            "pools": number of connection pools,
+            "connections_created": number of connections opened,
+            "requests": number of HTTP requests sent,
+            "connections_reused": number of requests sent on an already
+            opened connection
+        """
+        if self._http_adapter is None:
+            stats = {"pools": 0, "connections_created": 0, "requests": 0}
+        else:
+            stats = self._http_adapter.connection_stats()
+        stats["connections_reused"] = max(
+            0, stats["requests"] - stats["connections_created"]
+        )
+        return stats
+
+    ####################################
+    # RATE LIMIT
+    def set_rate_limit(
+        self, calls_per_hour: int | None = 5000, burst: int | None = None
+    ) -> None:
+        """
+        Enable (or disable) the client-side rate limiter. When enabled, the
+        requests are paced to stay within `calls_per_hour` for each API Token,
+        and each request is sent with the API Token having the most remaining
+        budget. The limiter is shared by all the threads (and by the
+        AsyncAPISession) using this session.
+
+        PARAMS
+        -----------
+        calls_per_hour : int, default 5000
+            Maximum number of API calls per hour and per API Token (or per
+            login/password session). None or 0 disables the rate limiter
+        burst : int, default None
+            Maximum number of API calls that can be sent without pacing after
+            an idle period. Defaults to 1/60th of `calls_per_hour` (i.e. one
+            minute of budget)
+        """
+        if calls_per_hour is not None and calls_per_hour < 0:
+            raise ValueError("calls_per_hour must be >= 0")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be >= 1")
+        with self._token_lock:
+            self._rate_limit_buckets = {}
+            if not calls_per_hour:
+                self._rate_limit = None
+                logger.info("apirequest:set_rate_limit:rate limiter disabled")
+                return
+            self._rate_limit = calls_per_hour
+            self._rate_limit_burst = burst or max(1, calls_per_hour // 60)
+        logger.info(
+            "apirequest:set_rate_limit:rate limiter set to %s calls/hour (burst %s)",
+            self._rate_limit,
+            self._rate_limit_burst,
+        )
+
+    def _get_rate_limit_bucket(self, index: int) -> _TokenBucket:
+        key = self._apitoken[index] if 0 <= index < len(self._apitoken) else ""
+        bucket = self._rate_limit_buckets.get(key)
+        if bucket is None:
+            bucket = _TokenBucket(
+                rate=(self._rate_limit or 1) / 3600, capacity=self._rate_limit_burst
+            )
+            self._rate_limit_buckets[key] = bucket
+        return bucket
+
+    def _reserve_rate_limit(self) -> tuple[int | None, float]:
+        """
+        Reserve the budget for one request, switching to the API Token with
+        the most remaining budget. Return the index of the API Token charged,
+        which must be the one sent with the request (see `_auth_snapshot`),
+        and the delay (s) to wait before sending the request. The index is
+        None when the rate limiter is disabled. Shared by the sync and async
+        transports.
+        """
+        if not self._rate_limit:
+            return None, 0.0
+        with self._token_lock:
+            index = self._apitoken_index
+            if len(self._apitoken) > 1:
+                index = max(
+                    range(len(self._apitoken)),
+                    key=lambda i: self._get_rate_limit_bucket(i).available(),
+                )
+                if index != self._apitoken_index:
+                    self._set_apitoken_index(index)
+            return index, self._get_rate_limit_bucket(index).reserve()
+
+    def get_rate_limit_budget(self) -> dict[str, int]:
+        """
+        Get the number of requests that can be sent without waiting, for each
+        API Token (masked), or for the login/password session. Empty when the
+        rate limiter is disabled.
+
+        RETURN
+        -----------
+        dict
+            remaining budget, by API Token
+        """
+        if not self._rate_limit:
+            return {}
+        with self._token_lock:
+            if not self._apitoken:
+                return {"session": int(self._get_rate_limit_bucket(-1).available())}
+            return {
+                _apitoken_sanitizer(token): int(
+                    self._get_rate_limit_bucket(i).available()
+                )
+                for i, token in enumerate(self._apitoken)
+            }
+
+    ####################################
+    # RESPONSE CACHE
+    def enable_cache(
+        self,
+        ttl: float = 60,
+        backend: str | ResponseCache = "memory",
+        max_entries: int = 1024,
+        path: str | None = None,
+    ) -> None:
+        """
+        Enable the cache of the GET responses. A cached response is returned
+        without sending a request during `ttl` seconds. Once expired, the
+        response is revalidated with a conditional request when the Mist
+        Cloud sent an ETag or a Last-Modified header (a HTTP 304 response
+        reuses the cached body), otherwise it is requested again. The cached
+        responses of a resource are dropped when the resource (or one of its
+        children) is modified with this session.
+
+        PARAMS
+        -----------
+        ttl : float, default 60
+            Number of seconds a cached response is used without revalidation
+        backend : str | mistapi.__response_cache.ResponseCache, default "memory"
+            "memory" to cache the responses in memory, "sqlite" to cache them
+            on disk in the `path` sqlite database (the cache is then reused by
+            the next runs), or a ResponseCache instance
+        max_entries : int, default 1024
+            Maximum number of cached responses. The least recently used
+            responses are evicted first
+        path : str, default None
+            Path of the sqlite database. Required with the "sqlite" backend
+        """
+        if ttl < 0:
+            raise ValueError("ttl must be >= 0")
+        if isinstance(backend, ResponseCache):
+            cache = backend
+        elif backend == "memory":
+            cache = MemoryCache(max_entries=max_entries)
+        elif backend == "sqlite":
+            if not path:
+                raise ValueError('path is required with the "sqlite" backend')
+            cache = SQLiteCache(path, max_entries=max_entries)
+        else:
+            raise ValueError(f"unknown cache backend {backend!r}")
+        self._cache_ttl = ttl
+        self._response_cache = cache
+        logger.info(
+            "apirequest:enable_cache:%s cache enabled with ttl=%ss",
+            type(cache).__name__,
+            ttl,
+        )
+
+    def disable_cache(self) -> None:
+        """
+        Disable the cache of the GET responses
+        """
+        if isinstance(self._response_cache, SQLiteCache):
+            self._response_cache.close()
+        self._response_cache = None
+        logger.info("apirequest:disable_cache:cache disabled")
+
+    def clear_cache(self) -> None:
+        """
+        Remove all the cached responses
+        """
+        if self._response_cache is not None:
+            self._response_cache.clear()
+
+    def get_cache_stats(self) -> dict[str, int]:
+        """
+        Get the cache metrics. Empty when the cache is disabled.
+
+        RETURN
+        -----------
+        dict
+            "hits": responses returned from the cache without request,
+            "revalidated": cached responses confirmed by a HTTP 304,
+            "misses": requests sent because no fresh response was cached,
+            "evictions": responses evicted by the LRU policy
+        """
+        if self._response_cache is None:
+            return {}
+        return dict(self._response_cache.stats)
+
+    def _cache_key(self, url: str, auth_headers: dict[str, str]) -> str:
+        """
+        Return the cache key of `url` requested with `auth_headers`: the
+        responses are cached per cloud host and API token (or login user
+        for the login/password sessions, set by APISession)
+        """
+        identity = auth_headers.get("Authorization") or getattr(self, "email", None)
+        return cache_key(url, f"{self._cloud_uri}\n{identity or ''}")
+
+    def _cached_get(
+        self, cache: ResponseCache, url: str, keep_raw_data: bool | None
+    ) -> APIResponse:
+        key = self._cache_key(url, self._auth_snapshot()[1])
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh(self._cache_ttl):
+            cache._count("hits")
+            logger.debug("apirequest:mist_get:cache hit for %s", url)
+            if keep_raw_data is None:
+                keep_raw_data = self._keep_raw_data
+            return APIResponse(
+                url=url, response=entry.to_response(), keep_raw_data=keep_raw_data
+            )
+        cache._count("misses")
+        validators = entry.validators() if entry is not None else {}
+
+        def _do_get(headers: dict[str, str]):
+            # the validators only apply to the credentials the entry was
+            # cached with (the API token may be rotated between attempts)
+            attempt_key = self._cache_key(url, headers)
+            attempt_validators = validators if attempt_key == key else {}
+            resp = self._session.get(url, headers={**headers, **attempt_validators})
+            if resp.status_code == 304 and attempt_validators:
+                logger.debug("apirequest:mist_get:cache revalidated for %s", url)
+                cache.touch(key)
+                cache._count("revalidated")
+                return entry.to_response()  # type: ignore[union-attr]
+            if resp.status_code == 200:
+                # the session cookies are never stored with the cached responses
+                resp_headers = {
+                    name: value
+                    for name, value in resp.headers.items()
+                    if name.lower() != "set-cookie"
+                }
+                cache.set(
+                    CacheEntry(url, 200, resp_headers, resp.content, key=attempt_key)
+                )
+            return resp
+
+        return self._request_with_retry("mist_get", _do_get, url, keep_raw_data)
+
+    def _invalidate_cache(self, url: str) -> None:
+        """
+        Drop the cached responses of a resource modified by a write request,
+        of its children and of its parent collection
+        """
+        if self._response_cache is None:
+            return
+        self._response_cache.invalidate(url)
+        self._response_cache.invalidate(url.rsplit("/", 1)[0], children=False)
+
     def _gen_query(self, query: dict[str, str] | None) -> str:
         if not query:
             return ""
@@ -183,15 +766,98 @@ class APIRequest:
                     request_body += f"\r\n{i}"
         return request_body
 
-    def _handle_rate_limit(self, resp: requests.Response, attempt: int) -> None:
+    def _gen_multipart_form_data(
+        self, method_name: str, multipart_form_data: dict | None
+    ) -> tuple[dict[str, Any], list]:
+        """
+        Build the multipart form used by the "post_file" requests. Files
+        referenced by the "csv" and "file" keys are opened and must be closed
+        by the caller once the request is sent.
+
+        PARAMS
+        -----------
+        method_name : str
+            name of the calling method, used in the logs
+        multipart_form_data : dict
+            dict of key/values to add include in the multipart form
+
+        RETURN
+        -----------
+        tuple[dict, list]
+            generated multipart form data, and list of opened files
+        """
+        if multipart_form_data is None:
+            multipart_form_data = {}
+        logger.debug(
+            "apirequest:%s:initial multipart_form_data:%s",
+            method_name,
+            multipart_form_data,
+        )
+        generated_multipart_form_data: dict[str, Any] = {}
+        opened_files: list = []
+        for key in multipart_form_data:
+            logger.debug(
+                "apirequest:%s:multipart_form_data:%s = %s",
+                method_name,
+                key,
+                multipart_form_data[key],
+            )
+            if multipart_form_data[key]:
+                try:
+                    if key in ["csv", "file"]:
+                        logger.debug(
+                            "apirequest:%s:reading file:%s",
+                            method_name,
+                            multipart_form_data[key],
+                        )
+                        f = open(multipart_form_data[key], "rb")
+                        opened_files.append(f)
+                        generated_multipart_form_data[key] = (
+                            os.path.basename(multipart_form_data[key]),
+                            f,
+                            "application/octet-stream",
+                        )
+                    else:
+                        generated_multipart_form_data[key] = (
+                            None,
+                            json.dumps(multipart_form_data[key]),
+                        )
+                except (OSError, json.JSONDecodeError):
+                    logger.error(
+                        "apirequest:%s:multipart_form_data:"
+                        "Unable to parse JSON object %s with value %s",
+                        method_name,
+                        key,
+                        multipart_form_data[key],
+                    )
+                    logger.error(
+                        "apirequest:%s: Exception occurred",
+                        method_name,
+                        exc_info=True,
+                    )
+        logger.debug(
+            "apirequest:%s:final multipart_form_data:%s",
+            method_name,
+            generated_multipart_form_data,
+        )
+        return generated_multipart_form_data, opened_files
+
+    def _rate_limit_wait(self, resp: requests.Response, attempt: int) -> int:
+        """
+        Compute how long to wait before retrying a rate-limited request, based
+        on the "Retry-After" header or on an exponential backoff.
+        Shared by the sync and async transports.
+        """
         retry_after = resp.headers.get("Retry-After")
         if retry_after:
             try:
-                wait = int(retry_after)
+                return int(retry_after)
             except ValueError:
-                wait = self._DEFAULT_RETRY_AFTER * (2**attempt)
-        else:
-            wait = self._DEFAULT_RETRY_AFTER * (2**attempt)
+                pass
+        return self._DEFAULT_RETRY_AFTER * (2**attempt)
+
+    def _handle_rate_limit(self, resp: requests.Response, attempt: int) -> None:
+        wait = self._rate_limit_wait(resp, attempt)
         logger.info(
             "apirequest:rate_limited:sleeping %ss (attempt %s/%s)",
             wait,
@@ -201,16 +867,31 @@ class APIRequest:
         time.sleep(wait)
 
     def _request_with_retry(
-        self, method_name: str, request_fn: Callable, url: str
+        self,
+        method_name: str,
+        request_fn: Callable[[dict[str, str]], requests.Response],
+        url: str,
+        keep_raw_data: bool | None = None,
     ) -> APIResponse:
-        """Shared retry wrapper for all HTTP methods."""
+        """
+        Shared retry wrapper for all HTTP methods. `request_fn` receives the
+        authentication headers to send with each attempt.
+        """
         resp = None
         proxy_failed = False
         for attempt in range(self._MAX_429_RETRIES + 1):
+            reserved_index, delay = self._reserve_rate_limit()
+            if delay > 0:
+                logger.debug(
+                    "apirequest:%s:rate limiter:waiting %.2fs", method_name, delay
+                )
+                time.sleep(delay)
+            token_index, auth_headers = self._auth_snapshot(reserved_index)
             try:
                 logger.info("apirequest:%s:sending request to %s", method_name, url)
                 self._log_proxy()
-                resp = request_fn()
+                resp = request_fn(auth_headers)
+                self._sync_csrftoken(resp)
                 logger.debug(
                     "apirequest:%s:request headers:%s",
                     method_name,
@@ -234,7 +915,7 @@ class APIRequest:
                         self._MAX_429_RETRIES,
                     )
                     try:
-                        self._next_apitoken()
+                        self._next_apitoken(token_index)
                     except RuntimeError:
                         pass  # single token — still retry with backoff
                     self._handle_rate_limit(e.response, attempt)
@@ -255,9 +936,21 @@ class APIRequest:
                 break
         with self._token_lock:
             self._count += 1
-        return APIResponse(url=url, response=resp, proxy_error=proxy_failed)
+        if keep_raw_data is None:
+            keep_raw_data = self._keep_raw_data
+        return APIResponse(
+            url=url,
+            response=resp,
+            proxy_error=proxy_failed,
+            keep_raw_data=keep_raw_data,
+        )
 
-    def mist_get(self, uri: str, query: dict[str, str] | None = None) -> APIResponse:
+    def mist_get(
+        self,
+        uri: str,
+        query: dict[str, str] | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
         """
         GET HTTP Request
 
@@ -267,6 +960,8 @@ class APIRequest:
             HTTP URI (e.g. "/api/v1/self")
         query : dict
             dict of HTTP Queries (e.g. {"page": 1, "limit":100})
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
 
         RETURN
         -----------
@@ -274,9 +969,21 @@ class APIRequest:
             response from the API call
         """
         url = self._url(uri) + self._gen_query(query)
-        return self._request_with_retry("mist_get", lambda: self._session.get(url), url)
+        if self._response_cache is not None:
+            return self._cached_get(self._response_cache, url, keep_raw_data)
+        return self._request_with_retry(
+            "mist_get",
+            lambda headers: self._session.get(url, headers=headers),
+            url,
+            keep_raw_data,
+        )
 
-    def mist_post(self, uri: str, body: dict | list | None = None) -> APIResponse:
+    def mist_post(
+        self,
+        uri: str,
+        body: dict | list | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
         """
         POST HTTP Request
 
@@ -285,6 +992,8 @@ class APIRequest:
         uri : str
             HTTP URI (e.g. "/api/v1/self")
         body : dict
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
 
         RETURN
         -----------
@@ -292,15 +1001,26 @@ class APIRequest:
             response from the API call
         """
         url = self._url(uri)
-        headers = {"Content-Type": "application/json"}
+        content_type = {"Content-Type": "application/json"}
         logger.debug("apirequest:mist_post:Request body:%s", body)
         if isinstance(body, str):
-            fn = lambda: self._session.post(url, data=body, headers=headers)
+            fn = lambda headers: self._session.post(
+                url, data=body, headers={**headers, **content_type}
+            )
         else:
-            fn = lambda: self._session.post(url, json=body, headers=headers)
-        return self._request_with_retry("mist_post", fn, url)
+            fn = lambda headers: self._session.post(
+                url, json=body, headers={**headers, **content_type}
+            )
+        response = self._request_with_retry("mist_post", fn, url, keep_raw_data)
+        self._invalidate_cache(url)
+        return response
 
-    def mist_put(self, uri: str, body: dict | None = None) -> APIResponse:
+    def mist_put(
+        self,
+        uri: str,
+        body: dict | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
         """
         PUT HTTP Request
 
@@ -309,6 +1029,8 @@ class APIRequest:
         uri : str
             HTTP URI (e.g. "/api/v1/self")
         body : dict
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
 
         RETURN
         -----------
@@ -316,15 +1038,26 @@ class APIRequest:
             response from the API call
         """
         url = self._url(uri)
-        headers = {"Content-Type": "application/json"}
+        content_type = {"Content-Type": "application/json"}
         logger.debug("apirequest:mist_put:Request body:%s", body)
         if isinstance(body, str):
-            fn = lambda: self._session.put(url, data=body, headers=headers)
+            fn = lambda headers: self._session.put(
+                url, data=body, headers={**headers, **content_type}
+            )
         else:
-            fn = lambda: self._session.put(url, json=body, headers=headers)
-        return self._request_with_retry("mist_put", fn, url)
+            fn = lambda headers: self._session.put(
+                url, json=body, headers={**headers, **content_type}
+            )
+        response = self._request_with_retry("mist_put", fn, url, keep_raw_data)
+        self._invalidate_cache(url)
+        return response
 
-    def mist_delete(self, uri: str, query: dict | None = None) -> APIResponse:
+    def mist_delete(
+        self,
+        uri: str,
+        query: dict | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
         """
         DELETE HTTP Request
 
@@ -332,19 +1065,30 @@ class APIRequest:
         -----------
         uri : str
             HTTP URI (e.g. "/api/v1/self")
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
 
         RETURN
         -----------
         mistapi.APIResponse
             response from the API call
         """
-        url = self._url(uri) + self._gen_query(query)
-        return self._request_with_retry(
-            "mist_delete", lambda: self._session.delete(url), url
+        resource_url = self._url(uri)
+        url = resource_url + self._gen_query(query)
+        response = self._request_with_retry(
+            "mist_delete",
+            lambda headers: self._session.delete(url, headers=headers),
+            url,
+            keep_raw_data,
         )
+        self._invalidate_cache(resource_url)
+        return response
 
     def mist_post_file(
-        self, uri: str, multipart_form_data: dict | None = None
+        self,
+        uri: str,
+        multipart_form_data: dict | None = None,
+        keep_raw_data: bool | None = None,
     ) -> APIResponse:
         """
         POST HTTP Request
@@ -355,64 +1099,26 @@ class APIRequest:
             HTTP URI (e.g. "/api/v1/self")
         multipart_form_data : dict
             dict of key/values to add include in the multipart form
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
 
         RETURN
         -----------
         mistapi.APIResponse
             response from the API call
         """
-        if multipart_form_data is None:
-            multipart_form_data = {}
         url = self._url(uri)
-        logger.debug(
-            "apirequest:mist_post_file:initial multipart_form_data:%s",
-            multipart_form_data,
-        )
-        generated_multipart_form_data: dict[str, Any] = {}
-        opened_files: list = []
-        for key in multipart_form_data:
-            logger.debug(
-                "apirequest:mist_post_file:multipart_form_data:%s = %s",
-                key,
-                multipart_form_data[key],
-            )
-            if multipart_form_data[key]:
-                try:
-                    if key in ["csv", "file"]:
-                        logger.debug(
-                            "apirequest:mist_post_file:reading file:%s",
-                            multipart_form_data[key],
-                        )
-                        f = open(multipart_form_data[key], "rb")
-                        opened_files.append(f)
-                        generated_multipart_form_data[key] = (
-                            os.path.basename(multipart_form_data[key]),
-                            f,
-                            "application/octet-stream",
-                        )
-                    else:
-                        generated_multipart_form_data[key] = (
-                            None,
-                            json.dumps(multipart_form_data[key]),
-                        )
-                except (OSError, json.JSONDecodeError):
-                    logger.error(
-                        "apirequest:mist_post_file:multipart_form_data:"
-                        "Unable to parse JSON object %s with value %s",
-                        key,
-                        multipart_form_data[key],
-                    )
-                    logger.error(
-                        "apirequest:mist_post_file: Exception occurred",
-                        exc_info=True,
-                    )
-        logger.debug(
-            "apirequest:mist_post_file:final multipart_form_data:%s",
-            generated_multipart_form_data,
+        generated_multipart_form_data, opened_files = self._gen_multipart_form_data(
+            "mist_post_file", multipart_form_data
         )
 
-        def _do_post_file():
-            resp = self._session.post(url, files=generated_multipart_form_data)
+        def _do_post_file(headers: dict[str, str]):
+            # rewind the files in case the request is retried after a 429
+            for f in opened_files:
+                f.seek(0)
+            resp = self._session.post(
+                url, files=generated_multipart_form_data, headers=headers
+            )
             logger.debug(
                 "apirequest:mist_post_file:request body:%s",
                 self.remove_file_from_body(resp),
@@ -420,7 +1126,11 @@ class APIRequest:
             return resp
 
         try:
-            return self._request_with_retry("mist_post_file", _do_post_file, url)
+            response = self._request_with_retry(
+                "mist_post_file", _do_post_file, url, keep_raw_data
+            )
         finally:
             for f in opened_files:
                 f.close()
+        self._invalidate_cache(url)
+        return response
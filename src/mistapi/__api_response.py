@@ -16,6 +16,7 @@ import re
 from requests import Response
 from requests.structures import CaseInsensitiveDict
 
+from mistapi import __json as _json
 from mistapi.__logger import console, logger
 
 
@@ -25,7 +26,11 @@ class APIResponse:
     """
 
     def __init__(
-        self, response: Response | None, url: str, proxy_error: bool = False
+        self,
+        response: Response | None,
+        url: str,
+        proxy_error: bool = False,
+        keep_raw_data: bool = True,
     ) -> None:
         """
         PARAMS
@@ -34,8 +39,16 @@ class APIResponse:
             Response from the request
         url : str
             URL of the HTTP Request
+        proxy_error : bool, default False
+            True if the request failed because of the proxy
+        keep_raw_data : bool, default True
+            If True, the response body is kept and made available, as text,
+            through the `raw_data` attribute. If False, the body is released
+            once decoded and `raw_data` is an empty string.
         """
-        self.raw_data: str = ""
+        self._raw_content: bytes | None = None
+        self._raw_encoding: str = "utf-8"
+        self._raw_data: str | None = ""
         self.data: dict | list = {}
         self.url: str = url
         self.next: str | None = None
@@ -53,8 +66,15 @@ class APIResponse:
             console.debug(f"Response Status Code: {response.status_code}")
 
             try:
-                self.raw_data = response.text
-                self.data = response.json()
+                content = response.content
+                if keep_raw_data:
+                    # the text copy of the body is only built if raw_data is read
+                    self._raw_content = content
+                    self._raw_data = None
+                    encoding = getattr(response, "encoding", None)
+                    if isinstance(encoding, str) and encoding:
+                        self._raw_encoding = encoding
+                self.data = _json.loads(content)
                 self._check_next()
                 logger.debug("apiresponse:__init__:HTTP response processed")
                 if self.status_code >= 400 or (
@@ -67,6 +87,26 @@ class APIResponse:
                     f"apiresponse:__init__:unable to process HTTP Response: \r\n{err}"
                 )
 
+    @property
+    def raw_data(self) -> str:
+        """
+        Response body as text. Empty when the response was created with
+        `keep_raw_data=False`.
+        """
+        if self._raw_data is None:
+            content = self._raw_content or b""
+            try:
+                self._raw_data = content.decode(self._raw_encoding, errors="replace")
+            except LookupError:
+                self._raw_data = content.decode("utf-8", errors="replace")
+            self._raw_content = None
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: str) -> None:
+        self._raw_content = None
+        self._raw_data = value
+
     def _check_next(self) -> None:
         logger.debug("apiresponse:_check_next")
         if isinstance(self.data, dict) and "next" in self.data:
@@ -68,6 +68,15 @@ class APISession(APIRequest):
         logging_log_level: int = 10,
         show_cli_notif: bool = True,
         https_proxy: str | None = None,
+        keep_raw_data: bool = True,
+        rate_limit: int | None = None,
+        rate_limit_burst: int | None = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: bool = True,
+        connection_retries: int = 0,
+        cache_ttl: float | None = None,
     ) -> None:
         """
         Initialise the APISession class. This class is used to manage Mist API authentication.
@@ -115,6 +124,38 @@ class APISession(APIRequest):
             show/hide package decorative text on the console output
         https_proxy : str, default None
             HTTPS Proxy to use to send the API Requests
+        keep_raw_data : bool, default True
+            If True, the body of each response is kept and available as text in
+            `APIResponse.raw_data`. Set to False to release it once decoded,
+            which halves the memory used by large responses. Can be overridden
+            per request with the `keep_raw_data` parameter of the `mist_*`
+            methods
+        rate_limit : int, default None
+            Maximum number of API calls per hour and per API Token. When set,
+            the requests are paced client-side and sent with the API Token
+            having the most remaining budget, instead of waiting for HTTP 429
+            responses. See `set_rate_limit()`. None disables the rate limiter
+        rate_limit_burst : int, default None
+            Maximum number of API calls sent without pacing after an idle
+            period. Defaults to 1/60th of `rate_limit`
+        pool_connections : int, default 10
+            Number of HTTP connection pools (one per host) to cache
+        pool_maxsize : int, default 10
+            Maximum number of HTTP connections kept open for reuse. Should be
+            at least the number of threads sharing the session. See
+            `set_connection_pool()`
+        pool_block : bool, default False
+            If True, wait for a free connection when `pool_maxsize`
+            connections are in use, instead of opening a new one
+        tcp_keepalive : bool, default True
+            Enable the TCP keepalive probes on the HTTP connections
+        connection_retries : int, default 0
+            Number of times a request is retried when the connection fails or
+            is reset by the peer
+        cache_ttl : float, default None
+            If set, the GET responses are cached in memory during `cache_ttl`
+            seconds, then revalidated with the ETag/Last-Modified headers.
+            See `enable_cache()`. None disables the cache
         """
         super().__init__()
         LOGGER.info("mistapi:init:package version %s", __version__)
@@ -126,8 +167,16 @@ class APISession(APIRequest):
         self._csrftoken: str | None = None
         self._authenticated: bool = False
         self._count: int = 0
+        self._keep_raw_data: bool = keep_raw_data
         self._session: Session = requests.session()
         self._session.headers["Accept"] = "application/json, application/vnd.api+json"
+        self.set_connection_pool(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            tcp_keepalive=tcp_keepalive,
+            connection_retries=connection_retries,
+        )
         self._console_log_level = console_log_level
         self._logging_log_level = logging_log_level
         self._show_cli_notif = show_cli_notif
@@ -180,6 +229,10 @@ class APISession(APIRequest):
                     "apisession:__init__: overriding previously loaded MIST_APITOKEN with constructor parameter"
                 )
             self.set_api_token(apitoken)
+        if rate_limit:
+            self.set_rate_limit(rate_limit, rate_limit_burst)
+        if cache_ttl:
+            self.enable_cache(ttl=cache_ttl)
         self.first_name: str = ""
         self.last_name: str = ""
         self.via_sso: bool = False
@@ -193,6 +246,7 @@ class APISession(APIRequest):
     def _new_session(self) -> Session:
         session = requests.session()
         session.headers["Accept"] = "application/json, application/vnd.api+json"
+        self._mount_http_adapter(session)
         filtered_proxies = {k: v for k, v in self._proxies.items() if v is not None}
         if filtered_proxies:
             session.proxies.update(filtered_proxies)
@@ -552,11 +606,9 @@ class APISession(APIRequest):
         else:
             valid_api_tokens = apitokens_out
         if valid_api_tokens:
-            self._apitoken = valid_api_tokens
-            self._apitoken_index = 0
-            self._session.headers.update(
-                {"Authorization": "Token " + self._apitoken[self._apitoken_index]}
-            )
+            with self._token_lock:
+                self._apitoken = valid_api_tokens
+                self._set_apitoken_index(0)
             LOGGER.info("apisession:set_api_token:API Token configured")
             CONSOLE.debug("API Token configured")
         else:
@@ -984,10 +1036,12 @@ class APISession(APIRequest):
                     LOGGER.error(
                         "apirequest:mist_post_file: Exception occurred", exc_info=True
                     )
-                csrf_cookie = self._session.cookies.get("csrftoken" + cookies_ext)
+                self._csrf_cookie = "csrftoken" + cookies_ext
+                csrf_cookie = self._session.cookies.get(self._csrf_cookie)
                 if csrf_cookie:
                     self._csrftoken = csrf_cookie
-                    self._session.headers.update({"X-CSRFToken": self._csrftoken})
+                    with self._token_lock:
+                        self._session.headers.update({"X-CSRFToken": self._csrftoken})
                     LOGGER.info("apisession:_set_authenticated:CSRF Token stored")
                 else:
                     LOGGER.error(
@@ -999,6 +1053,7 @@ class APISession(APIRequest):
                 'apisession:_set_authenticated: session is now "Unauthenticated"'
             )
             self._csrftoken = ""
+            self._csrf_cookie = None
             del self._session
             LOGGER.info(
                 "apisession:_set_authenticated:CSRF Token is cleaned up and HTTP Session deleted"
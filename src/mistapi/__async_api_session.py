@@ -0,0 +1,509 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the AsyncAPISession class, a native asyncio transport
+for the Mist API. It reuses the authentication, API Token rotation and HTTP 429
+handling of an existing APISession, and sends the requests with httpx so
+thousands of requests can be multiplexed on a single event loop.
+
+The generated functions in mistapi.api.v1 return whatever the session request
+methods return, so they can be awaited directly when called with an
+AsyncAPISession.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from mistapi.__api_response import APIResponse
+from mistapi.__logger import logger
+from mistapi.__response_cache import CacheEntry, ResponseCache
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the installed extras
+    httpx = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from mistapi import APISession
+
+# Headers copied from the APISession requests.Session to each async request,
+# in addition to the authentication headers
+_FORWARDED_HEADERS = ("Accept",)
+
+
+class AsyncAPISession:
+    """
+    Class managing asyncio REST API requests to the Mist Cloud.
+
+    The AsyncAPISession does not authenticate by itself. It relies on an
+    APISession (API Token or login/password) and shares its Mist Cloud,
+    credentials, cookies, API Token rotation, rate limiter, response cache
+    (see `APISession.enable_cache()`) and request counter.
+
+    EXAMPLE
+    -----------
+    ::
+
+        import asyncio
+        import mistapi
+        from mistapi.api.v1.sites import devices
+
+        apisession = mistapi.APISession(env_file="~/.mist_env")
+        apisession.login()
+
+        async def main():
+            async with mistapi.AsyncAPISession(apisession) as asession:
+                responses = await asyncio.gather(
+                    *[devices.listSiteDevices(asession, site_id) for site_id in site_ids]
+                )
+
+        asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        mist_session: "APISession",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        PARAMS
+        -----------
+        mist_session : mistapi.APISession
+            mistapi session including authentication and Mist host information
+        max_connections : int, default 100
+            Maximum number of concurrent HTTP connections to the Mist Cloud
+        max_keepalive_connections : int, default 20
+            Maximum number of idle connections kept open for reuse
+        timeout : float, default None
+            Timeout in seconds for each HTTP request. None disables the timeout
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncAPISession requires the 'httpx' package. "
+                "Install it with `pip install mistapi[async]`"
+            )
+        if max_connections < 1:
+            raise ValueError("max_connections must be >= 1")
+        if max_keepalive_connections < 0:
+            raise ValueError("max_keepalive_connections must be >= 0")
+        self._mist_session = mist_session
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    ####################################
+    # CLIENT MANAGEMENT
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            session = self._mist_session._session
+            proxy = session.proxies.get("https") if session.proxies else None
+            self._client = httpx.AsyncClient(
+                proxy=proxy,
+                verify=session.verify if session.verify is not None else True,
+                cert=session.cert,
+                timeout=self._timeout,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_keepalive_connections,
+                ),
+            )
+        return self._client
+
+    def _use_session_cookies(self) -> None:
+        """
+        Send the current cookies of the mistapi session with the next request,
+        so the async client follows a re-login or a cookie set by a sync
+        request.
+        """
+        self._get_client().cookies = self._mist_session._session.cookies
+
+    def _store_cookies(self, resp: "httpx.Response") -> None:
+        """
+        Store the cookies sent by the Mist Cloud (e.g. a new CSRF cookie) in
+        the cookie jar of the mistapi session, shared with the sync requests.
+        """
+        session_cookies = self._mist_session._session.cookies
+        if session_cookies is None or not isinstance(resp, httpx.Response):
+            return  # no jar, or response rebuilt from the cache
+        for cookie in resp.cookies.jar:
+            session_cookies.set_cookie(cookie)
+
+    def _headers(
+        self, auth_headers: dict[str, str], extra: dict | None = None
+    ) -> dict[str, str]:
+        """
+        Build the headers of one attempt from the authentication headers
+        snapshot, so an API Token rotation is applied to the retries.
+        """
+        session_headers = self._mist_session._session.headers
+        headers = {
+            key: session_headers[key]
+            for key in _FORWARDED_HEADERS
+            if session_headers.get(key)
+        }
+        headers.update(auth_headers)
+        if extra:
+            headers.update(extra)
+        return headers
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying HTTP connections
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncAPISession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def get_request_count(self) -> int:
+        """
+        Get the number of API requests sent by the script (shared with the
+        APISession)
+
+        RETURN
+        -----------
+        int
+            number of API calls sent
+        """
+        return self._mist_session.get_request_count()
+
+    ####################################
+    # REQUESTS
+    async def _request_with_retry(
+        self,
+        method_name: str,
+        request_fn: Callable[[dict[str, str]], Awaitable["httpx.Response"]],
+        url: str,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        Shared retry wrapper for all HTTP methods. `request_fn` receives the
+        headers to send with each attempt.
+        """
+        mist_session = self._mist_session
+        resp = None
+        proxy_failed = False
+        for attempt in range(mist_session._MAX_429_RETRIES + 1):
+            reserved_index, delay = mist_session._reserve_rate_limit()
+            if delay > 0:
+                logger.debug(
+                    "asyncapisession:%s:rate limiter:waiting %.2fs", method_name, delay
+                )
+                await asyncio.sleep(delay)
+            token_index, auth_headers = mist_session._auth_snapshot(reserved_index)
+            try:
+                logger.info(
+                    "asyncapisession:%s:sending request to %s", method_name, url
+                )
+                self._use_session_cookies()
+                resp = await request_fn(self._headers(auth_headers))
+                self._store_cookies(resp)
+                mist_session._sync_csrftoken(resp)
+                resp.raise_for_status()
+                break
+            except httpx.ProxyError as e:
+                logger.error("asyncapisession:%s:Proxy Error: %s", method_name, e)
+                proxy_failed = True
+                break
+            except httpx.TransportError as e:
+                logger.error("asyncapisession:%s:Connection Error: %s", method_name, e)
+                break
+            except httpx.HTTPStatusError as e:
+                if (
+                    e.response.status_code == 429
+                    and attempt < mist_session._MAX_429_RETRIES
+                ):
+                    logger.warning(
+                        "asyncapisession:%s:HTTP 429 (attempt %s/%s)",
+                        method_name,
+                        attempt + 1,
+                        mist_session._MAX_429_RETRIES,
+                    )
+                    try:
+                        mist_session._next_apitoken(token_index)
+                    except RuntimeError:
+                        pass  # single token — still retry with backoff
+                    wait = mist_session._rate_limit_wait(e.response, attempt)
+                    logger.info(
+                        "asyncapisession:rate_limited:sleeping %ss (attempt %s/%s)",
+                        wait,
+                        attempt + 1,
+                        mist_session._MAX_429_RETRIES,
+                    )
+                    await asyncio.sleep(wait)
+                    continue
+                logger.error("asyncapisession:%s:HTTP error: %s", method_name, e)
+                logger.error(
+                    "asyncapisession:%s:HTTP error description: %s",
+                    method_name,
+                    e.response.text,
+                )
+                break
+            except Exception as e:
+                logger.error("asyncapisession:%s:error: %s", method_name, e)
+                logger.error(
+                    "asyncapisession:%s:Exception occurred",
+                    method_name,
+                    exc_info=True,
+                )
+                break
+        with mist_session._token_lock:
+            mist_session._count += 1
+        if keep_raw_data is None:
+            keep_raw_data = mist_session._keep_raw_data
+        return APIResponse(
+            url=url,
+            response=resp,  # type: ignore[arg-type]
+            proxy_error=proxy_failed,
+            keep_raw_data=keep_raw_data,
+        )
+
+    async def mist_get(
+        self,
+        uri: str,
+        query: dict[str, str] | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        GET HTTP Request
+
+        PARAMS
+        -----------
+        uri : str
+            HTTP URI (e.g. "/api/v1/self")
+        query : dict
+            dict of HTTP Queries (e.g. {"page": 1, "limit":100})
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
+
+        RETURN
+        -----------
+        mistapi.APIResponse
+            response from the API call
+        """
+        url = self._mist_session._url(uri) + self._mist_session._gen_query(query)
+        cache = self._mist_session._response_cache
+        if cache is not None:
+            return await self._cached_get(cache, url, keep_raw_data)
+        client = self._get_client()
+        return await self._request_with_retry(
+            "mist_get",
+            lambda headers: client.get(url, headers=headers),
+            url,
+            keep_raw_data,
+        )
+
+    async def _cached_get(
+        self, cache: ResponseCache, url: str, keep_raw_data: bool | None
+    ) -> APIResponse:
+        """Async version of APIRequest._cached_get, using the same cache"""
+        mist_session = self._mist_session
+        key = mist_session._cache_key(url, mist_session._auth_snapshot()[1])
+        entry = cache.get(key)
+        if entry is not None and entry.is_fresh(mist_session._cache_ttl):
+            cache._count("hits")
+            logger.debug("asyncapisession:mist_get:cache hit for %s", url)
+            if keep_raw_data is None:
+                keep_raw_data = mist_session._keep_raw_data
+            return APIResponse(
+                url=url, response=entry.to_response(), keep_raw_data=keep_raw_data
+            )
+        cache._count("misses")
+        validators = entry.validators() if entry is not None else {}
+        client = self._get_client()
+
+        async def _do_get(headers: dict[str, str]):
+            # the validators only apply to the credentials the entry was
+            # cached with (the API token may be rotated between attempts)
+            attempt_key = mist_session._cache_key(url, headers)
+            attempt_validators = validators if attempt_key == key else {}
+            resp = await client.get(url, headers={**headers, **attempt_validators})
+            if resp.status_code == 304 and attempt_validators:
+                logger.debug("asyncapisession:mist_get:cache revalidated for %s", url)
+                cache.touch(key)
+                cache._count("revalidated")
+                return entry.to_response()  # type: ignore[union-attr]
+            if resp.status_code == 200:
+                # the session cookies are never stored with the cached responses
+                resp_headers = {
+                    name: value
+                    for name, value in resp.headers.items()
+                    if name.lower() != "set-cookie"
+                }
+                cache.set(
+                    CacheEntry(url, 200, resp_headers, resp.content, key=attempt_key)
+                )
+            return resp
+
+        return await self._request_with_retry("mist_get", _do_get, url, keep_raw_data)
+
+    async def mist_post(
+        self,
+        uri: str,
+        body: dict | list | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        POST HTTP Request
+
+        PARAMS
+        -----------
+        uri : str
+            HTTP URI (e.g. "/api/v1/self")
+        body : dict
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
+
+        RETURN
+        -----------
+        mistapi.APIResponse
+            response from the API call
+        """
+        url = self._mist_session._url(uri)
+        client = self._get_client()
+        content_type = {"Content-Type": "application/json"}
+        logger.debug("asyncapisession:mist_post:Request body:%s", body)
+        if isinstance(body, str):
+            fn = lambda headers: client.post(
+                url, content=body, headers={**headers, **content_type}
+            )
+        else:
+            fn = lambda headers: client.post(
+                url, json=body, headers={**headers, **content_type}
+            )
+        response = await self._request_with_retry("mist_post", fn, url, keep_raw_data)
+        self._mist_session._invalidate_cache(url)
+        return response
+
+    async def mist_put(
+        self,
+        uri: str,
+        body: dict | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        PUT HTTP Request
+
+        PARAMS
+        -----------
+        uri : str
+            HTTP URI (e.g. "/api/v1/self")
+        body : dict
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
+
+        RETURN
+        -----------
+        mistapi.APIResponse
+            response from the API call
+        """
+        url = self._mist_session._url(uri)
+        client = self._get_client()
+        content_type = {"Content-Type": "application/json"}
+        logger.debug("asyncapisession:mist_put:Request body:%s", body)
+        if isinstance(body, str):
+            fn = lambda headers: client.put(
+                url, content=body, headers={**headers, **content_type}
+            )
+        else:
+            fn = lambda headers: client.put(
+                url, json=body, headers={**headers, **content_type}
+            )
+        response = await self._request_with_retry("mist_put", fn, url, keep_raw_data)
+        self._mist_session._invalidate_cache(url)
+        return response
+
+    async def mist_delete(
+        self,
+        uri: str,
+        query: dict | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        DELETE HTTP Request
+
+        PARAMS
+        -----------
+        uri : str
+            HTTP URI (e.g. "/api/v1/self")
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
+
+        RETURN
+        -----------
+        mistapi.APIResponse
+            response from the API call
+        """
+        resource_url = self._mist_session._url(uri)
+        url = resource_url + self._mist_session._gen_query(query)
+        client = self._get_client()
+        response = await self._request_with_retry(
+            "mist_delete",
+            lambda headers: client.delete(url, headers=headers),
+            url,
+            keep_raw_data,
+        )
+        self._mist_session._invalidate_cache(resource_url)
+        return response
+
+    async def mist_post_file(
+        self,
+        uri: str,
+        multipart_form_data: dict | None = None,
+        keep_raw_data: bool | None = None,
+    ) -> APIResponse:
+        """
+        POST HTTP Request
+
+        PARAMS
+        -----------
+        uri : str uri
+            HTTP URI (e.g. "/api/v1/self")
+        multipart_form_data : dict
+            dict of key/values to add include in the multipart form
+        keep_raw_data : bool, default None
+            Override the session `keep_raw_data` setting for this request
+
+        RETURN
+        -----------
+        mistapi.APIResponse
+            response from the API call
+        """
+        url = self._mist_session._url(uri)
+        client = self._get_client()
+        files: dict[str, Any]
+        files, opened_files = self._mist_session._gen_multipart_form_data(
+            "mist_post_file", multipart_form_data
+        )
+
+        async def _do_post_file(headers: dict[str, str]):
+            # rewind the files in case the request is retried after a 429
+            for f in opened_files:
+                f.seek(0)
+            return await client.post(url, files=files, headers=headers)
+
+        try:
+            response = await self._request_with_retry(
+                "mist_post_file", _do_post_file, url, keep_raw_data
+            )
+        finally:
+            for f in opened_files:
+                f.close()
+        self._mist_session._invalidate_cache(url)
+        return response
@@ -12,8 +12,11 @@
 
 # isort: skip_file
 from mistapi.__api_session import APISession as APISession
+from mistapi.__async_api_session import AsyncAPISession as AsyncAPISession
 from mistapi.__pagination import get_all as get_all
 from mistapi.__pagination import get_next as get_next
+from mistapi.__pagination import iter_all as iter_all
+from mistapi.__pagination import iter_pages as iter_pages
 from mistapi.__version import __author__ as __author__
 from mistapi.__version import __version__ as __version__
 
@@ -23,12 +26,14 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from mistapi import api as api
+    from mistapi import batch as batch
     from mistapi import cli as cli
     from mistapi import device_utils as device_utils
     from mistapi import websockets as websockets
 
 _LAZY_SUBPACKAGES = {
     "api": "mistapi.api",
+    "batch": "mistapi.batch",
     "cli": "mistapi.cli",
     "websockets": "mistapi.websockets",
     "device_utils": "mistapi.device_utils",
@@ -51,6 +56,9 @@ async def arun(func: _Callable, *args, **kwargs):
 
     Wraps the function call in ``asyncio.to_thread()`` so the blocking
     HTTP request runs in a thread pool while the event loop continues.
+    For large fan-outs, prefer ``mistapi.AsyncAPISession``: the generated
+    API functions can be awaited directly with it, without one thread per
+    in-flight request.
 
     EXAMPLE
     -----------
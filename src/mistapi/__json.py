@@ -0,0 +1,59 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module selects the JSON decoder used to process the Mist API payloads.
+orjson or msgspec are used when installed (in this order), otherwise the
+decoder falls back to the standard json module.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+JSON_BACKEND: str
+_loads: Callable[[bytes | str], Any]
+
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+    _loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+
+        JSON_BACKEND = "msgspec"
+        _loads = msgspec.json.decode
+    except ImportError:
+        JSON_BACKEND = "json"
+        _loads = json.loads
+
+# Exceptions raised by the selected decoder for an invalid payload
+JSON_DECODE_ERRORS: tuple[type[Exception], ...] = (ValueError, TypeError)
+if JSON_BACKEND == "msgspec":
+    JSON_DECODE_ERRORS = (ValueError, TypeError, msgspec.DecodeError)
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Decode a JSON document with the fastest available backend.
+
+    PARAMS
+    -----------
+    data : bytes | str
+        JSON document. Bytes are decoded directly, without an intermediate
+        str copy, when the backend supports it.
+
+    RETURN
+    -----------
+    Any
+        decoded object
+    """
+    return _loads(data)
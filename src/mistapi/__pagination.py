@@ -10,8 +10,14 @@
 --------------------------------------------------------------------------------
 """
 
+import math
+import re
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+
 from mistapi import APISession as _APISession
 from mistapi.__api_response import APIResponse as _APIResponse
+from mistapi.__logger import logger
 
 
 def get_next(mist_session: _APISession, response: _APIResponse) -> _APIResponse | None:
@@ -36,7 +42,49 @@ def get_next(mist_session: _APISession, response: _APIResponse) -> _APIResponse
         return None
 
 
-def get_all(mist_session: _APISession, response: _APIResponse) -> list:
+def _page_items(response: _APIResponse) -> list | None:
+    """
+    Return the items of a page, for both the list shape and the
+    {"results": [...]} search shape
+    """
+    if isinstance(response.data, list):
+        return response.data
+    if isinstance(response.data, dict) and isinstance(
+        response.data.get("results"), list
+    ):
+        return response.data["results"]
+    return None
+
+
+def _remaining_page_uris(response: _APIResponse) -> list[str]:
+    """
+    Compute the URIs of all the remaining pages when the response is paginated
+    with the X-Page-Total/X-Page-Limit/X-Page-Page headers. Returns an empty
+    list when the pages can't be computed up front (e.g. search endpoints
+    using a "next" link).
+    """
+    if not response.next or not response.headers:
+        return []
+    if isinstance(response.data, dict) and "next" in response.data:
+        return []
+    try:
+        total = int(response.headers.get("X-Page-Total"))
+        limit = int(response.headers.get("X-Page-Limit"))
+        page = int(response.headers.get("X-Page-Page"))
+    except (TypeError, ValueError):
+        return []
+    if limit <= 0:
+        return []
+    last_page = math.ceil(total / limit)
+    return [
+        re.sub(r"(?<=[?&])page=\d+(?=&|$)", f"page={next_page}", response.next)
+        for next_page in range(page + 1, last_page + 1)
+    ]
+
+
+def get_all(
+    mist_session: _APISession, response: _APIResponse, max_workers: int = 1
+) -> list:
     """
     Retrieve and return all the items after a first request
 
@@ -46,13 +94,51 @@ def get_all(mist_session: _APISession, response: _APIResponse) -> list:
         mistapi session including authentication and Mist host information
     response : mistapi.APIResponse
         mistapi previous response to use
+    max_workers : int, default 1
+        Maximum number of pages requested concurrently. When greater than 1
+        and the response is paginated with the X-Page-* headers, all the
+        remaining pages are computed from the first response and retrieved
+        in parallel, then reassembled in order. HTTP 429 responses are
+        retried by the session (with API Token rotation when multiple
+        tokens are configured). Endpoints using a "next" link (e.g. search
+        endpoints) are always retrieved sequentially. As with the sequential
+        retrieval, the items stop at the first page which could not be
+        retrieved (the error is logged).
 
     RETURN
     -----------
     list
         list of all the items
     """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
     data: list = []
+    first_items = _page_items(response)
+    page_uris = _remaining_page_uris(response) if max_workers > 1 else []
+    if first_items is not None and page_uris:
+        data = list(first_items)
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(page_uris)))
+        try:
+            # executor.map() yields the pages in the submission order
+            for page_uri, page in zip(
+                page_uris, executor.map(mist_session.mist_get, page_uris)
+            ):
+                items = _page_items(page)
+                if page.status_code != 200 or items is None:
+                    # never splice the following pages around the missing one
+                    logger.error(
+                        "pagination:get_all:unable to retrieve %s (HTTP %s). "
+                        "Returning the %s items of the previous pages",
+                        page_uri,
+                        page.status_code,
+                        len(data),
+                    )
+                    break
+                data += items
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return data
+
     if isinstance(response.data, list):
         data = list(response.data)
         while response.next:
@@ -68,3 +154,65 @@ def get_all(mist_session: _APISession, response: _APIResponse) -> list:
                 response = tmp
                 data += response.data["results"]
     return data
+
+
+def iter_pages(
+    mist_session: _APISession, response: _APIResponse
+) -> Generator[_APIResponse, None, None]:
+    """
+    Generator yielding the response passed in parameter, then each following
+    page as it is retrieved. A page is released as soon as the next one is
+    requested, so only one page is kept in memory at a time.
+
+    PARAMS
+    -----------
+    mist_session :  mistapi.APISession
+        mistapi session including authentication and Mist host information
+    response : mistapi.APIResponse
+        mistapi previous response to use
+
+    YIELD
+    -----------
+    mistapi.APIResponse
+        response of each page, starting with the response passed in parameter
+    """
+    page: _APIResponse | None = response
+    del response
+    while page is not None:
+        next_uri = page.next
+        yield page
+        page = None
+        if next_uri:
+            page = mist_session.mist_get(next_uri)
+
+
+def iter_all(
+    mist_session: _APISession, response: _APIResponse
+) -> Generator[dict, None, None]:
+    """
+    Generator yielding all the items one by one, starting with the items of
+    the response passed in parameter. Works with both the list shape and the
+    {"results": [...], "next": ...} search shape. Contrary to get_all(), the
+    items are not accumulated, so large exports are processed with the
+    memory footprint of a single page.
+
+    PARAMS
+    -----------
+    mist_session :  mistapi.APISession
+        mistapi session including authentication and Mist host information
+    response : mistapi.APIResponse
+        mistapi previous response to use
+
+    YIELD
+    -----------
+    dict
+        each item of each page
+    """
+    pages = iter_pages(mist_session, response)
+    del response
+    for page in pages:
+        items = _page_items(page)
+        del page
+        if items:
+            yield from items
+        del items
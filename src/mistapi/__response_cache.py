@@ -0,0 +1,291 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the response cache backends used by
+APIRequest.mist_get() when the cache is enabled with
+APISession.enable_cache(). The responses are stored by URL (including the
+query string) and credentials (see cache_key()), with a TTL and a LRU
+eviction. Once the TTL is expired, an
+entry with an ETag or a Last-Modified header is revalidated with a
+conditional request (If-None-Match/If-Modified-Since) instead of being
+downloaded again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+def cache_key(url: str, identity: str) -> str:
+    """
+    Return the cache key of `url` requested with the credentials `identity`
+    (cloud host and API token or login user). The key is the URL followed
+    by a hash of the identity, so a response is never served to other
+    credentials, while the invalidation of a URL drops the responses cached
+    for all the credentials.
+    """
+    digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+    return f"{url}#{digest}"
+
+
+class CacheEntry:
+    """
+    Cached HTTP response
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: dict[str, str],
+        content: bytes,
+        stored_at: float | None = None,
+        key: str | None = None,
+    ) -> None:
+        self.url = url
+        self.key = key or url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    @property
+    def etag(self) -> str | None:
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> dict[str, str]:
+        """Return the headers used to revalidate the entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Build a requests.Response from the cached entry"""
+        resp = requests.Response()
+        resp.url = self.url
+        resp.status_code = self.status_code
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.content
+        resp.encoding = "utf-8"
+        resp.request = requests.PreparedRequest()
+        resp.request.prepare(method="GET", url=self.url)
+        return resp
+
+
+class ResponseCache(ABC):
+    """
+    Base class of the response cache backends
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "evictions": 0,
+        }
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry stored with `key`, or None"""
+
+    @abstractmethod
+    def set(self, entry: CacheEntry) -> None:
+        """Store the entry with its key, and evict the least recently used"""
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Mark the entry as fresh (e.g. after a HTTP 304)"""
+
+    @abstractmethod
+    def invalidate(self, url: str, children: bool = True) -> None:
+        """
+        Remove the entries of `url` (with any query string, for all the
+        credentials), and, if `children` is True, the entries of the URLs
+        below `url`
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all the entries"""
+
+    @staticmethod
+    def _matches(key: str, url: str, children: bool) -> bool:
+        if key == url or key.startswith((url + "?", url + "#")):
+            return True
+        return children and key.startswith(url + "/")
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU response cache, shared by the threads using the session
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        super().__init__(max_entries)
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+
+    def invalidate(self, url: str, children: bool = True) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if self._matches(k, url, children)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk LRU response cache, stored in a sqlite database so it can be
+    reused by the next runs of a script. The database file is created with
+    owner-only permissions, since it contains the API responses.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024) -> None:
+        super().__init__(max_entries)
+        self.path = os.path.expanduser(path)
+        if not os.path.exists(self.path):
+            os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, "
+                "content BLOB, stored_at REAL, accessed_at REAL)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT status_code, headers, content, stored_at FROM responses "
+                "WHERE url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                (time.time(), key),
+            )
+        return CacheEntry(
+            url=key.partition("#")[0],
+            status_code=row[0],
+            headers=json.loads(row[1]),
+            content=row[2],
+            stored_at=row[3],
+            key=key,
+        )
+
+    def set(self, entry: CacheEntry) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    entry.key,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.stored_at,
+                    time.time(),
+                ),
+            )
+            overflow = (
+                self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                - self.max_entries
+            )
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE url IN (SELECT url FROM responses "
+                    "ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats["evictions"] += overflow
+
+    def touch(self, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), key)
+            )
+
+    def invalidate(self, url: str, children: bool = True) -> None:
+        escaped = url.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = (
+            "DELETE FROM responses WHERE url = ? OR url LIKE ? ESCAPE '\\' "
+            "OR url LIKE ? ESCAPE '\\'"
+        )
+        params: tuple = (url, escaped + "?%", escaped + "#%")
+        if children:
+            query += " OR url LIKE ? ESCAPE '\\'"
+            params += (escaped + "/%",)
+        with self._lock, self._db:
+            self._db.execute(query, params)
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
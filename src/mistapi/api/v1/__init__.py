@@ -10,21 +10,25 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1 import (
-    const,
-    installer,
-    invite,
-    login,
-    logout,
-    mobile,
-    msps,
-    orgs,
-    recover,
-    register,
-    self,
-    sites,
-    utils,
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mistapi.api.v1 import (
+        const,
+        installer,
+        invite,
+        login,
+        logout,
+        mobile,
+        msps,
+        orgs,
+        recover,
+        register,
+        self,
+        sites,
+        utils,
+    )
 
 __all__ = [
     "const",
@@ -41,3 +45,16 @@ __all__ = [
     "sites",
     "utils",
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -10,35 +10,39 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.const import (
-    alarm_defs,
-    ap_channels,
-    ap_esl_versions,
-    ap_led_status,
-    app_categories,
-    app_subcategories,
-    applications,
-    client_events,
-    countries,
-    default_gateway_config,
-    device_events,
-    device_models,
-    fingerprint_types,
-    gateway_applications,
-    insight_metrics,
-    languages,
-    license_types,
-    marvisclient_versions,
-    mxedge_events,
-    mxedge_models,
-    nac_events,
-    otherdevice_events,
-    otherdevice_models,
-    states,
-    system_events,
-    traffic_types,
-    webhook_topics,
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mistapi.api.v1.const import (
+        alarm_defs,
+        ap_channels,
+        ap_esl_versions,
+        ap_led_status,
+        app_categories,
+        app_subcategories,
+        applications,
+        client_events,
+        countries,
+        default_gateway_config,
+        device_events,
+        device_models,
+        fingerprint_types,
+        gateway_applications,
+        insight_metrics,
+        languages,
+        license_types,
+        marvisclient_versions,
+        mxedge_events,
+        mxedge_models,
+        nac_events,
+        otherdevice_events,
+        otherdevice_models,
+        states,
+        system_events,
+        traffic_types,
+        webhook_topics,
+    )
 
 __all__ = [
     "alarm_defs",
@@ -69,3 +73,16 @@ __all__ = [
     "traffic_types",
     "webhook_topics",
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -10,6 +10,27 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.installer.sites import optimize
+import importlib as _importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["optimize"]
+if TYPE_CHECKING:
+    from mistapi.api.v1.installer.sites import (
+        optimize,
+    )
+
+__all__ = [
+    "optimize",
+]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -10,91 +10,95 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.orgs import (
-    orgs,
-    aamwprofiles,
-    admins,
-    alarms,
-    alarmtemplates,
-    aos,
-    apitokens,
-    aptemplates,
-    assetfilters,
-    assets,
-    avprofiles,
-    cert,
-    claim,
-    claims,
-    clients,
-    clone,
-    crl,
-    deviceprofiles,
-    devices,
-    events,
-    evpn_topologies,
-    exports,
-    gatewaytemplates,
-    guests,
-    idpprofiles,
-    insights,
-    inventory,
-    invites,
-    jsi,
-    licenses,
-    logs,
-    maps,
-    marvisclients,
-    marvisinvites,
-    mist_nac,
-    mxclusters,
-    mxedges,
-    mxtunnels,
-    nac_clients,
-    nacportals,
-    nacrules,
-    nactags,
-    networks,
-    networktemplates,
-    ocdevices,
-    otherdevices,
-    pcaps,
-    pma,
-    pskportals,
-    psks,
-    rftemplates,
-    sdkclients,
-    sdkinvites,
-    sdktemplates,
-    secintelprofiles,
-    secpolicies,
-    servicepolicies,
-    services,
-    setting,
-    sitegroups,
-    sites,
-    sitetemplates,
-    ssl_proxy_cert,
-    ssoroles,
-    ssos,
-    ssr,
-    stats,
-    subscriptions,
-    templates,
-    tickets,
-    troubleshoot,
-    uisettings,
-    usermacs,
-    vars,
-    vpns,
-    wan_client,
-    wan_clients,
-    webhooks,
-    wired_clients,
-    wlans,
-    wxrules,
-    wxtags,
-    wxtunnels,
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mistapi.api.v1.orgs import (
+        orgs,
+        aamwprofiles,
+        admins,
+        alarms,
+        alarmtemplates,
+        aos,
+        apitokens,
+        aptemplates,
+        assetfilters,
+        assets,
+        avprofiles,
+        cert,
+        claim,
+        claims,
+        clients,
+        clone,
+        crl,
+        deviceprofiles,
+        devices,
+        events,
+        evpn_topologies,
+        exports,
+        gatewaytemplates,
+        guests,
+        idpprofiles,
+        insights,
+        inventory,
+        invites,
+        jsi,
+        licenses,
+        logs,
+        maps,
+        marvisclients,
+        marvisinvites,
+        mist_nac,
+        mxclusters,
+        mxedges,
+        mxtunnels,
+        nac_clients,
+        nacportals,
+        nacrules,
+        nactags,
+        networks,
+        networktemplates,
+        ocdevices,
+        otherdevices,
+        pcaps,
+        pma,
+        pskportals,
+        psks,
+        rftemplates,
+        sdkclients,
+        sdkinvites,
+        sdktemplates,
+        secintelprofiles,
+        secpolicies,
+        servicepolicies,
+        services,
+        setting,
+        sitegroups,
+        sites,
+        sitetemplates,
+        ssl_proxy_cert,
+        ssoroles,
+        ssos,
+        ssr,
+        stats,
+        subscriptions,
+        templates,
+        tickets,
+        troubleshoot,
+        uisettings,
+        usermacs,
+        vars,
+        vpns,
+        wan_client,
+        wan_clients,
+        webhooks,
+        wired_clients,
+        wlans,
+        wxrules,
+        wxtags,
+        wxtunnels,
+    )
 
 __all__ = [
     "orgs",
@@ -181,3 +185,16 @@ __all__ = [
     "wxtags",
     "wxtunnels",
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -10,6 +10,29 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.recover import recover, verify
+import importlib as _importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["recover", "verify"]
+if TYPE_CHECKING:
+    from mistapi.api.v1.recover import (
+        recover,
+        verify,
+    )
+
+__all__ = [
+    "recover",
+    "verify",
+]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
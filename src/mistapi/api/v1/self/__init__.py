@@ -10,17 +10,21 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.self import (
-    self,
-    apitokens,
-    login_failures,
-    logs,
-    oauth,
-    subscriptions,
-    two_factor,
-    update,
-    usage,
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mistapi.api.v1.self import (
+        self,
+        apitokens,
+        login_failures,
+        logs,
+        oauth,
+        subscriptions,
+        two_factor,
+        update,
+        usage,
+    )
 
 __all__ = [
     "self",
@@ -33,3 +37,16 @@ __all__ = [
     "update",
     "usage",
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -10,76 +10,80 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.sites import (
-    sites,
-    aamwprofiles,
-    alarms,
-    analyze_spectrum,
-    anomaly,
-    apply_auto_map_assignment,
-    apps,
-    aptemplates,
-    assetfilters,
-    assets,
-    auto_map_assignment,
-    avprofiles,
-    beacons,
-    clear_auto_map_assignment,
-    clients,
-    deviceprofiles,
-    devices,
-    events,
-    evpn_topologies,
-    gatewaytemplates,
-    guests,
-    idpprofiles,
-    insights,
-    iotendpoints,
-    licenses,
-    location,
-    maps,
-    mapstacks,
-    marvis_configs,
-    mxedges,
-    mxtunnels,
-    nac_clients,
-    networks,
-    networktemplates,
-    otherdevices,
-    pcaps,
-    psks,
-    rfdiags,
-    rftemplates,
-    rogues,
-    rrm,
-    rssizones,
-    secintelprofiles,
-    servicepolicies,
-    services,
-    setting,
-    sitetemplates,
-    skyatp,
-    sle,
-    ssr,
-    stats,
-    subscriptions,
-    synthetic_test,
-    uisettings,
-    vbeacons,
-    vpns,
-    wan_client,
-    wan_clients,
-    wan_usages,
-    webhooks,
-    wired_clients,
-    wlans,
-    wxrules,
-    wxtags,
-    wxtunnels,
-    zones,
-    count,
-    visits,
-)
+import importlib as _importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mistapi.api.v1.sites import (
+        sites,
+        aamwprofiles,
+        alarms,
+        analyze_spectrum,
+        anomaly,
+        apply_auto_map_assignment,
+        apps,
+        aptemplates,
+        assetfilters,
+        assets,
+        auto_map_assignment,
+        avprofiles,
+        beacons,
+        clear_auto_map_assignment,
+        clients,
+        deviceprofiles,
+        devices,
+        events,
+        evpn_topologies,
+        gatewaytemplates,
+        guests,
+        idpprofiles,
+        insights,
+        iotendpoints,
+        licenses,
+        location,
+        maps,
+        mapstacks,
+        marvis_configs,
+        mxedges,
+        mxtunnels,
+        nac_clients,
+        networks,
+        networktemplates,
+        otherdevices,
+        pcaps,
+        psks,
+        rfdiags,
+        rftemplates,
+        rogues,
+        rrm,
+        rssizones,
+        secintelprofiles,
+        servicepolicies,
+        services,
+        setting,
+        sitetemplates,
+        skyatp,
+        sle,
+        ssr,
+        stats,
+        subscriptions,
+        synthetic_test,
+        uisettings,
+        vbeacons,
+        vpns,
+        wan_client,
+        wan_clients,
+        wan_usages,
+        webhooks,
+        wired_clients,
+        wlans,
+        wxrules,
+        wxtags,
+        wxtunnels,
+        zones,
+        count,
+        visits,
+    )
 
 __all__ = [
     "sites",
@@ -151,3 +155,16 @@ __all__ = [
     "count",
     "visits",
 ]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
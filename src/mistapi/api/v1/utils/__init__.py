@@ -10,6 +10,31 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.api.v1.utils import test_smsglobal, test_telstra, test_twilio
+import importlib as _importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["test_smsglobal", "test_telstra", "test_twilio"]
+if TYPE_CHECKING:
+    from mistapi.api.v1.utils import (
+        test_smsglobal,
+        test_telstra,
+        test_twilio,
+    )
+
+__all__ = [
+    "test_smsglobal",
+    "test_telstra",
+    "test_twilio",
+]
+
+
+def __getattr__(name: str):
+    # PEP 562: the submodules are only imported when first accessed
+    if name in __all__:
+        module = _importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
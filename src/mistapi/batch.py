@@ -0,0 +1,276 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module runs one generated API function (e.g.
+mistapi.api.v1.sites.devices.listSiteDevicesStats) over a list of IDs with a
+bounded concurrency, and yields the results as they complete.
+
+The HTTP 429 retries, the API Token rotation and the client-side rate limiter
+are handled by the session, which is shared by all the requests.
+"""
+
+import asyncio
+import inspect
+import time
+from collections.abc import AsyncGenerator, Callable, Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from mistapi.__api_response import APIResponse
+from mistapi.__logger import logger
+
+
+class BatchResult:
+    """
+    Result of one call made by `map()` or `amap()`
+    """
+
+    def __init__(
+        self,
+        index: int,
+        id: str,
+        response: APIResponse | None = None,
+        error: Exception | None = None,
+        duration: float = 0.0,
+    ) -> None:
+        """
+        PARAMS
+        -----------
+        index : int
+            position of the ID in the list passed to `map()`/`amap()`
+        id : str
+            ID passed to the function (e.g. site_id)
+        response : mistapi.APIResponse, default None
+            response returned by the function. None if the function raised
+        error : Exception, default None
+            exception raised by the function, if any
+        duration : float, default 0.0
+            duration of the call, in seconds
+        """
+        self.index = index
+        self.id = id
+        self.response = response
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self) -> bool:
+        """
+        True if the function returned a response with a 2xx status code
+        """
+        return (
+            self.error is None
+            and self.response is not None
+            and self.response.status_code is not None
+            and 200 <= self.response.status_code < 300
+        )
+
+    def __repr__(self) -> str:
+        status = self.response.status_code if self.response is not None else None
+        return (
+            f"BatchResult(id={self.id!r}, ok={self.ok}, status_code={status}, "
+            f"error={self.error!r})"
+        )
+
+
+def _call(
+    func: Callable, mist_session: Any, index: int, item_id: str, kwargs: dict
+) -> BatchResult:
+    start = time.monotonic()
+    try:
+        response = func(mist_session, item_id, **kwargs)
+        result = BatchResult(index, item_id, response=response)
+    except Exception as e:
+        logger.error(
+            "batch:map:%s failed for %s: %s",
+            getattr(func, "__name__", func),
+            item_id,
+            e,
+        )
+        result = BatchResult(index, item_id, error=e)
+    result.duration = time.monotonic() - start
+    return result
+
+
+def map(
+    func: Callable,
+    mist_session: Any,
+    ids: Iterable[str],
+    max_workers: int = 10,
+    **kwargs,
+) -> Generator[BatchResult, None, None]:
+    """
+    Call `func(mist_session, id, **kwargs)` for each ID, with at most
+    `max_workers` concurrent calls, and yield the results as they complete.
+
+    EXAMPLE
+    -----------
+    ::
+
+        import mistapi
+        from mistapi.api.v1.sites import stats
+
+        for result in mistapi.batch.map(
+            stats.listSiteDevicesStats, apisession, site_ids, max_workers=16, limit=1000
+        ):
+            if result.ok:
+                print(result.id, len(result.response.data))
+            else:
+                print(result.id, "failed", result.error or result.response.status_code)
+
+    PARAMS
+    -----------
+    func : callable
+        function taking the session and the ID as the first two parameters,
+        typically a function from mistapi.api.v1.sites
+    mist_session : mistapi.APISession
+        mistapi session including authentication and Mist host information
+    ids : Iterable[str]
+        IDs to pass to the function (e.g. list of site_ids)
+    max_workers : int, default 10
+        Maximum number of concurrent calls. The `pool_maxsize` of the session
+        should be at least this value to reuse the HTTP connections
+    **kwargs
+        Additional parameters passed to each call (e.g. `limit=1000`)
+
+    YIELD
+    -----------
+    mistapi.batch.BatchResult
+        result of each call, in completion order. A failed call (exception
+        or HTTP error) does not stop the batch
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    items = enumerate(ids)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future] = set()
+
+        def _submit(count: int) -> None:
+            for _ in range(count):
+                try:
+                    index, item_id = next(items)
+                except StopIteration:
+                    return
+                pending.add(
+                    executor.submit(_call, func, mist_session, index, item_id, kwargs)
+                )
+
+        # keep a bounded number of calls queued, so large lists of IDs are not
+        # all submitted up front
+        _submit(max_workers * 2)
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+                _submit(len(done))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def _acall(
+    func: Callable,
+    mist_session: Any,
+    index: int,
+    item_id: str,
+    kwargs: dict,
+    semaphore: asyncio.Semaphore,
+) -> BatchResult:
+    async with semaphore:
+        start = time.monotonic()
+        try:
+            response = func(mist_session, item_id, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+            result = BatchResult(index, item_id, response=response)
+        except Exception as e:
+            logger.error(
+                "batch:amap:%s failed for %s: %s",
+                getattr(func, "__name__", func),
+                item_id,
+                e,
+            )
+            result = BatchResult(index, item_id, error=e)
+        result.duration = time.monotonic() - start
+        return result
+
+
+async def amap(
+    func: Callable,
+    mist_session: Any,
+    ids: Iterable[str],
+    max_concurrency: int = 10,
+    **kwargs,
+) -> AsyncGenerator[BatchResult, None]:
+    """
+    Asyncio version of `map()`. With a mistapi.AsyncAPISession, the calls are
+    awaited on the event loop. With a mistapi.APISession, each call runs in a
+    thread, like `mistapi.arun()`.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with mistapi.AsyncAPISession(apisession) as asession:
+            async for result in mistapi.batch.amap(
+                wlans.listSiteWlans, asession, site_ids, max_concurrency=50
+            ):
+                print(result.id, result.ok)
+
+    PARAMS
+    -----------
+    func : callable
+        function taking the session and the ID as the first two parameters,
+        typically a function from mistapi.api.v1.sites
+    mist_session : mistapi.AsyncAPISession | mistapi.APISession
+        mistapi session including authentication and Mist host information
+    ids : Iterable[str]
+        IDs to pass to the function (e.g. list of site_ids)
+    max_concurrency : int, default 10
+        Maximum number of concurrent calls
+    **kwargs
+        Additional parameters passed to each call (e.g. `limit=1000`)
+
+    YIELD
+    -----------
+    mistapi.batch.BatchResult
+        result of each call, in completion order
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    if _is_sync_session(mist_session):
+
+        def _threaded(session, item_id, **kw):
+            return asyncio.to_thread(func, session, item_id, **kw)
+
+        _threaded.__name__ = getattr(func, "__name__", "func")
+        target: Callable = _threaded
+    else:
+        target = func
+    tasks = [
+        asyncio.ensure_future(
+            _acall(target, mist_session, index, item_id, kwargs, semaphore)
+        )
+        for index, item_id in enumerate(ids)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _is_sync_session(mist_session: Any) -> bool:
+    """Return True if the session request methods are blocking"""
+    return not inspect.iscoroutinefunction(getattr(mist_session, "mist_get", None))
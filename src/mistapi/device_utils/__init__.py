@@ -30,6 +30,26 @@ Supported Devices:
 - ex:  Juniper EX Switches
 - srx: Juniper SRX Firewalls
 - ssr: Juniper Session Smart Routers
+
+Shared Connection
+-----------------
+Commands started while a DeviceCmdPool is open share its WebSocket
+connection(s) instead of opening one connection per command:
+
+    from mistapi.device_utils import DeviceCmdPool
+
+    with DeviceCmdPool(session):
+        responses = [ex.retrieveArpTable(session, site_id, d) for d in device_ids]
+
+Batch Execution
+---------------
+Run a utility on many devices with a bounded number of commands in progress:
+
+    from mistapi.device_utils import batch
+
+    run = batch.run(session, targets, ex.retrieveArpTable, max_in_flight=20)
+    for result in run.receive():
+        print(result.device_id, result.status)
 """
 
 # Device-specific modules (recommended)
@@ -37,14 +57,21 @@ Supported Devices:
 # Internal modules
 from mistapi.device_utils import (
     ap,
+    batch,
     ex,
     srx,
     ssr,
 )
+from mistapi.device_utils.__tools.__cmd_pool import DeviceCmdPool
+from mistapi.device_utils.__tools.__pcapng import CapturedPacket, PcapngWriter
 
 __all__ = [
+    "CapturedPacket",
+    "DeviceCmdPool",
+    "PcapngWriter",
     # Device-specific modules (recommended)
     "ap",
+    "batch",
     "ex",
     "srx",
     "ssr",
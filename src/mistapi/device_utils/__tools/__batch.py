@@ -0,0 +1,428 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module runs a device_utils function on a list of devices. At most
+`max_in_flight` commands run at the same time (and optionally at most
+`triggers_per_second` trigger API calls per second), so a large batch stays
+under the REST API and WebSocket rate limits. The result of each device is
+delivered as soon as its command completes.
+"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Generator
+from typing import Any
+
+from mistapi import APISession
+from mistapi.__logger import logger as LOGGER
+from mistapi.device_utils.__tools.__cmd_pool import DeviceCmdPool, active_pool
+from mistapi.device_utils.__tools.__ws_wrapper import UtilResponse
+
+STATUS_SUCCESS = "success"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+
+class BatchResult:
+    """
+    Result of the command run on one device of a batch.
+
+    ATTRIBUTES
+    -----------
+    site_id : str
+        UUID of the site of the device
+    device_id : str
+        UUID of the device
+    status : str
+        "success", "timeout" (the command did not complete in time and was
+        disconnected), "error" (the function raised, the trigger API call
+        failed or the WebSocket stream did not complete cleanly) or
+        "cancelled"
+    response : UtilResponse | None
+        Response of the command, or None if the function raised
+    error : str | None
+        Reason of the "error" status
+    duration : float
+        Time in seconds between the trigger and the completion
+    """
+
+    def __init__(
+        self,
+        site_id: str,
+        device_id: str,
+        status: str,
+        response: UtilResponse | None = None,
+        error: str | None = None,
+        duration: float = 0.0,
+    ) -> None:
+        self.site_id = site_id
+        self.device_id = device_id
+        self.status = status
+        self.response = response
+        self.error = error
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchResult(device_id={self.device_id!r}, status={self.status!r}, "
+            f"duration={self.duration:.2f})"
+        )
+
+
+def _response_status(response: UtilResponse) -> tuple[str, str | None]:
+    if response.ws_error is not None:
+        return STATUS_ERROR, response.ws_error
+    trigger = response.trigger_api_response
+    if trigger is None:
+        return STATUS_ERROR, "trigger API call not sent"
+    if trigger.status_code != 200:
+        return STATUS_ERROR, f"trigger failed: {trigger.status_code} - {trigger.data}"
+    return STATUS_SUCCESS, None
+
+
+class BatchRun:
+    """
+    Batch of commands started by run(). The results are collected in the
+    background; use receive(), wait(), or the `on_result` callback to consume
+    them.
+
+    ATTRIBUTES
+    -----------
+    results : list[BatchResult]
+        Results of the completed commands, in completion order. This list is
+        live: it grows as the commands complete.
+    """
+
+    def __init__(
+        self,
+        apisession: APISession,
+        targets: list[tuple[str, str]],
+        util_fn: Callable[..., UtilResponse],
+        util_kwargs: dict[str, Any],
+        max_in_flight: int,
+        triggers_per_second: float,
+        timeout: float | None,
+        shared_connection: bool,
+        on_result: Callable[[BatchResult], None] | None,
+    ) -> None:
+        self._apisession = apisession
+        self._targets = list(targets)
+        self._util_fn = util_fn
+        self._util_kwargs = util_kwargs
+        self._triggers_per_second = triggers_per_second
+        self._timeout = timeout
+        self._shared_connection = shared_connection
+        self._on_result_cb = on_result
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_in_flight)
+        self._in_flight: dict[int, UtilResponse] = {}
+        # ids of the in-flight responses disconnected by cancel()
+        self._disconnected: set[int] = set()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._queue: queue.Queue[BatchResult | None] = queue.Queue()
+        self._started_at = 0.0
+        self._finished_at: float | None = None
+        self.results: list[BatchResult] = []
+
+    def _start(self) -> "BatchRun":
+        self._started_at = time.monotonic()
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        """True once every command completed (or was cancelled)"""
+        return self._finished.is_set()
+
+    def wait(self, timeout: float | None = None) -> "BatchRun":
+        """Block until every command completed. Returns self."""
+        self._finished.wait(timeout=timeout)
+        return self
+
+    def receive(self) -> Generator[BatchResult, None, None]:
+        """
+        Blocking generator that yields the result of each device as soon as
+        its command completes. Exits when every command completed.
+        """
+        while True:
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._finished.is_set() and self._queue.empty():
+                    break
+                continue
+            if item is None:
+                break
+            yield item
+
+    def cancel(self) -> None:
+        """
+        Do not start the remaining commands, and disconnect the commands in
+        progress. Their results get the "cancelled" status.
+        """
+        self._cancelled.set()
+        with self._lock:
+            in_flight = [r for r in self._in_flight.values() if not r.done]
+            self._disconnected.update(id(r) for r in in_flight)
+        for response in in_flight:
+            response.disconnect()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Return the number of commands per status and their durations.
+
+        RETURN
+        -----------
+        dict
+            "total", "success", "timeout", "error", "cancelled", "pending"
+            (not completed yet), "elapsed" (seconds since the start of the
+            batch) and "duration_min", "duration_avg", "duration_max" (seconds,
+            None before the first result)
+        """
+        with self._lock:
+            results = list(self.results)
+        counts = {
+            STATUS_SUCCESS: 0,
+            STATUS_TIMEOUT: 0,
+            STATUS_ERROR: 0,
+            STATUS_CANCELLED: 0,
+        }
+        for result in results:
+            counts[result.status] += 1
+        durations = [r.duration for r in results if r.status != STATUS_CANCELLED]
+        end = self._finished_at if self._finished_at is not None else time.monotonic()
+        return {
+            "total": len(self._targets),
+            **counts,
+            "pending": len(self._targets) - len(results),
+            "elapsed": end - self._started_at,
+            "duration_min": min(durations) if durations else None,
+            "duration_avg": sum(durations) / len(durations) if durations else None,
+            "duration_max": max(durations) if durations else None,
+        }
+
+    def __enter__(self) -> "BatchRun":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.cancel()
+        self.wait()
+
+    def __await__(self):
+        """Allow ``await batch_run`` in async contexts."""
+        import asyncio
+
+        async def _await_impl():
+            await asyncio.to_thread(self._finished.wait)
+            return self
+
+        return _await_impl().__await__()
+
+    ##########################################################################
+    ## Background processing
+
+    def _run(self) -> None:
+        pool = None
+        if self._shared_connection and active_pool(self._apisession) is None:
+            try:
+                pool = DeviceCmdPool(self._apisession)
+            except RuntimeError:
+                pool = None  # a pool was opened meanwhile, use it
+        waiters: list[threading.Thread] = []
+        interval = 1 / self._triggers_per_second if self._triggers_per_second else 0
+        next_trigger = time.monotonic()
+        started_count = 0
+        try:
+            for site_id, device_id in self._targets:
+                if not self._acquire_slot():
+                    break
+                delay = next_trigger - time.monotonic()
+                if delay > 0 and self._cancelled.wait(delay):
+                    self._slots.release()
+                    break
+                next_trigger = max(next_trigger, time.monotonic()) + interval
+                started_count += 1
+                started = time.monotonic()
+                try:
+                    response = self._util_fn(
+                        self._apisession, site_id, device_id, **self._util_kwargs
+                    )
+                except Exception as e:
+                    LOGGER.error("batch: command failed on device %s: %s", device_id, e)
+                    self._complete(
+                        BatchResult(
+                            site_id,
+                            device_id,
+                            STATUS_ERROR,
+                            error=str(e),
+                            duration=time.monotonic() - started,
+                        )
+                    )
+                    self._slots.release()
+                    continue
+                with self._lock:
+                    self._in_flight[id(response)] = response
+                waiter = threading.Thread(
+                    target=self._wait_response,
+                    args=(site_id, device_id, response, started),
+                    daemon=True,
+                )
+                waiter.start()
+                waiters.append(waiter)
+            for waiter in waiters:
+                waiter.join()
+        finally:
+            if pool is not None:
+                pool.close()
+            for site_id, device_id in self._targets[started_count:]:
+                self._complete(BatchResult(site_id, device_id, STATUS_CANCELLED))
+            self._finished_at = time.monotonic()
+            self._queue.put(None)
+            self._finished.set()
+
+    def _acquire_slot(self) -> bool:
+        while not self._slots.acquire(timeout=0.1):
+            if self._cancelled.is_set():
+                return False
+        if self._cancelled.is_set():
+            self._slots.release()
+            return False
+        return True
+
+    def _wait_response(
+        self, site_id: str, device_id: str, response: UtilResponse, started: float
+    ) -> None:
+        if self._timeout is not None:
+            timed_out = not response.wait(timeout=self._timeout).done
+        else:
+            timed_out = not self._wait_max_duration(response)
+        if timed_out:
+            LOGGER.warning("batch: command timed out on device %s", device_id)
+            response.disconnect()
+            response.wait(timeout=5)
+        with self._lock:
+            self._in_flight.pop(id(response), None)
+            disconnected = id(response) in self._disconnected
+            self._disconnected.discard(id(response))
+        if timed_out:
+            status, error = STATUS_TIMEOUT, None
+        else:
+            status, error = _response_status(response)
+            if status == STATUS_SUCCESS and disconnected:
+                # stopped by cancel() before completing on its own
+                status = STATUS_CANCELLED
+        self._complete(
+            BatchResult(
+                site_id,
+                device_id,
+                status,
+                response=response,
+                error=error,
+                duration=time.monotonic() - started,
+            )
+        )
+        self._slots.release()
+
+    @staticmethod
+    def _wait_max_duration(response: UtilResponse) -> bool:
+        """
+        Wait for the command for its max duration + 10 seconds. The util
+        functions return before the WebSocket is started in the background:
+        the timeout of the response is only known once it is required.
+
+        RETURN
+        -----------
+        bool
+            True if the command completed in time
+        """
+        while not response.ws_required or response._await_timeout is None:
+            if response.wait(timeout=0.1).done:
+                return True
+        return response.wait(timeout=response._await_timeout).done
+
+    def _complete(self, result: BatchResult) -> None:
+        with self._lock:
+            self.results.append(result)
+        self._queue.put(result)
+        if self._on_result_cb:
+            try:
+                self._on_result_cb(result)
+            except Exception:
+                LOGGER.exception("batch on_result callback raised")
+
+
+def run(
+    apisession: APISession,
+    targets: list[tuple[str, str]],
+    util_fn: Callable[..., UtilResponse],
+    max_in_flight: int = 10,
+    triggers_per_second: float = 0,
+    timeout: float | None = None,
+    shared_connection: bool = True,
+    on_result: Callable[[BatchResult], None] | None = None,
+    **kwargs: Any,
+) -> BatchRun:
+    """
+    Run a device_utils function on a list of devices, in the background.
+
+    PARAMS
+    -----------
+    apisession : mistapi.APISession
+        The API session to use for the requests.
+    targets : list[tuple[str, str]]
+        (site_id, device_id) of each device.
+    util_fn : Callable
+        device_utils function to run, called as
+        ``util_fn(apisession, site_id, device_id, **kwargs)`` (e.g.
+        ``ex.retrieveArpTable``, ``ap.ping``).
+    max_in_flight : int, default 10
+        Maximum number of commands running at the same time.
+    triggers_per_second : float, default 0
+        Maximum number of trigger API calls per second. 0 = no limit other
+        than `max_in_flight`.
+    timeout : float, optional
+        Maximum time in seconds to wait for each command. The commands still
+        running are disconnected and get the "timeout" status. Defaults to
+        the max duration of the command + 10 seconds.
+    shared_connection : bool, default True
+        Open a DeviceCmdPool for the batch (unless one is already open for
+        the session), so the commands share their WebSocket connection(s).
+    on_result : Callable, optional
+        Callback invoked with the BatchResult of each device as soon as its
+        command completes.
+    **kwargs
+        Additional arguments passed to `util_fn` (e.g. ``host="8.8.8.8"``).
+
+    RETURNS
+    -----------
+    BatchRun
+        Returned immediately. Use ``receive()``, ``wait()`` and
+        ``summary()`` to consume the results.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be >= 1")
+    if triggers_per_second < 0:
+        raise ValueError("triggers_per_second must be >= 0 (0 = unlimited)")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be > 0")
+    return BatchRun(
+        apisession,
+        targets,
+        util_fn,
+        kwargs,
+        max_in_flight,
+        triggers_per_second,
+        timeout,
+        shared_connection,
+        on_result,
+    )._start()
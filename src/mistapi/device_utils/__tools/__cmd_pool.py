@@ -0,0 +1,380 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the DeviceCmdPool class. By default, each device_utils
+command opens its own DeviceCmdEvents WebSocket connection for the device it
+targets. While a DeviceCmdPool is open for an APISession, the commands share
+its connection(s) instead: the device channels are added to a ShardedStream
+(at most `max_devices_per_connection` devices per connection), and the output
+is delivered to each command's UtilResponse by the session id (or capture id)
+returned by the trigger API call.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from mistapi import APISession
+from mistapi.__logger import logger as LOGGER
+from mistapi.websockets import ShardedStream
+from mistapi.websockets.__ws_client import MAX_CHANNELS_PER_CONNECTION
+
+# Output received for a session before its command is attached to the pool
+# (the device answered before the trigger API call returned) is kept for at
+# most this number of sessions
+MAX_UNROUTED_SESSIONS = 100
+
+_ACTIVE_POOLS: dict[int, "DeviceCmdPool"] = {}
+_ACTIVE_POOLS_LOCK = threading.Lock()
+
+
+def active_pool(apisession: APISession) -> "DeviceCmdPool | None":
+    """Return the DeviceCmdPool open for `apisession`, if any"""
+    with _ACTIVE_POOLS_LOCK:
+        return _ACTIVE_POOLS.get(id(apisession))
+
+
+def _device_channel(site_id: str, device_id: str) -> str:
+    return f"/sites/{site_id}/devices/{device_id}/cmd"
+
+
+def _session_key(message: dict) -> str | None:
+    """Return the session id (or capture id) of a command output message"""
+    data = message.get("data")
+    if isinstance(data, (str, bytes)):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(data, dict):
+        return None
+    return data.get("session") or data.get("capture_id")
+
+
+class _PooledCmdStream:
+    """
+    Stand-in for the DeviceCmdEvents of a single command, attached to the
+    connection(s) of a DeviceCmdPool. Provides the subset of the
+    _MistWebsocket interface used by WebSocketWrapper.
+    """
+
+    def __init__(
+        self, pool: "DeviceCmdPool", channels: list[str], keys: list[str]
+    ) -> None:
+        self._pool = pool
+        self._channels = channels
+        self._keys = keys
+        self._closed = threading.Event()
+        self._on_message_cb: Callable[[dict], None] | None = None
+        self._on_error_cb: Callable[[Exception], None] | None = None
+        self._on_open_cb: Callable[[], None] | None = None
+        self._on_close_cb: Callable[[int | None, str | None], None] | None = None
+
+    def on_message(self, callback: Callable[[dict], None]) -> None:
+        self._on_message_cb = callback
+
+    def on_error(self, callback: Callable[[Exception], None]) -> None:
+        self._on_error_cb = callback
+
+    def on_open(self, callback: Callable[[], None]) -> None:
+        self._on_open_cb = callback
+
+    def on_close(self, callback: Callable[[int | None, str | None], None]) -> None:
+        self._on_close_cb = callback
+
+    def connect(self, run_in_background: bool = True) -> None:
+        self._pool._attach(self)
+
+    def disconnect(self, wait: bool = False, timeout: float | None = None) -> None:
+        self._pool._detach(self)
+        self._close(1000, "command finished")
+
+    def _deliver(self, message: dict) -> None:
+        if self._closed.is_set() or self._on_message_cb is None:
+            return
+        try:
+            self._on_message_cb(message)
+        except Exception:
+            LOGGER.exception("device command on_message callback raised")
+
+    def _close(self, code: int | None, msg: str | None) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._on_close_cb:
+            try:
+                self._on_close_cb(code, msg)
+            except Exception:
+                LOGGER.exception("device command on_close callback raised")
+
+
+class DeviceCmdPool:
+    """
+    Share the DeviceCmdEvents connection(s) between the device_utils commands
+    run with `apisession`, instead of one connection per command. The pool is
+    used by the commands started while it is open.
+
+    PARAMS
+    -----------
+    apisession : mistapi.APISession
+        API session used by the device_utils commands. Only one pool can be
+        open for a session.
+    max_devices_per_connection : int, default 1000
+        Maximum number of devices subscribed on each connection. A new
+        connection is opened when all the connections are full.
+    auto_reconnect : bool, default True
+        Reconnect the connections closed by the Mist Cloud. The commands in
+        progress when all the connections are lost are closed with the close
+        code of the connection.
+    ping_interval : int, default 60
+        Interval in seconds to send WebSocket ping frames (keep-alive).
+
+    EXAMPLE
+    -----------
+    ::
+
+        with DeviceCmdPool(session) as pool:
+            pool.add_devices(site_id, device_ids)  # optional, subscribe early
+            responses = [
+                ex.retrieveArpTable(session, site_id, device_id)
+                for device_id in device_ids
+            ]
+            for response in responses:
+                print(response.wait().ws_data)
+    """
+
+    def __init__(
+        self,
+        apisession: APISession,
+        max_devices_per_connection: int = 1000,
+        auto_reconnect: bool = True,
+        ping_interval: int = 60,
+    ) -> None:
+        if not 1 <= max_devices_per_connection <= MAX_CHANNELS_PER_CONNECTION:
+            raise ValueError(
+                "max_devices_per_connection must be between 1 and "
+                f"{MAX_CHANNELS_PER_CONNECTION}"
+            )
+        self._apisession = apisession
+        self._max_devices_per_connection = max_devices_per_connection
+        self._auto_reconnect = auto_reconnect
+        self._ping_interval = ping_interval
+        self._lock = threading.Lock()
+        self._stream: ShardedStream | None = None
+        self._channels: set[str] = set()
+        self._subscribed: set[str] = set()
+        self._by_key: dict[str, _PooledCmdStream] = {}
+        self._by_channel: dict[str, list[_PooledCmdStream]] = {}
+        self._unrouted: OrderedDict[str, list[dict]] = OrderedDict()
+        self._closed = False
+        with _ACTIVE_POOLS_LOCK:
+            if id(apisession) in _ACTIVE_POOLS:
+                raise RuntimeError("A DeviceCmdPool is already open for this session")
+            _ACTIVE_POOLS[id(apisession)] = self
+
+    @property
+    def stream(self) -> ShardedStream | None:
+        """Shared connection(s), or None until a device is subscribed"""
+        return self._stream
+
+    def add_devices(self, site_id: str, device_ids: list[str]) -> None:
+        """
+        Subscribe to the command output of the devices now, so the commands
+        started later do not wait for the subscription.
+
+        PARAMS
+        -----------
+        site_id : str
+            UUID of the site of the devices
+        device_ids : list[str]
+            UUIDs of the devices
+        """
+        channels = [_device_channel(site_id, d) for d in device_ids]
+        with self._lock:
+            self._ensure_subscribed(channels)
+
+    def close(self) -> None:
+        """
+        Close the shared connection(s). The commands in progress are closed.
+        """
+        with _ACTIVE_POOLS_LOCK:
+            if _ACTIVE_POOLS.get(id(self._apisession)) is self:
+                del _ACTIVE_POOLS[id(self._apisession)]
+        with self._lock:
+            self._closed = True
+            stream = self._stream
+            self._unrouted.clear()
+        self._close_all(1000, "pool closed")
+        if stream is not None:
+            stream.disconnect(wait=True, timeout=10)
+
+    def __enter__(self) -> "DeviceCmdPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Used by WebSocketWrapper
+
+    def _wrap(
+        self, channels: list[str], session_id: str | None, capture_id: str | None
+    ) -> _PooledCmdStream:
+        keys = [k for k in (session_id, capture_id) if k]
+        return _PooledCmdStream(self, channels, keys)
+
+    def _attach(self, cmd_stream: _PooledCmdStream) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DeviceCmdPool is closed")
+            for key in cmd_stream._keys:
+                self._by_key[key] = cmd_stream
+            for channel in cmd_stream._channels:
+                self._by_channel.setdefault(channel, []).append(cmd_stream)
+            try:
+                self._ensure_subscribed(cmd_stream._channels)
+            except Exception:
+                self._remove(cmd_stream)
+                raise
+            acknowledged = [c for c in cmd_stream._channels if c in self._subscribed]
+            early = []
+            for key in cmd_stream._keys:
+                early.extend(self._unrouted.pop(key, []))
+        if cmd_stream._on_open_cb:
+            cmd_stream._on_open_cb()
+        for channel in acknowledged:
+            cmd_stream._deliver({"event": "channel_subscribed", "channel": channel})
+        for message in early:
+            cmd_stream._deliver(message)
+
+    def _detach(self, cmd_stream: _PooledCmdStream) -> None:
+        with self._lock:
+            self._remove(cmd_stream)
+
+    def _remove(self, cmd_stream: _PooledCmdStream) -> None:
+        """Must be called with the lock held"""
+        for key in cmd_stream._keys:
+            if self._by_key.get(key) is cmd_stream:
+                del self._by_key[key]
+        for channel in cmd_stream._channels:
+            attached = self._by_channel.get(channel, [])
+            if cmd_stream in attached:
+                attached.remove(cmd_stream)
+
+    # ------------------------------------------------------------------
+    # Shared connection
+
+    def _ensure_subscribed(self, channels: list[str]) -> None:
+        """Subscribe the new channels. Must be called with the lock held"""
+        new_channels = [c for c in dict.fromkeys(channels) if c not in self._channels]
+        if not new_channels:
+            return
+        self._channels.update(new_channels)
+        if self._stream is not None:
+            self._stream.subscribe(new_channels)
+            return
+        LOGGER.info("DeviceCmdPool: opening the shared connection")
+        stream = ShardedStream(
+            self._apisession,
+            new_channels,
+            max_channels_per_connection=self._max_devices_per_connection,
+            auto_reconnect=self._auto_reconnect,
+            ping_interval=self._ping_interval,
+            throughput_log_interval=0,
+        )
+        stream.on_message(self._dispatch)
+        stream.on_error(self._handle_stream_error)
+        stream.on_close(self._handle_stream_close)
+        self._stream = stream
+        stream.connect()
+
+    def _dispatch(self, message: dict) -> None:
+        event = message.get("event")
+        channel = message.get("channel")
+        if event == "channel_subscribed":
+            with self._lock:
+                self._subscribed.add(channel)  # type: ignore[arg-type]
+                targets = list(self._by_channel.get(channel, []))  # type: ignore[arg-type]
+        elif event == "data":
+            key = _session_key(message)
+            with self._lock:
+                target = self._by_key.get(key) if key else None
+                if target is not None:
+                    targets = [target]
+                else:
+                    # commands without a session id accept all the output
+                    targets = [
+                        s
+                        for s in self._by_channel.get(channel, [])  # type: ignore[arg-type]
+                        if not s._keys
+                    ]
+                    if not targets and key:
+                        self._keep_unrouted(key, message)
+        else:
+            return
+        for cmd_stream in targets:
+            cmd_stream._deliver(message)
+
+    def _keep_unrouted(self, key: str, message: dict) -> None:
+        """Must be called with the lock held"""
+        self._unrouted.setdefault(key, []).append(message)
+        self._unrouted.move_to_end(key)
+        while len(self._unrouted) > MAX_UNROUTED_SESSIONS:
+            dropped, _ = self._unrouted.popitem(last=False)
+            LOGGER.debug("DeviceCmdPool: no command for session %s", dropped)
+
+    def _handle_stream_error(self, error: Exception) -> None:
+        with self._lock:
+            attached = self._attached()
+        for cmd_stream in attached:
+            if cmd_stream._on_error_cb:
+                try:
+                    cmd_stream._on_error_cb(error)
+                except Exception:
+                    LOGGER.exception("device command on_error callback raised")
+
+    def _handle_stream_close(self, code: int | None, msg: str | None) -> None:
+        LOGGER.info("DeviceCmdPool: shared connection closed: %s - %s", code, msg)
+        with self._lock:
+            self._stream = None
+            self._channels.clear()
+            self._subscribed.clear()
+            self._unrouted.clear()
+        self._close_all(code, msg)
+
+    def _attached(self) -> list[_PooledCmdStream]:
+        """Must be called with the lock held"""
+        attached = {id(s): s for s in self._by_key.values()}
+        for streams in self._by_channel.values():
+            attached.update((id(s), s) for s in streams)
+        return list(attached.values())
+
+    def _close_all(self, code: int | None, msg: str | None) -> None:
+        with self._lock:
+            attached = self._attached()
+            self._by_key.clear()
+            self._by_channel.clear()
+        for cmd_stream in attached:
+            cmd_stream._close(code, msg)
+
+
+def _pooled_stream(apisession: APISession, ws: Any, wrapper: Any) -> Any:
+    """
+    Return the stream to use for a command: `ws` itself, or a stream attached
+    to the DeviceCmdPool open for `apisession`
+    """
+    from mistapi.websockets.sites import DeviceCmdEvents
+
+    pool = active_pool(apisession)
+    if pool is None or not isinstance(ws, DeviceCmdEvents):
+        return ws
+    return pool._wrap(list(ws._channels), wrapper.session_id, wrapper.capture_id)
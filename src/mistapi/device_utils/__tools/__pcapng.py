@@ -0,0 +1,373 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the PcapngWriter class, which writes the packets streamed
+by the remote packet captures (the "pcap_dict" of each PcapEvents message) to
+pcapng files, one packet at a time, so a long capture is not kept in memory.
+The files can be opened with Wireshark / tshark.
+
+Each capture source (device, port or radio band) is recorded as a pcapng
+interface with its own link type, so the packets of several devices can be
+written to the same file. The files can be rotated by size and/or duration.
+"""
+
+import base64
+import binascii
+import os
+import re
+import struct
+import threading
+import time
+from collections.abc import Callable
+from typing import IO, Any, NamedTuple
+
+from mistapi.__logger import logger as LOGGER
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+_BLOCK_SHB = 0x0A0D0D0A
+_BLOCK_IDB = 0x00000001
+_BLOCK_EPB = 0x00000006
+_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+_OPT_ENDOFOPT = 0
+_OPT_SHB_USERAPPL = 4
+_OPT_IF_NAME = 2
+
+# Keys of the pcap_dict read by decode_pcap_dict(), by order of preference
+_DATA_KEYS = ("raw", "data", "packet", "frame", "pkt")
+_TIMESTAMP_KEYS = ("ts", "timestamp", "time")
+_LENGTH_KEYS = ("orig_len", "len", "length", "wirelen")
+_LINKTYPE_KEYS = ("linktype", "dlt", "DLT", "link_type")
+_INTERFACE_KEYS = ("interface", "port_id", "port", "band", "radio")
+
+_HEX_RE = re.compile(r"^(?:[0-9a-fA-F]{2})+$")
+
+
+class CapturedPacket(NamedTuple):
+    """A packet to write, as returned by the pcap_dict decoders"""
+
+    data: bytes
+    timestamp: float
+    orig_len: int
+    interface: str | None = None
+    linktype: int | None = None
+
+
+def _first(pcap_dict: dict, keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        value = pcap_dict.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _packet_bytes(value: Any) -> bytes | None:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if not isinstance(value, str):
+        return None
+    if _HEX_RE.match(value):
+        return bytes.fromhex(value)
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def decode_pcap_dict(pcap_dict: Any) -> CapturedPacket | None:
+    """
+    Default decoder of the "pcap_dict" of the PcapEvents messages.
+
+    The packet bytes are read from the first of the "raw", "data", "packet",
+    "frame" or "pkt" keys (hex or base64 string), the timestamp (seconds or
+    milliseconds since the epoch, default: now) from "ts", "timestamp" or
+    "time", the original length from "orig_len", "len", "length" or
+    "wirelen", the link type from "linktype" or "dlt", and the interface
+    from "interface", "port_id", "port", "band" or "radio".
+
+    RETURN
+    -----------
+    CapturedPacket
+        the packet, or None if the pcap_dict has no packet bytes
+    """
+    if not isinstance(pcap_dict, dict):
+        return None
+    data = _packet_bytes(_first(pcap_dict, _DATA_KEYS))
+    if data is None:
+        return None
+    timestamp = _first(pcap_dict, _TIMESTAMP_KEYS)
+    try:
+        timestamp = float(timestamp)
+    except (TypeError, ValueError):
+        timestamp = time.time()
+    if timestamp > 1e11:  # milliseconds
+        timestamp /= 1000
+    orig_len = _first(pcap_dict, _LENGTH_KEYS)
+    if not isinstance(orig_len, int) or orig_len < len(data):
+        orig_len = len(data)
+    linktype = _first(pcap_dict, _LINKTYPE_KEYS)
+    interface = _first(pcap_dict, _INTERFACE_KEYS)
+    return CapturedPacket(
+        data=data,
+        timestamp=timestamp,
+        orig_len=orig_len,
+        interface=str(interface) if interface is not None else None,
+        linktype=linktype if isinstance(linktype, int) else None,
+    )
+
+
+def _option(code: int, value: bytes) -> bytes:
+    padding = b"\x00" * (-len(value) % 4)
+    return struct.pack("<HH", code, len(value)) + value + padding
+
+
+def _block(block_type: int, body: bytes) -> bytes:
+    length = 12 + len(body)
+    return struct.pack("<II", block_type, length) + body + struct.pack("<I", length)
+
+
+class PcapngWriter:
+    """
+    Write the packets of remote packet captures to pcapng files.
+
+    Pass the writer to a remote capture function (``pcap_writer=``), or
+    use ``write()`` as the ``on_message`` callback. Thread-safe: several
+    captures can write to the same writer.
+
+    PARAMS
+    -----------
+    path : str
+        Path of the pcapng file. With rotation, the files are named
+        ``<name>_<index>_<YYYYmmddHHMMSS><ext>`` next to `path`.
+    max_file_size : int, default 0
+        Start a new file when the current one reaches this size in bytes.
+        0 = no rotation by size.
+    max_file_duration : float, default 0
+        Start a new file when the current one is older than this number of
+        seconds. 0 = no rotation by duration.
+    max_files : int, default 0
+        With rotation, maximum number of files kept; the oldest are deleted.
+        0 = keep all the files.
+    linktype : int, default LINKTYPE_ETHERNET
+        Link type of the packets when neither the capture nor the packet
+        provides it (LINKTYPE_IEEE802_11_RADIOTAP for wireless captures).
+    snaplen : int, default 0
+        Snapshot length recorded in the interface descriptions. 0 = no limit.
+    decoder : Callable, optional
+        Function converting a pcap_dict to a CapturedPacket (or None to skip
+        it). Defaults to decode_pcap_dict().
+
+    EXAMPLE
+    -----------
+    ::
+
+        with PcapngWriter("capture.pcapng", max_file_size=50_000_000) as writer:
+            response = remote_capture.ex_remote_pcap(
+                session, site_id, device_id, port_ids=["ge-0/0/1"],
+                pcap_writer=writer,
+            )
+            response.wait()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_file_size: int = 0,
+        max_file_duration: float = 0,
+        max_files: int = 0,
+        linktype: int = LINKTYPE_ETHERNET,
+        snaplen: int = 0,
+        decoder: Callable[[Any], CapturedPacket | None] | None = None,
+    ) -> None:
+        if max_file_size < 0:
+            raise ValueError("max_file_size must be >= 0 (0 = no rotation)")
+        if max_file_duration < 0:
+            raise ValueError("max_file_duration must be >= 0 (0 = no rotation)")
+        if max_files < 0:
+            raise ValueError("max_files must be >= 0 (0 = keep all the files)")
+        self._path = path
+        self._max_file_size = max_file_size
+        self._max_file_duration = max_file_duration
+        self._max_files = max_files
+        self._linktype = linktype
+        self._snaplen = snaplen
+        self._decoder = decoder or decode_pcap_dict
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._file_size = 0
+        self._file_opened_at = 0.0
+        # (interface name, link type) -> interface id in the current file
+        self._interfaces: dict[tuple[str, int], int] = {}
+        self._closed = False
+        # index of the last file opened; not derived from `files`, which is
+        # trimmed to `max_files`
+        self._file_index = 0
+        self._packets_written = 0
+        self._packets_skipped = 0
+        self._bytes_written = 0
+        self.files: list[str] = []
+
+    @property
+    def _rotating(self) -> bool:
+        return bool(self._max_file_size or self._max_file_duration)
+
+    def write(
+        self,
+        pcap_dict: Any,
+        interface: str | None = None,
+        linktype: int | None = None,
+    ) -> bool:
+        """
+        Write a packet.
+
+        PARAMS
+        -----------
+        pcap_dict : dict
+            "pcap_dict" of a PcapEvents message
+        interface : str, optional
+            Name of the capture source (e.g. the device MAC address). The
+            interface provided by the packet is appended to it.
+        linktype : int, optional
+            Link type of the capture, used when the packet does not provide
+            one.
+
+        RETURN
+        -----------
+        bool
+            False if the packet was skipped (no packet data, or writer closed)
+        """
+        try:
+            packet = self._decoder(pcap_dict)
+        except Exception:
+            LOGGER.exception("PcapngWriter: failed to decode %s", pcap_dict)
+            packet = None
+        with self._lock:
+            if packet is None or self._closed:
+                self._packets_skipped += 1
+                if self._packets_skipped == 1:
+                    LOGGER.warning("PcapngWriter: packet skipped: %s", pcap_dict)
+                return False
+            name = ":".join(n for n in (interface, packet.interface) if n) or "mist"
+            link = packet.linktype or linktype or self._linktype
+            self._rotate_if_needed()
+            interface_id = self._interfaces.get((name, link))
+            if interface_id is None:
+                interface_id = self._write_interface(name, link)
+            timestamp = int(packet.timestamp * 1_000_000)
+            body = (
+                struct.pack(
+                    "<IIIII",
+                    interface_id,
+                    timestamp >> 32,
+                    timestamp & 0xFFFFFFFF,
+                    len(packet.data),
+                    packet.orig_len,
+                )
+                + packet.data
+                + b"\x00" * (-len(packet.data) % 4)
+            )
+            self._write_block(_block(_BLOCK_EPB, body))
+            self._packets_written += 1
+        return True
+
+    def close(self) -> None:
+        """Close the current file. The packets written afterwards are skipped."""
+        with self._lock:
+            self._closed = True
+            self._close_file()
+
+    def get_counters(self) -> dict[str, int]:
+        """
+        Return the number of packets written and skipped, the number of
+        bytes written, and the number of files.
+
+        RETURN
+        -----------
+        dict
+            "packets_written", "packets_skipped", "bytes_written" and "files"
+        """
+        with self._lock:
+            return {
+                "packets_written": self._packets_written,
+                "packets_skipped": self._packets_skipped,
+                "bytes_written": self._bytes_written,
+                "files": len(self.files),
+            }
+
+    def __enter__(self) -> "PcapngWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Files (must be called with the lock held)
+
+    def _rotate_if_needed(self) -> None:
+        if self._file is not None and self._rotating:
+            too_big = self._max_file_size and self._file_size >= self._max_file_size
+            too_old = (
+                self._max_file_duration
+                and time.monotonic() - self._file_opened_at >= self._max_file_duration
+            )
+            if too_big or too_old:
+                self._close_file()
+        if self._file is None:
+            self._open_file()
+
+    def _next_path(self) -> str:
+        if not self._rotating:
+            return self._path
+        root, ext = os.path.splitext(self._path)
+        stamp = time.strftime("%Y%m%d%H%M%S")
+        return f"{root}_{self._file_index:05d}_{stamp}{ext or '.pcapng'}"
+
+    def _open_file(self) -> None:
+        self._file_index += 1
+        path = self._next_path()
+        self._file = open(path, "wb")  # noqa: SIM115
+        self._file_size = 0
+        self._file_opened_at = time.monotonic()
+        self._interfaces = {}
+        LOGGER.info("PcapngWriter: writing %s", path)
+        options = _option(_OPT_SHB_USERAPPL, b"mistapi") + _option(_OPT_ENDOFOPT, b"")
+        body = struct.pack("<IHHq", _BYTE_ORDER_MAGIC, 1, 0, -1) + options
+        self._write_block(_block(_BLOCK_SHB, body))
+        # the oldest files are only removed once the new one is open
+        self.files.append(path)
+        if self._max_files and len(self.files) > self._max_files:
+            for old in self.files[: -self._max_files]:
+                try:
+                    os.remove(old)
+                except OSError as e:
+                    LOGGER.warning("PcapngWriter: unable to remove %s: %s", old, e)
+            self.files = self.files[-self._max_files :]
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_interface(self, name: str, linktype: int) -> int:
+        options = _option(_OPT_IF_NAME, name.encode("utf-8")) + _option(
+            _OPT_ENDOFOPT, b""
+        )
+        body = struct.pack("<HHI", linktype, 0, self._snaplen) + options
+        self._write_block(_block(_BLOCK_IDB, body))
+        interface_id = len(self._interfaces)
+        self._interfaces[(name, linktype)] = interface_id
+        return interface_id
+
+    def _write_block(self, block: bytes) -> None:
+        self._file.write(block)  # type: ignore[union-attr]
+        self._file.flush()  # type: ignore[union-attr]
+        self._file_size += len(block)
+        self._bytes_written += len(block)
@@ -1,13 +1,20 @@
+import collections
 import json
+import os
 import queue
 import re
+import tempfile
 import threading
+import time
 from collections.abc import Callable, Generator
 from enum import Enum
+from typing import IO, Any
 
 from mistapi import APISession
 from mistapi.__api_response import APIResponse as _APIResponse
 from mistapi.__logger import logger as LOGGER
+from mistapi.device_utils.__tools.__cmd_pool import _pooled_stream
+from mistapi.websockets.__backpressure import _BackpressureQueue
 
 # Matches ANSI CSI sequences, OSC sequences, and character set designations
 _ANSI_ESCAPE_RE = re.compile(
@@ -18,6 +25,23 @@ _ANSI_ESCAPE_RE = re.compile(
 _SCREEN_MODE_RE = re.compile(r"\x1b\[[\d;]*H|\x1b\[2J")
 
 
+# Escape sequences and control characters interpreted by _VT100Screen.feed().
+# Everything between two matches is printable text, written as one run.
+_VT100_TOKEN_RE = re.compile(
+    r"\x1b\[([\d;?]*)([^\d;?])"  # CSI: \x1b[ <params> <cmd>
+    r"|\x1b[()][\s\S]"  # character-set designation
+    r"|\x1b\][^\x07]*\x07"  # OSC, terminated by BEL
+    r"|\x1b[\s\S]"  # unknown escape
+    r"|[\r\n\x00]"
+)
+
+# Escape sequence cut at the end of a chunk (completed by the next chunk)
+_VT100_INCOMPLETE_RE = re.compile(r"\x1b(?:\[[\d;?]*|[()]|\][^\x07]*)?\Z")
+
+# An incomplete sequence longer than this is dropped instead of buffered
+_VT100_MAX_PENDING = 256
+
+
 class _VT100Screen:
     """Minimal VT100 terminal emulator for rendering screen-based output.
 
@@ -25,6 +49,12 @@ class _VT100Screen:
     ``monitor interface`` commands: cursor positioning, screen/line
     clearing, and cursor movement.  SGR (colors), scroll regions, and
     mode changes are silently ignored.
+
+    The rows modified by ``feed()`` are tracked, so ``render()`` only
+    re-renders these rows, ``changed`` tells whether the rendered screen
+    differs from the last ``render()``, and ``render_diff()`` returns the
+    lines modified since the previous call (``diff_changed`` tells whether
+    there are any).
     """
 
     def __init__(self, rows: int = 24, cols: int = 80) -> None:
@@ -33,71 +63,82 @@ class _VT100Screen:
         self.cursor_row = 0
         self.cursor_col = 0
         self.grid: list[list[str]] = [[" "] * cols for _ in range(rows)]
+        # rendered (right-trimmed) line of each row, up to date for the rows
+        # not in _dirty
+        self._lines: list[str] = [""] * rows
+        self._dirty: set[int] = set()
+        # last render(), or None when a line changed since
+        self._text: str | None = ""
+        # lines returned by the last render_diff()
+        self._emitted: list[str] = [""] * rows
+        self._diff_rows: set[int] = set()
+        self._pending = ""
 
     def feed(self, text: str) -> None:
         """Process *text* (may contain VT100 sequences) into the screen buffer."""
-        i = 0
-        n = len(text)
-        while i < n:
-            ch = text[i]
-
-            if ch == "\x1b" and i + 1 < n:
-                nxt = text[i + 1]
-                if nxt == "[":
-                    # CSI sequence: \x1b[ <params> <cmd>
-                    j = i + 2
-                    params = ""
-                    while j < n and text[j] in "0123456789;":
-                        params += text[j]
-                        j += 1
-                    if j < n:
-                        self._handle_csi(params, text[j])
-                        i = j + 1
-                    else:
-                        i = j
-                    continue
-                if nxt in "()":
-                    # Character-set designation – skip 3 bytes
-                    i += 3 if i + 2 < n else n
-                    continue
-                if nxt == "]":
-                    # OSC sequence – skip until BEL
-                    j = i + 2
-                    while j < n and text[j] != "\x07":
-                        j += 1
-                    i = j + 1
-                    continue
-                # Unknown escape – skip \x1b and the next char
-                i += 2
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+        incomplete = _VT100_INCOMPLETE_RE.search(text)
+        if incomplete:
+            if len(text) - incomplete.start() <= _VT100_MAX_PENDING:
+                self._pending = incomplete.group()
+            text = text[: incomplete.start()]
+        pos = 0
+        for match in _VT100_TOKEN_RE.finditer(text):
+            start = match.start()
+            if start > pos:
+                self._write(text[pos:start])
+            pos = match.end()
+            cmd = match.group(2)
+            if cmd is not None:
+                self._handle_csi(match.group(1), cmd)
                 continue
-
-            if ch == "\r":
+            token = match.group()
+            if token == "\r":
                 self.cursor_col = 0
-                i += 1
-                continue
-
-            if ch == "\n":
-                self.cursor_row += 1
-                self.cursor_col = 0
-                if self.cursor_row >= self.rows:
-                    self.grid.pop(0)
-                    self.grid.append([" "] * self.cols)
-                    self.cursor_row = self.rows - 1
-                i += 1
-                continue
-
-            if ch == "\x00":
-                i += 1
-                continue
-
-            # Printable character
-            if 0 <= self.cursor_row < self.rows and 0 <= self.cursor_col < self.cols:
-                self.grid[self.cursor_row][self.cursor_col] = ch
-            self.cursor_col += 1
-            i += 1
+            elif token == "\n":
+                self._line_feed()
+            # NUL, character-set designations, OSC and unknown escapes: ignored
+        if pos < len(text):
+            self._write(text[pos:])
 
     # ------------------------------------------------------------------
+    def _write(self, run: str) -> None:
+        col = self.cursor_col
+        if col < self.cols:
+            chars = run[: self.cols - col]
+            self.grid[self.cursor_row][col : col + len(chars)] = chars
+            self._dirty.add(self.cursor_row)
+        self.cursor_col = col + len(run)
+
+    def _line_feed(self) -> None:
+        self.cursor_row += 1
+        self.cursor_col = 0
+        if self.cursor_row >= self.rows:
+            self._refresh()
+            self.grid.pop(0)
+            self.grid.append([" "] * self.cols)
+            self._lines.pop(0)
+            self._lines.append("")
+            self._text = None
+            # every line moved up
+            self._diff_rows.update(range(self.rows))
+            self.cursor_row = self.rows - 1
+
+    def _clear_rows(self, start: int, end: int) -> None:
+        for r in range(start, end):
+            self.grid[r] = [" "] * self.cols
+            self._dirty.add(r)
+
+    def _clear_cols(self, start: int, end: int) -> None:
+        row = self.grid[self.cursor_row]
+        row[start:end] = [" "] * (end - start)
+        self._dirty.add(self.cursor_row)
+
     def _handle_csi(self, params: str, cmd: str) -> None:
+        if params.startswith("?"):
+            return  # private mode set/reset – ignore
         nums = []
         for p in params.split(";") if params else []:
             try:
@@ -125,33 +166,81 @@ class _VT100Screen:
         elif cmd == "J":  # Erase in display
             n = nums[0] if nums else 0
             if n == 2:
-                self.grid = [[" "] * self.cols for _ in range(self.rows)]
+                self._clear_rows(0, self.rows)
                 self.cursor_row = 0
                 self.cursor_col = 0
             elif n == 0:
-                for c in range(self.cursor_col, self.cols):
-                    self.grid[self.cursor_row][c] = " "
-                for r in range(self.cursor_row + 1, self.rows):
-                    self.grid[r] = [" "] * self.cols
+                self._clear_cols(min(self.cursor_col, self.cols), self.cols)
+                self._clear_rows(self.cursor_row + 1, self.rows)
         elif cmd == "K":  # Erase in line
             n = nums[0] if nums else 0
             if n == 0:
-                for c in range(self.cursor_col, self.cols):
-                    self.grid[self.cursor_row][c] = " "
+                self._clear_cols(min(self.cursor_col, self.cols), self.cols)
             elif n == 1:
-                for c in range(self.cursor_col + 1):
-                    self.grid[self.cursor_row][c] = " "
+                self._clear_cols(0, min(self.cursor_col + 1, self.cols))
             elif n == 2:
-                self.grid[self.cursor_row] = [" "] * self.cols
+                self._clear_rows(self.cursor_row, self.cursor_row + 1)
         # SGR (m), scroll region (r), mode set/reset (l, h) – ignore
 
     # ------------------------------------------------------------------
+    def _refresh(self) -> None:
+        """Re-render the dirty rows"""
+        for r in self._dirty:
+            line = "".join(self.grid[r]).rstrip()
+            if line != self._lines[r]:
+                self._lines[r] = line
+                self._diff_rows.add(r)
+                self._text = None
+        self._dirty.clear()
+
+    @property
+    def changed(self) -> bool:
+        """True if the screen changed since the last ``render()``."""
+        self._refresh()
+        return self._text is None
+
+    @property
+    def diff_changed(self) -> bool:
+        """True if a line changed since the last ``render_diff()``."""
+        self._refresh()
+        return any(self._lines[r] != self._emitted[r] for r in self._diff_rows)
+
     def render(self) -> str:
         """Return screen content as text with trailing whitespace trimmed."""
-        lines = ["".join(row).rstrip() for row in self.grid]
-        while lines and not lines[-1]:
-            lines.pop()
-        return "\n".join(lines)
+        self._refresh()
+        if self._text is None:
+            lines = list(self._lines)
+            while lines and not lines[-1]:
+                lines.pop()
+            self._text = "\n".join(lines)
+        return self._text
+
+    def render_diff(self) -> dict[int, str]:
+        """
+        Return the lines changed since the previous ``render_diff()`` call,
+        as {row index: line}.
+        """
+        self._refresh()
+        diff = {}
+        for r in sorted(self._diff_rows):
+            if self._lines[r] != self._emitted[r]:
+                diff[r] = self._emitted[r] = self._lines[r]
+        self._diff_rows.clear()
+        return diff
+
+
+# How the output of a command is retained in UtilResponse.ws_data and
+# UtilResponse.ws_raw_events (see UtilResponse.set_retention())
+RETENTION_MODES = ("all", "ring", "none", "file")
+
+
+def _check_retention(mode: str, max_messages: int, path: str | None) -> None:
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"mode must be one of {', '.join(RETENTION_MODES)}")
+    if max_messages < 1:
+        raise ValueError("max_messages must be >= 1")
+    if mode == "file" and not path:
+        raise ValueError('mode "file" requires a path')
 
 
 class TimerAction(Enum):
@@ -211,14 +300,24 @@ class UtilResponse:
         print(response.ws_data)
     """
 
+    _default_retention: tuple[str, int, str | None] = ("all", 1000, None)
+
     def __init__(
         self,
         api_response: _APIResponse | None = None,
     ) -> None:
         self.trigger_api_response = api_response
         self.ws_required: bool = False
-        self.ws_data: list[str] = []
-        self.ws_raw_events: list[str] = []
+        self.ws_data: list[str] | collections.deque = []
+        self.ws_raw_events: list[str] | collections.deque = []
+        # Path of the file the output is written to, with the "file" retention
+        self.ws_data_path: str | None = None
+        self._retention = "all"
+        self._spill_path: str | None = None
+        self._spill_file: IO[str] | None = None
+        self._data_lock = threading.Lock()
+        # (rows, cols, frame_interval, diffs) of the screen-mode commands
+        self._screen_settings: tuple[int, int, float, bool] = (24, 80, 0.0, False)
         # Set when the WebSocket leg did NOT complete cleanly (transport error,
         # abnormal close, or failure to start). Stays None on a clean completion or
         # a trigger-only command, so `ws_error is not None` is a reliable
@@ -234,6 +333,188 @@ class UtilResponse:
             self._closed.set()
         # api_response is None → _closed stays unset (in-progress, waiting for WS)
         self._disconnect_fn: Callable[[], None] | None = None
+        mode, max_messages, path = UtilResponse._default_retention
+        if mode != "all":
+            self.set_retention(mode, max_messages, path)
+
+    @classmethod
+    def set_default_retention(
+        cls, mode: str = "all", max_messages: int = 1000, path: str | None = None
+    ) -> None:
+        """
+        Set the retention of the UtilResponse objects created afterwards (see
+        set_retention()). With the "file" retention, `path` must be a
+        directory: each response writes its output to a new file in it.
+        """
+        _check_retention(mode, max_messages, path)
+        if mode == "file" and not os.path.isdir(path):  # type: ignore[arg-type]
+            raise ValueError("path must be an existing directory")
+        cls._default_retention = (mode, max_messages, path)
+
+    def set_retention(
+        self, mode: str = "ring", max_messages: int = 1000, path: str | None = None
+    ) -> "UtilResponse":
+        """
+        Limit the output retained in memory, for long-running commands. Can
+        be called at any time: the output already collected is kept according
+        to the new retention.
+
+        PARAMS
+        -----------
+        mode : str, default "ring"
+            "all": keep all the output (default behavior).
+            "ring": keep the last `max_messages` messages in ``ws_data`` and
+            ``ws_raw_events`` (collections.deque).
+            "none": keep nothing; the output is only delivered to the
+            ``on_message`` callback and ``receive()``.
+            "file": write each message to `path` (one JSON document per
+            line), and keep the last `max_messages` messages in memory.
+        max_messages : int, default 1000
+            Number of messages kept in memory with the "ring" and "file"
+            retentions. With any retention other than "all", it is also the
+            number of messages waiting to be read by ``receive()``; the
+            oldest are dropped when it is full (see ``ws_messages_dropped``).
+        path : str, optional
+            With the "file" retention, file to write the output to. If `path`
+            is a directory, a new file is created in it (see
+            ``ws_data_path``).
+
+        RETURNS
+        -----------
+        UtilResponse
+            self
+        """
+        _check_retention(mode, max_messages, path)
+        with self._data_lock:
+            self._close_spill_file()
+            self._spill_path = path if mode == "file" else None
+            if mode == "file":
+                for item in self.ws_data:
+                    self._spill(item)
+            if mode == "all":
+                self.ws_data = list(self.ws_data)
+                self.ws_raw_events = list(self.ws_raw_events)
+                new_queue: queue.Queue = queue.Queue()
+            else:
+                if mode == "none":
+                    self.ws_data = []
+                    self.ws_raw_events = []
+                else:
+                    self.ws_data = collections.deque(self.ws_data, maxlen=max_messages)
+                    self.ws_raw_events = collections.deque(
+                        self.ws_raw_events, maxlen=max_messages
+                    )
+                new_queue = _BackpressureQueue(
+                    maxsize=max_messages, policy="drop_oldest"
+                )
+            self._retention = mode
+            # keep the messages not read by receive() yet
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._put_message(new_queue, item)
+            self._queue = new_queue
+        return self
+
+    def set_screen_rendering(
+        self,
+        frame_interval: float = 0.0,
+        diffs: bool = False,
+        rows: int = 24,
+        cols: int = 80,
+    ) -> "UtilResponse":
+        """
+        Configure the rendering of screen-mode commands (``top``,
+        ``monitor interface``), whose output is drawn on a VT100 screen. Must
+        be called before the first output of the command.
+
+        PARAMS
+        -----------
+        frame_interval : float, default 0.0
+            Minimum time in seconds between two rendered frames. The screen
+            is rendered when it changed, at most once per `frame_interval`
+            (0 = on every change); the last changes are always rendered.
+        diffs : bool, default False
+            If True, each message is a dict {row index: line} with the lines
+            changed since the previous message, instead of the full screen.
+        rows : int, default 24
+            Number of rows of the screen.
+        cols : int, default 80
+            Number of columns of the screen.
+
+        RETURNS
+        -----------
+        UtilResponse
+            self
+        """
+        if frame_interval < 0:
+            raise ValueError("frame_interval must be >= 0")
+        if rows < 1 or cols < 1:
+            raise ValueError("rows and cols must be >= 1")
+        self._screen_settings = (rows, cols, frame_interval, diffs)
+        return self
+
+    @property
+    def ws_messages_dropped(self) -> int:
+        """Number of messages dropped because receive() did not keep up"""
+        if isinstance(self._queue, _BackpressureQueue):
+            return self._queue.counters["dropped_oldest"]
+        return 0
+
+    def _open_spill_file(self, path: str) -> IO[str]:
+        if os.path.isdir(path):
+            fd, path = tempfile.mkstemp(
+                prefix="mistapi-output-", suffix=".jsonl", dir=path
+            )
+            spill_file = os.fdopen(fd, "a", encoding="utf-8")
+        else:
+            spill_file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        # the file is created on the first message, and appended to afterwards
+        self.ws_data_path = self._spill_path = path
+        return spill_file
+
+    def _close_spill_file(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _spill(self, item: Any) -> None:
+        if self._spill_file is None:
+            self._spill_file = self._open_spill_file(self._spill_path)  # type: ignore[arg-type]
+        self._spill_file.write(json.dumps(item) + "\n")
+        self._spill_file.flush()
+
+    @staticmethod
+    def _put_message(target: queue.Queue, item: Any) -> None:
+        if isinstance(target, _BackpressureQueue):
+            target.offer(item)
+        else:
+            target.put(item)
+
+    def _add_raw_event(self, event: Any) -> None:
+        with self._data_lock:
+            if self._retention != "none":
+                self.ws_raw_events.append(event)
+
+    def _add_data(self, item: Any) -> None:
+        with self._data_lock:
+            if self._retention != "none":
+                self.ws_data.append(item)
+            if self._spill_path is not None:
+                self._spill(item)
+            self._put_message(self._queue, item)  # feed receive() generator
+
+    def _finish(self) -> None:
+        """Signal the end of the output (receive() exits, wait() returns)"""
+        with self._data_lock:
+            self._close_spill_file()
+            try:
+                self._queue.put_nowait(None)  # sentinel for receive()
+            except queue.Full:
+                pass  # receive() also exits once _closed is set
+        self._closed.set()
 
     @property
     def done(self) -> bool:
@@ -322,16 +603,29 @@ class WebSocketWrapper:
             },
         }
         self.received_messages = 0
-        self.data = []
-        self.raw_events = []
         self.ws = None
         self.session_id: str | None = None
         self.capture_id: str | None = None
         self._on_message_cb = on_message
         self._screen: _VT100Screen | None = None
         self._screen_mode: bool = False
+        # held while a message is processed and its output emitted, so the
+        # screen frames (also emitted by the flush timer) stay in order
+        self._screen_lock = threading.RLock()
+        self._screen_frame_at = 0.0
+        self._screen_flush_timer: threading.Timer | None = None
         self._extract_trigger_ids()
 
+    @property
+    def data(self):
+        """Output collected so far (UtilResponse.ws_data)"""
+        return self.util_response.ws_data
+
+    @property
+    def raw_events(self):
+        """Raw events collected so far (UtilResponse.ws_raw_events)"""
+        return self.util_response.ws_raw_events
+
     def _extract_trigger_ids(self):
         """Extract session_id and capture_id from the trigger API response."""
         if not self.util_response.trigger_api_response:
@@ -365,6 +659,7 @@ class WebSocketWrapper:
 
     def _on_close(self, code, msg):
         LOGGER.info("WebSocket closed: %s - %s", code, msg)
+        self._flush_screen()
         self.util_response.ws_close_code = code
         # An abnormal close (anything other than a normal 1000 / no-status close)
         # is recorded as an error so a clean completion is distinguishable.
@@ -373,8 +668,7 @@ class WebSocketWrapper:
                 f"WebSocket closed abnormally (code {code}): {msg}"
             )
         self._stop_all_timers()
-        self.util_response._queue.put(None)  # sentinel for receive()
-        self.util_response._closed.set()  # signal completion
+        self.util_response._finish()  # signal completion
 
     ##########################################################################
     ## Helper methods for managing timers
@@ -423,12 +717,10 @@ class WebSocketWrapper:
             if self.timers[Timer.FIRST_MESSAGE_TIMEOUT.value]["thread"]:
                 self._timeout_handler(Timer.FIRST_MESSAGE_TIMEOUT, TimerAction.STOP)
             LOGGER.debug("data: %s", msg)
-            raw = self._extract_raw(msg)
-            if raw:
-                self.data.append(raw)
-                self.util_response._queue.put(raw)  # feed receive() generator
-                if self._on_message_cb:
-                    self._on_message_cb(raw)
+            with self._screen_lock:
+                raw = self._extract_raw(msg)
+                if raw:
+                    self._emit(raw)
             self._timeout_handler(Timer.TIMEOUT, TimerAction.RESET)
 
     ##########################################################################
@@ -479,7 +771,7 @@ class WebSocketWrapper:
         Handles both command events (with "raw" field) and pcap events (with "pcap_dict" field).
         """
         if root:
-            self.raw_events.append(message)
+            self.util_response._add_raw_event(message)
         event = message
         if isinstance(event, str):
             try:
@@ -496,11 +788,13 @@ class WebSocketWrapper:
                 if isinstance(raw_value, str):
                     # Detect screen-mode (cursor positioning / clear-screen)
                     if not self._screen_mode and _SCREEN_MODE_RE.search(raw_value):
+                        rows, cols, _, _ = self.util_response._screen_settings
                         self._screen_mode = True
-                        self._screen = _VT100Screen()
+                        self._screen = _VT100Screen(rows=rows, cols=cols)
                     if self._screen_mode and self._screen is not None:
-                        self._screen.feed(raw_value)
-                        raw_value = self._screen.render()
+                        with self._screen_lock:
+                            self._screen.feed(raw_value)
+                            raw_value = self._screen_frame()
                     else:
                         raw_value = _ANSI_ESCAPE_RE.sub("", raw_value)
                 LOGGER.debug("Extracted raw message: %s", raw_value)
@@ -511,6 +805,51 @@ class WebSocketWrapper:
                 return event["pcap_dict"]
         return None
 
+    ##########################################################################
+    ## Screen-mode rendering
+    def _screen_frame(self):
+        """
+        Return the frame to emit after a screen update: the rendered screen
+        (or the changed lines), or None when the screen did not change or the
+        last frame is too recent (a flush is then scheduled).
+        Must be called with the screen lock held.
+        """
+        if self._screen is None:
+            return None
+        _, _, frame_interval, diffs = self.util_response._screen_settings
+        if not (self._screen.diff_changed if diffs else self._screen.changed):
+            return None
+        if frame_interval:
+            wait = self._screen_frame_at + frame_interval - time.monotonic()
+            if wait > 0:
+                if self._screen_flush_timer is None:
+                    self._screen_flush_timer = threading.Timer(wait, self._flush_screen)
+                    self._screen_flush_timer.daemon = True
+                    self._screen_flush_timer.start()
+                return None
+            self._screen_frame_at = time.monotonic()
+        if self._screen_flush_timer is not None:
+            self._screen_flush_timer.cancel()
+            self._screen_flush_timer = None
+        return self._screen.render_diff() if diffs else self._screen.render()
+
+    def _flush_screen(self):
+        """Emit the screen changes not rendered yet (see frame_interval)"""
+        with self._screen_lock:
+            if self._screen_flush_timer is not None:
+                self._screen_flush_timer.cancel()
+                self._screen_flush_timer = None
+            self._screen_frame_at = 0.0
+            frame = self._screen_frame()
+            if frame:
+                self._emit(frame)
+
+    def _emit(self, item) -> None:
+        """Add an output item to the response and pass it to on_message"""
+        self.util_response._add_data(item)
+        if self._on_message_cb:
+            self._on_message_cb(item)
+
     ##########################################################################
     ## WebSocket connection management
     def start(self, ws) -> UtilResponse:
@@ -535,8 +874,6 @@ class WebSocketWrapper:
         # Wire up UtilResponse before starting WS
         # _closed is already unset (in-progress) from UtilResponse.__init__
         self.util_response.ws_required = True
-        self.util_response.ws_data = self.data  # live list reference
-        self.util_response.ws_raw_events = self.raw_events
         self.util_response._await_timeout = (
             self.timers[Timer.MAX_DURATION.value]["duration"] + 10
         )
@@ -582,6 +919,8 @@ class WebSocketWrapper:
                     self._extract_trigger_ids()
                     ws = ws_factory_fn(trigger)
                     if ws:
+                        # Use the shared connection of the DeviceCmdPool, if any
+                        ws = _pooled_stream(self.apisession, ws, self)
                         self.start(ws)
                         return  # start() / _on_close manages _closed
                     LOGGER.error("WS factory returned None")
@@ -603,8 +942,7 @@ class WebSocketWrapper:
                 if self.util_response.ws_error is None:
                     self.util_response.ws_error = f"trigger/WebSocket setup error: {e}"
             # Mark done (failure or WS factory returned None)
-            self.util_response._queue.put(None)
-            self.util_response._closed.set()
+            self.util_response._finish()
 
         threading.Thread(target=_run, daemon=True).start()
         return self.util_response
@@ -624,6 +962,5 @@ class WebSocketWrapper:
                 )
         except Exception as e:
             LOGGER.error("Error during trigger: %s", e)
-        self.util_response._queue.put(None)
-        self.util_response._closed.set()
+        self.util_response._finish()
         return self.util_response
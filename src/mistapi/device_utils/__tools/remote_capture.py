@@ -15,10 +15,37 @@ from collections.abc import Callable
 from mistapi import APISession as _APISession
 from mistapi.__logger import logger as LOGGER
 from mistapi.api.v1.sites import pcaps
+from mistapi.device_utils.__tools.__pcapng import (
+    LINKTYPE_ETHERNET,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    PcapngWriter,
+)
 from mistapi.device_utils.__tools.__ws_wrapper import UtilResponse, WebSocketWrapper
 from mistapi.websockets.sites import PcapEvents
 
 
+def _pcap_writer_callback(
+    util_response: UtilResponse,
+    pcap_writer: PcapngWriter,
+    device_id: str,
+    linktype: int,
+    on_message: Callable[[dict], None] | None,
+) -> Callable[[dict], None]:
+    """
+    Return the on_message callback writing the captured packets with
+    pcap_writer. The packets are not kept in the UtilResponse.
+    """
+    util_response.set_retention("none")
+    interface = device_id.split("-")[-1]
+
+    def _on_packet(pcap_dict: dict) -> None:
+        pcap_writer.write(pcap_dict, interface=interface, linktype=linktype)
+        if on_message:
+            on_message(pcap_dict)
+
+    return _on_packet
+
+
 def _build_pcap_body(
     device_id: str,
     port_ids: list[str],
@@ -65,6 +92,7 @@ def ap_remote_pcap_wireless(
     num_packets: int = 1024,
     timeout=10,
     on_message: Callable[[dict], None] | None = None,
+    pcap_writer: PcapngWriter | None = None,
 ) -> UtilResponse:
     """
     DEVICE: AP
@@ -98,6 +126,9 @@ def ap_remote_pcap_wireless(
         Timeout for the remote pcap command in seconds.
     on_message : Callable, optional
         Callback invoked with each extracted raw message as it arrives.
+    pcap_writer : PcapngWriter, optional
+        Write the captured packets to pcapng file(s) as they arrive. The
+        packets are then not kept in ``ws_data``.
 
     RETURNS
     -----------
@@ -126,6 +157,14 @@ def ap_remote_pcap_wireless(
     if tcpdump_expression:
         body["tcpdump_expression"] = tcpdump_expression
     util_response = UtilResponse()
+    if pcap_writer is not None:
+        on_message = _pcap_writer_callback(
+            util_response,
+            pcap_writer,
+            device_id,
+            LINKTYPE_IEEE802_11_RADIOTAP,
+            on_message,
+        )
     return WebSocketWrapper(
         apisession, util_response, timeout=timeout, on_message=on_message
     ).start_with_trigger(
@@ -146,6 +185,7 @@ def ap_remote_pcap_wired(
     num_packets: int = 1024,
     timeout=10,
     on_message: Callable[[dict], None] | None = None,
+    pcap_writer: PcapngWriter | None = None,
 ) -> UtilResponse:
     """
     DEVICE: AP
@@ -173,6 +213,9 @@ def ap_remote_pcap_wired(
         Timeout for the remote pcap command in seconds.
     on_message : Callable, optional
         Callback invoked with each extracted raw message as it arrives.
+    pcap_writer : PcapngWriter, optional
+        Write the captured packets to pcapng file(s) as they arrive. The
+        packets are then not kept in ``ws_data``.
 
     RETURNS
     -----------
@@ -195,6 +238,10 @@ def ap_remote_pcap_wired(
     if tcpdump_expression:
         body["tcpdump_expression"] = tcpdump_expression
     util_response = UtilResponse()
+    if pcap_writer is not None:
+        on_message = _pcap_writer_callback(
+            util_response, pcap_writer, device_id, LINKTYPE_ETHERNET, on_message
+        )
     return WebSocketWrapper(
         apisession, util_response, timeout=timeout, on_message=on_message
     ).start_with_trigger(
@@ -216,6 +263,7 @@ def srx_remote_pcap(
     num_packets: int = 1024,
     timeout=10,
     on_message: Callable[[dict], None] | None = None,
+    pcap_writer: PcapngWriter | None = None,
 ) -> UtilResponse:
     """
     DEVICE: SRX
@@ -245,6 +293,9 @@ def srx_remote_pcap(
         Timeout for the remote pcap command in seconds.
     on_message : Callable, optional
         Callback invoked with each extracted raw message as it arrives.
+    pcap_writer : PcapngWriter, optional
+        Write the captured packets to pcapng file(s) as they arrive. The
+        packets are then not kept in ``ws_data``.
 
     RETURNS
     -----------
@@ -269,6 +320,10 @@ def srx_remote_pcap(
         num_packets,
     )
     util_response = UtilResponse()
+    if pcap_writer is not None:
+        on_message = _pcap_writer_callback(
+            util_response, pcap_writer, device_id, LINKTYPE_ETHERNET, on_message
+        )
     return WebSocketWrapper(
         apisession, util_response, timeout=timeout, on_message=on_message
     ).start_with_trigger(
@@ -290,6 +345,7 @@ def ssr_remote_pcap(
     num_packets: int = 1024,
     timeout=10,
     on_message: Callable[[dict], None] | None = None,
+    pcap_writer: PcapngWriter | None = None,
 ) -> UtilResponse:
     """
     DEVICE: SSR
@@ -319,6 +375,9 @@ def ssr_remote_pcap(
         Timeout for the remote pcap command in seconds.
     on_message : Callable, optional
         Callback invoked with each extracted raw message as it arrives.
+    pcap_writer : PcapngWriter, optional
+        Write the captured packets to pcapng file(s) as they arrive. The
+        packets are then not kept in ``ws_data``.
 
     RETURNS
     -----------
@@ -344,6 +403,10 @@ def ssr_remote_pcap(
         raw=False,
     )
     util_response = UtilResponse()
+    if pcap_writer is not None:
+        on_message = _pcap_writer_callback(
+            util_response, pcap_writer, device_id, LINKTYPE_ETHERNET, on_message
+        )
     return WebSocketWrapper(
         apisession, util_response, timeout=timeout, on_message=on_message
     ).start_with_trigger(
@@ -365,6 +428,7 @@ def ex_remote_pcap(
     num_packets: int = 1024,
     timeout=10,
     on_message: Callable[[dict], None] | None = None,
+    pcap_writer: PcapngWriter | None = None,
 ) -> UtilResponse:
     """
     DEVICE: EX
@@ -394,6 +458,9 @@ def ex_remote_pcap(
         Timeout for the remote pcap command in seconds.
     on_message : Callable, optional
         Callback invoked with each extracted raw message as it arrives.
+    pcap_writer : PcapngWriter, optional
+        Write the captured packets to pcapng file(s) as they arrive. The
+        packets are then not kept in ``ws_data``.
 
     RETURNS
     -----------
@@ -418,6 +485,10 @@ def ex_remote_pcap(
         num_packets,
     )
     util_response = UtilResponse()
+    if pcap_writer is not None:
+        on_message = _pcap_writer_callback(
+            util_response, pcap_writer, device_id, LINKTYPE_ETHERNET, on_message
+        )
     return WebSocketWrapper(
         apisession, util_response, timeout=timeout, on_message=on_message
     ).start_with_trigger(
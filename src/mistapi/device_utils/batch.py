@@ -0,0 +1,27 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+
+Batch execution of device utilities.
+
+Run a device utility function on a list of devices with a bounded number of
+commands in progress, and consume the results as they complete:
+
+    from mistapi.device_utils import batch, ex
+
+    run = batch.run(session, targets, ex.retrieveArpTable, max_in_flight=20)
+    for result in run.receive():
+        print(result.device_id, result.status, result.response.ws_data)
+    print(run.summary())
+"""
+
+from mistapi.device_utils.__tools.__batch import BatchResult, BatchRun, run
+
+__all__ = ["BatchResult", "BatchRun", "run"]
@@ -0,0 +1,570 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the _AsyncMistWebsocket base class, the asyncio version
+of _MistWebsocket. The connection, the reconnect loop and the subscription
+watchdog run in a single asyncio task on the caller's event loop, so no
+thread is started, and the messages are delivered with `async for`.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import ssl
+import time
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
+
+from mistapi.__logger import logger
+from mistapi.websockets.__pacing import ACK_POLL_INTERVAL, _SubscriptionPacer
+from mistapi.websockets.__ws_client import _HeaderRedactFilter, _MistWebsocketBase
+from mistapi.websockets.metrics import _frame_size
+
+try:
+    from websockets.asyncio.client import ClientConnection
+    from websockets.asyncio.client import connect as ws_connect
+    from websockets.exceptions import ConnectionClosed
+except ImportError:  # pragma: no cover - depends on the installed extras
+    ws_connect = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from mistapi import APISession
+
+_async_ws_logger = logging.getLogger("websockets.client")
+if not any(isinstance(f, _HeaderRedactFilter) for f in _async_ws_logger.filters):
+    _async_ws_logger.addFilter(_HeaderRedactFilter())
+
+
+class _AsyncMistWebsocket(_MistWebsocketBase):
+    """
+    Base class for the asyncio Mist API WebSocket channels.
+
+    Connects to wss://{host}/api-ws/v1/stream and subscribes to the channels
+    by sending {"subscribe": "<channel>"} on open. Authentication is the same
+    as _MistWebsocket (Authorization header or requests Session cookies).
+
+    The received messages go through an ``asyncio.Queue`` which drops the
+    incoming messages when full: the backpressure policies of
+    ``set_backpressure()`` and the ``on_batch()`` callback of the threaded
+    clients are not supported (they raise a TypeError). Use
+    ``receive_batches()`` to consume the messages in batches.
+
+    Requires the ``websockets`` package (``pip install mistapi[async]``).
+    """
+
+    def __init__(
+        self,
+        mist_session: "APISession",
+        channels: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        if ws_connect is None:
+            raise ImportError(
+                "Async WebSocket channels require the 'websockets' package. "
+                "Install it with `pip install mistapi[async]`"
+            )
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+        self._ws: ClientConnection | None = None
+        self._task: asyncio.Task | None = None
+        self._close_task: asyncio.Future | None = None
+        self._subscribe_task: asyncio.Task | None = None
+        self._subscription_watchdog: asyncio.TimerHandle | None = None
+        self._queue: asyncio.Queue[dict | None] | None = None
+        # The events are created again by connect(), so the stream can be
+        # reused with another event loop
+        self._connected = asyncio.Event()
+        self._user_disconnect = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()  # not running initially
+
+    # ------------------------------------------------------------------
+    # Auth / SSL helpers
+
+    def _build_ssl_context(self) -> ssl.SSLContext:
+        """Build the SSL context from the APISession's requests.Session."""
+        session = self._mist_session._session
+        if isinstance(session.verify, str):
+            context = ssl.create_default_context(cafile=session.verify)
+        else:
+            context = ssl.create_default_context()
+            if session.verify is False:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+        if session.cert:
+            if isinstance(session.cert, str):
+                context.load_cert_chain(session.cert)
+            elif isinstance(session.cert, tuple):
+                keyfile = session.cert[1] if len(session.cert) > 1 else None
+                context.load_cert_chain(session.cert[0], keyfile)
+        return context
+
+    def _build_handshake_headers(self) -> dict:
+        headers = self._get_headers()
+        cookie = self._get_cookie()
+        if cookie:
+            headers["Cookie"] = cookie
+        return headers
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    def _close_ws(self, ws: "ClientConnection") -> None:
+        # Only called on subscription failures, so close with 1008 (policy
+        # violation): the server echoes the code, which is then kept as the
+        # last close code. Keep a reference to the task until it is done.
+        self._close_task = asyncio.ensure_future(ws.close(1008))
+
+    def _cancel_subscription_watchdog(self) -> None:
+        handle = self._subscription_watchdog
+        self._subscription_watchdog = None
+        if handle is not None:
+            handle.cancel()
+
+    def _arm_subscription_watchdog(self, ws: "ClientConnection") -> None:
+        if not self._expected_channels:
+            return
+
+        def _watchdog_expired() -> None:
+            self._subscription_watchdog = None
+            if self._user_disconnect.is_set() or ws is not self._ws:
+                return
+            self._subscription_timeout(ws)
+
+        self._cancel_subscription_watchdog()
+        self._subscription_watchdog = asyncio.get_running_loop().call_later(
+            self._subscription_watchdog_timeout, _watchdog_expired
+        )
+
+    def _enqueue_message(self, message: dict) -> None:
+        self._messages_received += 1
+        try:
+            self._queue.put_nowait(message)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            self._messages_dropped += 1
+            logger.warning("Receive queue full; dropping message")
+            return
+        self._stats.record_queue_depth(
+            "receive",
+            self._queue.qsize(),  # type: ignore[union-attr]
+        )
+        if (
+            self._throughput_log_interval
+            and self._messages_received % self._throughput_log_interval == 0
+        ):
+            logger.info(
+                "WebSocket received %d messages. Receive queue size=%d dropped=%d",
+                self._messages_received,
+                self._queue.qsize(),  # type: ignore[union-attr]
+                self._messages_dropped,
+            )
+
+    # ------------------------------------------------------------------
+    # Connection handlers
+
+    async def _handle_open(self, ws: "ClientConnection") -> None:
+        logger.info(
+            "WebSocket opened. Requesting %d channel subscription(s)",
+            len(self._channels),
+        )
+        self._last_http_status = None
+        self._stats.record_open()
+        pacer = self._new_subscription_pacer()
+        with self._subscription_lock:
+            self._subscribed_channels.clear()
+            channels = list(self._channels)
+            self._subscribing_ws = ws
+            if not channels:
+                pacer = None
+            self._paced_channels = channels if pacer is not None else None
+        if pacer is not None:
+            # in a task, so the acknowledgements are read meanwhile
+            self._subscribe_task = asyncio.create_task(
+                self._send_paced_subscriptions(ws, channels, pacer)
+            )
+        else:
+            for channel in channels:
+                await ws.send(json.dumps({"subscribe": channel}))
+            self._arm_subscription_watchdog(ws)
+        if not self._expected_channels:
+            self._reconnect_attempts = 0
+            self._last_close_code = None
+            self._last_close_msg = None
+        self._connected.set()
+        if self._on_open_cb:
+            try:
+                self._on_open_cb()
+            except Exception:
+                logger.exception("on_open callback raised")
+
+    async def _send_paced_subscriptions(
+        self,
+        ws: "ClientConnection",
+        channels: list[str],
+        pacer: _SubscriptionPacer,
+    ) -> None:
+        """Send the subscription frames paced by `pacer`, then arm the watchdog"""
+        sent = 0
+        try:
+            while not self._paced_subscriptions_done(channels, sent):
+                for batch in pacer.batches(channels, sent):
+                    if sent and not await self._wait_next_batch(ws, pacer, sent):
+                        return
+                    for channel in batch:
+                        await ws.send(json.dumps({"subscribe": channel}))
+                    sent += len(batch)
+        except ConnectionClosed as exc:
+            logger.error("Subscription send failed: %s", exc)
+            return
+        if pacer.slowdowns:
+            logger.info(
+                "Subscription frames sent; pacing reduced %d time(s)",
+                pacer.slowdowns,
+            )
+        if self._is_subscribing(ws):
+            self._arm_subscription_watchdog(ws)
+
+    async def _wait_next_batch(
+        self, ws: "ClientConnection", pacer: _SubscriptionPacer, sent: int
+    ) -> bool:
+        """
+        Wait until the next subscription batch can be sent. Return False if
+        the connection was closed meanwhile, or the acknowledgements did not
+        arrive within the subscription watchdog timeout.
+        """
+        waiting_since: float | None = None
+        while not self._user_disconnect.is_set() and self._is_subscribing(ws):
+            delay = pacer.next_delay(sent, self._acknowledged_count())
+            if delay is not None:
+                await asyncio.sleep(delay)
+                return not self._user_disconnect.is_set() and self._is_subscribing(ws)
+            if waiting_since is None:
+                waiting_since = time.monotonic()
+                self._log_pacing_slowdown(pacer, sent)
+            elif time.monotonic() - waiting_since > self._subscription_watchdog_timeout:
+                self._subscription_timeout(ws)
+                return False
+            await asyncio.sleep(ACK_POLL_INTERVAL)
+        return False
+
+    def _cancel_paced_subscriptions(self) -> None:
+        task = self._subscribe_task
+        self._subscribe_task = None
+        if task is not None:
+            task.cancel()
+
+    async def _handle_message(
+        self, ws: "ClientConnection", message: str | bytes
+    ) -> None:
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write(message)
+        data = self._parse_message(message)
+        self._stats.record_message(data, _frame_size(message))
+        self._process_subscription_event(ws, data)
+
+        callback = self._on_message_cb
+        if callback is None:
+            self._enqueue_message(data)
+            return
+        self._messages_received += 1
+        started = time.perf_counter()
+        try:
+            result = callback(data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("on_message callback raised")
+        self._stats.record_callback(time.perf_counter() - started)
+        self._messages_processed += 1
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+
+    async def subscribe(self, channels: list[str]) -> None:
+        """
+        Add channels to the stream. On a live connection, only the new
+        channels are subscribed; the reconnections subscribe the current set.
+        See `_MistWebsocket.subscribe()`.
+        """
+        added, ws = self._add_channels(channels)
+        if not added or ws is None:
+            return
+        logger.info("Subscribing to %d additional channel(s)", len(added))
+        try:
+            for channel in added:
+                await ws.send(json.dumps({"subscribe": channel}))
+        except ConnectionClosed as exc:
+            logger.error("Subscription send failed: %s", exc)
+            return
+        self._arm_subscription_watchdog(ws)
+
+    async def unsubscribe(self, channels: list[str]) -> None:
+        """
+        Remove channels from the stream. On a live connection, only these
+        channels are unsubscribed. See `_MistWebsocket.unsubscribe()`.
+        """
+        removed, ws, all_subscribed = self._remove_channels(channels)
+        if all_subscribed:
+            self._cancel_subscription_watchdog()
+        if not removed or ws is None:
+            return
+        logger.info("Unsubscribing from %d channel(s)", len(removed))
+        try:
+            for channel in removed:
+                await ws.send(json.dumps({"unsubscribe": channel}))
+        except ConnectionClosed as exc:
+            logger.error("Unsubscription send failed: %s", exc)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+
+    async def _run_once(self) -> None:
+        url = self._build_ws_url()
+        async with ws_connect(
+            url,
+            additional_headers=self._build_handshake_headers(),
+            ssl=self._build_ssl_context() if url.startswith("wss://") else None,
+            ping_interval=self._ping_interval or None,
+            ping_timeout=self._ping_timeout if self._ping_interval else None,
+            max_size=None,
+        ) as ws:
+            if self._user_disconnect.is_set():
+                return  # disconnect() called during the handshake
+            self._ws = ws
+            await self._handle_open(ws)
+            try:
+                async for message in ws:
+                    await self._handle_message(ws, message)
+            except ConnectionClosed:
+                pass  # abnormal closure, reported by _handle_close below
+            self._handle_close(ws, ws.close_code, ws.close_reason)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    await self._run_once()
+                except Exception as exc:
+                    self._handle_error(self._ws, exc)
+                    self._handle_close(self._ws, -1, str(exc))
+                finally:
+                    self._ws = None
+                    self._cancel_paced_subscriptions()
+
+                if self._user_disconnect.is_set() or not self._auto_reconnect:
+                    break
+
+                delay = self._next_reconnect_delay()
+                if delay is None:
+                    break
+                try:
+                    await asyncio.wait_for(self._user_disconnect.wait(), timeout=delay)
+                    break  # disconnect() called during backoff
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._cancel_subscription_watchdog()
+            self._connected.clear()
+            try:
+                self._queue.put_nowait(None)  # type: ignore[union-attr]
+            except asyncio.QueueFull:
+                pass  # receive() stops once the queue is drained
+            self._finished.set()
+            if self._on_close_cb:
+                try:
+                    self._on_close_cb(self._last_close_code, self._last_close_msg)
+                except Exception:
+                    logger.exception("on_close callback raised")
+
+    async def connect(self, run_in_background: bool = True) -> None:
+        """
+        Open the WebSocket connection and subscribe to the channels.
+
+        PARAMS
+        -----------
+        run_in_background : bool, default True
+            If True, the connection runs in an asyncio task and connect()
+            returns immediately. If False, waits until disconnected.
+        """
+        if self._task is not None and not self._task.done():
+            raise RuntimeError("Already connected; call disconnect() first")
+        self._connected = asyncio.Event()
+        self._user_disconnect = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._queue = asyncio.Queue(maxsize=self._queue_maxsize)
+        self._reconnect_attempts = 0
+        self._messages_received = 0
+        self._messages_dropped = 0
+        self._messages_processed = 0
+        self._stats.reset()
+        self._task = asyncio.create_task(self._run())
+        if not run_in_background:
+            await asyncio.wait({self._task})
+
+    async def disconnect(self, timeout: float | None = None) -> None:
+        """Close the WebSocket connection and wait for the task to finish.
+
+        PARAMS
+        -----------
+        timeout : float or None, default None
+            Maximum seconds to wait for the task to finish. ``None`` means
+            wait indefinitely.
+        """
+        self._user_disconnect.set()
+        self._cancel_subscription_watchdog()
+        if self._ws is not None:
+            await self._ws.close()
+        task = self._task
+        if task is not None and task is not asyncio.current_task():
+            await asyncio.wait({task}, timeout=timeout)
+
+    async def receive(self) -> AsyncGenerator[dict, None]:
+        """
+        Async generator that yields each incoming message as a dict.
+
+        Exits cleanly when the connection closes (disconnect() is called or
+        the server closes the connection and auto_reconnect gave up).
+        Cannot be used when an on_message callback is registered.
+        """
+        if self._on_message_cb is not None:
+            raise RuntimeError(
+                "receive() cannot be used when an on_message callback is "
+                "registered; use one or the other"
+            )
+        if self._queue is None:
+            return
+        while True:
+            if self._finished.is_set() and self._queue.empty():
+                break
+            item = await self._queue.get()
+            if item is None:
+                break
+            yield item
+
+    async def receive_batches(
+        self, max_items: int = 100, max_latency_ms: float = 100
+    ) -> AsyncGenerator[list[dict], None]:
+        """
+        Async generator that yields the incoming messages as lists of dicts.
+        A batch is yielded once it holds `max_items` messages, or
+        `max_latency_ms` after its first message.
+
+        Exits cleanly when the connection closes (disconnect() is called or
+        the server closes the connection and auto_reconnect gave up).
+        Cannot be used when an on_message callback is registered.
+
+        PARAMS
+        -----------
+        max_items : int, default 100
+            Maximum number of messages per batch
+        max_latency_ms : float, default 100
+            Maximum time in milliseconds to wait for more messages once the
+            first message of a batch is received
+        """
+        self._check_batch_settings(max_items, max_latency_ms)
+        if self._on_message_cb is not None:
+            raise RuntimeError(
+                "receive_batches() cannot be used when an on_message callback "
+                "is registered; use one or the other"
+            )
+        if self._queue is None:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._finished.is_set() and self._queue.empty():
+                break
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            ended = False
+            deadline = loop.time() + max_latency_ms / 1000
+            while len(batch) < max_items:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    ended = True
+                    break
+                batch.append(item)
+            yield batch
+            if ended:
+                break
+
+    def __aiter__(self) -> AsyncGenerator[dict, None]:
+        return self.receive()
+
+    # ------------------------------------------------------------------
+    # Not supported by the asyncio clients
+
+    def on_batch(self, *args, **kwargs) -> None:
+        """Not supported by the asyncio clients: use receive_batches()"""
+        raise TypeError(
+            "on_batch() is not supported by the asyncio WebSocket clients; "
+            "use receive_batches()"
+        )
+
+    def set_backpressure(self, *args, **kwargs) -> None:
+        """Not supported by the asyncio clients (the incoming messages are
+        dropped when the queue is full)"""
+        raise TypeError(
+            "set_backpressure() is not supported by the asyncio WebSocket "
+            "clients; the incoming messages are dropped when the queue is full"
+        )
+
+    def get_backpressure_counters(self) -> dict[str, int]:
+        """Not supported by the asyncio clients: see stats()"""
+        raise TypeError(
+            "get_backpressure_counters() is not supported by the asyncio "
+            "WebSocket clients; see stats()"
+        )
+
+    # ------------------------------------------------------------------
+    # Context manager
+
+    async def __aenter__(self) -> "_AsyncMistWebsocket":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.disconnect()
+
+    def ready(self) -> bool:
+        """Returns True if the WebSocket connection is open and ready."""
+        return self._ws is not None and self._connected.is_set()
@@ -0,0 +1,285 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the queue used to buffer the WebSocket messages, and the
+backpressure policies applied when the consumer does not keep up:
+
+    - "drop_newest": the incoming message is dropped when the queue is full
+      (default)
+    - "drop_oldest": the oldest queued message is dropped to make room for
+      the incoming one
+    - "coalesce": an incoming message replaces the queued message with the
+      same key (by default, same channel and same device/client MAC), so
+      only the most recent sample of each device is kept. When the queue is
+      full and no message can be replaced, the oldest message is dropped
+    - "block": waits up to `timeout` seconds for room in the queue, which
+      slows down the reads from the socket, then drops the incoming message
+    - "spill": the messages which do not fit in the queue are written to a
+      temporary file, and read back in order when room is made in the queue
+"""
+
+import collections
+import pickle
+import queue
+import tempfile
+import time
+from collections.abc import Callable, Hashable
+from typing import IO, Any
+
+from mistapi import __json as _json
+
+BACKPRESSURE_POLICIES = ("drop_newest", "drop_oldest", "coalesce", "block", "spill")
+
+
+def message_mac(message: Any) -> str | None:
+    """
+    Return the MAC address of the device or client in the payload of a
+    WebSocket message, or None if the message has no payload or the payload
+    has no MAC. The payload is decoded if it is still a JSON string.
+
+    PARAMS
+    -----------
+    message : dict
+        WebSocket message
+
+    RETURN
+    -----------
+    str
+        MAC address, or None
+    """
+    if not isinstance(message, dict):
+        return None
+    data = message.get("data")
+    if data is None:
+        return None
+    if isinstance(data, (str, bytes)):
+        try:
+            data = _json.loads(data)
+        except _json.JSON_DECODE_ERRORS:
+            return None
+    if isinstance(data, dict):
+        mac = data.get("mac")
+    else:
+        mac = getattr(data, "mac", None)
+    return mac or None
+
+
+def default_coalesce_key(message: Any) -> Hashable | None:
+    """
+    Return the key used by the "coalesce" policy: the channel and the MAC
+    address of the device or client in the payload, or None (never
+    coalesced) if the message has no payload or the payload has no MAC.
+
+    PARAMS
+    -----------
+    message : dict
+        WebSocket message
+
+    RETURN
+    -----------
+    Hashable
+        (channel, mac) tuple, or None
+    """
+    if not isinstance(message, dict):
+        return None
+    channel = message.get("channel")
+    if channel is None:
+        return None
+    mac = message_mac(message)
+    if mac is None:
+        return None
+    return (channel, mac)
+
+
+class _BackpressureQueue(queue.Queue):
+    """
+    queue.Queue applying a backpressure policy to the messages added with
+    offer(). put()/get() keep the queue.Queue behavior, so the end-of-stream
+    sentinels are never coalesced, dropped or spilled.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = "drop_newest",
+        timeout: float = 1.0,
+        coalesce_key: Callable[[Any], Hashable | None] | None = None,
+        spill_dir: str | None = None,
+    ) -> None:
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"policy must be one of {', '.join(BACKPRESSURE_POLICIES)}"
+            )
+        if policy in ("drop_oldest", "block", "spill") and maxsize <= 0:
+            raise ValueError(f'policy "{policy}" requires queue_maxsize > 0')
+        if timeout < 0:
+            raise ValueError("timeout must be >= 0")
+        self._policy = policy
+        self._timeout = timeout
+        self._coalesce_key = coalesce_key or default_coalesce_key
+        self._spill_dir = spill_dir
+        self.counters = dict.fromkeys(
+            (
+                "dropped_newest",
+                "dropped_oldest",
+                "coalesced",
+                "blocked",
+                "block_timeouts",
+                "spilled",
+            ),
+            0,
+        )
+        super().__init__(maxsize=maxsize)
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    # ------------------------------------------------------------------
+    # queue.Queue storage
+
+    def _init(self, maxsize: int) -> None:
+        self.queue: collections.deque = collections.deque()
+        # "coalesce": queued [key, message] entries by key
+        self._pending: dict[Hashable, list] = {}
+        # "spill": messages written to the spill file and not read back yet
+        self._spill_file: IO[bytes] | None = None
+        self._spill_count = 0
+        self._spill_read_pos = 0
+
+    def _put(self, item: Any) -> None:
+        if self._policy == "coalesce":
+            self._put_entry(self._coalesce_key(item), item)
+        else:
+            self.queue.append(item)
+
+    def _put_entry(self, key: Hashable | None, item: Any) -> None:
+        entry = [key, item]
+        self.queue.append(entry)
+        if key is not None:
+            self._pending[key] = entry
+
+    def _get(self) -> Any:
+        item = self.queue.popleft()
+        if self._policy == "coalesce":
+            entry = item
+            key, item = entry
+            if key is not None and self._pending.get(key) is entry:
+                del self._pending[key]
+        elif self._spill_count:
+            self.queue.append(self._read_spill())
+        return item
+
+    # ------------------------------------------------------------------
+    # Spill file
+
+    def _write_spill(self, item: Any) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(  # noqa: SIM115
+                prefix="mistapi-ws-", suffix=".spill", dir=self._spill_dir
+            )
+        self._spill_file.seek(0, 2)
+        pickle.dump(item, self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_count += 1
+
+    def _read_spill(self) -> Any:
+        spill_file = self._spill_file
+        spill_file.seek(self._spill_read_pos)  # type: ignore[union-attr]
+        item = pickle.load(spill_file)  # type: ignore[arg-type]
+        self._spill_count -= 1
+        if self._spill_count:
+            self._spill_read_pos = spill_file.tell()  # type: ignore[union-attr]
+        else:
+            # everything was read back; reclaim the disk space
+            spill_file.seek(0)  # type: ignore[union-attr]
+            spill_file.truncate()  # type: ignore[union-attr]
+            self._spill_read_pos = 0
+        return item
+
+    # ------------------------------------------------------------------
+    # Backpressure
+
+    def _count_event(self, counter: str) -> None:
+        # called with the queue mutex held
+        self.counters[counter] += 1
+
+    def get_counters(self) -> dict[str, int]:
+        """Return a copy of the backpressure counters"""
+        with self.mutex:
+            return dict(self.counters)
+
+    def reset_counters(self) -> None:
+        with self.mutex:
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def _is_full(self) -> bool:
+        return 0 < self.maxsize <= self._qsize()
+
+    def _add(self, key: Hashable | None, item: Any) -> None:
+        if self._policy == "coalesce":
+            self._put_entry(key, item)
+        else:
+            self.queue.append(item)
+        self.unfinished_tasks += 1
+        self.not_empty.notify()
+
+    def offer(self, item: Any) -> bool:
+        """
+        Add a message to the queue according to the backpressure policy.
+
+        PARAMS
+        -----------
+        item : dict
+            message to add
+
+        RETURN
+        -----------
+        bool
+            False if a message was dropped (the incoming one or, with the
+            "drop_oldest" and "coalesce" policies, the oldest one)
+        """
+        key = self._coalesce_key(item) if self._policy == "coalesce" else None
+        with self.not_full:
+            if key is not None:
+                entry = self._pending.get(key)
+                if entry is not None:
+                    entry[1] = item
+                    self._count_event("coalesced")
+                    return True
+            if self._policy == "spill" and (self._spill_count or self._is_full()):
+                # keep the FIFO order: once spilling, every message goes to
+                # the file until it is read back
+                self._write_spill(item)
+                self._count_event("spilled")
+                return True
+            if not self._is_full():
+                self._add(key, item)
+                return True
+            if self._policy == "drop_newest":
+                self._count_event("dropped_newest")
+                return False
+            if self._policy == "block":
+                self._count_event("blocked")
+                deadline = time.monotonic() + self._timeout
+                while self._is_full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._count_event("block_timeouts")
+                        return False
+                    self.not_full.wait(remaining)
+                self._add(key, item)
+                return True
+            # "drop_oldest" and "coalesce"
+            self._get()
+            self.unfinished_tasks -= 1
+            self._add(key, item)
+            self._count_event("dropped_oldest")
+            return False
@@ -0,0 +1,463 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the StreamDispatcher class, which delivers the messages of
+a single WebSocket stream to several in-process consumers. Each consumer
+selects the messages it wants (by channel prefix, event type, device/client
+MAC or any predicate), and gets its own bounded queue, consumed with its own
+receive() generator or callback thread (asyncio task with the async clients).
+A slow consumer only fills its own queue, and never delays the others.
+"""
+
+import asyncio
+import inspect
+import itertools
+import queue
+import threading
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Any
+
+from mistapi.__logger import logger
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
+from mistapi.websockets.__backpressure import _BackpressureQueue, message_mac
+
+_UNSET = object()
+# Maximum time in seconds the close of the stream waits for the last queued
+# messages to be dispatched (a blocked consumer must not hang the close)
+CLOSE_DRAIN_TIMEOUT = 5.0
+
+
+def _as_tuple(value: str | list[str] | None) -> tuple[str, ...] | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+def _normalize_mac(mac: Any) -> str | None:
+    if not isinstance(mac, str):
+        return None
+    return mac.lower().replace(":", "").replace("-", "").replace(".", "")
+
+
+class StreamConsumer:
+    """
+    Filtered subscription of a StreamDispatcher, created with
+    StreamDispatcher.add_consumer(). The messages are read with receive(), or
+    delivered to the consumer callback by a dedicated thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        channel_prefix: str | list[str] | None = None,
+        event: str | list[str] | None = None,
+        mac: str | list[str] | None = None,
+        predicate: Callable[[dict], bool] | None = None,
+        callback: Callable[[dict], Any] | None = None,
+        queue_maxsize: int = 1000,
+        backpressure: str = "drop_newest",
+    ) -> None:
+        if queue_maxsize < 0:
+            raise ValueError("queue_maxsize must be >= 0")
+        self.name = name
+        self._prefixes = _as_tuple(channel_prefix)
+        self._events = _as_tuple(event)
+        macs = _as_tuple(mac)
+        self._macs = (
+            None if macs is None else {_normalize_mac(m) for m in macs} - {None}
+        )
+        self._predicate = predicate
+        self._callback = callback
+        self._messages_received = 0
+        self._messages_dropped = 0
+        self._closed = threading.Event()
+        self._init_queue(queue_maxsize, backpressure)
+
+    def _init_queue(self, queue_maxsize: int, backpressure: str) -> None:
+        self._queue = _BackpressureQueue(maxsize=queue_maxsize, policy=backpressure)
+        self._thread: threading.Thread | None = None
+        if self._callback is not None:
+            self._thread = threading.Thread(target=self._run_callback, daemon=True)
+            self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        """True once the consumer was removed or the stream closed"""
+        return self._closed.is_set()
+
+    def _matches(self, message: dict, mac: Any) -> bool:
+        if self._prefixes is not None:
+            channel = message.get("channel")
+            if not isinstance(channel, str) or not channel.startswith(self._prefixes):
+                return False
+        if self._events is not None and message.get("event") not in self._events:
+            return False
+        if self._macs is not None and _normalize_mac(mac) not in self._macs:
+            return False
+        if self._predicate is not None:
+            try:
+                return bool(self._predicate(message))
+            except Exception:
+                logger.exception("Consumer %s predicate raised", self.name)
+                return False
+        return True
+
+    def _offer(self, message: dict) -> None:
+        if self._closed.is_set():
+            return
+        self._messages_received += 1
+        if not self._queue.offer(message):
+            self._messages_dropped += 1
+            logger.warning(
+                "Consumer %s queue full; dropping message (policy=%s)",
+                self.name,
+                self._queue.policy,
+            )
+
+    def close(self) -> None:
+        """
+        Stop the consumer: receive() ends once the queued messages are
+        consumed, and the callback thread once they are processed.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            self._queue.put_nowait(None)  # sentinel — unblocks receive()
+        except queue.Full:
+            pass  # receive() stops once the queue is drained
+
+    def _iter_queue(self) -> Generator[dict, None, None]:
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._closed.is_set() and self._queue.empty():
+                    break
+                continue
+            if item is None:
+                break
+            yield item
+
+    def _run_callback(self) -> None:
+        for message in self._iter_queue():
+            try:
+                self._callback(message)  # type: ignore[misc]
+            except Exception:
+                logger.exception("Consumer %s callback raised", self.name)
+
+    def receive(self) -> Generator[dict, None, None]:
+        """
+        Blocking generator yielding the messages selected by the consumer.
+        Exits when the consumer is removed or the stream closes. Cannot be
+        used when the consumer has a callback.
+        """
+        if self._callback is not None:
+            raise RuntimeError(
+                f"receive() cannot be used on consumer {self.name}, which has "
+                "a callback"
+            )
+        yield from self._iter_queue()
+
+    def join(self, timeout: float | None = None) -> None:
+        """
+        Wait until the callback thread has processed the queued messages,
+        after close().
+
+        PARAMS
+        -----------
+        timeout : float or None, default None
+            Maximum seconds to wait. ``None`` means wait indefinitely.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def get_counters(self) -> dict[str, int]:
+        """
+        Return the number of messages selected by the consumer, the number
+        of messages dropped because its queue was full, and its queue size.
+
+        RETURN
+        -----------
+        dict
+            "messages_received", "messages_dropped" and "queue_size"
+        """
+        return {
+            "messages_received": self._messages_received,
+            "messages_dropped": self._messages_dropped,
+            "queue_size": self._queue.qsize(),
+        }
+
+
+class AsyncStreamConsumer(StreamConsumer):
+    """
+    StreamConsumer of an asyncio stream: the messages are read with
+    `async for` (or receive()), or delivered to the consumer callback
+    (a function or a coroutine function) by an asyncio task. The queue
+    drops the newest messages when full.
+    """
+
+    def _init_queue(self, queue_maxsize: int, backpressure: str) -> None:
+        if backpressure != "drop_newest":
+            raise ValueError('the async consumers only support "drop_newest"')
+        self._queue = asyncio.Queue(maxsize=queue_maxsize)  # type: ignore[assignment]
+        self._task: asyncio.Task | None = None
+
+    def _offer(self, message: dict) -> None:
+        if self._closed.is_set():
+            return
+        if self._callback is not None and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run_callback())
+        self._messages_received += 1
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._messages_dropped += 1
+            logger.warning("Consumer %s queue full; dropping message", self.name)
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass  # receive() stops once the queue is drained
+
+    async def _iter_queue(self) -> AsyncGenerator[dict, None]:  # type: ignore[override]
+        while True:
+            if self._closed.is_set() and self._queue.empty():
+                break
+            item = await self._queue.get()
+            if item is None:
+                break
+            yield item
+
+    async def _run_callback(self) -> None:  # type: ignore[override]
+        async for message in self._iter_queue():
+            try:
+                result = self._callback(message)  # type: ignore[misc]
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Consumer %s callback raised", self.name)
+
+    async def receive(self) -> AsyncGenerator[dict, None]:  # type: ignore[override]
+        """
+        Async generator yielding the messages selected by the consumer.
+        Exits when the consumer is removed or the stream closes. Cannot be
+        used when the consumer has a callback.
+        """
+        if self._callback is not None:
+            raise RuntimeError(
+                f"receive() cannot be used on consumer {self.name}, which has "
+                "a callback"
+            )
+        async for message in self._iter_queue():
+            yield message
+
+    def __aiter__(self) -> AsyncGenerator[dict, None]:
+        return self.receive()
+
+    async def join(self, timeout: float | None = None) -> None:  # type: ignore[override]
+        """
+        Wait until the callback task has processed the queued messages,
+        after close().
+
+        PARAMS
+        -----------
+        timeout : float or None, default None
+            Maximum seconds to wait. ``None`` means wait indefinitely.
+        """
+        if self._task is not None:
+            await asyncio.wait({self._task}, timeout=timeout)
+
+
+class StreamDispatcher:
+    """
+    Deliver the messages of one WebSocket stream to several consumers, each
+    with its own filters, bounded queue and thread (or asyncio task), so a
+    single connection can feed several pipelines.
+
+    The dispatcher registers the on_message and on_close callbacks of the
+    stream: register the on_close callback with StreamDispatcher.on_close().
+    The consumers are closed when the stream closes.
+
+    PARAMS
+    -----------
+    stream : _MistWebsocket | ShardedStream | _AsyncMistWebsocket
+        stream to dispatch (e.g. mistapi.websockets.sites.DeviceStatsEvents).
+        With the async clients, the consumers are AsyncStreamConsumer.
+
+    EXAMPLE
+    -----------
+    ::
+
+        ws = mistapi.websockets.sites.DeviceStatsEvents(session, site_ids=[site_id])
+        dispatcher = StreamDispatcher(ws)
+        dispatcher.add_consumer(callback=store, event="data")
+        alerts = dispatcher.add_consumer(mac=["5c5b35000001"], queue_maxsize=100)
+        ws.connect()
+        for msg in alerts.receive():
+            check(msg)
+    """
+
+    def __init__(self, stream: Any) -> None:
+        self._stream = stream
+        self._async = isinstance(stream, _AsyncMistWebsocket)
+        self._lock = threading.Lock()
+        # replaced (never mutated), so _dispatch() iterates without the lock
+        self._consumers: tuple[StreamConsumer, ...] = ()
+        self._names = itertools.count(1)
+        self._messages_unmatched = 0
+        self._on_close_cb: Callable[[int | None, str | None], None] | None = getattr(
+            stream, "_on_close_cb", None
+        )
+        stream.on_message(self._dispatch)
+        stream.on_close(self._handle_close)
+
+    @property
+    def consumers(self) -> list[StreamConsumer]:
+        """Consumers currently registered"""
+        return list(self._consumers)
+
+    def on_close(self, callback: Callable[[int | None, str | None], None]) -> None:
+        """Register a callback invoked when the stream closes."""
+        self._on_close_cb = callback
+
+    def add_consumer(
+        self,
+        callback: Callable[[dict], Any] | None = None,
+        channel_prefix: str | list[str] | None = None,
+        event: str | list[str] | None = None,
+        mac: str | list[str] | None = None,
+        predicate: Callable[[dict], bool] | None = None,
+        queue_maxsize: int = 1000,
+        backpressure: str = "drop_newest",
+        name: str | None = None,
+    ) -> StreamConsumer:
+        """
+        Register a consumer. A message is delivered to the consumer when it
+        matches all the filters set.
+
+        PARAMS
+        -----------
+        callback : callable, default None
+            function called with each selected message, by a thread
+            dedicated to the consumer (an asyncio task with the async
+            clients, where coroutine functions are awaited). If None, the
+            messages are read with consumer.receive()
+        channel_prefix : str | list[str], default None
+            select the messages of the channels starting with one of these
+            prefixes (e.g. "/sites/{site_id}/")
+        event : str | list[str], default None
+            select the messages with one of these "event" values (e.g. "data")
+        mac : str | list[str], default None
+            select the messages of these devices/clients, from the "mac" of
+            the payload. The MAC addresses are compared without separators,
+            case insensitive
+        predicate : callable, default None
+            function returning True for the messages to select
+        queue_maxsize : int, default 1000
+            Maximum number of messages buffered for this consumer. ``0`` means
+            unbounded
+        backpressure : str, default "drop_newest"
+            policy applied when the consumer queue is full (see
+            `_MistWebsocket.set_backpressure()`). With "block", a full
+            consumer queue delays the other consumers. The async consumers
+            only support "drop_newest"
+        name : str, default None
+            name of the consumer, used in the logs. Defaults to "consumer-N"
+
+        RETURN
+        -----------
+        StreamConsumer
+            the consumer (AsyncStreamConsumer with the async clients)
+        """
+        consumer_class = AsyncStreamConsumer if self._async else StreamConsumer
+        consumer = consumer_class(
+            name or f"consumer-{next(self._names)}",
+            channel_prefix=channel_prefix,
+            event=event,
+            mac=mac,
+            predicate=predicate,
+            callback=callback,
+            queue_maxsize=queue_maxsize,
+            backpressure=backpressure,
+        )
+        with self._lock:
+            self._consumers = (*self._consumers, consumer)
+        return consumer
+
+    def remove_consumer(self, consumer: StreamConsumer) -> None:
+        """
+        Unregister a consumer and close it. The messages already queued are
+        still delivered.
+
+        PARAMS
+        -----------
+        consumer : StreamConsumer
+            consumer returned by add_consumer()
+        """
+        with self._lock:
+            self._consumers = tuple(c for c in self._consumers if c is not consumer)
+        consumer.close()
+
+    def get_counters(self) -> dict[str, Any]:
+        """
+        Return the counters of each consumer (see
+        StreamConsumer.get_counters()), and the number of messages selected
+        by no consumer.
+
+        RETURN
+        -----------
+        dict
+            {"messages_unmatched": int, "consumers": {name: counters}}
+        """
+        return {
+            "messages_unmatched": self._messages_unmatched,
+            "consumers": {c.name: c.get_counters() for c in self._consumers},
+        }
+
+    def _dispatch(self, message: dict) -> None:
+        mac: Any = _UNSET
+        matched = False
+        for consumer in self._consumers:
+            if consumer._macs is not None and mac is _UNSET:
+                mac = message_mac(message)  # decoded once for all consumers
+            if consumer._matches(message, mac):
+                consumer._offer(message)
+                matched = True
+        if not matched:
+            self._messages_unmatched += 1
+
+    def _handle_close(
+        self, close_status_code: int | None, close_msg: str | None
+    ) -> None:
+        # The stream calls on_close before its callback thread has delivered
+        # the last queued messages: wait for them before closing the consumers
+        worker = getattr(self._stream, "_callback_thread", None)
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=CLOSE_DRAIN_TIMEOUT)
+            if worker.is_alive():
+                logger.warning(
+                    "StreamDispatcher: the last messages were not dispatched "
+                    "within %.1fs (blocked consumer?); closing the consumers",
+                    CLOSE_DRAIN_TIMEOUT,
+                )
+        for consumer in self._consumers:
+            consumer.close()
+        if self._on_close_cb:
+            try:
+                self._on_close_cb(close_status_code, close_msg)
+            except Exception:
+                logger.exception("on_close callback raised")
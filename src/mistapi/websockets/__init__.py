@@ -10,11 +10,23 @@
 --------------------------------------------------------------------------------
 """
 
-from mistapi.websockets import location, orgs, session, sites
+from mistapi.websockets import location, metrics, orgs, replay, session, sites
+from mistapi.websockets.__dispatcher import (
+    AsyncStreamConsumer,
+    StreamConsumer,
+    StreamDispatcher,
+)
+from mistapi.websockets.__sharded_stream import ShardedStream
 
 __all__ = [
+    "AsyncStreamConsumer",
+    "ShardedStream",
+    "StreamConsumer",
+    "StreamDispatcher",
     "location",
+    "metrics",
     "orgs",
+    "replay",
     "session",
     "sites",
 ]
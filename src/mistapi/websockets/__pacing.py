@@ -0,0 +1,108 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the pacing of the subscription frames sent when a
+WebSocket connection opens. Without pacing, all the {"subscribe": ...} frames
+are sent at once, which on a connection with many channels (or many clients
+reconnecting at the same time) can trigger the Mist rate limits.
+
+The frames are sent in batches of `batch_size`, at most `frames_per_second`
+frames per second. With `max_pending_acks`, the pacer also waits when more
+than `max_pending_acks` subscriptions are not acknowledged yet, and halves its
+rate each time it has to wait (additive increase / multiplicative decrease),
+so a slow server is not flooded.
+"""
+
+from collections.abc import Generator
+
+# Interval between two checks of the acknowledgements while the pacer waits
+ACK_POLL_INTERVAL = 0.05
+# The rate is never reduced below this fraction of `frames_per_second`
+MIN_RATE_FACTOR = 1 / 16
+# Fraction of `frames_per_second` recovered after each batch sent on time
+RATE_RECOVERY_FACTOR = 1 / 10
+
+
+def check_pacing_settings(
+    frames_per_second: float, batch_size: int, max_pending_acks: int | None
+) -> None:
+    if frames_per_second < 0:
+        raise ValueError("frames_per_second must be >= 0 (0 = unlimited)")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    if max_pending_acks is not None and max_pending_acks < 1:
+        raise ValueError("max_pending_acks must be >= 1")
+
+
+class _SubscriptionPacer:
+    """
+    Split the channels in batches, and compute the delay before each batch
+    from the number of frames sent and acknowledged so far.
+
+    PARAMS
+    -----------
+    frames_per_second : float
+        maximum number of subscription frames per second. 0 = unlimited
+    batch_size : int
+        number of frames sent back to back
+    max_pending_acks : int
+        maximum number of subscriptions waiting for an acknowledgement, or
+        None to never wait for the acknowledgements
+    """
+
+    def __init__(
+        self,
+        frames_per_second: float,
+        batch_size: int,
+        max_pending_acks: int | None,
+    ) -> None:
+        self._max_rate = frames_per_second
+        self._min_rate = frames_per_second * MIN_RATE_FACTOR
+        self._batch_size = batch_size
+        self._max_pending_acks = max_pending_acks
+        self._lagging = False
+        self.rate = frames_per_second
+        self.slowdowns = 0
+
+    def batches(
+        self, channels: list[str], start: int = 0
+    ) -> Generator[list[str], None, None]:
+        """
+        Yield the channels from `start` in batches. The channels appended to
+        `channels` while iterating are included.
+        """
+        while start < len(channels):
+            yield channels[start : start + self._batch_size]
+            start += self._batch_size
+
+    def next_delay(self, sent: int, acknowledged: int) -> float | None:
+        """
+        Return the delay in seconds before the next batch, or None while too
+        many subscriptions are waiting for an acknowledgement (check again
+        after ACK_POLL_INTERVAL).
+        """
+        if (
+            self._max_pending_acks is not None
+            and sent - acknowledged > self._max_pending_acks
+        ):
+            if not self._lagging:
+                self._lagging = True
+                self.slowdowns += 1
+                self.rate = max(self.rate / 2, self._min_rate)
+            return None
+        if self._lagging:
+            self._lagging = False
+        elif self.rate < self._max_rate:
+            self.rate = min(
+                self._max_rate, self.rate + self._max_rate * RATE_RECOVERY_FACTOR
+            )
+        if not self.rate:
+            return 0.0
+        return self._batch_size / self.rate
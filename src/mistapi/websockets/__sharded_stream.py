@@ -0,0 +1,630 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the ShardedStream class, which spreads a list of channels
+over several WebSocket connections (shards) and merges their messages into a
+single receive() generator or on_message callback.
+
+Each shard is a regular _MistWebsocket with its own background thread and its
+own reconnect logic, so a shard closed by the Mist Cloud is reconnected without
+interrupting the other shards.
+"""
+
+import math
+import queue
+import threading
+import time
+from collections.abc import Callable, Generator, Hashable
+from typing import TYPE_CHECKING, Any
+
+from mistapi.__logger import logger
+from mistapi.websockets.__backpressure import _BackpressureQueue
+from mistapi.websockets.__ws_client import MAX_CHANNELS_PER_CONNECTION, _MistWebsocket
+from mistapi.websockets.metrics import _StreamStats, merge_stats
+
+if TYPE_CHECKING:
+    from mistapi import APISession
+    from mistapi.websockets.replay import StreamRecorder
+
+# Default number of channels per shard. Kept well below
+# HIGH_CHANNEL_COUNT_WARNING so each connection has a small backlog.
+DEFAULT_CHANNELS_PER_SHARD = 1000
+
+
+class _Shard(_MistWebsocket):
+    """
+    _MistWebsocket forwarding its messages to the ShardedStream merged queue
+    instead of its own receive/callback queues.
+    """
+
+    def __init__(
+        self,
+        stream: "ShardedStream",
+        index: int,
+        mist_session: "APISession",
+        channels: list[str],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(mist_session, channels=channels, **kwargs)
+        self._stream = stream
+        self._index = index
+
+    def _enqueue_message(self, message: dict, to_callback_queue: bool) -> None:
+        with self._metrics_lock:
+            self._messages_received += 1
+        self._stream._enqueue_message(message)
+
+
+def _partition(channels: list[str], count: int) -> list[list[str]]:
+    """Split the channels into `count` contiguous chunks of balanced size"""
+    size, extra = divmod(len(channels), count)
+    chunks = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < extra else 0)
+        chunks.append(channels[start:end])
+        start = end
+    return chunks
+
+
+class ShardedStream:
+    """WebSocket stream spreading its channels over several connections.
+
+    The channels are split in balanced shards of at most
+    ``max_channels_per_connection`` channels, each shard using its own
+    WebSocket connection. The messages of all the shards are merged into a
+    single ``receive()`` generator or ``on_message`` callback.
+
+    PARAMS
+    -----------
+    mist_session : mistapi.APISession
+        Authenticated API session.
+    channels : list[str]
+        Channels to subscribe to (e.g. ``/sites/{site_id}/stats/devices``).
+        Duplicated channels are ignored.
+    max_channels_per_connection : int, default 1000
+        Maximum number of channels subscribed on each connection. Must be
+        between 1 and 2000 (the Mist limit).
+    min_connections : int, default 1
+        Minimum number of connections to open. The channels are spread over
+        ``max(min_connections, ceil(len(channels) / max_channels_per_connection))``
+        connections.
+    ping_interval : int, default 60
+        Interval in seconds to send WebSocket ping frames (keep-alive).
+    ping_timeout : int | None, default None
+        Time in seconds to wait for a ping response before considering the
+        connection dead. Defaults to ``min(45, ping_interval - 1)`` when
+        pings are enabled, or ``45`` when ``ping_interval`` is 0 (unused
+        since pings are disabled). Must be lower than ping_interval when
+        pings are enabled.
+    auto_reconnect : bool, default False
+        Automatically reconnect each shard on unexpected disconnections using
+        exponential backoff. The shards are reconnected independently.
+    max_reconnect_attempts : int, default 5
+        Maximum number of reconnect attempts of each shard before giving up.
+    reconnect_backoff : float, default 2.0
+        Base backoff delay in seconds. Doubles after each failed attempt.
+    max_reconnect_backoff : float | None, default None
+        Maximum backoff delay in seconds. If None, backoff grows indefinitely.
+    queue_maxsize : int, default 0
+        Maximum number of messages buffered in the merged queue used for the
+        ``receive()`` generator and callback delivery. ``0`` means unbounded.
+        When set, incoming messages are dropped with a warning when the queue
+        is full.
+    subscription_watchdog_timeout : float, default 10.0
+        Maximum time in seconds to wait for all channel subscription
+        acknowledgements of a shard after connect.
+    rate_limit_backoff : float, default 30.0
+        Minimum reconnect delay in seconds after an HTTP 429 rate-limit
+        response.
+    throughput_log_interval : int, default 100
+        Log queue depth and processed counts every N messages. ``0`` disables
+        periodic throughput logs.
+
+    EXAMPLE
+    -----------
+    Callback style (background threads)::
+
+        channels = [f"/sites/{site_id}/stats/devices" for site_id in site_ids]
+        ws = ShardedStream(session, channels, auto_reconnect=True)
+        ws.on_message(lambda data: print(data))
+        ws.connect()  # non-blocking, one background thread per shard
+        input("Press Enter to stop")
+        ws.disconnect()
+
+    Generator style::
+
+        ws = ShardedStream(session, channels)
+        ws.connect()
+        for msg in ws.receive():
+            process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: "APISession",
+        channels: list[str],
+        max_channels_per_connection: int = DEFAULT_CHANNELS_PER_SHARD,
+        min_connections: int = 1,
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        if not 1 <= max_channels_per_connection <= MAX_CHANNELS_PER_CONNECTION:
+            raise ValueError(
+                "max_channels_per_connection must be between 1 and "
+                f"{MAX_CHANNELS_PER_CONNECTION}"
+            )
+        if min_connections < 1:
+            raise ValueError("min_connections must be >= 1")
+        if queue_maxsize < 0:
+            raise ValueError("queue_maxsize must be >= 0")
+        if throughput_log_interval < 0:
+            raise ValueError("throughput_log_interval must be >= 0")
+        deduped_channels = list(dict.fromkeys(channels))
+        if len(deduped_channels) != len(channels):
+            logger.warning(
+                "Duplicate channels detected; using %d unique channels instead of %d",
+                len(deduped_channels),
+                len(channels),
+            )
+        if not deduped_channels:
+            raise ValueError("channels must not be empty")
+        shard_count = min(
+            len(deduped_channels),
+            max(
+                min_connections,
+                math.ceil(len(deduped_channels) / max_channels_per_connection),
+            ),
+        )
+
+        self._channels = deduped_channels
+        self._throughput_log_interval = throughput_log_interval
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._queue_maxsize = queue_maxsize
+        self._queue: _BackpressureQueue = _BackpressureQueue(maxsize=queue_maxsize)
+        self._callback_thread: threading.Thread | None = None
+        self._finished = threading.Event()
+        self._finished.set()  # not running initially
+        self._running_shards = 0
+        self._messages_received = 0
+        self._messages_dropped = 0
+        self._messages_processed = 0
+        self._stats = _StreamStats()
+        self._on_message_cb: Callable[[dict], None] | None = None
+        self._on_error_cb: Callable[[Exception], None] | None = None
+        self._on_open_cb: Callable[[], None] | None = None
+        self._on_close_cb: Callable[[int | None, str | None], None] | None = None
+        self._mist_session = mist_session
+        self._max_channels_per_connection = max_channels_per_connection
+        self._shard_settings: dict[str, Any] = {
+            "ping_interval": ping_interval,
+            "ping_timeout": ping_timeout,
+            "auto_reconnect": auto_reconnect,
+            "max_reconnect_attempts": max_reconnect_attempts,
+            "reconnect_backoff": reconnect_backoff,
+            "max_reconnect_backoff": max_reconnect_backoff,
+            "subscription_watchdog_timeout": subscription_watchdog_timeout,
+            "rate_limit_backoff": rate_limit_backoff,
+            "throughput_log_interval": 0,
+        }
+        self._payload_decoding: tuple[bool, Any] = (False, None)
+        self._recorder: StreamRecorder | None = None
+        self._subscription_pacing: tuple[float, int, int | None] | None = None
+        self._reconnect_jitter = 0.0
+        self._shards: list[_Shard] = []
+        for shard_channels in _partition(deduped_channels, shard_count):
+            self._shards.append(self._create_shard(shard_channels))
+        logger.info(
+            "ShardedStream: %d channel(s) spread over %d connection(s)",
+            len(deduped_channels),
+            len(self._shards),
+        )
+
+    def _create_shard(self, channels: list[str]) -> _Shard:
+        shard = _Shard(
+            self,
+            len(self._shards),
+            self._mist_session,
+            channels,
+            **self._shard_settings,
+        )
+        shard.on_open(self._handle_shard_open)
+        shard.on_error(self._handle_shard_error)
+        shard.on_close(self._handle_shard_close)
+        enabled, data_type = self._payload_decoding
+        if enabled:
+            shard.set_payload_decoding(enabled=enabled, data_type=data_type)
+        shard.set_recorder(self._recorder)
+        if self._subscription_pacing is not None:
+            shard.set_subscription_pacing(*self._subscription_pacing)
+        shard.set_reconnect_jitter(self._reconnect_jitter)
+        return shard
+
+    @property
+    def shards(self) -> list[_MistWebsocket]:
+        """WebSocket connections used by the stream, one per shard"""
+        return list(self._shards)
+
+    # ------------------------------------------------------------------
+    # Callback registration
+
+    def on_message(self, callback: Callable[[dict], None]) -> None:
+        """Register a callback invoked for every incoming message of any shard."""
+        self._on_message_cb = callback
+
+    def on_error(self, callback: Callable[[Exception], None]) -> None:
+        """Register a callback invoked on WebSocket errors of any shard."""
+        self._on_error_cb = callback
+
+    def on_open(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked each time a shard connection is established."""
+        self._on_open_cb = callback
+
+    def on_close(self, callback: Callable[[int | None, str | None], None]) -> None:
+        """Register a callback invoked once all the shards are closed."""
+        self._on_close_cb = callback
+
+    def set_payload_decoding(self, enabled: bool = True, data_type: Any = None) -> None:
+        """
+        Decode the JSON string of the "data" field of the messages of all
+        the shards. See `_MistWebsocket.set_payload_decoding()`.
+        """
+        for shard in self._shards:
+            shard.set_payload_decoding(enabled=enabled, data_type=data_type)
+        self._payload_decoding = (enabled, data_type)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+
+    def subscribe(self, channels: list[str]) -> None:
+        """
+        Add channels to the stream. The new channels are spread over the
+        least loaded shards; a new shard (connection) is opened when all the
+        shards hold `max_channels_per_connection` channels. On the live
+        connections, only the new channels are subscribed.
+
+        PARAMS
+        -----------
+        channels : list[str]
+            channels to add. The channels already subscribed are ignored.
+        """
+        new_shards: list[_Shard] = []
+        assignments: dict[int, list[str]] = {}
+        with self._lock:
+            current = set(self._channels)
+            added = [c for c in dict.fromkeys(channels) if c not in current]
+            loads = [len(shard._channels) for shard in self._shards]
+            for channel in added:
+                index = min(range(len(loads)), key=loads.__getitem__)
+                if loads[index] >= self._max_channels_per_connection:
+                    shard = self._create_shard([])
+                    self._shards.append(shard)
+                    new_shards.append(shard)
+                    loads.append(0)
+                    index = len(loads) - 1
+                assignments.setdefault(index, []).append(channel)
+                loads[index] += 1
+            self._channels.extend(added)
+            running = not self._finished.is_set()
+            if running:
+                self._running_shards += len(new_shards)
+        if new_shards:
+            logger.info(
+                "ShardedStream: %d new connection(s) for the added channels",
+                len(new_shards),
+            )
+        for index, shard_channels in assignments.items():
+            self._shards[index].subscribe(shard_channels)
+        if running:
+            for shard in new_shards:
+                shard.connect(run_in_background=True)
+
+    def unsubscribe(self, channels: list[str]) -> None:
+        """
+        Remove channels from the stream. On the live connections, only these
+        channels are unsubscribed. The shards left without channels stay
+        connected, and receive the next added channels first.
+
+        PARAMS
+        -----------
+        channels : list[str]
+            channels to remove. The channels not subscribed are ignored.
+        """
+        removed = set(channels)
+        with self._lock:
+            self._channels = [c for c in self._channels if c not in removed]
+            shards = list(self._shards)
+        for shard in shards:
+            shard.unsubscribe(channels)
+
+    def set_subscription_pacing(
+        self,
+        frames_per_second: float = 100,
+        batch_size: int = 10,
+        max_pending_acks: int | None = None,
+    ) -> None:
+        """
+        Pace the subscription frames sent by each shard when it connects.
+        The limits apply to each connection. See
+        `_MistWebsocket.set_subscription_pacing()`.
+        """
+        for shard in self._shards:
+            shard.set_subscription_pacing(
+                frames_per_second, batch_size, max_pending_acks
+            )
+        self._subscription_pacing = (frames_per_second, batch_size, max_pending_acks)
+
+    def set_reconnect_jitter(self, jitter: float = 0.5) -> None:
+        """
+        Add a random delay to the reconnect backoff of each shard. See
+        `_MistWebsocket.set_reconnect_jitter()`.
+        """
+        for shard in self._shards:
+            shard.set_reconnect_jitter(jitter)
+        self._reconnect_jitter = jitter
+
+    def set_recorder(self, recorder: "StreamRecorder | None") -> None:
+        """
+        Write the raw frames received by all the shards to a recording. See
+        `_MistWebsocket.set_recorder()`.
+        """
+        for shard in self._shards:
+            shard.set_recorder(recorder)
+        self._recorder = recorder
+
+    def set_backpressure(
+        self,
+        policy: str = "drop_newest",
+        timeout: float = 1.0,
+        coalesce_key: Callable[[dict], Hashable | None] | None = None,
+        spill_dir: str | None = None,
+    ) -> None:
+        """
+        Select what happens to the incoming messages when the merged queue is
+        full. Must be called before connect(). See
+        `_MistWebsocket.set_backpressure()`.
+        """
+        if not self._finished.is_set():
+            raise RuntimeError("set_backpressure() must be called before connect()")
+        self._queue = _BackpressureQueue(
+            maxsize=self._queue_maxsize,
+            policy=policy,
+            timeout=timeout,
+            coalesce_key=coalesce_key,
+            spill_dir=spill_dir,
+        )
+
+    def get_backpressure_counters(self) -> dict[str, int]:
+        """
+        Return the number of messages handled by the backpressure policy
+        since connect(). See `_MistWebsocket.get_backpressure_counters()`.
+        """
+        return self._queue.get_counters()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the metrics of all the shards since connect(), merged. The
+        "queue_high_water" and "callback_latency" metrics are the ones of the
+        merged queue and callback. See `_MistWebsocket.stats()`.
+        """
+        with self._metrics_lock:
+            counters = {
+                "messages_received": self._messages_received,
+                "messages_dropped": self._messages_dropped,
+                "messages_processed": self._messages_processed,
+            }
+        return merge_stats(
+            [shard.stats() for shard in self._shards] + [self._stats.snapshot()],
+            **counters,
+        )
+
+    # ------------------------------------------------------------------
+    # Shard handlers
+
+    def _handle_shard_open(self) -> None:
+        if self._on_open_cb:
+            try:
+                self._on_open_cb()
+            except Exception:
+                logger.exception("on_open callback raised")
+
+    def _handle_shard_error(self, error: Exception) -> None:
+        if self._on_error_cb:
+            try:
+                self._on_error_cb(error)
+            except Exception:
+                logger.exception("on_error callback raised")
+
+    def _handle_shard_close(
+        self, close_status_code: int | None, close_msg: str | None
+    ) -> None:
+        with self._lock:
+            self._running_shards -= 1
+            running = self._running_shards
+        logger.info(
+            "ShardedStream: shard closed. code=%s message=%s (%d/%d still running)",
+            close_status_code,
+            close_msg,
+            running,
+            len(self._shards),
+        )
+        if running > 0:
+            return
+        try:
+            self._queue.put_nowait(None)  # sentinel — unblocks receive()/worker
+        except queue.Full:
+            pass  # _finished.set() below will unblock receive() independently
+        self._finished.set()
+        if self._on_close_cb:
+            try:
+                self._on_close_cb(close_status_code, close_msg)
+            except Exception:
+                logger.exception("on_close callback raised")
+
+    def _enqueue_message(self, message: dict) -> None:
+        with self._metrics_lock:
+            self._messages_received += 1
+            messages_received = self._messages_received
+        if not self._queue.offer(message):
+            with self._metrics_lock:
+                self._messages_dropped += 1
+            logger.warning(
+                "ShardedStream queue full; dropping message (policy=%s)",
+                self._queue.policy,
+            )
+            return
+        self._stats.record_queue_depth("stream", self._queue.qsize())
+        if (
+            self._throughput_log_interval
+            and messages_received % self._throughput_log_interval == 0
+        ):
+            with self._metrics_lock:
+                messages_dropped = self._messages_dropped
+            logger.info(
+                "ShardedStream received %d messages. Queue size=%d dropped=%d",
+                messages_received,
+                self._queue.qsize(),
+                messages_dropped,
+            )
+
+    def _run_callback_worker(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._finished.is_set() and self._queue.empty():
+                    break
+                continue
+            if item is None:
+                break  # end-of-stream sentinel; everything before it was delivered
+            callback = self._on_message_cb
+            if callback is None:
+                continue
+            started = time.perf_counter()
+            try:
+                callback(item)
+            except Exception:
+                logger.exception("on_message callback raised")
+            self._stats.record_callback(time.perf_counter() - started)
+            with self._metrics_lock:
+                self._messages_processed += 1
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+
+    def connect(self, run_in_background: bool = True) -> None:
+        """
+        Open the WebSocket connection of each shard.
+
+        PARAMS
+        -----------
+        run_in_background : bool, default True
+            If True, returns once the shards are started (each shard runs in
+            its own daemon thread). If False, blocks the calling thread until
+            all the shards are disconnected.
+        """
+        with self._lock:
+            if not self._finished.is_set():
+                raise RuntimeError("Already connected; call disconnect() first")
+            self._finished.clear()
+            self._running_shards = len(self._shards)
+            self._messages_received = 0
+            self._messages_dropped = 0
+            self._messages_processed = 0
+            self._stats.reset()
+            # Drain stale sentinel from previous connection
+            while not self._queue.empty():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._queue.reset_counters()
+            if self._on_message_cb:
+                self._callback_thread = threading.Thread(
+                    target=self._run_callback_worker, daemon=True
+                )
+                self._callback_thread.start()
+        for shard in self._shards:
+            shard.connect(run_in_background=True)
+        if not run_in_background:
+            self._finished.wait()
+            if self._callback_thread is not None:
+                self._callback_thread.join()
+
+    def disconnect(self, wait: bool = False, timeout: float | None = None) -> None:
+        """Close the WebSocket connection of each shard.
+
+        PARAMS
+        -----------
+        wait : bool, default False
+            If True, block until the background threads have finished.
+        timeout : float or None, default None
+            Maximum seconds to wait for each thread to finish (only used
+            when *wait* is True). ``None`` means wait indefinitely.
+        """
+        for shard in self._shards:
+            shard.disconnect()
+        if wait:
+            for shard in self._shards:
+                shard.disconnect(wait=True, timeout=timeout)
+            if (
+                self._callback_thread is not None
+                and self._callback_thread is not threading.current_thread()
+            ):
+                self._callback_thread.join(timeout=timeout)
+
+    def receive(self) -> Generator[dict, None, None]:
+        """
+        Blocking generator that yields each incoming message of any shard as a
+        dict.
+
+        Exits cleanly once all the shards are closed (disconnect() is called,
+        or the shards gave up reconnecting).
+
+        Intended for use after connect(run_in_background=True).
+        Cannot be used when an on_message callback is registered.
+        """
+        if self._on_message_cb is not None:
+            raise RuntimeError(
+                "receive() cannot be used when an on_message callback is "
+                "registered; use one or the other"
+            )
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._finished.is_set() and self._queue.empty():
+                    break
+                continue
+            if item is None:
+                break
+            yield item
+
+    def ready(self) -> bool:
+        """Returns True if the connections of all the shards are open and ready."""
+        return all(shard.ready() for shard in self._shards)
+
+    # ------------------------------------------------------------------
+    # Context manager
+
+    def __enter__(self) -> "ShardedStream":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disconnect()
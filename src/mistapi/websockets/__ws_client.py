@@ -9,21 +9,34 @@
 
 --------------------------------------------------------------------------------
 This module provides the _MistWebsocket base class for WebSocket connections
-to the Mist API streaming endpoint (wss://{host}/api-ws/v1/stream).
+to the Mist API streaming endpoint (wss://{host}/api-ws/v1/stream), and the
+_MistWebsocketBase class it shares with the asyncio client
+(_AsyncMistWebsocket).
 """
 
 import json
 import logging
 import queue
+import random
 import re
 import ssl
 import threading
-from collections.abc import Callable, Generator
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Generator, Hashable
 from typing import TYPE_CHECKING, Any
 
 import websocket
 
+from mistapi import __json as _json
 from mistapi.__logger import logger
+from mistapi.websockets.__backpressure import _BackpressureQueue
+from mistapi.websockets.__pacing import (
+    ACK_POLL_INTERVAL,
+    _SubscriptionPacer,
+    check_pacing_settings,
+)
+from mistapi.websockets.metrics import _frame_size, _StreamStats
 
 
 class _HeaderRedactFilter(logging.Filter):
@@ -46,6 +59,7 @@ if not any(isinstance(f, _HeaderRedactFilter) for f in _ws_logger.filters):
 
 if TYPE_CHECKING:
     from mistapi import APISession
+    from mistapi.websockets.replay import StreamRecorder
 
 
 # Channel limits from the Mist WebSocket documentation:
@@ -59,16 +73,10 @@ HIGH_CHANNEL_COUNT_WARNING = 1500
 DEFAULT_PING_TIMEOUT = 45
 
 
-class _MistWebsocket:
+class _MistWebsocketBase(ABC):
     """
-    Base class for Mist API WebSocket channels.
-
-    Connects to wss://{host}/api-ws/v1/stream and subscribes to a channel
-    by sending {"subscribe": "<channel>"} on open.
-
-    Auth is handled automatically:
-    - API token sessions use an Authorization header.
-    - Login/password sessions pass the requests Session cookies.
+    Settings, authentication and subscription tracking shared by the
+    threaded (_MistWebsocket) and the asyncio (_AsyncMistWebsocket) clients.
     """
 
     def __init__(
@@ -154,29 +162,20 @@ class _MistWebsocket:
         self._subscription_watchdog_timeout = subscription_watchdog_timeout
         self._rate_limit_backoff = rate_limit_backoff
         self._throughput_log_interval = throughput_log_interval
-        self._lock = threading.Lock()
+        self._queue_maxsize = queue_maxsize
         self._subscription_lock = threading.Lock()
         self._metrics_lock = threading.Lock()
-        self._ws: websocket.WebSocketApp | None = None
-        self._thread: threading.Thread | None = None
-        self._callback_thread: threading.Thread | None = None
-        self._subscription_watchdog: threading.Timer | None = None
-        self._queue: queue.Queue[dict | None] = queue.Queue(maxsize=queue_maxsize)
-        self._callback_queue: queue.Queue[dict | None] = queue.Queue(
-            maxsize=queue_maxsize
-        )
-        self._connected = (
-            threading.Event()
-        )  # tracks whether the WebSocket connection is currently open
-        self._user_disconnect = threading.Event()
-        self._callback_stop = threading.Event()
-        self._finished = threading.Event()
-        self._finished.set()  # not running initially
         self._reconnect_attempts = 0
         self._last_close_code: int | None = None
         self._last_close_msg: str | None = None
         self._last_http_status: int | None = None
         self._subscribed_channels: set[str] = set()
+        # connection on which the current channels were (or are being)
+        # subscribed; channels added later are sent to it by subscribe()
+        self._subscribing_ws: Any = None
+        # channels of the pacer run in progress (see _send_paced_subscriptions);
+        # subscribe() appends the new channels to it instead of sending them
+        self._paced_channels: list[str] | None = None
         self._messages_received = 0
         self._messages_dropped = 0
         self._messages_processed = 0
@@ -184,8 +183,13 @@ class _MistWebsocket:
         self._on_error_cb: Callable[[Exception], None] | None = None
         self._on_open_cb: Callable[[], None] | None = None
         self._on_close_cb: Callable[[int | None, str | None], None] | None = None
-        self._on_ping_cb: Callable[[str | bytes | None], None] | None = None
-        self._on_pong_cb: Callable[[str | bytes | None], None] | None = None
+        self._decode_payload = False
+        self._payload_type: Any = None
+        self._payload_decoders: dict[str | None, Callable[[str], Any]] = {}
+        self._stats = _StreamStats()
+        self._recorder: StreamRecorder | None = None
+        self._subscription_pacing: tuple[float, int, int | None] | None = None
+        self._reconnect_jitter = 0.0
 
     # ------------------------------------------------------------------
     # Auth / URL helpers
@@ -252,40 +256,706 @@ class _MistWebsocket:
         """Register a callback invoked for every incoming message."""
         self._on_message_cb = callback
 
-    def on_error(self, callback: Callable[[Exception], None]) -> None:
-        """Register a callback invoked on WebSocket errors."""
-        self._on_error_cb = callback
+    def on_error(self, callback: Callable[[Exception], None]) -> None:
+        """Register a callback invoked on WebSocket errors."""
+        self._on_error_cb = callback
+
+    def on_open(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked when the connection is established."""
+        self._on_open_cb = callback
+
+    def on_close(self, callback: Callable[[int | None, str | None], None]) -> None:
+        """Register a callback invoked when the connection closes."""
+        self._on_close_cb = callback
+
+    # ------------------------------------------------------------------
+    # Metrics
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the metrics of the stream since connect(). See
+        mistapi.websockets.metrics to export them to Prometheus or
+        OpenTelemetry.
+
+        RETURN
+        -----------
+        dict
+            "uptime": seconds since connect()
+            "messages_received", "messages_dropped", "messages_processed"
+            "bytes_received": size of the received messages
+            "reconnects": number of reconnections since connect()
+            "subscription_time": seconds between the last connection and the
+            acknowledgement of all the channels, or None
+            "queue_high_water": highest number of queued messages, by queue
+            "callback_latency": histogram of the callback durations, with
+            "count", "sum" and cumulative "buckets" (upper bound: count)
+            "channels": metrics by channel, with "messages", "bytes", "rate"
+            (messages/s since connect()) and "lag" (delay between the
+            "timestamp" or "last_seen" of the payload and the reception, in
+            seconds; requires the payload decoding)
+        """
+        with self._metrics_lock:
+            counters = {
+                "messages_received": self._messages_received,
+                "messages_dropped": self._messages_dropped,
+                "messages_processed": self._messages_processed,
+            }
+        return self._stats.snapshot(**counters)
+
+    # ------------------------------------------------------------------
+    # Recording
+
+    def set_recorder(self, recorder: "StreamRecorder | None") -> None:
+        """
+        Write the raw frames received by the client to a recording, which
+        can be replayed later with mistapi.websockets.replay.replay_into().
+
+        PARAMS
+        -----------
+        recorder : mistapi.websockets.replay.StreamRecorder
+            recorder to write the frames to (may be shared by several
+            clients). None stops the recording. The recorder is not closed
+            by the client.
+        """
+        self._recorder = recorder
+
+    # ------------------------------------------------------------------
+    # Subscription pacing
+
+    def set_subscription_pacing(
+        self,
+        frames_per_second: float = 100,
+        batch_size: int = 10,
+        max_pending_acks: int | None = None,
+    ) -> None:
+        """
+        Pace the subscription frames sent when the connection opens (and
+        reopens), instead of sending them all at once. The subscription
+        watchdog starts once the last frame is sent.
+
+        PARAMS
+        -----------
+        frames_per_second : float, default 100
+            Maximum number of subscription frames per second. 0 = unlimited
+        batch_size : int, default 10
+            Number of frames sent back to back
+        max_pending_acks : int, default None
+            Maximum number of subscriptions waiting for an acknowledgement.
+            When reached, the next frames wait for the acknowledgements (up
+            to `subscription_watchdog_timeout`) and the rate is halved. The
+            rate is then slowly restored. None never waits.
+
+        With frames_per_second=0 and max_pending_acks=None, the pacing is
+        disabled.
+        """
+        check_pacing_settings(frames_per_second, batch_size, max_pending_acks)
+        if not frames_per_second and max_pending_acks is None:
+            self._subscription_pacing = None
+        else:
+            self._subscription_pacing = (
+                frames_per_second,
+                batch_size,
+                max_pending_acks,
+            )
+
+    def set_reconnect_jitter(self, jitter: float = 0.5) -> None:
+        """
+        Add a random delay to the reconnect backoff, so the clients which lost
+        their connection at the same time (e.g. during a cloud outage) do not
+        all reconnect at the same time.
+
+        PARAMS
+        -----------
+        jitter : float, default 0.5
+            Maximum random delay, as a fraction of the backoff: each reconnect
+            waits between backoff and backoff * (1 + jitter). 0 disables the
+            jitter
+        """
+        if jitter < 0:
+            raise ValueError("jitter must be >= 0")
+        self._reconnect_jitter = jitter
+
+    def _new_subscription_pacer(self) -> _SubscriptionPacer | None:
+        if self._subscription_pacing is None:
+            return None
+        return _SubscriptionPacer(*self._subscription_pacing)
+
+    def _paced_subscriptions_done(self, channels: list[str], sent: int) -> bool:
+        """
+        End the pacer run of `channels` if all of them were sent. Return False
+        if subscribe() added channels meanwhile.
+        """
+        with self._subscription_lock:
+            if sent < len(channels):
+                return False
+            if self._paced_channels is channels:
+                self._paced_channels = None
+            return True
+
+    def _is_subscribing(self, ws: Any) -> bool:
+        with self._subscription_lock:
+            return self._subscribing_ws is ws
+
+    def _acknowledged_count(self) -> int:
+        with self._subscription_lock:
+            return len(self._subscribed_channels)
+
+    def _log_pacing_slowdown(self, pacer: _SubscriptionPacer, sent: int) -> None:
+        logger.info(
+            "Waiting for subscription acknowledgements (%d/%d); "
+            "pacing reduced to %.1f frames/s",
+            self._acknowledged_count(),
+            sent,
+            pacer.rate,
+        )
+
+    # ------------------------------------------------------------------
+    # Payload decoding
+
+    def set_payload_decoding(self, enabled: bool = True, data_type: Any = None) -> None:
+        """
+        Decode the JSON string of the "data" field of the messages in the
+        receive path, with orjson or msgspec when installed, so the consumers
+        get the decoded payload instead of a string.
+
+        PARAMS
+        -----------
+        enabled : bool, default True
+            Enable or disable the payload decoding
+        data_type : str | type, default None
+            None decodes the payloads into dicts/lists.
+            "auto" decodes the payloads of the clients stats, devices stats
+            and location channels into the mistapi.websockets.models
+            structures (the undeclared fields are kept in their `extra`
+            dict), and the other payloads into dicts/lists. This mode is
+            about twice as slow as the plain decoding.
+            A msgspec Struct (or any type supported by msgspec) decodes
+            every payload straight into this type, and drops the undeclared
+            fields. This is the fastest mode.
+            "auto" and types require the `msgspec` package.
+        """
+        if isinstance(data_type, str) and data_type != "auto":
+            raise ValueError('data_type must be None, "auto" or a type')
+        if data_type is not None:
+            # fail early if msgspec is not installed
+            from mistapi.websockets import models  # noqa: F401
+        self._decode_payload = enabled
+        self._payload_type = data_type
+        self._payload_decoders = {}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    @staticmethod
+    def _extract_status_code(error: Exception) -> int | None:
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code
+        response = getattr(error, "response", None)
+        if response is not None:
+            response_code = getattr(response, "status_code", None)
+            if isinstance(response_code, int):
+                return response_code
+        return None
+
+    def _parse_message(self, message: str | bytes) -> dict:
+        if self._decode_payload:
+            return self._decode_message(message)
+        if isinstance(message, bytes):
+            message = message.replace(b"\x00", b"").decode("utf-8", errors="replace")
+        try:
+            data = json.loads(message)
+        except (json.JSONDecodeError, TypeError):
+            data = {"raw": message}
+        if not isinstance(data, dict):
+            data = {"data": data}
+        return data
+
+    def _decode_message(self, message: str | bytes) -> dict:
+        if isinstance(message, bytes):
+            message = message.replace(b"\x00", b"")
+        try:
+            data = _json.loads(message)
+        except _json.JSON_DECODE_ERRORS:
+            if isinstance(message, bytes):
+                message = message.decode("utf-8", errors="replace")
+            return {"raw": message}
+        if not isinstance(data, dict):
+            return {"data": data}
+        payload = data.get("data")
+        if isinstance(payload, str):
+            try:
+                data["data"] = self._payload_decoder(data.get("channel"))(payload)
+            except _json.JSON_DECODE_ERRORS:
+                pass  # not a JSON document, keep the string
+        return data
+
+    def _payload_decoder(self, channel: str | None) -> Callable[[str], Any]:
+        decoder = self._payload_decoders.get(channel)
+        if decoder is None:
+            data_type = self._payload_type
+            if data_type is not None:
+                from mistapi.websockets import models
+
+                if data_type == "auto":
+                    data_type = models.type_for_channel(channel)
+            if data_type is None:
+                decoder = _json.loads
+            else:
+                decoder = models.payload_decoder(data_type)
+            self._payload_decoders[channel] = decoder
+        return decoder
+
+    @abstractmethod
+    def _close_ws(self, ws: Any) -> None:
+        """Close the connection `ws`"""
+
+    @abstractmethod
+    def _cancel_subscription_watchdog(self) -> None:
+        """Stop the subscription watchdog, if running"""
+
+    @staticmethod
+    def _check_batch_settings(max_items: int, max_latency_ms: float) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+        if max_latency_ms < 0:
+            raise ValueError("max_latency_ms must be >= 0")
+
+    def _next_reconnect_delay(self) -> float | None:
+        """
+        Count a reconnect attempt and return the delay before it, or None
+        when the maximum number of attempts is reached.
+        """
+        self._reconnect_attempts += 1
+        if (
+            self._max_reconnect_attempts > 0
+            and self._reconnect_attempts > self._max_reconnect_attempts
+        ):
+            logger.warning(
+                "Max reconnect attempts (%d) reached, giving up",
+                self._max_reconnect_attempts,
+            )
+            return None
+
+        delay = self._reconnect_backoff * (2 ** (self._reconnect_attempts - 1))
+        if self._max_reconnect_backoff is not None:
+            delay = min(delay, self._max_reconnect_backoff)
+        if self._last_http_status == 429:
+            delay = max(delay, self._rate_limit_backoff)
+        if self._reconnect_jitter:
+            delay += delay * self._reconnect_jitter * random.random()
+        if self._max_reconnect_attempts > 0:
+            logger.info(
+                "Reconnecting in %.1fs (attempt %d/%d)",
+                delay,
+                self._reconnect_attempts,
+                self._max_reconnect_attempts,
+            )
+        else:
+            logger.info(
+                "Reconnecting in %.1fs (attempt %d, unlimited)",
+                delay,
+                self._reconnect_attempts,
+            )
+        return delay
+
+    def _add_channels(self, channels: list[str]) -> tuple[list[str], Any]:
+        """
+        Add the channels to the subscription set. Return the added channels
+        and the connection to send them to (None if they will be sent on the
+        next connection)
+        """
+        requested = list(dict.fromkeys(channels))
+        with self._subscription_lock:
+            added = [c for c in requested if c not in self._expected_channels]
+            total = len(self._channels) + len(added)
+            if total > MAX_CHANNELS_PER_CONNECTION:
+                raise ValueError(
+                    f"Too many channels ({total}). Mist supports up to "
+                    f"{MAX_CHANNELS_PER_CONNECTION} channels per connection"
+                )
+            self._channels.extend(added)
+            self._expected_channels.update(added)
+            ws = self._subscribing_ws
+            if self._paced_channels is not None:
+                # the pacer sends them and arms the watchdog once done
+                self._paced_channels.extend(added)
+                ws = None
+        if added and total >= HIGH_CHANNEL_COUNT_WARNING:
+            logger.warning(
+                "High channel count (%d). Consider spreading subscriptions over "
+                "multiple WebSocket connections to reduce message backlog risk.",
+                total,
+            )
+        return added, ws
+
+    def _remove_channels(self, channels: list[str]) -> tuple[list[str], Any, bool]:
+        """
+        Remove the channels from the subscription set. Return the removed
+        channels, the connection to unsubscribe them from (or None) and
+        whether all the remaining channels are subscribed
+        """
+        with self._subscription_lock:
+            removed = [
+                c for c in dict.fromkeys(channels) if c in self._expected_channels
+            ]
+            removed_set = set(removed)
+            self._channels = [c for c in self._channels if c not in removed_set]
+            self._expected_channels -= removed_set
+            self._subscribed_channels -= removed_set
+            all_subscribed = self._expected_channels <= self._subscribed_channels
+            ws = self._subscribing_ws
+        return removed, ws, all_subscribed
+
+    def _process_subscription_event(self, ws: Any, data: dict) -> None:
+        event = data.get("event")
+        channel = data.get("channel")
+        if not isinstance(channel, str):
+            channel = None
+
+        if event == "channel_subscribed" and channel:
+            if channel not in self._expected_channels:
+                logger.warning(
+                    "Received channel_subscribed for unexpected channel: %s", channel
+                )
+                return
+            with self._subscription_lock:
+                self._subscribed_channels.add(channel)
+                subscribed_count = len(self._subscribed_channels)
+                expected_count = len(self._expected_channels)
+            logger.debug(
+                "Channel subscribed (%d/%d): %s",
+                subscribed_count,
+                expected_count,
+                channel,
+            )
+            if expected_count and (
+                subscribed_count == 1
+                or subscribed_count % 100 == 0
+                or subscribed_count >= expected_count
+            ):
+                logger.info(
+                    "Subscription progress: received %d/%d channel acknowledgements",
+                    subscribed_count,
+                    expected_count,
+                )
+            if subscribed_count >= expected_count:
+                self._stats.record_subscribed()
+                self._cancel_subscription_watchdog()
+                self._reconnect_attempts = 0
+                self._last_close_code = None
+                self._last_close_msg = None
+                logger.info("All requested channels subscribed (%d)", expected_count)
+            return
+
+        if event == "channel_unsubscribed" and channel:
+            logger.debug("Channel unsubscribed: %s", channel)
+            return
+
+        if event == "subscribe_failed":
+            detail = data.get("detail")
+            self._last_close_code = 1008
+            self._last_close_msg = f"subscribe_failed channel={channel} detail={detail}"
+            self._cancel_subscription_watchdog()
+            # Surface through on_error so callers without auto_reconnect
+            # still get an actionable signal before the connection closes.
+            self._handle_error(
+                ws,
+                ConnectionError(f"subscription failed for channel {channel}: {detail}"),
+            )
+            self._close_ws(ws)
+
+    def _subscription_timeout(self, ws: Any) -> None:
+        """Report the missing subscriptions and close the connection"""
+        with self._subscription_lock:
+            missing = sorted(self._expected_channels - self._subscribed_channels)
+        if not missing:
+            return
+        preview = ", ".join(missing[:5])
+        if len(missing) > 5:
+            preview = f"{preview}, ..."
+        self._last_close_code = 1008
+        self._last_close_msg = (
+            f"subscription watchdog timeout: missing {len(missing)} channels"
+        )
+        # Surface through on_error so callers without auto_reconnect
+        # still get an actionable signal (the close alone reconnects
+        # only when auto_reconnect is enabled).
+        self._handle_error(
+            ws,
+            TimeoutError(
+                f"subscription watchdog timeout after "
+                f"{self._subscription_watchdog_timeout:.1f}s: received "
+                f"{len(self._expected_channels) - len(missing)}/"
+                f"{len(self._expected_channels)} subscriptions. "
+                f"Missing: {preview}"
+            ),
+        )
+        self._close_ws(ws)
+
+    def _handle_error(self, _ws: Any, error: Exception) -> None:
+        status_code = self._extract_status_code(error)
+        self._last_http_status = status_code
+        if status_code == 429:
+            logger.warning(
+                "WebSocket received HTTP 429 (rate limit). "
+                "Reconnect backoff will be raised to at least %.1fs",
+                self._rate_limit_backoff,
+            )
+        else:
+            logger.error("WebSocket error: %s", error)
+        if self._on_error_cb:
+            try:
+                self._on_error_cb(error)
+            except Exception:
+                logger.exception("on_error callback raised")
+
+    def _handle_close(
+        self, _ws: Any, close_status_code: int | None, close_msg: str | None
+    ) -> None:
+        self._connected.clear()
+        self._cancel_subscription_watchdog()
+        with self._subscription_lock:
+            self._subscribing_ws = None
+            self._paced_channels = None
+        if close_status_code is not None:
+            self._last_close_code = close_status_code
+        if close_msg not in (None, ""):
+            self._last_close_msg = close_msg
+        logger.info(
+            "WebSocket closed. code=%s message=%s",
+            self._last_close_code,
+            self._last_close_msg,
+        )
+
+
+class _MistWebsocket(_MistWebsocketBase):
+    """
+    Base class for Mist API WebSocket channels.
+
+    Connects to wss://{host}/api-ws/v1/stream and subscribes to a channel
+    by sending {"subscribe": "<channel>"} on open.
+
+    Auth is handled automatically:
+    - API token sessions use an Authorization header.
+    - Login/password sessions pass the requests Session cookies.
+    """
+
+    def __init__(
+        self,
+        mist_session: "APISession",
+        channels: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+        self._lock = threading.Lock()
+        self._ws: websocket.WebSocketApp | None = None
+        self._thread: threading.Thread | None = None
+        self._callback_thread: threading.Thread | None = None
+        self._subscription_watchdog: threading.Timer | None = None
+        self._queue: _BackpressureQueue = _BackpressureQueue(maxsize=queue_maxsize)
+        self._callback_queue: _BackpressureQueue = _BackpressureQueue(
+            maxsize=queue_maxsize
+        )
+        self._connected = (
+            threading.Event()
+        )  # tracks whether the WebSocket connection is currently open
+        self._user_disconnect = threading.Event()
+        self._callback_stop = threading.Event()
+        self._finished = threading.Event()
+        self._finished.set()  # not running initially
+        self._on_ping_cb: Callable[[str | bytes | None], None] | None = None
+        self._on_pong_cb: Callable[[str | bytes | None], None] | None = None
+        self._on_batch_cb: Callable[[list[dict]], None] | None = None
+        self._batch_max_items = 100
+        self._batch_max_latency = 0.1
+        # replaced by mistapi.websockets.replay.replay_into()
+        self._ws_app_factory: Callable[..., Any] | None = None
+
+    # ------------------------------------------------------------------
+    # Callback registration
+
+    def on_ping(self, callback: Callable[[str | bytes | None], None]) -> None:
+        """Register a callback invoked when a ping frame is received."""
+        self._on_ping_cb = callback
+
+    def on_pong(self, callback: Callable[[str | bytes | None], None]) -> None:
+        """Register a callback invoked when a pong frame is received."""
+        self._on_pong_cb = callback
+
+    def on_batch(
+        self,
+        callback: Callable[[list[dict]], None],
+        max_items: int = 100,
+        max_latency_ms: float = 100,
+    ) -> None:
+        """
+        Register a callback invoked with lists of incoming messages, instead
+        of one call per message. Takes precedence over on_message.
+
+        PARAMS
+        -----------
+        callback : callable
+            function receiving the list of messages
+        max_items : int, default 100
+            Maximum number of messages per batch
+        max_latency_ms : float, default 100
+            Maximum time in milliseconds to wait for more messages once the
+            first message of a batch is received
+        """
+        self._check_batch_settings(max_items, max_latency_ms)
+        self._batch_max_items = max_items
+        self._batch_max_latency = max_latency_ms / 1000
+        self._on_batch_cb = callback
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+
+    def subscribe(self, channels: list[str]) -> None:
+        """
+        Add channels to the stream. On a live connection, only the new
+        channels are subscribed (the subscription watchdog waits for their
+        acknowledgements); the reconnections subscribe the current set.
+        While the subscription frames are paced (see
+        set_subscription_pacing()), the new channels are sent by the pacer.
+
+        PARAMS
+        -----------
+        channels : list[str]
+            channels to add (e.g. "/sites/{site_id}/stats/devices"). The
+            channels already subscribed are ignored.
+        """
+        added, ws = self._add_channels(channels)
+        if not added or ws is None:
+            return
+        logger.info("Subscribing to %d additional channel(s)", len(added))
+        try:
+            for channel in added:
+                ws.send(json.dumps({"subscribe": channel}))
+        except Exception as exc:
+            # the connection is closing: the next connection subscribes them
+            logger.error("Subscription send failed: %s", exc)
+            return
+        self._arm_subscription_watchdog(ws)
+
+    def unsubscribe(self, channels: list[str]) -> None:
+        """
+        Remove channels from the stream. On a live connection, only these
+        channels are unsubscribed.
+
+        PARAMS
+        -----------
+        channels : list[str]
+            channels to remove. The channels not subscribed are ignored.
+        """
+        removed, ws, all_subscribed = self._remove_channels(channels)
+        if all_subscribed:
+            self._cancel_subscription_watchdog()
+        if not removed or ws is None:
+            return
+        logger.info("Unsubscribing from %d channel(s)", len(removed))
+        try:
+            for channel in removed:
+                ws.send(json.dumps({"unsubscribe": channel}))
+        except Exception as exc:
+            logger.error("Unsubscription send failed: %s", exc)
 
-    def on_open(self, callback: Callable[[], None]) -> None:
-        """Register a callback invoked when the connection is established."""
-        self._on_open_cb = callback
+    # ------------------------------------------------------------------
+    # Backpressure
 
-    def on_close(self, callback: Callable[[int | None, str | None], None]) -> None:
-        """Register a callback invoked when the connection closes."""
-        self._on_close_cb = callback
+    def set_backpressure(
+        self,
+        policy: str = "drop_newest",
+        timeout: float = 1.0,
+        coalesce_key: Callable[[dict], Hashable | None] | None = None,
+        spill_dir: str | None = None,
+    ) -> None:
+        """
+        Select what happens to the incoming messages when the receive or
+        callback queue is full. Must be called before connect().
 
-    def on_ping(self, callback: Callable[[str | bytes | None], None]) -> None:
-        """Register a callback invoked when a ping frame is received."""
-        self._on_ping_cb = callback
+        PARAMS
+        -----------
+        policy : str, default "drop_newest"
+            "drop_newest": drop the incoming message.
+            "drop_oldest": drop the oldest queued message.
+            "coalesce": replace the queued message with the same key, so only
+            the latest sample of each device/client is kept; when no message
+            can be replaced, drop the oldest one. Also bounds the memory with
+            queue_maxsize=0 to one message per device/client.
+            "block": wait up to `timeout` seconds for room in the queue (the
+            socket is not read meanwhile), then drop the incoming message.
+            "spill": write the messages which do not fit in the queue to a
+            temporary file, read back in order.
+            "drop_oldest", "block" and "spill" require queue_maxsize > 0.
+        timeout : float, default 1.0
+            Maximum time in seconds to wait with the "block" policy
+        coalesce_key : callable, default None
+            function returning the key of a message for the "coalesce"
+            policy, or None if the message must not be coalesced. Defaults to
+            the channel and the "mac" of the payload (see
+            mistapi.websockets.__backpressure.default_coalesce_key). Enable
+            the payload decoding to avoid decoding the payloads twice.
+        spill_dir : str, default None
+            directory of the spill file. Defaults to the system temporary
+            directory
+        """
+        if not self._finished.is_set():
+            raise RuntimeError("set_backpressure() must be called before connect()")
+        settings = {
+            "maxsize": self._queue_maxsize,
+            "policy": policy,
+            "timeout": timeout,
+            "coalesce_key": coalesce_key,
+            "spill_dir": spill_dir,
+        }
+        self._queue = _BackpressureQueue(**settings)
+        self._callback_queue = _BackpressureQueue(**settings)
+
+    def get_backpressure_counters(self) -> dict[str, int]:
+        """
+        Return the number of messages handled by the backpressure policy
+        since connect(), for the receive and callback queues combined.
 
-    def on_pong(self, callback: Callable[[str | bytes | None], None]) -> None:
-        """Register a callback invoked when a pong frame is received."""
-        self._on_pong_cb = callback
+        RETURN
+        -----------
+        dict
+            "dropped_newest", "dropped_oldest", "coalesced", "blocked"
+            (messages which had to wait for room with the "block" policy),
+            "block_timeouts" and "spilled" counters
+        """
+        counters = self._queue.get_counters()
+        for counter, value in self._callback_queue.get_counters().items():
+            counters[counter] += value
+        return counters
 
     # ------------------------------------------------------------------
     # Internal helpers
 
-    @staticmethod
-    def _extract_status_code(error: Exception) -> int | None:
-        status_code = getattr(error, "status_code", None)
-        if isinstance(status_code, int):
-            return status_code
-        response = getattr(error, "response", None)
-        if response is not None:
-            response_code = getattr(response, "status_code", None)
-            if isinstance(response_code, int):
-                return response_code
-        return None
+    def _close_ws(self, ws: websocket.WebSocketApp) -> None:
+        ws.close()
 
     def _drain_queue(self, target_queue: queue.Queue[Any]) -> None:
         while not target_queue.empty():
@@ -306,7 +976,82 @@ class _MistWebsocket:
         )
         self._callback_thread.start()
 
+    @staticmethod
+    def _get_batch(
+        target_queue: queue.Queue[dict | None], max_items: int, max_latency: float
+    ) -> tuple[list[dict], bool]:
+        """
+        Wait up to 1s for a message, then collect the messages received
+        within `max_latency` seconds, up to `max_items`. Return the batch
+        (empty after an idle second) and whether the end-of-stream sentinel
+        was reached.
+        """
+        try:
+            item = target_queue.get(timeout=1)
+        except queue.Empty:
+            return [], False
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + max_latency
+        while len(batch) < max_items:
+            try:
+                item = target_queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = target_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run_batch_worker(self) -> None:
+        while True:
+            batch, ended = self._get_batch(
+                self._callback_queue, self._batch_max_items, self._batch_max_latency
+            )
+            if not batch:
+                if ended or self._callback_stop.is_set():
+                    break
+                if self._finished.is_set() and self._callback_queue.empty():
+                    break
+                continue
+            callback = self._on_batch_cb
+            if callback is not None:
+                started = time.perf_counter()
+                try:
+                    callback(batch)
+                except Exception:
+                    logger.exception("on_batch callback raised")
+                self._stats.record_callback(time.perf_counter() - started)
+            with self._metrics_lock:
+                before = self._messages_processed
+                self._messages_processed += len(batch)
+                messages_processed = self._messages_processed
+                messages_dropped = self._messages_dropped
+            if self._throughput_log_interval and (
+                messages_processed // self._throughput_log_interval
+                != before // self._throughput_log_interval
+            ):
+                logger.info(
+                    "WebSocket callback worker processed %d messages. "
+                    "Callback queue size=%d dropped=%d",
+                    messages_processed,
+                    self._callback_queue.qsize(),
+                    messages_dropped,
+                )
+            if ended:
+                break
+
     def _run_callback_worker(self) -> None:
+        if self._on_batch_cb is not None:
+            self._run_batch_worker()
+            return
         # On stop, keep draining so every message received before the stop
         # (i.e. before the None sentinel) is still delivered to the callback.
         while True:
@@ -323,10 +1068,12 @@ class _MistWebsocket:
             callback = self._on_message_cb
             if callback is None:
                 continue
+            started = time.perf_counter()
             try:
                 callback(item)
             except Exception:
                 logger.exception("on_message callback raised")
+            self._stats.record_callback(time.perf_counter() - started)
             with self._metrics_lock:
                 self._messages_processed += 1
                 messages_processed = self._messages_processed
@@ -361,31 +1108,7 @@ class _MistWebsocket:
                 current_ws = self._ws
             if ws is not current_ws:
                 return
-            with self._subscription_lock:
-                missing = sorted(self._expected_channels - self._subscribed_channels)
-            if not missing:
-                return
-            preview = ", ".join(missing[:5])
-            if len(missing) > 5:
-                preview = f"{preview}, ..."
-            self._last_close_code = 1008
-            self._last_close_msg = (
-                f"subscription watchdog timeout: missing {len(missing)} channels"
-            )
-            # Surface through on_error so callers without auto_reconnect
-            # still get an actionable signal (the close alone reconnects
-            # only when auto_reconnect is enabled).
-            self._handle_error(
-                ws,
-                TimeoutError(
-                    f"subscription watchdog timeout after "
-                    f"{self._subscription_watchdog_timeout:.1f}s: received "
-                    f"{len(self._expected_channels) - len(missing)}/"
-                    f"{len(self._expected_channels)} subscriptions. "
-                    f"Missing: {preview}"
-                ),
-            )
-            ws.close()
+            self._subscription_timeout(ws)
 
         timer = threading.Timer(self._subscription_watchdog_timeout, _watchdog_expired)
         timer.daemon = True
@@ -394,74 +1117,22 @@ class _MistWebsocket:
             self._subscription_watchdog = timer
         timer.start()
 
-    def _process_subscription_event(
-        self, ws: websocket.WebSocketApp, data: dict
-    ) -> None:
-        event = data.get("event")
-        channel = data.get("channel")
-        if not isinstance(channel, str):
-            channel = None
-
-        if event == "channel_subscribed" and channel:
-            if channel not in self._expected_channels:
-                logger.warning(
-                    "Received channel_subscribed for unexpected channel: %s", channel
-                )
-                return
-            with self._subscription_lock:
-                self._subscribed_channels.add(channel)
-                subscribed_count = len(self._subscribed_channels)
-                expected_count = len(self._expected_channels)
-            logger.debug(
-                "Channel subscribed (%d/%d): %s",
-                subscribed_count,
-                expected_count,
-                channel,
-            )
-            if expected_count and (
-                subscribed_count == 1
-                or subscribed_count % 100 == 0
-                or subscribed_count >= expected_count
-            ):
-                logger.info(
-                    "Subscription progress: received %d/%d channel acknowledgements",
-                    subscribed_count,
-                    expected_count,
-                )
-            if subscribed_count == expected_count:
-                self._cancel_subscription_watchdog()
-                self._reconnect_attempts = 0
-                self._last_close_code = None
-                self._last_close_msg = None
-                logger.info("All requested channels subscribed (%d)", expected_count)
-            return
-
-        if event == "subscribe_failed":
-            detail = data.get("detail")
-            self._last_close_code = 1008
-            self._last_close_msg = f"subscribe_failed channel={channel} detail={detail}"
-            self._cancel_subscription_watchdog()
-            # Surface through on_error so callers without auto_reconnect
-            # still get an actionable signal before the connection closes.
-            self._handle_error(
-                ws,
-                ConnectionError(f"subscription failed for channel {channel}: {detail}"),
-            )
-            ws.close()
-
     def _enqueue_message(self, message: dict, to_callback_queue: bool) -> None:
         target_queue = self._callback_queue if to_callback_queue else self._queue
         queue_name = "callback" if to_callback_queue else "receive"
         with self._metrics_lock:
             self._messages_received += 1
             messages_received = self._messages_received
-        try:
-            target_queue.put_nowait(message)
-        except queue.Full:
+        if not target_queue.offer(message):
             with self._metrics_lock:
                 self._messages_dropped += 1
-            logger.warning("%s queue full; dropping message", queue_name.capitalize())
+            logger.warning(
+                "%s queue full; dropping message (policy=%s)",
+                queue_name.capitalize(),
+                target_queue.policy,
+            )
             return
+        self._stats.record_queue_depth(queue_name, target_queue.qsize())
         if (
             self._throughput_log_interval
             and messages_received % self._throughput_log_interval == 0
@@ -485,18 +1156,31 @@ class _MistWebsocket:
             len(self._channels),
         )
         self._last_http_status = None
+        self._stats.record_open()
+        pacer = self._new_subscription_pacer()
         with self._subscription_lock:
             self._subscribed_channels.clear()
-        try:
-            for channel in self._channels:
-                ws.send(json.dumps({"subscribe": channel}))
-        except Exception as exc:
-            logger.error("Subscription send failed: %s", exc)
-            ws.close()
-            return
-        if self._expected_channels:
-            self._arm_subscription_watchdog(ws)
+            channels = list(self._channels)
+            self._subscribing_ws = ws
+            if not channels:
+                pacer = None
+            self._paced_channels = channels if pacer is not None else None
+        if pacer is not None:
+            threading.Thread(
+                target=self._send_paced_subscriptions,
+                args=(ws, channels, pacer),
+                daemon=True,
+            ).start()
         else:
+            try:
+                for channel in channels:
+                    ws.send(json.dumps({"subscribe": channel}))
+            except Exception as exc:
+                logger.error("Subscription send failed: %s", exc)
+                ws.close()
+                return
+            self._arm_subscription_watchdog(ws)
+        if not self._expected_channels:
             # Clients without managed subscriptions (for example
             # SessionWithUrl) are fully established as soon as the transport
             # opens because no channel acknowledgements will arrive.
@@ -510,42 +1194,73 @@ class _MistWebsocket:
             except Exception:
                 logger.exception("on_open callback raised")
 
-    def _handle_message(self, ws: websocket.WebSocketApp, message: str | bytes) -> None:
-        if isinstance(message, bytes):
-            message = message.replace(b"\x00", b"").decode("utf-8", errors="replace")
+    def _send_paced_subscriptions(
+        self,
+        ws: websocket.WebSocketApp,
+        channels: list[str],
+        pacer: _SubscriptionPacer,
+    ) -> None:
+        """Send the subscription frames paced by `pacer`, then arm the watchdog"""
+        sent = 0
         try:
-            data = json.loads(message)
-        except (json.JSONDecodeError, TypeError):
-            data = {"raw": message}
-        if not isinstance(data, dict):
-            data = {"data": data}
+            while not self._paced_subscriptions_done(channels, sent):
+                for batch in pacer.batches(channels, sent):
+                    if sent and not self._wait_next_batch(ws, pacer, sent):
+                        return
+                    for channel in batch:
+                        ws.send(json.dumps({"subscribe": channel}))
+                    sent += len(batch)
+        except Exception as exc:
+            logger.error("Subscription send failed: %s", exc)
+            ws.close()
+            return
+        if pacer.slowdowns:
+            logger.info(
+                "Subscription frames sent; pacing reduced %d time(s)",
+                pacer.slowdowns,
+            )
+        if self._is_subscribing(ws):
+            self._arm_subscription_watchdog(ws)
 
+    def _wait_next_batch(
+        self, ws: websocket.WebSocketApp, pacer: _SubscriptionPacer, sent: int
+    ) -> bool:
+        """
+        Wait until the next subscription batch can be sent. Return False if
+        the connection was closed meanwhile, or the acknowledgements did not
+        arrive within the subscription watchdog timeout.
+        """
+        waiting_since: float | None = None
+        while not self._user_disconnect.is_set() and self._is_subscribing(ws):
+            delay = pacer.next_delay(sent, self._acknowledged_count())
+            if delay is not None:
+                if self._user_disconnect.wait(delay):
+                    return False
+                return self._is_subscribing(ws)
+            if waiting_since is None:
+                waiting_since = time.monotonic()
+                self._log_pacing_slowdown(pacer, sent)
+            elif time.monotonic() - waiting_since > self._subscription_watchdog_timeout:
+                self._subscription_timeout(ws)
+                return False
+            self._user_disconnect.wait(ACK_POLL_INTERVAL)
+        return False
+
+    def _handle_message(self, ws: websocket.WebSocketApp, message: str | bytes) -> None:
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write(message)
+        data = self._parse_message(message)
+        self._stats.record_message(data, _frame_size(message))
         self._process_subscription_event(ws, data)
 
-        if self._on_message_cb:
+        if self._on_message_cb or self._on_batch_cb:
             self._start_callback_worker()
             self._enqueue_message(data, to_callback_queue=True)
             return
 
         self._enqueue_message(data, to_callback_queue=False)
 
-    def _handle_error(self, _ws: websocket.WebSocketApp, error: Exception) -> None:
-        status_code = self._extract_status_code(error)
-        self._last_http_status = status_code
-        if status_code == 429:
-            logger.warning(
-                "WebSocket received HTTP 429 (rate limit). "
-                "Reconnect backoff will be raised to at least %.1fs",
-                self._rate_limit_backoff,
-            )
-        else:
-            logger.error("WebSocket error: %s", error)
-        if self._on_error_cb:
-            try:
-                self._on_error_cb(error)
-            except Exception:
-                logger.exception("on_error callback raised")
-
     def _handle_ping(
         self, _ws: websocket.WebSocketApp, message: str | bytes | None
     ) -> None:
@@ -566,30 +1281,13 @@ class _MistWebsocket:
             except Exception:
                 logger.exception("on_pong callback raised")
 
-    def _handle_close(
-        self,
-        _ws: websocket.WebSocketApp,
-        close_status_code: int | None,
-        close_msg: str | None,
-    ) -> None:
-        self._connected.clear()
-        self._cancel_subscription_watchdog()
-        if close_status_code is not None:
-            self._last_close_code = close_status_code
-        if close_msg not in (None, ""):
-            self._last_close_msg = close_msg
-        logger.info(
-            "WebSocket closed. code=%s message=%s",
-            self._last_close_code,
-            self._last_close_msg,
-        )
-
     # ------------------------------------------------------------------
     # Lifecycle
 
     def _create_ws_app(self) -> websocket.WebSocketApp:
         """Create a new WebSocketApp instance with current auth/URL."""
-        return websocket.WebSocketApp(
+        factory = self._ws_app_factory or websocket.WebSocketApp
+        return factory(
             self._build_ws_url(),
             header=self._get_headers(),
             cookie=self._get_cookie(),
@@ -621,12 +1319,15 @@ class _MistWebsocket:
             self._messages_received = 0
             self._messages_dropped = 0
             self._messages_processed = 0
+            self._stats.reset()
             # Drain stale sentinel from previous connection
             self._drain_queue(self._queue)
             self._drain_queue(self._callback_queue)
+            self._queue.reset_counters()
+            self._callback_queue.reset_counters()
 
             self._ws = self._create_ws_app()
-            if self._on_message_cb:
+            if self._on_message_cb or self._on_batch_cb:
                 self._start_callback_worker()
             if run_in_background:
                 self._thread = threading.Thread(
@@ -659,35 +1360,9 @@ class _MistWebsocket:
                 if self._user_disconnect.is_set() or not self._auto_reconnect:
                     break
 
-                self._reconnect_attempts += 1
-                if (
-                    self._max_reconnect_attempts > 0
-                    and self._reconnect_attempts > self._max_reconnect_attempts
-                ):
-                    logger.warning(
-                        "Max reconnect attempts (%d) reached, giving up",
-                        self._max_reconnect_attempts,
-                    )
+                delay = self._next_reconnect_delay()
+                if delay is None:
                     break
-
-                delay = self._reconnect_backoff * (2 ** (self._reconnect_attempts - 1))
-                if self._max_reconnect_backoff is not None:
-                    delay = min(delay, self._max_reconnect_backoff)
-                if self._last_http_status == 429:
-                    delay = max(delay, self._rate_limit_backoff)
-                if self._max_reconnect_attempts > 0:
-                    logger.info(
-                        "Reconnecting in %.1fs (attempt %d/%d)",
-                        delay,
-                        self._reconnect_attempts,
-                        self._max_reconnect_attempts,
-                    )
-                else:
-                    logger.info(
-                        "Reconnecting in %.1fs (attempt %d, unlimited)",
-                        delay,
-                        self._reconnect_attempts,
-                    )
                 if self._user_disconnect.wait(timeout=delay):
                     break  # disconnect() called during backoff
 
@@ -752,6 +1427,45 @@ class _MistWebsocket:
             if self._callback_thread is not threading.current_thread():
                 self._callback_thread.join(timeout=timeout)
 
+    def _check_no_callback(self, method: str) -> None:
+        for name, callback in (
+            ("on_message", self._on_message_cb),
+            ("on_batch", self._on_batch_cb),
+        ):
+            if callback is not None:
+                raise RuntimeError(
+                    f"{method} cannot be used when an {name} callback is "
+                    "registered; use one or the other"
+                )
+
+    def _wait_for_connection(self) -> bool:
+        """Wait for the first connection; False if receiving should not start"""
+        if self._auto_reconnect:
+            while (
+                not self._connected.is_set()
+                and not self._user_disconnect.is_set()
+                and not self._finished.is_set()
+            ):
+                self._connected.wait(timeout=1)
+            return self._connected.is_set()
+        if not self._connected.wait(timeout=10):
+            # Thread already finished — drain the queued messages
+            return self._finished.is_set()
+        return True
+
+    def _receive_idle_stop(self) -> bool:
+        """Whether receiving should stop after an idle second"""
+        if self._finished.is_set() and self._queue.empty():
+            return True
+        if not self._connected.is_set() and self._queue.empty():
+            # keep waiting while a reconnect is in progress
+            return not (
+                self._auto_reconnect
+                and not self._user_disconnect.is_set()
+                and not self._finished.is_set()
+            )
+        return False
+
     def receive(self) -> Generator[dict, None, None]:
         """
         Blocking generator that yields each incoming message as a dict.
@@ -760,45 +1474,59 @@ class _MistWebsocket:
         the server closes the connection).
 
         Intended for use after connect(run_in_background=True).
-        Cannot be used when an on_message callback is registered.
+        Cannot be used when an on_message or on_batch callback is registered.
         """
-        if self._on_message_cb is not None:
-            raise RuntimeError(
-                "receive() cannot be used when an on_message callback is "
-                "registered; use one or the other"
-            )
-        if self._auto_reconnect:
-            while (
-                not self._connected.is_set()
-                and not self._user_disconnect.is_set()
-                and not self._finished.is_set()
-            ):
-                self._connected.wait(timeout=1)
-            if not self._connected.is_set():
-                return
-        elif not self._connected.wait(timeout=10):
-            if not self._finished.is_set():
-                return
-            # Thread already finished — fall through to drain queued messages
+        self._check_no_callback("receive()")
+        if not self._wait_for_connection():
+            return
         while True:
             try:
                 item = self._queue.get(timeout=1)
             except queue.Empty:
-                if self._finished.is_set() and self._queue.empty():
-                    break
-                if not self._connected.is_set() and self._queue.empty():
-                    if (
-                        self._auto_reconnect
-                        and not self._user_disconnect.is_set()
-                        and not self._finished.is_set()
-                    ):
-                        continue  # reconnect in progress, keep waiting
+                if self._receive_idle_stop():
                     break
                 continue
             if item is None:
                 break
             yield item
 
+    def receive_batches(
+        self, max_items: int = 100, max_latency_ms: float = 100
+    ) -> Generator[list[dict], None, None]:
+        """
+        Blocking generator that yields the incoming messages as lists of
+        dicts. A batch is yielded once it holds `max_items` messages, or
+        `max_latency_ms` after its first message.
+
+        Exits cleanly when the connection closes (disconnect() is called or
+        the server closes the connection).
+
+        Intended for use after connect(run_in_background=True).
+        Cannot be used when an on_message or on_batch callback is registered.
+
+        PARAMS
+        -----------
+        max_items : int, default 100
+            Maximum number of messages per batch
+        max_latency_ms : float, default 100
+            Maximum time in milliseconds to wait for more messages once the
+            first message of a batch is received
+        """
+        self._check_batch_settings(max_items, max_latency_ms)
+        self._check_no_callback("receive_batches()")
+        if not self._wait_for_connection():
+            return
+        while True:
+            batch, ended = self._get_batch(
+                self._queue, max_items, max_latency_ms / 1000
+            )
+            if batch:
+                yield batch
+            if ended:
+                break
+            if not batch and self._receive_idle_stop():
+                break
+
     # ------------------------------------------------------------------
     # Context manager
 
@@ -12,6 +12,7 @@ WebSocket channel for Location events.
 """
 
 from mistapi import APISession
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
 from mistapi.websockets.__ws_client import _MistWebsocket
 
 
@@ -547,3 +548,292 @@ class DiscoveredBleAssetsEvents(_MistWebsocket):
             rate_limit_backoff=rate_limit_backoff,
             throughput_log_interval=throughput_log_interval,
         )
+
+
+class AsyncBleAssetsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for location BLE assets events.
+
+    Asyncio version of ``BleAssetsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncBleAssetsEvents(
+            session, site_id="abc123", map_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        map_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/maps/{mid}/assets" for mid in map_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncConnectedClientsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for location connected clients events.
+
+    Asyncio version of ``ConnectedClientsEvents``, taking the same parameters.
+    The connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncConnectedClientsEvents(
+            session, site_id="abc123", map_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        map_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/maps/{mid}/clients" for mid in map_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncSdkClientsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for location SDK clients events.
+
+    Asyncio version of ``SdkClientsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncSdkClientsEvents(
+            session, site_id="abc123", map_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        map_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/maps/{mid}/sdkclients" for mid in map_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncUnconnectedClientsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for location unconnected clients events.
+
+    Asyncio version of ``UnconnectedClientsEvents``, taking the same parameters.
+    The connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncUnconnectedClientsEvents(
+            session, site_id="abc123", map_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        map_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [
+            f"/sites/{site_id}/stats/maps/{mid}/unconnected_clients" for mid in map_ids
+        ]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncDiscoveredBleAssetsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for location discovered BLE assets events.
+
+    Asyncio version of ``DiscoveredBleAssetsEvents``, taking the same
+    parameters. The connection runs in an asyncio task of the running event
+    loop, and the messages are delivered with ``async for``. Requires the
+    ``websockets`` package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncDiscoveredBleAssetsEvents(
+            session, site_id="abc123", map_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        map_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [
+            f"/sites/{site_id}/stats/maps/{mid}/discovered_assets" for mid in map_ids
+        ]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
@@ -0,0 +1,486 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module provides the metrics of the WebSocket clients, returned by their
+`stats()` method, and their export to Prometheus and OpenTelemetry:
+
+    stats = ws.stats()
+    print(stats["channels"]["/sites/{site_id}/stats/devices"]["rate"])
+
+    # Prometheus text exposition format, e.g. for a /metrics endpoint
+    body = mistapi.websockets.metrics.to_prometheus(stats)
+
+    # OpenTelemetry observable instruments, read at each collection
+    mistapi.websockets.metrics.register_opentelemetry(ws)
+
+The OpenTelemetry export requires the `opentelemetry-api` package
+(`pip install mistapi[otel]`).
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Upper bounds (seconds) of the callback latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Payload fields holding the time of the event, in this order. The values
+# are epoch timestamps in seconds or milliseconds.
+TIMESTAMP_FIELDS = ("timestamp", "last_seen")
+
+
+def _payload_timestamp(payload: Any) -> float | None:
+    for field in TIMESTAMP_FIELDS:
+        if isinstance(payload, dict):
+            value = payload.get(field)
+        else:
+            value = getattr(payload, field, None)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if value > 1e11:  # milliseconds
+                return value / 1000
+            return float(value)
+    return None
+
+
+def _frame_size(frame: str | bytes) -> int:
+    """Size in bytes of a WebSocket frame (the text frames are UTF-8)"""
+    if isinstance(frame, str) and not frame.isascii():
+        return len(frame.encode("utf-8"))
+    return len(frame)
+
+
+class _ChannelMetrics:
+    """Counters of the messages received on a channel"""
+
+    __slots__ = ("bytes", "lag_count", "lag_last", "lag_max", "lag_sum", "messages")
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+        self.lag_count = 0
+        self.lag_sum = 0.0
+        self.lag_max = 0.0
+        self.lag_last: float | None = None
+
+
+class _StreamStats:
+    """
+    Thread safe recorder of the metrics of a WebSocket client, reset by each
+    connect()
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._started = time.monotonic()
+            self._opens = 0
+            self._opened_at: float | None = None
+            self._subscription_time: float | None = None
+            self._queue_high_water: dict[str, int] = {}
+            self._latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+            self._latency_sum = 0.0
+            self._latency_count = 0
+            self._channels: dict[str, _ChannelMetrics] = {}
+
+    # ------------------------------------------------------------------
+    # Recording
+
+    def record_open(self) -> None:
+        with self._lock:
+            self._opens += 1
+            self._opened_at = time.monotonic()
+
+    def record_subscribed(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                self._subscription_time = time.monotonic() - self._opened_at
+
+    def record_message(self, message: dict, size: int) -> None:
+        """
+        Only called by the thread (or task) receiving the messages of the
+        client, so the channel counters are updated without lock; the lock
+        is only taken to add a channel.
+        """
+        channel = message.get("channel")
+        if not isinstance(channel, str):
+            return  # subscription events without channel, errors, ...
+        metrics = self._channels.get(channel)
+        if metrics is None:
+            with self._lock:
+                metrics = self._channels.setdefault(channel, _ChannelMetrics())
+        metrics.messages += 1
+        metrics.bytes += size
+        timestamp = _payload_timestamp(message.get("data"))
+        if timestamp is not None:
+            lag = time.time() - timestamp
+            metrics.lag_count += 1
+            metrics.lag_sum += lag
+            metrics.lag_last = lag
+            metrics.lag_max = max(metrics.lag_max, lag)
+
+    def record_queue_depth(self, name: str, depth: int) -> None:
+        # unlocked fast path: the high-water mark only grows
+        if depth <= self._queue_high_water.get(name, 0):
+            return
+        with self._lock:
+            if depth > self._queue_high_water.get(name, 0):
+                self._queue_high_water[name] = depth
+
+    def record_callback(self, duration: float) -> None:
+        index = bisect.bisect_left(LATENCY_BUCKETS, duration)
+        with self._lock:
+            self._latency_buckets[index] += 1
+            self._latency_sum += duration
+            self._latency_count += 1
+
+    # ------------------------------------------------------------------
+    # Snapshot
+
+    def snapshot(self, **counters: Any) -> dict[str, Any]:
+        """
+        Return the metrics as a dict (see _MistWebsocketBase.stats()), with
+        the additional global `counters`
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(
+                (*LATENCY_BUCKETS, float("inf")), self._latency_buckets
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+            channels = {}
+            for channel, metrics in self._channels.items():
+                messages = metrics.messages
+                lag_count = metrics.lag_count
+                lag_sum = metrics.lag_sum
+                channels[channel] = {
+                    "messages": messages,
+                    "bytes": metrics.bytes,
+                    "rate": messages / uptime if uptime else 0.0,
+                    "lag": {
+                        "count": lag_count,
+                        "sum": lag_sum,
+                        "avg": lag_sum / lag_count if lag_count else None,
+                        "max": metrics.lag_max if lag_count else None,
+                        "last": metrics.lag_last,
+                    },
+                }
+            return {
+                "uptime": uptime,
+                **counters,
+                "bytes_received": sum(c["bytes"] for c in channels.values()),
+                "reconnects": max(self._opens - 1, 0),
+                "subscription_time": self._subscription_time,
+                "queue_high_water": dict(self._queue_high_water),
+                "callback_latency": {
+                    "count": self._latency_count,
+                    "sum": self._latency_sum,
+                    "buckets": buckets,
+                },
+                "channels": channels,
+            }
+
+
+def merge_stats(snapshots: list[dict[str, Any]], **counters: Any) -> dict[str, Any]:
+    """
+    Merge the stats() of several clients (e.g. the shards of a
+    ShardedStream) into a single dict of the same structure.
+
+    PARAMS
+    -----------
+    snapshots : list[dict]
+        results of the clients stats()
+    **counters
+        values replacing the merged global counters
+
+    RETURN
+    -----------
+    dict
+        merged stats
+    """
+    merged: dict[str, Any] = {
+        "uptime": max((s["uptime"] for s in snapshots), default=0.0),
+        "messages_received": 0,
+        "messages_dropped": 0,
+        "messages_processed": 0,
+        "bytes_received": 0,
+        "reconnects": 0,
+        "subscription_time": None,
+        "queue_high_water": {},
+        "callback_latency": {
+            "count": 0,
+            "sum": 0.0,
+            "buckets": dict.fromkeys((*LATENCY_BUCKETS, float("inf")), 0),
+        },
+        "channels": {},
+    }
+    for snapshot in snapshots:
+        for counter in (
+            "messages_received",
+            "messages_dropped",
+            "messages_processed",
+            "bytes_received",
+            "reconnects",
+        ):
+            merged[counter] += snapshot.get(counter, 0)
+        if snapshot["subscription_time"] is not None:
+            merged["subscription_time"] = max(
+                merged["subscription_time"] or 0.0, snapshot["subscription_time"]
+            )
+        for name, depth in snapshot["queue_high_water"].items():
+            merged["queue_high_water"][name] = max(
+                merged["queue_high_water"].get(name, 0), depth
+            )
+        latency = snapshot["callback_latency"]
+        merged["callback_latency"]["count"] += latency["count"]
+        merged["callback_latency"]["sum"] += latency["sum"]
+        for bound, count in latency["buckets"].items():
+            merged["callback_latency"]["buckets"][bound] += count
+        merged["channels"].update(snapshot["channels"])
+    merged.update(counters)
+    return merged
+
+
+# ------------------------------------------------------------------
+# Prometheus
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def to_prometheus(
+    stats: dict[str, Any], prefix: str = "mistapi_ws", labels: dict | None = None
+) -> str:
+    """
+    Format the result of stats() in the Prometheus text exposition format.
+
+    PARAMS
+    -----------
+    stats : dict
+        result of the stats() method of a WebSocket client
+    prefix : str, default "mistapi_ws"
+        prefix of the metric names
+    labels : dict, default None
+        labels added to every sample, e.g. {"stream": "device_stats"} to
+        tell several clients apart
+
+    RETURN
+    -----------
+    str
+        metrics in the Prometheus text format
+    """
+    labels = dict(labels or {})
+    lines: list[str] = []
+
+    def _metric(name: str, metric_type: str, help_text: str) -> str:
+        full_name = f"{prefix}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        return full_name
+
+    def _sample(name: str, value: Any, extra: dict | None = None) -> None:
+        sample_labels = {**labels, **(extra or {})}
+        lines.append(f"{name}{_format_labels(sample_labels)} {float(value)!r}")
+
+    for counter, help_text in (
+        ("messages_received", "Messages received from the Mist Cloud"),
+        ("messages_dropped", "Messages dropped because a queue was full"),
+        ("messages_processed", "Messages delivered to the on_message callback"),
+        ("reconnects", "Reconnections since connect()"),
+    ):
+        if counter in stats:
+            _sample(_metric(f"{counter}_total", "counter", help_text), stats[counter])
+
+    if stats.get("subscription_time") is not None:
+        name = _metric(
+            "subscription_seconds",
+            "gauge",
+            "Time to receive all the channel subscription acknowledgements",
+        )
+        _sample(name, stats["subscription_time"])
+
+    if stats.get("queue_high_water"):
+        name = _metric("queue_high_water", "gauge", "Highest number of queued messages")
+        for queue_name, depth in stats["queue_high_water"].items():
+            _sample(name, depth, {"queue": queue_name})
+
+    latency = stats.get("callback_latency")
+    if latency and latency["count"]:
+        name = _metric(
+            "callback_latency_seconds", "histogram", "Duration of the callbacks"
+        )
+        for bound, count in latency["buckets"].items():
+            _sample(f"{name}_bucket", count, {"le": _format_bound(bound)})
+        _sample(f"{name}_sum", latency["sum"])
+        _sample(f"{name}_count", latency["count"])
+
+    channels = stats.get("channels") or {}
+    if channels:
+        messages = _metric(
+            "channel_messages_total", "counter", "Messages received per channel"
+        )
+        for channel, metrics in channels.items():
+            _sample(messages, metrics["messages"], {"channel": channel})
+        received = _metric(
+            "channel_bytes_total", "counter", "Bytes received per channel"
+        )
+        for channel, metrics in channels.items():
+            _sample(received, metrics["bytes"], {"channel": channel})
+        rate = _metric(
+            "channel_message_rate",
+            "gauge",
+            "Messages per second received per channel since connect()",
+        )
+        for channel, metrics in channels.items():
+            _sample(rate, metrics["rate"], {"channel": channel})
+        lag = _metric(
+            "channel_lag_seconds",
+            "summary",
+            "Delay between the event timestamp and its reception",
+        )
+        for channel, metrics in channels.items():
+            if metrics["lag"]["count"]:
+                _sample(f"{lag}_sum", metrics["lag"]["sum"], {"channel": channel})
+                _sample(f"{lag}_count", metrics["lag"]["count"], {"channel": channel})
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------------
+# OpenTelemetry
+
+
+def register_opentelemetry(
+    client: Any, meter: Any = None, prefix: str = "mistapi.ws"
+) -> list:
+    """
+    Register OpenTelemetry observable instruments reading the stats() of a
+    WebSocket client at each collection.
+
+    PARAMS
+    -----------
+    client : _MistWebsocket | _AsyncMistWebsocket | ShardedStream
+        WebSocket client
+    meter : opentelemetry.metrics.Meter, default None
+        meter used to create the instruments. Defaults to the meter
+        "mistapi.websockets" of the global MeterProvider
+    prefix : str, default "mistapi.ws"
+        prefix of the instrument names
+
+    RETURN
+    -----------
+    list
+        created instruments
+    """
+    try:
+        from opentelemetry.metrics import CallbackOptions, Observation, get_meter
+    except ImportError as exc:
+        raise ImportError(
+            "The OpenTelemetry export requires the 'opentelemetry-api' package. "
+            "Install it with `pip install mistapi[otel]`"
+        ) from exc
+    if meter is None:
+        meter = get_meter("mistapi.websockets")
+
+    def _observe(
+        read: Callable[[dict], list[tuple[float, dict]]],
+    ) -> Callable[[CallbackOptions], list]:
+        def _callback(_options: CallbackOptions) -> list:
+            return [
+                Observation(value, attributes)
+                for value, attributes in read(client.stats())
+            ]
+
+        return _callback
+
+    def _per_channel(field: str) -> Callable[[dict], list[tuple[float, dict]]]:
+        return lambda stats: [
+            (metrics[field], {"channel": channel})
+            for channel, metrics in stats["channels"].items()
+        ]
+
+    return [
+        meter.create_observable_counter(
+            f"{prefix}.messages_received",
+            callbacks=[_observe(lambda s: [(s["messages_received"], {})])],
+            description="Messages received from the Mist Cloud",
+        ),
+        meter.create_observable_counter(
+            f"{prefix}.messages_dropped",
+            callbacks=[_observe(lambda s: [(s["messages_dropped"], {})])],
+            description="Messages dropped because a queue was full",
+        ),
+        meter.create_observable_counter(
+            f"{prefix}.reconnects",
+            callbacks=[_observe(lambda s: [(s["reconnects"], {})])],
+            description="Reconnections since connect()",
+        ),
+        meter.create_observable_gauge(
+            f"{prefix}.queue_high_water",
+            callbacks=[
+                _observe(
+                    lambda s: [
+                        (depth, {"queue": name})
+                        for name, depth in s["queue_high_water"].items()
+                    ]
+                )
+            ],
+            description="Highest number of queued messages",
+        ),
+        meter.create_observable_counter(
+            f"{prefix}.channel.messages",
+            callbacks=[_observe(_per_channel("messages"))],
+            description="Messages received per channel",
+        ),
+        meter.create_observable_counter(
+            f"{prefix}.channel.bytes",
+            callbacks=[_observe(_per_channel("bytes"))],
+            unit="By",
+            description="Bytes received per channel",
+        ),
+        meter.create_observable_gauge(
+            f"{prefix}.channel.message_rate",
+            callbacks=[_observe(_per_channel("rate"))],
+            unit="1/s",
+            description="Messages per second received per channel since connect()",
+        ),
+        meter.create_observable_gauge(
+            f"{prefix}.channel.lag",
+            callbacks=[
+                _observe(
+                    lambda s: [
+                        (metrics["lag"]["last"], {"channel": channel})
+                        for channel, metrics in s["channels"].items()
+                        if metrics["lag"]["last"] is not None
+                    ]
+                )
+            ],
+            unit="s",
+            description="Delay between the last event timestamp and its reception",
+        ),
+    ]
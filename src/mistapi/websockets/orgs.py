@@ -12,6 +12,7 @@ WebSocket channel for Org events.
 """
 
 from mistapi import APISession
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
 from mistapi.websockets.__ws_client import _MistWebsocket
 
 
@@ -319,3 +320,162 @@ class MxEdgesEvents(_MistWebsocket):
             rate_limit_backoff=rate_limit_backoff,
             throughput_log_interval=throughput_log_interval,
         )
+
+
+class AsyncInsightsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for organization insights events.
+
+    Asyncio version of ``InsightsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncInsightsEvents(session, org_id="abc123") as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        org_id: str,
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        super().__init__(
+            mist_session,
+            channels=[f"/orgs/{org_id}/insights/summary"],
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncMxEdgesStatsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for organization MX edges stats events.
+
+    Asyncio version of ``MxEdgesStatsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncMxEdgesStatsEvents(session, org_id="abc123") as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        org_id: str,
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        super().__init__(
+            mist_session,
+            channels=[f"/orgs/{org_id}/stats/mxedges"],
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncMxEdgesEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for org MX edges events.
+
+    Asyncio version of ``MxEdgesEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncMxEdgesEvents(session, org_id="abc123") as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        org_id: str,
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        super().__init__(
+            mist_session,
+            channels=[f"/orgs/{org_id}/mxedges"],
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
@@ -0,0 +1,329 @@
+"""
+--------------------------------------------------------------------------------
+------------------------- Mist API Python CLI Session --------------------------
+
+    Written by: Thomas Munzer (tmunzer@juniper.net)
+    Github    : https://github.com/tmunzer/mistapi_python
+
+    This package is licensed under the MIT License.
+
+--------------------------------------------------------------------------------
+This module records the raw frames received by a WebSocket client, and replays
+them later into a _MistWebsocket without connecting to the Mist Cloud, e.g. to
+benchmark the receive -> decode -> callback pipeline offline:
+
+    # record
+    recorder = StreamRecorder("devices.mwsr", compress=True)
+    ws = mistapi.websockets.sites.DeviceStatsEvents(apisession, site_ids=[...])
+    ws.set_recorder(recorder)
+    ws.connect()
+    ...
+    ws.disconnect(wait=True)
+    recorder.close()
+
+    # replay, 10 times faster than recorded
+    ws = mistapi.websockets.sites.DeviceStatsEvents(apisession, site_ids=[...])
+    replay_into(ws, "devices.mwsr", speed=10)
+    ws.on_message(print)
+    ws.connect(run_in_background=False)  # returns at the end of the recording
+
+The recording is an append-only file starting with the b"MISTWSR1" header,
+followed by one record per frame: the reception time (float64, epoch seconds),
+the frame type (uint8, 1 = text, 2 = binary) and the frame length (uint32),
+little-endian, then the frame itself. With `compress=True` the file is a
+zstd stream (one zstd frame per recording session), which requires the
+`zstandard` package (`pip install mistapi[zstd]`).
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Generator
+from typing import IO, Any
+
+from mistapi.__logger import logger
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed extras
+    zstandard = None  # type: ignore[assignment]
+
+FILE_HEADER = b"MISTWSR1"
+_RECORD = struct.Struct("<dBI")
+_TEXT = 1
+_BINARY = 2
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ACK_EVENT = "channel_subscribed"
+# Errors of a recording which can't be read, reported through on_error
+_READ_ERRORS: tuple[type[Exception], ...] = (OSError, ValueError, EOFError)
+if zstandard is not None:
+    _READ_ERRORS += (zstandard.ZstdError,)
+
+
+def _is_subscription_ack(frame: str | bytes) -> bool:
+    """True if the frame is a recorded channel_subscribed event"""
+    marker = _ACK_EVENT if isinstance(frame, str) else _ACK_EVENT.encode()
+    if marker not in frame:  # avoid decoding every frame
+        return False
+    try:
+        message = json.loads(frame)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("event") == _ACK_EVENT
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError(
+            "Compressed recordings require the 'zstandard' package. "
+            "Install it with `pip install mistapi[zstd]`"
+        )
+
+
+class StreamRecorder:
+    """
+    Append the raw frames received by one or several WebSocket clients to a
+    recording file. Thread safe.
+
+    PARAMS
+    -----------
+    path : str
+        path of the recording file. The frames are appended if the file
+        already exists.
+    compress : bool, default False
+        compress the recording with zstd. Appending to an uncompressed
+        recording (or the opposite) is not supported.
+    level : int, default 3
+        zstd compression level
+    """
+
+    def __init__(self, path: str, compress: bool = False, level: int = 3) -> None:
+        if compress:
+            _require_zstandard()
+        self._path = path
+        self._lock = threading.Lock()
+        self._frames = 0
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file: IO[bytes] = open(path, "ab")  # noqa: SIM115
+        self._writer: Any = self._file
+        if compress:
+            self._writer = zstandard.ZstdCompressor(level=level).stream_writer(
+                self._file, closefd=False
+            )
+        if new_file:
+            self._writer.write(FILE_HEADER)
+
+    @property
+    def frames(self) -> int:
+        """Number of frames written since the recorder was created"""
+        return self._frames
+
+    def write(self, frame: str | bytes, timestamp: float | None = None) -> None:
+        """
+        Append a frame to the recording.
+
+        PARAMS
+        -----------
+        frame : str | bytes
+            raw WebSocket frame, as received
+        timestamp : float, default None
+            reception time (epoch seconds). Defaults to now
+        """
+        if isinstance(frame, str):
+            data = frame.encode("utf-8")
+            frame_type = _TEXT
+        else:
+            data = frame
+            frame_type = _BINARY
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._writer.write(_RECORD.pack(timestamp, frame_type, len(data)))
+            self._writer.write(data)
+            self._frames += 1
+
+    def close(self) -> None:
+        """Flush and close the recording file"""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._writer is not self._file:
+                self._writer.close()  # ends the zstd frame
+            self._file.close()
+        logger.info("Recorded %d frame(s) in %s", self._frames, self._path)
+
+    def __enter__(self) -> "StreamRecorder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _read_exact(reader: Any, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = reader.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def read_recording(path: str) -> Generator[tuple[float, str | bytes], None, None]:
+    """
+    Read the frames of a recording file, compressed or not. A truncated last
+    record (e.g. the recorder was not closed) is ignored.
+
+    PARAMS
+    -----------
+    path : str
+        path of the recording file
+
+    RETURN
+    -----------
+    Generator
+        (reception time, frame) tuples, in the recording order
+    """
+    with open(path, "rb") as f:
+        reader: Any = f
+        if f.read(4) == _ZSTD_MAGIC:
+            _require_zstandard()
+            f.seek(0)
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                f, read_across_frames=True
+            )
+        else:
+            f.seek(0)
+        if _read_exact(reader, len(FILE_HEADER)) != FILE_HEADER:
+            raise ValueError(f"{path} is not a WebSocket recording")
+        while True:
+            record = _read_exact(reader, _RECORD.size)
+            if len(record) < _RECORD.size:
+                break
+            timestamp, frame_type, length = _RECORD.unpack(record)
+            data = _read_exact(reader, length)
+            if len(data) < length:
+                logger.warning("%s: truncated last frame ignored", path)
+                break
+            yield timestamp, data.decode("utf-8") if frame_type == _TEXT else data
+
+
+class _ReplayWebSocketApp:
+    """
+    Stand-in for websocket.WebSocketApp, created by _MistWebsocket when
+    replay_into() was called. Acknowledges the subscriptions, then delivers
+    the recorded frames to the client handlers, paced by `speed`.
+
+    The recorded subscription acknowledgements are skipped, since the
+    subscriptions of the replaying client are acknowledged on open.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        recording: str,
+        speed: float | None,
+        on_open: Callable | None = None,
+        on_message: Callable | None = None,
+        on_error: Callable | None = None,
+        on_close: Callable | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.url = url
+        self._recording = recording
+        self._speed = speed
+        self._on_open = on_open
+        self._on_message = on_message
+        self._on_error = on_error
+        self._on_close = on_close
+        self._subscribed: list[str] = []
+        self._closed = threading.Event()
+        self._open = threading.Event()
+
+    def send(self, payload: str) -> None:
+        channel = json.loads(payload).get("subscribe")
+        if channel:
+            self._subscribed.append(channel)
+
+    def close(self, **kwargs: Any) -> None:
+        self._closed.set()
+
+    def ready(self) -> bool:
+        """True while the recording is being replayed"""
+        return self._open.is_set() and not self._closed.is_set()
+
+    def _ack_subscriptions(self) -> None:
+        for channel in self._subscribed:
+            self._on_message(  # type: ignore[misc]
+                self, json.dumps({"event": "channel_subscribed", "channel": channel})
+            )
+
+    def run_forever(self, **kwargs: Any) -> bool:
+        close_code, close_msg = 1000, "replay finished"
+        self._open.set()
+        try:
+            if self._on_open:
+                self._on_open(self)
+            self._ack_subscriptions()
+            started = time.monotonic()
+            first: float | None = None
+            for timestamp, frame in read_recording(self._recording):
+                if self._closed.is_set():
+                    close_msg = "closed"
+                    break
+                if _is_subscription_ack(frame):
+                    continue
+                if self._speed:
+                    if first is None:
+                        first = timestamp
+                    delay = (
+                        started + (timestamp - first) / self._speed - time.monotonic()
+                    )
+                    if delay > 0 and self._closed.wait(delay):
+                        close_msg = "closed"
+                        break
+                self._on_message(self, frame)  # type: ignore[misc]
+        except _READ_ERRORS as exc:
+            close_code, close_msg = -1, str(exc)
+            if self._on_error:
+                self._on_error(self, exc)
+        finally:
+            self._open.clear()
+        if self._on_close:
+            self._on_close(self, close_code, close_msg)
+        return False
+
+
+def replay_into(ws: Any, recording: str | None, speed: float | None = 1.0) -> None:
+    """
+    Make a WebSocket client replay a recording instead of connecting to the
+    Mist Cloud. The replay starts with connect(); at the end of the
+    recording the connection is closed with the code 1000 (with
+    auto_reconnect=True, the recording is replayed again).
+
+    PARAMS
+    -----------
+    ws : _MistWebsocket
+        WebSocket client (e.g. mistapi.websockets.sites.DeviceStatsEvents)
+    recording : str
+        path of the recording file. None restores the Mist Cloud connection
+    speed : float, default 1.0
+        replay speed: 1.0 replays at the recorded pace, 10.0 ten times
+        faster. None or 0 replays as fast as possible
+    """
+    if speed is not None and speed < 0:
+        raise ValueError("speed must be >= 0")
+    if recording is None:
+        ws._ws_app_factory = None
+        return
+    if not os.path.exists(recording):
+        raise ValueError(f"recording {recording} not found")
+
+    def _factory(url: str, **kwargs: Any) -> _ReplayWebSocketApp:
+        return _ReplayWebSocketApp(url, recording=recording, speed=speed, **kwargs)
+
+    ws._ws_app_factory = _factory
@@ -12,6 +12,7 @@ WebSocket channel for Site events.
 """
 
 from mistapi import APISession
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
 from mistapi.websockets.__ws_client import _MistWebsocket
 
 
@@ -745,3 +746,386 @@ class PcapEvents(_MistWebsocket):
             rate_limit_backoff=rate_limit_backoff,
             throughput_log_interval=throughput_log_interval,
         )
+
+
+class AsyncClientsStatsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site clients stats events.
+
+    Asyncio version of ``ClientsStatsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncClientsStatsEvents(session, site_ids=["abc123"]) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/clients" for site_id in site_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncDeviceCmdEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site device command events.
+
+    Asyncio version of ``DeviceCmdEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncDeviceCmdEvents(
+            session, site_id="abc123", device_ids=["def456"]
+        ) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        device_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [
+            f"/sites/{site_id}/devices/{device_id}/cmd" for device_id in device_ids
+        ]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncDeviceStatsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site device stats events.
+
+    Asyncio version of ``DeviceStatsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncDeviceStatsEvents(session, site_ids=["abc123"]) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/devices" for site_id in site_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncDeviceEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site device events.
+
+    Asyncio version of ``DeviceEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncDeviceEvents(session, site_ids=["abc123"]) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/devices" for site_id in site_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncMxEdgesStatsEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site MX edges stats events.
+
+    Asyncio version of ``MxEdgesStatsEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncMxEdgesStatsEvents(session, site_ids=["abc123"]) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/stats/mxedges" for site_id in site_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncMxEdgesEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site MX edges events.
+
+    Asyncio version of ``MxEdgesEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncMxEdgesEvents(session, site_ids=["abc123"]) as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_ids: list[str],
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/mxedges" for site_id in site_ids]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
+
+
+class AsyncPcapEvents(_AsyncMistWebsocket):
+    """Asyncio WebSocket stream for site PCAP events.
+
+    Asyncio version of ``PcapEvents``, taking the same parameters. The
+    connection runs in an asyncio task of the running event loop, and the
+    messages are delivered with ``async for``. Requires the ``websockets``
+    package (``pip install mistapi[async]``).
+
+    ``set_backpressure()`` and ``on_batch()`` are not supported (TypeError):
+    the messages are dropped when the queue is full, and
+    ``receive_batches()`` delivers them in batches.
+
+    EXAMPLE
+    -----------
+    ::
+
+        async with AsyncPcapEvents(session, site_id="abc123") as ws:
+            await ws.connect()
+            async for msg in ws:
+                process(msg)
+    """
+
+    def __init__(
+        self,
+        mist_session: APISession,
+        site_id: str,
+        ping_interval: int = 60,
+        ping_timeout: int | None = None,
+        auto_reconnect: bool = False,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 2.0,
+        max_reconnect_backoff: float | None = None,
+        queue_maxsize: int = 0,
+        subscription_watchdog_timeout: float = 10.0,
+        rate_limit_backoff: float = 30.0,
+        throughput_log_interval: int = 100,
+    ) -> None:
+        channels = [f"/sites/{site_id}/pcaps"]
+        super().__init__(
+            mist_session,
+            channels=channels,
+            ping_interval=ping_interval,
+            ping_timeout=ping_timeout,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+            max_reconnect_backoff=max_reconnect_backoff,
+            queue_maxsize=queue_maxsize,
+            subscription_watchdog_timeout=subscription_watchdog_timeout,
+            rate_limit_backoff=rate_limit_backoff,
+            throughput_log_interval=throughput_log_interval,
+        )
@@ -8,13 +8,17 @@ retry wrapper, and each HTTP-method convenience function.
 """
 
 import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 from requests.exceptions import HTTPError
 
-from mistapi.__api_request import APIRequest
+from mistapi.__api_request import APIRequest, _MistHTTPAdapter, _TokenBucket
 from mistapi.__api_response import APIResponse
 
 
@@ -169,6 +173,510 @@ class TestNextApiToken:
         assert req._apitoken_index == 0
 
 
+class TestTokenBucket:
+    """_TokenBucket paces reservations to the configured rate."""
+
+    @patch("mistapi.__api_request.time.monotonic")
+    def test_burst_then_wait(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        bucket = _TokenBucket(rate=2.0, capacity=2)
+
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    @patch("mistapi.__api_request.time.monotonic")
+    def test_refill_capped_at_capacity(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        bucket = _TokenBucket(rate=1.0, capacity=3)
+        bucket.reserve()
+        mock_monotonic.return_value = 1000.0
+
+        assert bucket.available() == 3
+
+    @patch("mistapi.__api_request.time.monotonic")
+    def test_drain(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        bucket = _TokenBucket(rate=1.0, capacity=3)
+        bucket.drain()
+
+        assert bucket.available() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+
+class TestRateLimiter:
+    """Client-side rate limiting and budget-based token selection."""
+
+    TOKENS = (
+        "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa1",
+        "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb2",
+    )
+
+    def test_disabled_by_default(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        assert req._reserve_rate_limit() == (None, 0.0)
+        assert req.get_rate_limit_budget() == {}
+
+    def test_invalid_values(self):
+        req = _make_api_request()
+        with pytest.raises(ValueError):
+            req.set_rate_limit(-1)
+        with pytest.raises(ValueError):
+            req.set_rate_limit(100, burst=0)
+
+    def test_default_burst_is_one_minute(self):
+        req = _make_api_request(tokens=self.TOKENS[:1])
+        req.set_rate_limit(6000)
+        assert req._rate_limit_burst == 100
+        assert list(req.get_rate_limit_budget().values()) == [100]
+
+    def test_picks_token_with_most_budget(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        req.set_rate_limit(3600, burst=2)
+
+        assert [req._reserve_rate_limit()[1] for _ in range(4)] == [0.0] * 4
+        budget = req.get_rate_limit_budget()
+
+        assert sorted(budget.values()) == [0, 0]
+        assert set(budget) == {"aaaa...aaa1", "bbbb...bbb2"}
+
+    def test_waits_when_all_tokens_exhausted(self):
+        req = _make_api_request(tokens=self.TOKENS[:1])
+        req.set_rate_limit(3600, burst=1)
+
+        assert req._reserve_rate_limit() == (0, 0.0)
+        assert req._reserve_rate_limit()[1] == pytest.approx(1.0, abs=0.01)
+
+    def test_login_session_budget(self):
+        req = _make_api_request()
+        req.set_rate_limit(3600, burst=5)
+        req._reserve_rate_limit()
+        assert req.get_rate_limit_budget() == {"session": 4}
+
+    def test_rotation_prefers_token_with_budget(self):
+        tokens = [*self.TOKENS, "cccccccccccccccccccccccccccccccccccccccc3"]
+        req = _make_api_request(tokens=tokens)
+        req.set_rate_limit(3600, burst=2)
+        req._get_rate_limit_bucket(1).drain()
+
+        req._next_apitoken()
+
+        assert req._apitoken_index == 2
+        assert req._session.headers["Authorization"] == "Token " + tokens[2]
+        assert req._get_rate_limit_bucket(0).available() < 1
+
+    @patch("mistapi.__api_request.time.sleep")
+    def test_request_waits_for_budget(self, mock_sleep):
+        req = _make_api_request(tokens=self.TOKENS[:1])
+        req.set_rate_limit(3600, burst=1)
+        req._session.get.return_value = _mock_response()
+
+        req.mist_get("/api/v1/self")
+        mock_sleep.assert_not_called()
+        req.mist_get("/api/v1/self")
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args.args[0] == pytest.approx(1.0, abs=0.01)
+
+    @patch("mistapi.__api_request.time.sleep")
+    def test_request_sent_with_reserved_token(self, mock_sleep):
+        req = _make_api_request(tokens=self.TOKENS)
+        req.set_rate_limit(3600, burst=1)
+        req._get_rate_limit_bucket(0).drain()
+        req._get_rate_limit_bucket(1).drain()
+        req._get_rate_limit_bucket(1).reserve()
+        req._session.get.return_value = _mock_response()
+
+        def _sleep(delay):
+            if mock_sleep.call_count > 1:
+                return
+            # while the first request waits for the budget of token 0, another
+            # thread switches to token 1
+            req._get_rate_limit_bucket(0).reserve()
+            other = threading.Thread(target=req.mist_get, args=("/api/v1/other",))
+            other.start()
+            other.join()
+
+        mock_sleep.side_effect = _sleep
+        req.mist_get("/api/v1/self")
+
+        sent = {
+            call.args[0].rsplit("/", 1)[-1]: call.kwargs["headers"]["Authorization"]
+            for call in req._session.get.call_args_list
+        }
+        assert req._apitoken_index == 1
+        assert sent == {
+            "other": "Token " + self.TOKENS[1],
+            "self": "Token " + self.TOKENS[0],
+        }
+
+    def test_disable(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        req.set_rate_limit(3600)
+        req.set_rate_limit(None)
+        assert req.get_rate_limit_budget() == {}
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool:
+    """HTTP connection pool configuration and connection reuse metrics."""
+
+    def test_default_adapter_mounted(self):
+        req = _make_api_request()
+        adapter = req._http_adapter
+        assert isinstance(adapter, _MistHTTPAdapter)
+        assert adapter._pool_maxsize == 10
+        assert adapter.max_retries.total == 0
+        req._session.mount.assert_any_call("https://", adapter)
+
+    def test_tcp_keepalive_socket_options(self):
+        req = _make_api_request()
+        assert (
+            socket.SOL_SOCKET,
+            socket.SO_KEEPALIVE,
+            1,
+        ) in req._http_adapter._socket_options
+        req.set_connection_pool(tcp_keepalive=False)
+        assert req._http_adapter._socket_options is None
+
+    def test_set_connection_pool(self):
+        req = _make_api_request()
+        req.set_connection_pool(
+            pool_connections=4, pool_maxsize=32, pool_block=True, connection_retries=2
+        )
+        adapter = req._http_adapter
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+        assert adapter.max_retries.connect == 2
+        assert adapter.max_retries.read == 2
+        assert adapter.max_retries.status == 0
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_invalid_values(self):
+        req = _make_api_request()
+        with pytest.raises(ValueError):
+            req.set_connection_pool(pool_connections=0)
+        with pytest.raises(ValueError):
+            req.set_connection_pool(pool_maxsize=0)
+        with pytest.raises(ValueError):
+            req.set_connection_pool(connection_retries=-1)
+
+    def test_connection_stats_empty(self):
+        req = _make_api_request()
+        assert req.get_connection_stats() == {
+            "pools": 0,
+            "connections_created": 0,
+            "requests": 0,
+            "connections_reused": 0,
+        }
+
+    def test_connections_reused_with_local_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            req = APIRequest()
+            url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/self"
+            for _ in range(5):
+                assert req._session.get(url).json() == {"ok": True}
+            stats = req.get_connection_stats()
+            req._session.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert stats == {
+            "pools": 1,
+            "connections_created": 1,
+            "requests": 5,
+            "connections_reused": 4,
+        }
+
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    """Stub Mist Cloud: HTTP 429 for the first API Token, HTTP 200 otherwise."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        auth = self.headers.get("Authorization", "")
+        self.server.seen_auth.append(auth)
+        if auth == self.server.limited_auth:
+            status, body = 429, b"{}"
+        else:
+            status, body = 200, json.dumps({"auth": auth}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestThreadSafety:
+    """Concurrent use of one APIRequest from a worker pool."""
+
+    TOKENS = (
+        "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa1",
+        "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb2",
+        "cccccccccccccccccccccccccccccccccccccccc3",
+    )
+
+    def test_auth_snapshot_is_a_copy(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        index, headers = req._auth_snapshot()
+
+        req._next_apitoken()
+
+        assert index == 0
+        assert headers == {"Authorization": "Token " + self.TOKENS[0]}
+        assert req._auth_snapshot() == (1, {"Authorization": "Token " + self.TOKENS[1]})
+
+    def test_request_sends_snapshot_headers(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        req._session.headers["X-CSRFToken"] = "csrf"
+        req._session.get.return_value = _mock_response()
+
+        req.mist_get("/api/v1/self")
+
+        assert req._session.get.call_args.kwargs["headers"] == {
+            "Authorization": "Token " + self.TOKENS[0],
+            "X-CSRFToken": "csrf",
+        }
+
+    def test_stale_rotation_is_ignored(self):
+        req = _make_api_request(tokens=self.TOKENS)
+        req._next_apitoken(0)
+        # a second request rate limited with the first token must not rotate again
+        req._next_apitoken(0)
+        assert req._apitoken_index == 1
+        assert req._session.headers["Authorization"] == "Token " + self.TOKENS[1]
+
+    def test_csrftoken_synced_from_response_cookies(self):
+        req = _make_api_request()
+        req._csrf_cookie = "csrftoken"
+        req._session.headers["X-CSRFToken"] = "old"
+        resp = _mock_response()
+        resp.cookies = {"csrftoken": "new"}
+        req._session.get.return_value = resp
+
+        req.mist_get("/api/v1/self")
+
+        assert req._session.headers["X-CSRFToken"] == "new"
+
+    def test_concurrent_requests_with_token_rotation(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedHandler)
+        server.daemon_threads = True
+        server.seen_auth = []
+        server.limited_auth = "Token " + self.TOKENS[0]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            req = APIRequest()
+            req._apitoken = list(self.TOKENS[:2])
+            req._set_apitoken_index(0)
+            req.set_connection_pool(pool_maxsize=32)
+            port = server.server_address[1]
+            req._url = lambda uri: f"http://127.0.0.1:{port}{uri}"
+
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                results = list(
+                    executor.map(
+                        lambda i: req.mist_get(f"/api/v1/sites/{i}"), range(300)
+                    )
+                )
+            req._session.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [r.status_code for r in results] == [200] * 300
+        assert {r.data["auth"] for r in results} == {"Token " + self.TOKENS[1]}
+        # concurrent 429s rotate only once, instead of cycling back to token 0
+        assert req._apitoken_index == 1
+        assert req.get_request_count() == 300
+        assert len(server.seen_auth) <= 300 + 32
+
+
+class TestResponseCache:
+    """Opt-in cache of the GET responses in mist_get()."""
+
+    WLANS = "/api/v1/orgs/o1/wlans"
+
+    def test_disabled_by_default(self):
+        req = _make_api_request()
+        req._session.get.return_value = _mock_response(json_data=[])
+        req.mist_get(self.WLANS)
+        req.mist_get(self.WLANS)
+        assert req._session.get.call_count == 2
+        assert req.get_cache_stats() == {}
+
+    def test_fresh_response_served_from_cache(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=60)
+        req._session.get.return_value = _mock_response(json_data=[{"id": "w1"}])
+
+        first = req.mist_get(self.WLANS, query={"limit": "100"})
+        second = req.mist_get(self.WLANS, query={"limit": "100"})
+        other_query = req.mist_get(self.WLANS, query={"limit": "10"})
+
+        assert second.data == first.data == [{"id": "w1"}]
+        assert second.status_code == 200
+        assert other_query.data == [{"id": "w1"}]
+        assert req._session.get.call_count == 2
+        assert req.get_request_count() == 2
+        assert req.get_cache_stats()["hits"] == 1
+
+    def test_expired_response_revalidated_with_etag(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=0)
+        req._session.get.side_effect = [
+            _mock_response(json_data=[{"id": "w1"}], headers={"ETag": '"v1"'}),
+            _mock_response(status_code=304),
+        ]
+
+        req.mist_get(self.WLANS)
+        result = req.mist_get(self.WLANS)
+
+        assert result.status_code == 200
+        assert result.data == [{"id": "w1"}]
+        assert req._session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert req.get_cache_stats()["revalidated"] == 1
+
+    def test_expired_response_without_validator_is_requested_again(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=0)
+        req._session.get.side_effect = [
+            _mock_response(json_data=[1]),
+            _mock_response(json_data=[2]),
+        ]
+
+        req.mist_get(self.WLANS)
+        result = req.mist_get(self.WLANS)
+
+        assert result.data == [2]
+        assert req._session.get.call_args.kwargs["headers"] == {}
+
+    def test_errors_are_not_cached(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=60)
+        req._session.get.return_value = _mock_response(
+            status_code=404,
+            raise_for_status_effect=HTTPError(response=Mock(status_code=404)),
+        )
+        req.mist_get(self.WLANS)
+        req.mist_get(self.WLANS)
+        assert req._session.get.call_count == 2
+
+    def test_write_invalidates_resource_and_collection(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=60)
+        req._session.get.return_value = _mock_response(json_data=[])
+        req._session.put.return_value = _mock_response()
+        req.mist_get(self.WLANS)
+        req.mist_get(self.WLANS + "/w1")
+
+        req.mist_put(self.WLANS + "/w1", body={"ssid": "new"})
+        req.mist_get(self.WLANS)
+        req.mist_get(self.WLANS + "/w1")
+
+        assert req._session.get.call_count == 4
+
+    def test_cookies_are_not_cached(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=60)
+        headers = {"Set-Cookie": "sessionid=secret", "X-Page-Total": "0"}
+        req._session.get.return_value = _mock_response(json_data=[], headers=headers)
+        req.mist_get(self.WLANS)
+        entry = req._response_cache.get(
+            req._cache_key("https://api.mist.com" + self.WLANS, {})
+        )
+        assert entry.headers == {"X-Page-Total": "0"}
+
+    def test_responses_not_shared_between_tokens(self, tmp_path):
+        path = str(tmp_path / "c.db")
+        first = _make_api_request(tokens=["token_org_1"])
+        first.enable_cache(ttl=60, backend="sqlite", path=path)
+        first._session.get.return_value = _mock_response(
+            json_data=[{"id": "w1"}], headers={"ETag": '"v1"'}
+        )
+        first.mist_get(self.WLANS)
+
+        # another token (or another run with another token) sharing the file
+        second = _make_api_request(tokens=["token_org_2"])
+        second.enable_cache(ttl=60, backend="sqlite", path=path)
+        second._session.get.return_value = _mock_response(json_data=[{"id": "w2"}])
+        assert second.mist_get(self.WLANS).data == [{"id": "w2"}]
+        # no revalidation of the response cached for the other token
+        assert second._session.get.call_args.kwargs["headers"] == {
+            "Authorization": "Token token_org_2"
+        }
+        assert first.mist_get(self.WLANS).data == [{"id": "w1"}]
+        assert first._session.get.call_count == 1
+
+        # a write drops the responses cached for all the credentials
+        second._session.put.return_value = _mock_response()
+        second.mist_put(self.WLANS + "/w2", body={})
+        first.mist_get(self.WLANS)
+        assert first._session.get.call_count == 2
+        first.disable_cache()
+        second.disable_cache()
+
+    def test_responses_not_shared_between_users(self):
+        req = _make_api_request()
+        req.enable_cache(ttl=60)
+        req._session.get.return_value = _mock_response(json_data=[])
+        req.email = "user1@example.com"
+        req.mist_get(self.WLANS)
+        req.mist_get(self.WLANS)
+        req.email = "user2@example.com"
+        req.mist_get(self.WLANS)
+        assert req._session.get.call_count == 2
+
+    def test_responses_not_shared_between_clouds(self):
+        req = _make_api_request(tokens=["token"])
+        assert req._cache_key(self.WLANS, {}) != _make_api_request(
+            cloud_uri="api.eu.mist.com", tokens=["token"]
+        )._cache_key(self.WLANS, {})
+
+    def test_sqlite_backend(self, tmp_path):
+        req = _make_api_request()
+        req.enable_cache(ttl=60, backend="sqlite", path=str(tmp_path / "c.db"))
+        req._session.get.return_value = _mock_response(json_data={"a": 1})
+        req.mist_get("/api/v1/orgs/o1/setting")
+        assert req.mist_get("/api/v1/orgs/o1/setting").data == {"a": 1}
+        assert req._session.get.call_count == 1
+        req.disable_cache()
+        assert req.get_cache_stats() == {}
+
+    def test_invalid_settings(self):
+        req = _make_api_request()
+        with pytest.raises(ValueError):
+            req.enable_cache(ttl=-1)
+        with pytest.raises(ValueError):
+            req.enable_cache(backend="sqlite")
+        with pytest.raises(ValueError):
+            req.enable_cache(backend="redis")
+
+
 class TestLogProxy:
     """APIRequest._log_proxy() prints a masked proxy URL."""
 
@@ -500,7 +1008,9 @@ class TestMistGet:
         result = req.mist_get("/api/v1/self")
 
         assert result.status_code == 200
-        req._session.get.assert_called_once_with("https://api.mist.com/api/v1/self")
+        req._session.get.assert_called_once_with(
+            "https://api.mist.com/api/v1/self", headers={}
+        )
 
     def test_get_with_query(self):
         req = _make_api_request()
@@ -511,7 +1021,7 @@ class TestMistGet:
 
         assert result.status_code == 200
         expected_url = "https://api.mist.com/api/v1/orgs?page=2&limit=50"
-        req._session.get.assert_called_once_with(expected_url)
+        req._session.get.assert_called_once_with(expected_url, headers={})
 
     def test_get_increments_count(self):
         req = _make_api_request()
@@ -522,6 +1032,37 @@ class TestMistGet:
         assert req.get_request_count() == 1
 
 
+class TestKeepRawData:
+    """keep_raw_data is set per session and can be overridden per request."""
+
+    def test_raw_data_kept_by_default(self):
+        req = _make_api_request()
+        req._session.get.return_value = _mock_response(json_data={"a": 1})
+
+        result = req.mist_get("/api/v1/self")
+
+        assert result.raw_data == '{"a": 1}'
+
+    def test_session_setting_disables_raw_data(self):
+        req = _make_api_request()
+        req._keep_raw_data = False
+        req._session.get.return_value = _mock_response(json_data={"a": 1})
+
+        result = req.mist_get("/api/v1/self")
+
+        assert result.data == {"a": 1}
+        assert result.raw_data == ""
+
+    def test_per_request_override(self):
+        req = _make_api_request()
+        req._keep_raw_data = False
+        req._session.post.return_value = _mock_response(json_data={"a": 1})
+
+        result = req.mist_post("/api/v1/test", body={}, keep_raw_data=True)
+
+        assert result.raw_data == '{"a": 1}'
+
+
 class TestMistPost:
     """mist_post() sends JSON body or raw string data."""
 
@@ -645,7 +1186,7 @@ class TestMistDelete:
 
         assert result.status_code == 200
         req._session.delete.assert_called_once_with(
-            "https://api.mist.com/api/v1/sites/123"
+            "https://api.mist.com/api/v1/sites/123", headers={}
         )
 
     def test_delete_with_query(self):
@@ -657,7 +1198,7 @@ class TestMistDelete:
 
         assert result.status_code == 200
         req._session.delete.assert_called_once_with(
-            "https://api.mist.com/api/v1/sites/123?force=true"
+            "https://api.mist.com/api/v1/sites/123?force=true", headers={}
         )
 
 
@@ -314,6 +314,59 @@ class TestCheckNextFromHeaders:
         assert resp.next == "/api/v1/orgs/abc/devices?page=2"
 
 
+# ---------------------------------------------------------------------------
+# Tests: body decoding and raw_data retention
+# ---------------------------------------------------------------------------
+
+
+class TestRawData:
+    """Tests for the single JSON decoding and the raw_data retention."""
+
+    def test_body_decoded_once_from_bytes(self):
+        """data should be decoded from response.content, not response.json()."""
+        mock = _make_mock_response(data={"key": "value"})
+        resp = APIResponse(response=mock, url="https://host/api/v1/x")
+
+        assert resp.data == {"key": "value"}
+        mock.json.assert_not_called()
+
+    def test_raw_data_materialized_lazily(self):
+        """The text copy of the body is only built when raw_data is read."""
+        mock = _make_mock_response(data={"key": "value"})
+        resp = APIResponse(response=mock, url="https://host/api/v1/x")
+
+        assert resp._raw_data is None
+        assert resp.raw_data == json.dumps({"key": "value"})
+        assert resp._raw_content is None
+
+    def test_raw_data_uses_response_encoding(self):
+        """raw_data should be decoded with the response encoding."""
+        mock = _make_mock_response()
+        mock.content = '{"name": "caf\u00e9"}'.encode("latin-1")
+        mock.encoding = "latin-1"
+        resp = APIResponse(response=mock, url="https://host/api/v1/x")
+
+        assert resp.raw_data == '{"name": "caf\u00e9"}'
+
+    def test_keep_raw_data_false(self):
+        """With keep_raw_data=False the body is not retained."""
+        mock = _make_mock_response(data=[{"id": "a"}])
+        resp = APIResponse(
+            response=mock, url="https://host/api/v1/x", keep_raw_data=False
+        )
+
+        assert resp.data == [{"id": "a"}]
+        assert resp._raw_content is None
+        assert resp.raw_data == ""
+
+    def test_raw_data_can_be_set(self):
+        """raw_data remains assignable."""
+        resp = APIResponse(response=None, url="https://host/api/v1/x")
+        resp.raw_data = "custom"
+
+        assert resp.raw_data == "custom"
+
+
 # ---------------------------------------------------------------------------
 # Tests: data types preserved
 # ---------------------------------------------------------------------------
@@ -30,6 +30,32 @@ class TestAPISessionInitialisation:
         assert isolated_session._console_log_level == 50  # Set in fixture
         assert isolated_session._logging_log_level == 10
         assert isolated_session._show_cli_notif is True
+        assert isolated_session._keep_raw_data is True
+
+    def test_keep_raw_data_disabled(self) -> None:
+        """Test APISession with keep_raw_data=False"""
+        with patch.dict(os.environ, {}, clear=True):
+            session = APISession(console_log_level=50, keep_raw_data=False)
+
+        assert session._keep_raw_data is False
+
+    def test_connection_pool_parameters(self) -> None:
+        """Test APISession with custom connection pool settings"""
+        with patch.dict(os.environ, {}, clear=True):
+            session = APISession(
+                console_log_level=50,
+                pool_maxsize=64,
+                pool_block=True,
+                connection_retries=3,
+            )
+
+        assert session._pool_maxsize == 64
+        assert session._http_adapter._pool_maxsize == 64
+        assert session._http_adapter._pool_block is True
+        assert session._http_adapter.max_retries.connect == 3
+        assert session._session.get_adapter("https://api.mist.com") is (
+            session._http_adapter
+        )
 
     def test_initialisation_with_parameters(self, api_token, test_host) -> None:
         """Test APISession with all parameters provided"""
@@ -566,6 +592,20 @@ class TestNewSession:
                 result = session._new_session()
                 assert result.proxies == {"https": "http://proxy:8080"}
 
+    def test_new_session_mounts_http_adapter(self, isolated_session) -> None:
+        """_new_session mounts a HTTPAdapter with the connection pool settings"""
+        isolated_session.set_connection_pool(pool_maxsize=32)
+        with patch("mistapi.__api_session.requests.session") as mock_session_cls:
+            mock_sess = Mock()
+            mock_sess.headers = {}
+            mock_sess.proxies = {}
+            mock_session_cls.return_value = mock_sess
+
+            isolated_session._new_session()
+
+            mock_sess.mount.assert_any_call("https://", isolated_session._http_adapter)
+            assert isolated_session._http_adapter._pool_maxsize == 32
+
     def test_new_session_no_auth_without_token(self, isolated_session) -> None:
         """_new_session omits Authorization when no token configured"""
         with patch("mistapi.__api_session.requests.session") as mock_session_cls:
@@ -0,0 +1,385 @@
+# tests/unit/test_async_api_session.py
+"""
+Unit tests for mistapi.__async_api_session.AsyncAPISession.
+
+Requests are served by an httpx.MockTransport so the asyncio transport,
+the header forwarding, the API Token rotation and the HTTP 429 retry logic
+can be tested without network access.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import requests
+
+httpx = pytest.importorskip("httpx")
+
+from mistapi import AsyncAPISession
+from mistapi.__api_request import APIRequest
+from mistapi.api.v1.sites import wlans
+
+TOKENS = [
+    "abcdef0123456789abcdef0123456789abcdef01",
+    "fedcba9876543210fedcba9876543210fedcba98",
+]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _make_mist_session(tokens=None):
+    """Create an APIRequest with a mocked requests.Session holding the auth."""
+    with patch("mistapi.__api_request.requests.session") as mock_session_cls:
+        mock_session = Mock()
+        mock_session.headers = {"Accept": "application/json"}
+        mock_session.proxies = {}
+        mock_session.cookies = None
+        mock_session.verify = True
+        mock_session.cert = None
+        mock_session_cls.return_value = mock_session
+        req = APIRequest()
+    req._cloud_uri = "api.mist.com"
+    tokens = tokens or TOKENS[:1]
+    req._apitoken = list(tokens)
+    req._apitoken_index = 0
+    req._session.headers["Authorization"] = "Token " + tokens[0]
+    return req
+
+
+def _make_async_session(handler, tokens=None):
+    mist_session = _make_mist_session(tokens)
+    asession = AsyncAPISession(mist_session)
+    asession._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return mist_session, asession
+
+
+# ===========================================================================
+# Tests
+# ===========================================================================
+
+
+class TestInit:
+    def test_invalid_max_connections(self):
+        with pytest.raises(ValueError):
+            AsyncAPISession(_make_mist_session(), max_connections=0)
+
+    def test_missing_httpx_raises_import_error(self):
+        with (
+            patch("mistapi.__async_api_session.httpx", None),
+            pytest.raises(ImportError, match="httpx"),
+        ):
+            AsyncAPISession(_make_mist_session())
+
+    def test_client_created_lazily(self):
+        asession = AsyncAPISession(_make_mist_session())
+        assert asession._client is None
+        client = asession._get_client()
+        assert asession._get_client() is client
+        asyncio.run(asession.aclose())
+        assert asession._client is None
+
+
+class TestRequests:
+    def test_get_forwards_auth_and_query(self):
+        seen = {}
+
+        def handler(request):
+            seen["url"] = str(request.url)
+            seen["auth"] = request.headers.get("Authorization")
+            return httpx.Response(200, json=[{"id": "wlan"}])
+
+        mist_session, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_get("/api/v1/self", query={"limit": "10"}))
+
+        assert resp.status_code == 200
+        assert resp.data == [{"id": "wlan"}]
+        assert seen["url"] == "https://api.mist.com/api/v1/self?limit=10"
+        assert seen["auth"] == "Token " + TOKENS[0]
+        assert mist_session.get_request_count() == 1
+
+    def test_post_json_body(self):
+        seen = {}
+
+        def handler(request):
+            seen["body"] = json.loads(request.content)
+            seen["content_type"] = request.headers.get("Content-Type")
+            return httpx.Response(200, json={"ok": True})
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_post("/api/v1/test", body={"a": 1}))
+
+        assert resp.data == {"ok": True}
+        assert seen == {"body": {"a": 1}, "content_type": "application/json"}
+
+    def test_put_string_body(self):
+        seen = {}
+
+        def handler(request):
+            seen["method"] = request.method
+            seen["body"] = request.content
+            return httpx.Response(200, json={})
+
+        _, asession = _make_async_session(handler)
+        asyncio.run(asession.mist_put("/api/v1/test", body='{"a": 1}'))  # type: ignore[arg-type]
+
+        assert seen == {"method": "PUT", "body": b'{"a": 1}'}
+
+    def test_delete(self):
+        def handler(request):
+            assert request.method == "DELETE"
+            return httpx.Response(200, json={})
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_delete("/api/v1/test"))
+        assert resp.status_code == 200
+
+    def test_post_file(self, tmp_path):
+        upload = tmp_path / "image.png"
+        upload.write_bytes(b"PNGDATA")
+        seen = {}
+
+        def handler(request):
+            seen["body"] = request.read()
+            return httpx.Response(200, json={})
+
+        _, asession = _make_async_session(handler)
+        asyncio.run(
+            asession.mist_post_file(
+                "/api/v1/test", {"file": str(upload), "json": {"name": "x"}}
+            )
+        )
+
+        assert b"PNGDATA" in seen["body"]
+        assert b'filename="image.png"' in seen["body"]
+        assert b'{"name": "x"}' in seen["body"]
+
+    @pytest.mark.parametrize(
+        "method,args",
+        [
+            ("mist_post", {"body": {"a": 1}}),
+            ("mist_put", {"body": {"a": 1}}),
+            ("mist_delete", {"query": {"force": "true"}}),
+            ("mist_post_file", {"multipart_form_data": {"json": {"name": "x"}}}),
+        ],
+    )
+    def test_write_invalidates_cache(self, method, args):
+        wlans_url = "https://api.mist.com/api/v1/sites/s1/wlans"
+        mist_session, asession = _make_async_session(
+            lambda request: httpx.Response(200, json={})
+        )
+        mist_session.enable_cache(ttl=60)
+        mist_session._response_cache.invalidate = Mock()
+        asyncio.run(getattr(asession, method)("/api/v1/sites/s1/wlans/w1", **args))
+
+        assert mist_session._response_cache.invalidate.call_args_list == [
+            ((wlans_url + "/w1",),),
+            ((wlans_url,), {"children": False}),
+        ]
+
+    def test_generated_function_can_be_awaited(self):
+        def handler(request):
+            assert request.url.path == "/api/v1/sites/site-1/wlans"
+            return httpx.Response(200, json=[{"id": "w1"}])
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(wlans.listSiteWlans(asession, "site-1"))  # type: ignore[arg-type]
+        assert resp.data == [{"id": "w1"}]
+
+    def test_concurrent_requests_on_one_loop(self):
+        def handler(request):
+            return httpx.Response(200, json={"path": request.url.path})
+
+        mist_session, asession = _make_async_session(handler)
+
+        async def _run():
+            return await asyncio.gather(
+                *[asession.mist_get(f"/api/v1/sites/{i}") for i in range(50)]
+            )
+
+        results = asyncio.run(_run())
+        assert [r.data["path"] for r in results] == [
+            f"/api/v1/sites/{i}" for i in range(50)
+        ]
+        assert mist_session.get_request_count() == 50
+
+
+class TestErrors:
+    def test_http_error_returns_response(self):
+        def handler(request):
+            return httpx.Response(404, json={"detail": "not found"})
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_get("/api/v1/test"))
+        assert resp.status_code == 404
+        assert resp.data == {"detail": "not found"}
+
+    def test_connection_error_returns_empty_response(self):
+        def handler(request):
+            raise httpx.ConnectError("boom", request=request)
+
+        mist_session, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_get("/api/v1/test"))
+        assert resp.status_code is None
+        assert resp.proxy_error is False
+        assert mist_session.get_request_count() == 1
+
+    def test_proxy_error_sets_flag(self):
+        def handler(request):
+            raise httpx.ProxyError("proxy down")
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_get("/api/v1/test"))
+        assert resp.proxy_error is True
+
+
+class TestRateLimit:
+    @patch("mistapi.__async_api_session.asyncio.sleep", new_callable=AsyncMock)
+    def test_429_rotates_token_and_retries(self, mock_sleep):
+        seen_auth = []
+
+        def handler(request):
+            seen_auth.append(request.headers["Authorization"])
+            if len(seen_auth) == 1:
+                return httpx.Response(429, headers={"Retry-After": "7"})
+            return httpx.Response(200, json={})
+
+        mist_session, asession = _make_async_session(handler, tokens=TOKENS)
+        resp = asyncio.run(asession.mist_get("/api/v1/test"))
+
+        assert resp.status_code == 200
+        assert seen_auth == ["Token " + TOKENS[0], "Token " + TOKENS[1]]
+        assert mist_session._apitoken_index == 1
+        mock_sleep.assert_called_once_with(7)
+
+    @patch("mistapi.__async_api_session.asyncio.sleep", new_callable=AsyncMock)
+    def test_429_exhausted_after_max_retries(self, mock_sleep):
+        calls = []
+
+        def handler(request):
+            calls.append(1)
+            return httpx.Response(429)
+
+        _, asession = _make_async_session(handler)
+        resp = asyncio.run(asession.mist_get("/api/v1/test"))
+
+        assert resp.status_code == 429
+        assert len(calls) == APIRequest._MAX_429_RETRIES + 1
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [5, 10, 20]
+
+
+class TestResponseCache:
+    WLANS = "/api/v1/sites/s1/wlans"
+
+    def test_get_uses_cache(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=[len(calls)])
+
+        mist_session, asession = _make_async_session(handler)
+        mist_session.enable_cache(ttl=60)
+        first = asyncio.run(asession.mist_get(self.WLANS))
+        second = asyncio.run(asession.mist_get(self.WLANS))
+
+        assert first.data == second.data == [1]
+        assert len(calls) == 1
+        assert mist_session.get_cache_stats()["hits"] == 1
+
+    def test_revalidation_with_etag(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=[1], headers={"ETag": '"v1"'})
+
+        mist_session, asession = _make_async_session(handler)
+        mist_session.enable_cache(ttl=0)
+        asyncio.run(asession.mist_get(self.WLANS))
+        resp = asyncio.run(asession.mist_get(self.WLANS))
+
+        assert resp.status_code == 200
+        assert resp.data == [1]
+        assert seen == [None, '"v1"']
+        assert mist_session.get_cache_stats()["revalidated"] == 1
+
+    def test_cache_shared_with_sync_session(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=["async"])
+
+        mist_session, asession = _make_async_session(handler)
+        mist_session.enable_cache(ttl=60)
+        asyncio.run(asession.mist_get(self.WLANS))
+        resp = mist_session.mist_get(self.WLANS)
+
+        assert resp.data == ["async"]
+        assert len(calls) == 1
+        mist_session._session.get.assert_not_called()
+
+
+class _RecordingAdapter(requests.adapters.BaseAdapter):
+    """requests transport adapter recording the requests sent"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.sent: list[dict[str, str]] = []
+
+    def send(self, request, **kwargs):
+        # copy: the logged request headers are redacted after the response
+        self.sent.append(dict(request.headers))
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b"{}"
+        resp.url = request.url
+        resp.request = request
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+class TestLoginSession:
+    def test_cookies_shared_with_sync_requests(self):
+        mist_session = APIRequest()
+        mist_session._cloud_uri = "api.mist.com"
+        mist_session._csrf_cookie = "csrftoken"
+        mist_session._session.cookies.set("sessionid", "s1", domain="api.mist.com")
+        mist_session._session.cookies.set("csrftoken", "old", domain="api.mist.com")
+        mist_session._session.headers["X-CSRFToken"] = "old"
+        adapter = _RecordingAdapter()
+        mist_session._session.mount("https://", adapter)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("Cookie"))
+            return httpx.Response(
+                200, json={}, headers={"Set-Cookie": "csrftoken=new; Path=/"}
+            )
+
+        asession = AsyncAPISession(mist_session)
+        asession._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        # async write renewing the CSRF cookie, then sync write
+        asyncio.run(asession.mist_post("/api/v1/test", body={}))
+        mist_session.mist_post("/api/v1/test", body={})
+
+        assert seen == ["sessionid=s1; csrftoken=old"]
+        sync_headers = adapter.sent[0]
+        assert sync_headers["X-CSRFToken"] == "new"
+        assert "csrftoken=new" in sync_headers["Cookie"]
+        assert "csrftoken=old" not in sync_headers["Cookie"]
+
+        # re-login: the async client uses the new session cookies
+        mist_session._session.cookies.set("sessionid", "s2", domain="api.mist.com")
+        asyncio.run(asession.mist_get("/api/v1/self"))
+        assert "sessionid=s2" in seen[-1]
+        assert "csrftoken=new" in seen[-1]
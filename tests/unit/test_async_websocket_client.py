@@ -0,0 +1,430 @@
+# tests/unit/test_async_websocket_client.py
+"""
+Unit tests for the asyncio WebSocket client (_AsyncMistWebsocket) and the
+Async* channel classes.
+
+The tests run the client against a local `websockets` server which
+acknowledges the subscriptions and sends one message per channel.
+"""
+
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from websockets.asyncio.server import serve
+from websockets.datastructures import Headers
+from websockets.http11 import Response
+
+from mistapi.websockets import __async_ws_client as async_ws_client
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
+from mistapi.websockets.location import AsyncBleAssetsEvents
+from mistapi.websockets.orgs import AsyncInsightsEvents
+from mistapi.websockets.sites import (
+    AsyncDeviceCmdEvents,
+    AsyncDeviceStatsEvents,
+)
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+class _Server:
+    """Local Mist-like WebSocket server"""
+
+    def __init__(self, ack: bool = True, close_first: bool = False) -> None:
+        self.ack = ack
+        self.close_first = close_first
+        self.connections = 0
+        self.unsubscribed: list[str] = []
+        self.headers: list[Headers] = []
+        self.reject_status: int | None = None
+
+    def process_request(self, connection, request):
+        self.headers.append(request.headers)
+        if self.reject_status:
+            return Response(self.reject_status, "Rejected", Headers(), b"")
+        return None
+
+    async def handler(self, ws) -> None:
+        self.connections += 1
+        connection = self.connections
+        channels = []
+        async for message in ws:
+            payload = json.loads(message)
+            if "unsubscribe" in payload:
+                self.unsubscribed.append(payload["unsubscribe"])
+                continue
+            channel = payload["subscribe"]
+            channels.append(channel)
+            if self.ack:
+                await ws.send(
+                    json.dumps({"event": "channel_subscribed", "channel": channel})
+                )
+            await ws.send(
+                json.dumps(
+                    {
+                        "event": "data",
+                        "channel": channel,
+                        "data": json.dumps({"connection": connection}),
+                    }
+                )
+            )
+            if self.close_first and connection == 1:
+                await ws.close(1011, "server restart")
+                return
+
+
+async def _start(server: _Server):
+    ws_server = await serve(
+        server.handler, "127.0.0.1", 0, process_request=server.process_request
+    )
+    port = ws_server.sockets[0].getsockname()[1]
+    return ws_server, f"ws://127.0.0.1:{port}/api-ws/v1/stream"
+
+
+def _client(mock_session, url: str, **kwargs) -> _AsyncMistWebsocket:
+    client = _AsyncMistWebsocket(
+        mock_session, channels=["/test/channel1", "/test/channel2"], **kwargs
+    )
+    client._build_ws_url = lambda: url
+    return client
+
+
+async def _collect_data(client, count: int) -> list[dict]:
+    received = []
+    async for msg in client:
+        if msg.get("event") == "data":
+            received.append(msg)
+        if len(received) == count:
+            await client.disconnect()
+    return received
+
+
+class TestAsyncReceive:
+    def test_async_for_yields_messages(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            async with ws_server:
+                client = _client(mock_session, url)
+                await client.connect()
+                received = await _collect_data(client, 2)
+            return server, client, received
+
+        server, client, received = asyncio.run(_run())
+        assert [m["channel"] for m in received] == ["/test/channel1", "/test/channel2"]
+        assert server.headers[0]["Authorization"] == "Token test_token"
+        assert client._subscribed_channels == {"/test/channel1", "/test/channel2"}
+        assert not client.ready()
+
+    def test_no_thread_is_started(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            async with ws_server:
+                before = threading.active_count()
+                client = _client(mock_session, url)
+                await client.connect()
+                await _collect_data(client, 2)
+                return before, threading.active_count()
+
+        before, after = asyncio.run(_run())
+        assert after == before
+
+    def test_async_callback(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            received = []
+            done = asyncio.Event()
+
+            async def _on_message(msg):
+                if msg.get("event") == "data":
+                    received.append(msg["channel"])
+                if len(received) == 2:
+                    done.set()
+
+            async with ws_server:
+                client = _client(mock_session, url)
+                client.on_message(_on_message)
+                await client.connect()
+                await asyncio.wait_for(done.wait(), timeout=5)
+                await client.disconnect()
+            return received
+
+        assert asyncio.run(_run()) == ["/test/channel1", "/test/channel2"]
+
+    def test_receive_rejected_with_callback(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+        client.on_message(lambda msg: None)
+
+        async def _run():
+            async for _ in client:
+                pass
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(_run())
+
+    def test_cookie_header(self, mock_session) -> None:
+        cookie = Mock()
+        cookie.name = "csrftoken"
+        cookie.value = "abc"
+        mock_session._apitoken = None
+        mock_session._session.cookies = [cookie]
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+        assert client._build_handshake_headers() == {"Cookie": "csrftoken=abc"}
+
+    def test_receive_batches(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+
+        async def _run():
+            client._queue = asyncio.Queue()
+            for i in range(5):
+                client._enqueue_message({"i": i})
+            batches = []
+            async for batch in client.receive_batches(max_items=2, max_latency_ms=10):
+                batches.append([m["i"] for m in batch])
+                if len(batches) == 3:
+                    client._queue.put_nowait(None)
+            return batches
+
+        assert asyncio.run(_run()) == [[0, 1], [2, 3], [4]]
+
+    def test_receive_batches_invalid_settings(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+
+        async def _run():
+            async for _ in client.receive_batches(max_items=0):
+                pass
+
+        with pytest.raises(ValueError):
+            asyncio.run(_run())
+
+    @pytest.mark.parametrize(
+        "method,args",
+        [
+            ("set_backpressure", ("coalesce",)),
+            ("on_batch", (lambda batch: None,)),
+            ("get_backpressure_counters", ()),
+        ],
+    )
+    def test_threaded_only_methods_raise(self, mock_session, method, args) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+        with pytest.raises(TypeError, match="asyncio"):
+            getattr(client, method)(*args)
+
+    def test_full_queue_drops_messages(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"], queue_maxsize=1)
+        client._queue = asyncio.Queue(maxsize=1)
+        client._enqueue_message({"a": 1})
+        client._enqueue_message({"b": 2})
+        assert client._messages_dropped == 1
+
+
+class TestAsyncLifecycle:
+    def test_auto_reconnect(self, mock_session) -> None:
+        async def _run():
+            server = _Server(close_first=True)
+            ws_server, url = await _start(server)
+            async with ws_server:
+                client = _client(
+                    mock_session, url, auto_reconnect=True, reconnect_backoff=0.01
+                )
+                await client.connect()
+                # 1 message from the first connection, 2 from the second one
+                received = await _collect_data(client, 3)
+            return server, received
+
+        server, received = asyncio.run(_run())
+        assert server.connections == 2
+        assert [json.loads(m["data"])["connection"] for m in received] == [1, 2, 2]
+
+    def test_subscription_watchdog(self, mock_session) -> None:
+        async def _run():
+            server = _Server(ack=False)
+            ws_server, url = await _start(server)
+            errors = []
+            async with ws_server:
+                client = _client(mock_session, url, subscription_watchdog_timeout=0.1)
+                client.on_error(errors.append)
+                await client.connect(run_in_background=False)
+            return client, errors
+
+        client, errors = asyncio.run(_run())
+        assert isinstance(errors[0], TimeoutError)
+        assert client._last_close_code == 1008
+
+    def test_rate_limited_handshake(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            server.reject_status = 429
+            ws_server, url = await _start(server)
+            errors = []
+            closed = Mock()
+            async with ws_server:
+                client = _client(mock_session, url)
+                client.on_error(errors.append)
+                client.on_close(closed)
+                await client.connect(run_in_background=False)
+            return client, errors, closed
+
+        client, errors, closed = asyncio.run(_run())
+        assert client._last_http_status == 429
+        assert len(errors) == 1
+        closed.assert_called_once()
+
+    def test_disconnect_during_backoff(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            server.reject_status = 500
+            ws_server, url = await _start(server)
+            async with ws_server:
+                client = _client(
+                    mock_session, url, auto_reconnect=True, reconnect_backoff=60
+                )
+                await client.connect()
+                await asyncio.sleep(0.2)
+                await asyncio.wait_for(client.disconnect(), timeout=5)
+            return client
+
+        client = asyncio.run(_run())
+        assert client._finished.is_set()
+        assert client._reconnect_attempts == 1
+
+    def test_connect_twice_raises(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            async with ws_server, _client(mock_session, url) as client:
+                await client.connect()
+                with pytest.raises(RuntimeError):
+                    await client.connect()
+            return client
+
+        client = asyncio.run(_run())
+        assert client._finished.is_set()
+
+    def test_missing_dependency(self, mock_session) -> None:
+        with (
+            patch.object(async_ws_client, "ws_connect", None),
+            pytest.raises(ImportError),
+        ):
+            _AsyncMistWebsocket(mock_session, channels=["/ch"])
+
+
+class TestAsyncSubscriptions:
+    def test_subscribe_and_unsubscribe_live(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            async with ws_server:
+                client = _client(mock_session, url)
+                await client.connect()
+                received = []
+                async for msg in client:
+                    if msg.get("event") != "data":
+                        continue
+                    received.append(msg["channel"])
+                    if len(received) == 2:
+                        await client.unsubscribe(["/test/channel1"])
+                        await client.subscribe(["/test/channel2", "/test/channel3"])
+                    elif len(received) == 3:
+                        await client.disconnect()
+                await asyncio.sleep(0)
+            return server, client, received
+
+        server, client, received = asyncio.run(_run())
+        assert received[-1] == "/test/channel3"
+        assert server.connections == 1
+        assert server.unsubscribed == ["/test/channel1"]
+        assert client._channels == ["/test/channel2", "/test/channel3"]
+
+    def test_paced_subscriptions(self, mock_session) -> None:
+        async def _run():
+            server = _Server()
+            ws_server, url = await _start(server)
+            async with ws_server:
+                client = _client(mock_session, url)
+                client.set_subscription_pacing(
+                    frames_per_second=20, batch_size=1, max_pending_acks=1
+                )
+                started = asyncio.get_running_loop().time()
+                await client.connect()
+                received = await _collect_data(client, 2)
+                elapsed = asyncio.get_running_loop().time() - started
+            return client, received, elapsed
+
+        client, received, elapsed = asyncio.run(_run())
+        assert [m["channel"] for m in received] == ["/test/channel1", "/test/channel2"]
+        assert client._subscribed_channels == {"/test/channel1", "/test/channel2"}
+        assert elapsed >= 0.05
+        assert client._subscribe_task is None
+
+    def test_subscribe_while_pacing(self, mock_session) -> None:
+        async def _run():
+            client = _AsyncMistWebsocket(
+                mock_session, channels=[f"/ch{i}" for i in range(6)]
+            )
+            client.set_subscription_pacing(frames_per_second=40, batch_size=2)
+            ws = AsyncMock()
+            await client._handle_open(ws)
+            await asyncio.sleep(0.01)
+            await client.subscribe(["/new"])
+            # the pacer sends the new channel and arms the watchdog once done
+            armed_early = client._subscription_watchdog is not None
+            await client._subscribe_task
+            armed = client._subscription_watchdog is not None
+            client._cancel_subscription_watchdog()
+            sent = [json.loads(c.args[0])["subscribe"] for c in ws.send.call_args_list]
+            return armed_early, armed, sent
+
+        armed_early, armed, sent = asyncio.run(_run())
+        assert not armed_early
+        assert armed
+        assert sent == [f"/ch{i}" for i in range(6)] + ["/new"]
+
+    def test_subscribe_before_connect(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+        asyncio.run(client.subscribe(["/ch", "/ch2"]))
+        asyncio.run(client.unsubscribe(["/ch"]))
+        assert client._channels == ["/ch2"]
+        assert client._expected_channels == {"/ch2"}
+
+
+class TestAsyncChannels:
+    def test_site_channels(self, mock_session) -> None:
+        ws = AsyncDeviceStatsEvents(mock_session, site_ids=["s1", "s2"])
+        assert ws._channels == ["/sites/s1/stats/devices", "/sites/s2/stats/devices"]
+        assert isinstance(ws, _AsyncMistWebsocket)
+
+    def test_device_cmd_channels(self, mock_session) -> None:
+        ws = AsyncDeviceCmdEvents(mock_session, site_id="s1", device_ids=["d1"])
+        assert ws._channels == ["/sites/s1/devices/d1/cmd"]
+
+    def test_org_channels(self, mock_session) -> None:
+        ws = AsyncInsightsEvents(mock_session, org_id="o1")
+        assert ws._channels == ["/orgs/o1/insights/summary"]
+
+    def test_location_channels(self, mock_session) -> None:
+        ws = AsyncBleAssetsEvents(mock_session, site_id="s1", map_ids=["m1"])
+        assert ws._channels == ["/sites/s1/stats/maps/m1/assets"]
+
+    def test_same_validation_as_sync(self, mock_session) -> None:
+        with pytest.raises(ValueError):
+            AsyncDeviceStatsEvents(mock_session, site_ids=["s1"], ping_interval=-1)
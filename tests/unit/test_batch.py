@@ -0,0 +1,194 @@
+# tests/unit/test_batch.py
+"""
+Unit tests for mistapi.batch (map/amap fan-out helpers).
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+import mistapi
+from mistapi import batch
+from mistapi.__api_response import APIResponse
+from mistapi.api.v1.sites import wlans
+
+
+def _response(status_code=200, data=None):
+    resp = APIResponse(response=None, url="https://api.mist.com/api/v1/test")
+    resp.status_code = status_code
+    resp.data = data if data is not None else {}
+    return resp
+
+
+class TestBatchResult:
+    def test_ok_on_2xx(self):
+        assert batch.BatchResult(0, "s1", response=_response(200)).ok
+
+    def test_not_ok_on_http_error(self):
+        assert not batch.BatchResult(0, "s1", response=_response(404)).ok
+
+    def test_not_ok_on_exception(self):
+        assert not batch.BatchResult(0, "s1", error=ValueError("boom")).ok
+
+
+class TestMap:
+    def test_calls_func_for_each_id(self):
+        session = Mock()
+        func = Mock(side_effect=lambda s, site_id, **kw: _response(data=[site_id]))
+
+        results = list(batch.map(func, session, ["s1", "s2", "s3"], limit=100))
+
+        assert sorted(r.id for r in results) == ["s1", "s2", "s3"]
+        assert all(r.ok for r in results)
+        assert {r.index: r.response.data[0] for r in results} == {
+            0: "s1",
+            1: "s2",
+            2: "s3",
+        }
+        func.assert_any_call(session, "s2", limit=100)
+
+    def test_failures_are_reported_per_id(self):
+        def func(session, site_id):
+            if site_id == "bad":
+                raise RuntimeError("boom")
+            if site_id == "missing":
+                return _response(404)
+            return _response(200)
+
+        results = {r.id: r for r in batch.map(func, Mock(), ["ok", "bad", "missing"])}
+
+        assert results["ok"].ok
+        assert isinstance(results["bad"].error, RuntimeError)
+        assert results["missing"].error is None
+        assert results["missing"].response.status_code == 404
+        assert not results["missing"].ok
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "max": 0}
+
+        def func(session, site_id):
+            with lock:
+                state["running"] += 1
+                state["max"] = max(state["max"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+            return _response()
+
+        ids = [str(i) for i in range(40)]
+        results = list(batch.map(func, Mock(), ids, max_workers=4))
+
+        assert len(results) == 40
+        assert 1 < state["max"] <= 4
+
+    def test_yields_in_completion_order(self):
+        def func(session, site_id):
+            time.sleep(0.2 if site_id == "slow" else 0)
+            return _response()
+
+        results = list(batch.map(func, Mock(), ["slow", "fast"], max_workers=2))
+
+        assert [r.id for r in results] == ["fast", "slow"]
+
+    def test_accepts_generator_of_ids(self):
+        func = Mock(return_value=_response())
+        ids = (f"s{i}" for i in range(25))
+        results = list(batch.map(func, Mock(), ids, max_workers=2))
+        assert len(results) == 25
+
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError):
+            list(batch.map(Mock(), Mock(), ["s1"], max_workers=0))
+
+    def test_generated_function(self):
+        session = Mock()
+        session.mist_get.side_effect = lambda uri, query=None: _response(data=uri)
+
+        results = list(batch.map(wlans.listSiteWlans, session, ["s1", "s2"]))
+
+        assert sorted(r.response.data for r in results) == [
+            "/api/v1/sites/s1/wlans",
+            "/api/v1/sites/s2/wlans",
+        ]
+
+    def test_lazy_loaded_from_package(self):
+        assert mistapi.batch is batch
+
+
+class TestAmap:
+    def _collect(self, agen):
+        async def _run():
+            return [r async for r in agen]
+
+        return asyncio.run(_run())
+
+    def test_async_session_calls_are_awaited(self):
+        session = Mock()
+        session.mist_get = AsyncMock(
+            side_effect=lambda uri, query=None: _response(data=uri)
+        )
+
+        results = self._collect(
+            batch.amap(wlans.listSiteWlans, session, ["s1", "s2", "s3"])
+        )
+
+        assert sorted(r.response.data for r in results) == [
+            "/api/v1/sites/s1/wlans",
+            "/api/v1/sites/s2/wlans",
+            "/api/v1/sites/s3/wlans",
+        ]
+        assert all(r.ok for r in results)
+
+    def test_sync_session_runs_in_threads(self):
+        thread_ids = set()
+
+        def func(session, site_id):
+            thread_ids.add(threading.get_ident())
+            return _response()
+
+        results = self._collect(batch.amap(func, Mock(), ["s1", "s2"]))
+
+        assert len(results) == 2
+        assert threading.get_ident() not in thread_ids
+
+    def test_concurrency_is_bounded(self):
+        state = {"running": 0, "max": 0}
+
+        async def func(session, site_id):
+            state["running"] += 1
+            state["max"] = max(state["max"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return _response()
+
+        session = Mock()
+        session.mist_get = AsyncMock()
+        results = self._collect(
+            batch.amap(func, session, [str(i) for i in range(20)], max_concurrency=3)
+        )
+
+        assert len(results) == 20
+        assert state["max"] == 3
+
+    def test_failures_are_reported_per_id(self):
+        async def func(session, site_id):
+            if site_id == "bad":
+                raise RuntimeError("boom")
+            return _response()
+
+        session = Mock()
+        session.mist_get = AsyncMock()
+        results = {
+            r.id: r for r in self._collect(batch.amap(func, session, ["ok", "bad"]))
+        }
+
+        assert results["ok"].ok
+        assert isinstance(results["bad"].error, RuntimeError)
+
+    def test_invalid_max_concurrency(self):
+        with pytest.raises(ValueError):
+            self._collect(batch.amap(Mock(), Mock(), ["s1"], max_concurrency=0))
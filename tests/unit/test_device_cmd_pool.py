@@ -0,0 +1,193 @@
+# tests/unit/test_device_cmd_pool.py
+"""
+Unit tests for mistapi.device_utils.DeviceCmdPool: device commands sharing
+one DeviceCmdEvents connection, with the output routed by session id.
+"""
+
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mistapi.device_utils import DeviceCmdPool
+from mistapi.device_utils.__tools.__cmd_pool import (
+    MAX_UNROUTED_SESSIONS,
+    _PooledCmdStream,
+    active_pool,
+)
+from mistapi.device_utils.__tools.__ws_wrapper import UtilResponse, WebSocketWrapper
+from mistapi.websockets.sites import DeviceCmdEvents
+
+SITE_ID = "site-1"
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+@pytest.fixture
+def sharded_stream():
+    with patch("mistapi.device_utils.__tools.__cmd_pool.ShardedStream") as cls:
+        yield cls
+
+
+@pytest.fixture
+def pool(mock_session, sharded_stream):
+    pool = DeviceCmdPool(mock_session)
+    yield pool
+    pool.close()
+
+
+def _channel(device_id: str) -> str:
+    return f"/sites/{SITE_ID}/devices/{device_id}/cmd"
+
+
+def _output(device_id: str, session_id: str, raw: str) -> dict:
+    return {
+        "event": "data",
+        "channel": _channel(device_id),
+        "data": json.dumps({"session": session_id, "raw": raw}),
+    }
+
+
+def _run_command(apisession, device_id: str, session_id: str) -> WebSocketWrapper:
+    wrapper = WebSocketWrapper(apisession, UtilResponse())
+    wrapper.start_with_trigger(
+        trigger_fn=lambda: Mock(status_code=200, data={"session": session_id}),
+        ws_factory_fn=lambda _trigger: DeviceCmdEvents(
+            apisession, site_id=SITE_ID, device_ids=[device_id]
+        ),
+    )
+    _wait_until(lambda: wrapper.ws is not None)
+    if isinstance(wrapper.ws, _PooledCmdStream):
+        # the pool routes the output to the command once it is attached
+        pool = wrapper.ws._pool
+        _wait_until(lambda: wrapper.ws in pool._by_key.values())
+    return wrapper
+
+
+def _wait_until(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestDeviceCmdPool:
+    def test_commands_share_one_connection(
+        self, mock_session, pool, sharded_stream
+    ) -> None:
+        first = _run_command(mock_session, "d1", "s1")
+        second = _run_command(mock_session, "d2", "s2")
+        assert isinstance(first.ws, _PooledCmdStream)
+
+        sharded_stream.assert_called_once()
+        assert sharded_stream.call_args.args[1] == [_channel("d1")]
+        stream = sharded_stream.return_value
+        stream.connect.assert_called_once()
+        stream.subscribe.assert_called_once_with([_channel("d2")])
+
+        pool._dispatch(_output("d2", "s2", "second"))
+        pool._dispatch(_output("d1", "s1", "first"))
+        pool._dispatch(_output("d1", "other", "not for us"))
+        first.util_response.disconnect()
+        second.util_response.disconnect()
+
+        assert first.util_response.wait(timeout=5).ws_data == ["first"]
+        assert second.util_response.wait(timeout=5).ws_data == ["second"]
+        assert first.util_response.ws_close_code == 1000
+        assert first.util_response.ws_error is None
+
+    def test_same_device_twice(self, mock_session, pool, sharded_stream) -> None:
+        first = _run_command(mock_session, "d1", "s1")
+        second = _run_command(mock_session, "d1", "s2")
+        sharded_stream.return_value.subscribe.assert_not_called()
+        pool._dispatch(_output("d1", "s2", "second"))
+        pool._dispatch(_output("d1", "s1", "first"))
+        pool.close()
+        assert first.util_response.wait(timeout=5).ws_data == ["first"]
+        assert second.util_response.wait(timeout=5).ws_data == ["second"]
+
+    def test_subscribed_devices(self, mock_session, pool, sharded_stream) -> None:
+        pool.add_devices(SITE_ID, ["d1", "d2"])
+        assert sharded_stream.call_args.args[1] == [_channel("d1"), _channel("d2")]
+        pool._dispatch({"event": "channel_subscribed", "channel": _channel("d1")})
+
+        wrapper = _run_command(mock_session, "d1", "s1")
+        sharded_stream.return_value.subscribe.assert_not_called()
+        # the wrapper waits for its first message once the channel is subscribed
+        assert wrapper.timers["first_message_timeout"]["thread"] is not None
+
+    def test_output_before_attach(self, mock_session, pool) -> None:
+        pool.add_devices(SITE_ID, ["d1"])
+        pool._dispatch(_output("d1", "s1", "early"))
+        wrapper = _run_command(mock_session, "d1", "s1")
+        # the early output is delivered by the attach, after the pool lock is
+        # released: wait for it before sending the next one
+        _wait_until(lambda: wrapper.util_response.ws_data == ["early"])
+        pool._dispatch(_output("d1", "s1", "late"))
+        wrapper.util_response.disconnect()
+        assert wrapper.util_response.wait(timeout=5).ws_data == ["early", "late"]
+
+    def test_unrouted_output_is_bounded(self, pool) -> None:
+        pool.add_devices(SITE_ID, ["d1"])
+        for i in range(MAX_UNROUTED_SESSIONS + 5):
+            pool._dispatch(_output("d1", f"s{i}", "lost"))
+        assert len(pool._unrouted) == MAX_UNROUTED_SESSIONS
+        assert "s0" not in pool._unrouted
+
+    def test_connection_lost(self, mock_session, pool) -> None:
+        first = _run_command(mock_session, "d1", "s1")
+        second = _run_command(mock_session, "d2", "s2")
+        pool._handle_stream_error(ConnectionError("lost"))
+        pool._handle_stream_close(1006, "lost")
+        for wrapper in (first, second):
+            response = wrapper.util_response.wait(timeout=5)
+            assert response.done
+            assert response.ws_close_code == 1006
+            assert response.ws_error == "lost"
+        assert pool.stream is None
+
+    def test_close(self, mock_session, sharded_stream) -> None:
+        pool = DeviceCmdPool(mock_session)
+        assert active_pool(mock_session) is pool
+        with pytest.raises(RuntimeError):
+            DeviceCmdPool(mock_session)
+        wrapper = _run_command(mock_session, "d1", "s1")
+
+        pool.close()
+        sharded_stream.return_value.disconnect.assert_called_once_with(
+            wait=True, timeout=10
+        )
+        assert wrapper.util_response.wait(timeout=5).ws_close_code == 1000
+        assert active_pool(mock_session) is None
+        with DeviceCmdPool(mock_session) as other:
+            assert active_pool(mock_session) is other
+        assert active_pool(mock_session) is None
+
+    def test_without_pool(self, mock_session) -> None:
+        assert active_pool(mock_session) is None
+        with patch.object(DeviceCmdEvents, "connect") as connect:
+            wrapper = _run_command(mock_session, "d1", "s1")
+            deadline = time.monotonic() + 5
+            while not connect.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert connect.called
+        assert isinstance(wrapper.ws, DeviceCmdEvents)
+        wrapper._on_close(1000, "done")
+
+    @pytest.mark.parametrize("value", [0, 2001])
+    def test_invalid_max_devices(self, mock_session, value) -> None:
+        with pytest.raises(ValueError):
+            DeviceCmdPool(mock_session, max_devices_per_connection=value)
+        assert active_pool(mock_session) is None
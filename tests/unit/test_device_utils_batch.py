@@ -0,0 +1,196 @@
+# tests/unit/test_device_utils_batch.py
+"""
+Unit tests for mistapi.device_utils.batch: a device utility run on many
+devices with a bounded number of commands in progress.
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.device_utils import batch
+from mistapi.device_utils.__tools.__cmd_pool import active_pool
+from mistapi.device_utils.__tools.__ws_wrapper import UtilResponse
+
+
+def _targets(count: int) -> list[tuple[str, str]]:
+    return [("site-1", f"device-{i}") for i in range(count)]
+
+
+class _FakeUtil:
+    """device_utils function completing each command after `duration`"""
+
+    def __init__(self, duration: float = 0.05, status_code: int = 200) -> None:
+        self.duration = duration
+        self.status_code = status_code
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls: list[tuple] = []
+        self.pools: list = []
+
+    def __call__(self, apisession, site_id, device_id, **kwargs) -> UtilResponse:
+        with self.lock:
+            self.calls.append((site_id, device_id, kwargs))
+            self.pools.append(active_pool(apisession))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        response = UtilResponse()
+        response.trigger_api_response = Mock(status_code=self.status_code, data={})
+        response._disconnect_fn = lambda: self._finish(response)
+        if self.duration is not None:
+            threading.Timer(self.duration, self._finish, args=(response,)).start()
+        return response
+
+    def _finish(self, response: UtilResponse) -> None:
+        with self.lock:
+            if response.done:
+                return
+            self.in_flight -= 1
+            response.ws_data.append("output")
+            response._queue.put(None)
+            response._closed.set()
+
+
+class TestBatchRun:
+    def test_bounded_concurrency(self) -> None:
+        session = Mock()
+        util = _FakeUtil()
+        run = batch.run(session, _targets(8), util, max_in_flight=3, host="8.8.8.8")
+        results = list(run.receive())
+
+        assert run.done
+        assert len(results) == 8
+        assert util.max_in_flight == 3
+        assert all(r.status == "success" for r in results)
+        assert {r.device_id for r in results} == {d for _, d in _targets(8)}
+        assert util.calls[0] == ("site-1", "device-0", {"host": "8.8.8.8"})
+        assert run.results == results
+        assert results[0].response.ws_data == ["output"]
+
+    def test_summary(self) -> None:
+        def util(apisession, site_id, device_id):
+            if device_id == "device-0":
+                raise ValueError("bad port")
+            return _FakeUtil(status_code=404 if device_id == "device-1" else 200)(
+                apisession, site_id, device_id
+            )
+
+        run = batch.run(Mock(), _targets(4), util).wait(timeout=5)
+        summary = run.summary()
+        assert summary["total"] == 4
+        assert summary["success"] == 2
+        assert summary["error"] == 2
+        assert summary["timeout"] == summary["cancelled"] == summary["pending"] == 0
+        assert 0 <= summary["duration_min"] <= summary["duration_avg"]
+        assert summary["duration_avg"] <= summary["duration_max"] <= summary["elapsed"]
+        errors = {r.device_id: r.error for r in run.results if r.status == "error"}
+        assert errors["device-0"] == "bad port"
+        assert errors["device-1"].startswith("trigger failed: 404")
+
+    def test_ws_error(self) -> None:
+        def util(apisession, site_id, device_id):
+            response = _FakeUtil()(apisession, site_id, device_id)
+            response.ws_error = "WebSocket closed abnormally (code 1006): lost"
+            return response
+
+        run = batch.run(Mock(), _targets(1), util).wait(timeout=5)
+        assert run.results[0].status == "error"
+        assert "1006" in run.results[0].error
+
+    def test_timeout(self) -> None:
+        util = _FakeUtil(duration=None)
+        run = batch.run(Mock(), _targets(3), util, max_in_flight=1, timeout=0.05)
+        assert run.wait(timeout=5).done
+        assert run.summary()["timeout"] == 3
+        assert util.in_flight == 0  # the commands were disconnected
+
+    def test_default_timeout(self) -> None:
+        def util(apisession, site_id, device_id):
+            response = _FakeUtil(duration=None)(apisession, site_id, device_id)
+
+            def _start_ws():
+                # as WebSocketWrapper.start(), after the util function returned
+                response._await_timeout = 0.05
+                response.ws_required = True
+
+            threading.Timer(0.05, _start_ws).start()
+            return response
+
+        run = batch.run(Mock(), _targets(2), util).wait(timeout=5)
+        assert run.done
+        assert run.summary()["timeout"] == 2
+
+    def test_triggers_per_second(self) -> None:
+        started = time.monotonic()
+        batch.run(
+            Mock(), _targets(5), _FakeUtil(duration=0), triggers_per_second=50
+        ).wait(timeout=5)
+        assert time.monotonic() - started >= 0.08
+
+    def test_on_result(self) -> None:
+        received = []
+        failing = Mock(side_effect=RuntimeError)
+        batch.run(Mock(), _targets(2), _FakeUtil(), on_result=received.append).wait(5)
+        batch.run(Mock(), _targets(2), _FakeUtil(), on_result=failing).wait(5)
+        assert len(received) == 2
+        assert failing.call_count == 2
+
+    def test_cancel(self) -> None:
+        util = _FakeUtil(duration=None)
+        run = batch.run(Mock(), _targets(5), util, max_in_flight=2)
+        deadline = time.monotonic() + 5
+        while len(util.calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        run.cancel()
+        assert run.wait(timeout=5).done
+        summary = run.summary()
+        assert summary["cancelled"] == 5
+        assert len(util.calls) == 2
+        assert util.in_flight == 0
+
+    def test_cancel_after_completion(self) -> None:
+        run = None
+        finished = _FakeUtil(duration=0.01)
+        pending = _FakeUtil(duration=None)
+
+        def _finish_then_cancel(response: UtilResponse) -> None:
+            _FakeUtil._finish(finished, response)
+            run.cancel()  # the command already completed on its own
+
+        finished._finish = _finish_then_cancel
+
+        def util(apisession, site_id, device_id):
+            if device_id == "device-0":
+                return finished(apisession, site_id, device_id)
+            return pending(apisession, site_id, device_id)
+
+        run = batch.run(Mock(), _targets(3), util, max_in_flight=2)
+        assert run.wait(timeout=5).done
+        statuses = {r.device_id: r.status for r in run.results}
+        assert statuses == {
+            "device-0": "success",
+            "device-1": "cancelled",
+            "device-2": "cancelled",
+        }
+
+    def test_shared_connection(self) -> None:
+        session = Mock()
+        util = _FakeUtil()
+        batch.run(session, _targets(2), util).wait(timeout=5)
+        assert all(pool is not None for pool in util.pools)
+        assert active_pool(session) is None
+
+        util = _FakeUtil()
+        batch.run(session, _targets(2), util, shared_connection=False).wait(5)
+        assert util.pools == [None, None]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"max_in_flight": 0}, {"triggers_per_second": -1}, {"timeout": 0}],
+    )
+    def test_invalid_arguments(self, kwargs) -> None:
+        with pytest.raises(ValueError):
+            batch.run(Mock(), _targets(1), _FakeUtil(), **kwargs)
@@ -5,10 +5,15 @@ Unit tests for mistapi.__init__ module.
 Tests verify:
 - Direct imports (APISession, get_all, get_next, __version__, __author__)
 - Lazy subpackage loading (api, utils, websockets, cli)
+- Lazy loading of the generated mistapi.api tree
 - AttributeError for unknown attributes
 """
 
 import importlib
+import json
+import pkgutil
+import subprocess
+import sys
 import types
 from unittest.mock import patch
 
@@ -207,7 +212,7 @@ class TestLazyImportMechanism:
         """_LAZY_SUBPACKAGES should contain the expected subpackage mappings."""
         import mistapi
 
-        expected = {"api", "cli", "websockets", "device_utils"}
+        expected = {"api", "batch", "cli", "websockets", "device_utils"}
         assert set(mistapi._LAZY_SUBPACKAGES.keys()) == expected
 
     def test_lazy_subpackages_values_are_dotted_paths(self):
@@ -286,3 +291,63 @@ class TestInvalidAttribute:
 
         with pytest.raises(AttributeError):
             mistapi.__getattr__(name)
+
+
+class TestLazyApiTree:
+    """Test the PEP 562 lazy loading of the generated mistapi.api packages."""
+
+    @staticmethod
+    def _loaded_api_modules(code: str) -> list:
+        """Run *code* in a fresh interpreter, return the mistapi.api modules loaded"""
+        script = (
+            f"{code}\nimport json, sys\n"
+            "modules = [m for m in sys.modules if m.startswith('mistapi.api')]\n"
+            "print(json.dumps(sorted(modules)))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", script], check=True, capture_output=True, text=True
+        )
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    def test_import_api_does_not_load_endpoints(self):
+        assert self._loaded_api_modules("import mistapi.api") == ["mistapi.api"]
+
+    def test_only_accessed_module_is_loaded(self):
+        loaded = self._loaded_api_modules(
+            "import mistapi\nmistapi.api.v1.orgs.devices.listOrgDevices"
+        )
+        assert loaded == [
+            "mistapi.api",
+            "mistapi.api.v1",
+            "mistapi.api.v1.orgs",
+            "mistapi.api.v1.orgs.devices",
+        ]
+
+    def test_from_import_loads_submodule(self):
+        from mistapi.api.v1.sites import wlans
+
+        assert wlans.__name__ == "mistapi.api.v1.sites.wlans"
+        assert callable(wlans.listSiteWlans)
+
+    def test_unknown_submodule_raises_attribute_error(self):
+        orgs = importlib.import_module("mistapi.api.v1.orgs")
+
+        with pytest.raises(AttributeError, match="not_a_module"):
+            orgs.not_a_module  # noqa: B018
+
+    def test_dir_lists_lazy_submodules(self):
+        orgs = importlib.import_module("mistapi.api.v1.orgs")
+
+        assert "wlans" in dir(orgs)
+
+    def test_all_declared_submodules_resolve(self):
+        api = importlib.import_module("mistapi.api")
+
+        packages = [api] + [
+            importlib.import_module(info.name)
+            for info in pkgutil.walk_packages(api.__path__, "mistapi.api.")
+            if info.ispkg
+        ]
+        for package in packages:
+            for name in package.__all__:
+                assert isinstance(getattr(package, name), types.ModuleType)
@@ -7,14 +7,17 @@ mocked APISession and APIResponse objects.
 
 from unittest.mock import Mock
 
-from mistapi.__pagination import get_all, get_next
+import pytest
 
+from mistapi.__pagination import get_all, get_next, iter_all, iter_pages
 
-def _make_response(data, next_url=None):
+
+def _make_response(data, next_url=None, status_code=200):
     """Create a mock APIResponse with the given data and next link."""
     response = Mock()
     response.data = data
     response.next = next_url
+    response.status_code = status_code
     return response
 
 
@@ -294,3 +297,194 @@ class TestGetAllEdgeCases:
 
         assert original_results == [{"id": "1"}]
         assert result is not original_results
+
+
+class TestGetAllParallel:
+    """Tests for get_all() with max_workers > 1 (X-Page-* pagination)."""
+
+    @staticmethod
+    def _paged_response(data, page, total, limit=2, uri="/api/v1/items?limit=2"):
+        response = _make_response(
+            data=data,
+            next_url=f"{uri}&page={page + 1}" if page * limit < total else None,
+        )
+        response.headers = {
+            "X-Page-Total": str(total),
+            "X-Page-Limit": str(limit),
+            "X-Page-Page": str(page),
+        }
+        return response
+
+    def test_fetches_remaining_pages_in_order(self):
+        """All remaining pages are requested and reassembled in page order."""
+        session = Mock()
+        pages = {
+            f"/api/v1/items?limit=2&page={page}": self._paged_response(
+                [{"id": 2 * page - 1}, {"id": 2 * page}], page, total=8
+            )
+            for page in range(2, 5)
+        }
+        session.mist_get.side_effect = lambda uri: pages[uri]
+        first = self._paged_response([{"id": 1}, {"id": 2}], 1, total=8)
+
+        result = get_all(session, first, max_workers=4)
+
+        assert result == [{"id": i} for i in range(1, 9)]
+        assert sorted(c.args[0] for c in session.mist_get.call_args_list) == sorted(
+            pages
+        )
+
+    def test_partial_last_page(self):
+        """The page count is rounded up when the total is not a multiple of limit."""
+        session = Mock()
+        session.mist_get.return_value = self._paged_response([{"id": 3}], 2, total=3)
+        first = self._paged_response([{"id": 1}, {"id": 2}], 1, total=3)
+
+        result = get_all(session, first, max_workers=4)
+
+        assert result == [{"id": 1}, {"id": 2}, {"id": 3}]
+        session.mist_get.assert_called_once_with("/api/v1/items?limit=2&page=2")
+
+    @pytest.mark.parametrize(
+        "error_page",
+        [
+            _make_response(data={"detail": "error"}, status_code=500),
+            _make_response(data={"detail": "error"}),
+            _make_response(data=None, status_code=429),
+        ],
+    )
+    def test_failed_page_stops_retrieval(self, error_page, caplog):
+        """
+        The items stop at a page which could not be retrieved, as with the
+        sequential retrieval: the following pages are not spliced around it.
+        """
+        session = Mock()
+        session.mist_get.side_effect = lambda uri: (
+            error_page
+            if uri.endswith("page=3")
+            else self._paged_response(
+                [{"id": int(uri[-1]) * 2 - 1}, {"id": int(uri[-1]) * 2}],
+                int(uri[-1]),
+                total=8,
+            )
+        )
+        first = self._paged_response([{"id": 1}, {"id": 2}], 1, total=8)
+
+        result = get_all(session, first, max_workers=2)
+
+        assert result == [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}]
+        assert "page=3" in caplog.text
+
+    def test_next_link_pagination_stays_sequential(self):
+        """Search responses with a "next" link are followed one page at a time."""
+        session = Mock()
+        first = _make_response(
+            data={"results": [{"id": "1"}], "next": "/api/v1/search?search_after=a"},
+            next_url="/api/v1/search?search_after=a",
+        )
+        first.headers = {}
+        session.mist_get.return_value = _make_response(
+            data={"results": [{"id": "2"}]}, next_url=None
+        )
+
+        result = get_all(session, first, max_workers=4)
+
+        assert result == [{"id": "1"}, {"id": "2"}]
+        session.mist_get.assert_called_once_with("/api/v1/search?search_after=a")
+
+    def test_invalid_max_workers(self):
+        """max_workers must be a positive integer."""
+        with pytest.raises(ValueError):
+            get_all(Mock(), _make_response(data=[]), max_workers=0)
+
+
+class TestIterPages:
+    """Tests for iter_pages()."""
+
+    def test_yields_first_response_then_next_pages(self):
+        """iter_pages() yields the given response, then follows next links."""
+        session = Mock()
+        page1 = _make_response(data=[{"id": "1"}], next_url="/api/v1/items?page=2")
+        page2 = _make_response(data=[{"id": "2"}], next_url="/api/v1/items?page=3")
+        page3 = _make_response(data=[{"id": "3"}], next_url=None)
+        session.mist_get.side_effect = [page2, page3]
+
+        result = list(iter_pages(session, page1))
+
+        assert result == [page1, page2, page3]
+        assert [c.args[0] for c in session.mist_get.call_args_list] == [
+            "/api/v1/items?page=2",
+            "/api/v1/items?page=3",
+        ]
+
+    def test_is_lazy(self):
+        """The next page is only requested when the consumer asks for it."""
+        session = Mock()
+        page1 = _make_response(data=[], next_url="/api/v1/items?page=2")
+        session.mist_get.return_value = _make_response(data=[], next_url=None)
+
+        pages = iter_pages(session, page1)
+        assert next(pages) is page1
+        session.mist_get.assert_not_called()
+        next(pages)
+        session.mist_get.assert_called_once()
+
+
+class TestIterAll:
+    """Tests for iter_all()."""
+
+    def test_list_shape(self):
+        """iter_all() yields the items of every list page."""
+        session = Mock()
+        page1 = _make_response(
+            data=[{"id": "1"}, {"id": "2"}], next_url="/api/v1/items?page=2"
+        )
+        session.mist_get.return_value = _make_response(data=[{"id": "3"}])
+
+        assert list(iter_all(session, page1)) == [
+            {"id": "1"},
+            {"id": "2"},
+            {"id": "3"},
+        ]
+
+    def test_search_shape(self):
+        """iter_all() yields the "results" of every search page."""
+        session = Mock()
+        page1 = _make_response(
+            data={"results": [{"id": "1"}], "next": "/api/v1/search?x=1"},
+            next_url="/api/v1/search?x=1",
+        )
+        session.mist_get.return_value = _make_response(
+            data={"results": [{"id": "2"}]}, next_url=None
+        )
+
+        assert list(iter_all(session, page1)) == [{"id": "1"}, {"id": "2"}]
+
+    def test_skips_pages_without_items(self):
+        """Pages without items (e.g. errors) are skipped."""
+        session = Mock()
+        page1 = _make_response(data={"detail": "error"}, next_url=None)
+
+        assert list(iter_all(session, page1)) == []
+
+    def test_previous_page_released(self):
+        """A page is no longer referenced once the next one is retrieved."""
+        import gc
+        import weakref
+
+        class _Page:
+            def __init__(self, data, next_url):
+                self.data = data
+                self.next = next_url
+
+        session = Mock()
+        page1 = _Page([{"id": "1"}], "/api/v1/items?page=2")
+        session.mist_get.return_value = _Page([{"id": "2"}], None)
+        ref = weakref.ref(page1)
+
+        items = iter_all(session, page1)
+        del page1
+        assert next(items) == {"id": "1"}
+        assert next(items) == {"id": "2"}
+        gc.collect()
+        assert ref() is None
@@ -0,0 +1,243 @@
+# tests/unit/test_pcapng_writer.py
+"""
+Unit tests for mistapi.device_utils.PcapngWriter: remote capture packets
+written to (rotating) pcapng files.
+"""
+
+import base64
+import json
+import struct
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.device_utils import CapturedPacket, PcapngWriter
+from mistapi.device_utils.__tools.__pcapng import (
+    LINKTYPE_ETHERNET,
+    LINKTYPE_IEEE802_11_RADIOTAP,
+    decode_pcap_dict,
+)
+from mistapi.device_utils.__tools.__ws_wrapper import UtilResponse, WebSocketWrapper
+from mistapi.device_utils.__tools.remote_capture import _pcap_writer_callback
+
+FRAME = bytes(range(60))
+TS = 1_700_000_000.25
+
+
+def _read_blocks(path) -> list[tuple[int, bytes]]:
+    """Return the (type, body) of each block of a little-endian pcapng file"""
+    with open(path, "rb") as f:
+        content = f.read()
+    blocks = []
+    offset = 0
+    while offset < len(content):
+        block_type, length = struct.unpack_from("<II", content, offset)
+        assert length % 4 == 0
+        (trailer,) = struct.unpack_from("<I", content, offset + length - 4)
+        assert trailer == length
+        blocks.append((block_type, content[offset + 8 : offset + length - 4]))
+        offset += length
+    assert offset == len(content)
+    return blocks
+
+
+def _options(data: bytes) -> dict[int, bytes]:
+    options = {}
+    offset = 0
+    while offset < len(data):
+        code, length = struct.unpack_from("<HH", data, offset)
+        if code == 0:
+            break
+        options[code] = data[offset + 4 : offset + 4 + length]
+        offset += 4 + length + (-length % 4)
+    return options
+
+
+def _interfaces(blocks) -> list[tuple[int, str]]:
+    return [
+        (struct.unpack_from("<H", body)[0], _options(body[8:])[2].decode())
+        for block_type, body in blocks
+        if block_type == 1
+    ]
+
+
+def _packets(blocks) -> list[tuple[int, float, bytes, int]]:
+    packets = []
+    for block_type, body in blocks:
+        if block_type == 6:
+            if_id, ts_high, ts_low, cap_len, orig_len = struct.unpack_from(
+                "<IIIII", body
+            )
+            timestamp = ((ts_high << 32) | ts_low) / 1_000_000
+            packets.append((if_id, timestamp, body[20 : 20 + cap_len], orig_len))
+    return packets
+
+
+class TestDecodePcapDict:
+    def test_hex(self) -> None:
+        packet = decode_pcap_dict(
+            {"raw": FRAME.hex(), "ts": TS * 1000, "len": 1500, "port_id": "ge-0/0/1"}
+        )
+        assert packet == CapturedPacket(FRAME, TS, 1500, "ge-0/0/1", None)
+
+    def test_base64(self) -> None:
+        packet = decode_pcap_dict(
+            {"data": base64.b64encode(FRAME).decode(), "timestamp": TS, "dlt": 105}
+        )
+        assert packet.data == FRAME
+        assert packet.timestamp == TS
+        assert packet.orig_len == len(FRAME)
+        assert packet.linktype == 105
+
+    @pytest.mark.parametrize(
+        "pcap_dict", [None, "abcd", {}, {"raw": "not a packet!"}, {"raw": 42}]
+    )
+    def test_no_packet(self, pcap_dict) -> None:
+        assert decode_pcap_dict(pcap_dict) is None
+
+
+class TestPcapngWriter:
+    def test_file_structure(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        with PcapngWriter(str(path)) as writer:
+            assert writer.write({"raw": FRAME.hex(), "ts": TS}, interface="aabbcc")
+            assert writer.write({"raw": FRAME[:20].hex(), "ts": TS + 1, "len": 64})
+
+        blocks = _read_blocks(path)
+        assert [block_type for block_type, _ in blocks] == [0x0A0D0D0A, 1, 6, 1, 6]
+        magic, major, minor = struct.unpack_from("<IHH", blocks[0][1])
+        assert (magic, major, minor) == (0x1A2B3C4D, 1, 0)
+        assert _interfaces(blocks) == [
+            (LINKTYPE_ETHERNET, "aabbcc"),
+            (LINKTYPE_ETHERNET, "mist"),
+        ]
+        assert _packets(blocks) == [
+            (0, TS, FRAME, len(FRAME)),
+            (1, TS + 1, FRAME[:20], 64),
+        ]
+        assert writer.files == [str(path)]
+        assert writer.get_counters() == {
+            "packets_written": 2,
+            "packets_skipped": 0,
+            "bytes_written": path.stat().st_size,
+            "files": 1,
+        }
+
+    def test_interfaces(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        with PcapngWriter(str(path), linktype=LINKTYPE_IEEE802_11_RADIOTAP) as writer:
+            writer.write({"raw": FRAME.hex(), "band": "24"}, interface="aabbcc")
+            writer.write({"raw": FRAME.hex(), "band": "5"}, interface="aabbcc")
+            writer.write({"raw": FRAME.hex(), "band": "24"}, interface="aabbcc")
+            writer.write({"raw": FRAME.hex()}, interface="ddeeff", linktype=1)
+
+        blocks = _read_blocks(path)
+        assert _interfaces(blocks) == [
+            (LINKTYPE_IEEE802_11_RADIOTAP, "aabbcc:24"),
+            (LINKTYPE_IEEE802_11_RADIOTAP, "aabbcc:5"),
+            (LINKTYPE_ETHERNET, "ddeeff"),
+        ]
+        assert [p[0] for p in _packets(blocks)] == [0, 1, 0, 2]
+
+    def test_skipped_packets(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        writer = PcapngWriter(str(path))
+        assert not writer.write({"capture_id": "c1"})
+        assert not path.exists()  # the file is created on the first packet
+        assert writer.write({"raw": FRAME.hex()})
+        writer.close()
+        assert not writer.write({"raw": FRAME.hex()})
+        counters = writer.get_counters()
+        assert counters["packets_written"] == 1
+        assert counters["packets_skipped"] == 2
+
+    def test_custom_decoder(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        with PcapngWriter(
+            str(path), decoder=lambda d: CapturedPacket(d["bytes"], TS, 100)
+        ) as writer:
+            writer.write({"bytes": FRAME})
+        assert _packets(_read_blocks(path)) == [(0, TS, FRAME, 100)]
+
+    def test_rotation_by_size(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        with PcapngWriter(str(path), max_file_size=200, max_files=2) as writer:
+            # 2 packets per file: several rotations after the trimming starts,
+            # all in the same second
+            for i in range(10):
+                writer.write({"raw": FRAME.hex(), "ts": TS + i})
+
+        assert len(writer.files) == 2
+        assert writer.get_counters()["files"] == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            p.rsplit("/", 1)[-1] for p in writer.files
+        ]
+        assert "_00004_" in writer.files[0]
+        assert "_00005_" in writer.files[1]
+        for file in writer.files:
+            assert file.endswith(".pcapng")
+            blocks = _read_blocks(file)
+            # every file is readable on its own
+            assert blocks[0][0] == 0x0A0D0D0A
+            assert _interfaces(blocks) == [(LINKTYPE_ETHERNET, "mist")]
+        assert [p[1] for p in _packets(_read_blocks(writer.files[0]))] == [
+            TS + 6,
+            TS + 7,
+        ]
+        assert [p[1] for p in _packets(_read_blocks(writer.files[-1]))] == [
+            TS + 8,
+            TS + 9,
+        ]
+
+    def test_rotation_by_duration(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        with PcapngWriter(str(path), max_file_duration=0.05) as writer:
+            writer.write({"raw": FRAME.hex()})
+            writer.write({"raw": FRAME.hex()})
+            time.sleep(0.1)
+            writer.write({"raw": FRAME.hex()})
+        assert len(writer.files) == 2
+        assert len(_packets(_read_blocks(writer.files[0]))) == 2
+        assert len(_packets(_read_blocks(writer.files[1]))) == 1
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"max_file_size": -1}, {"max_file_duration": -1}, {"max_files": -1}],
+    )
+    def test_invalid_args(self, tmp_path, kwargs) -> None:
+        with pytest.raises(ValueError):
+            PcapngWriter(str(tmp_path / "capture.pcapng"), **kwargs)
+
+
+class TestRemoteCaptureWriter:
+    def test_packets_written_not_retained(self, tmp_path) -> None:
+        path = tmp_path / "capture.pcapng"
+        received = []
+        util_response = UtilResponse()
+        writer = PcapngWriter(str(path))
+        on_message = _pcap_writer_callback(
+            util_response,
+            writer,
+            "00000000-0000-0000-1000-aabbccddeeff",
+            LINKTYPE_IEEE802_11_RADIOTAP,
+            received.append,
+        )
+        wrapper = WebSocketWrapper(Mock(), util_response, on_message=on_message)
+        for i in range(3):
+            wrapper._handle_message(
+                {
+                    "event": "data",
+                    "channel": "/sites/s1/pcaps",
+                    "data": json.dumps(
+                        {"pcap_dict": {"raw": FRAME.hex(), "ts": TS + i, "band": "5"}}
+                    ),
+                }
+            )
+        writer.close()
+
+        assert util_response.ws_data == []
+        assert len(received) == 3
+        blocks = _read_blocks(path)
+        assert _interfaces(blocks) == [(LINKTYPE_IEEE802_11_RADIOTAP, "aabbccddeeff:5")]
+        assert [p[1] for p in _packets(blocks)] == [TS, TS + 1, TS + 2]
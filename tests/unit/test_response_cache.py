@@ -0,0 +1,150 @@
+# tests/unit/test_response_cache.py
+"""
+Unit tests for the response cache backends (mistapi.__response_cache).
+"""
+
+import os
+import stat
+import time
+
+import pytest
+
+from mistapi.__response_cache import (
+    CacheEntry,
+    MemoryCache,
+    ResponseCache,
+    SQLiteCache,
+    cache_key,
+)
+
+URL = "https://api.mist.com/api/v1/orgs/o1/wlans"
+
+
+def _entry(url=URL, content=b"[]", headers=None, stored_at=None):
+    return CacheEntry(url, 200, headers or {}, content, stored_at=stored_at)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        backend = MemoryCache(max_entries=3)
+    else:
+        backend = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+    yield backend
+    if request.param == "sqlite":
+        backend.close()
+
+
+class TestCacheEntry:
+    def test_freshness(self):
+        assert _entry().is_fresh(60)
+        assert not _entry(stored_at=time.time() - 61).is_fresh(60)
+
+    def test_validators(self):
+        entry = _entry(headers={"etag": '"abc"', "Last-Modified": "Mon"})
+        assert entry.validators() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon",
+        }
+        assert _entry().validators() == {}
+
+    def test_to_response(self):
+        entry = _entry(content=b'[{"id": 1}]', headers={"X-Page-Total": "1"})
+        resp = entry.to_response()
+        assert resp.status_code == 200
+        assert resp.json() == [{"id": 1}]
+        assert resp.headers["x-page-total"] == "1"
+        assert resp.request.url == URL
+
+
+class TestBackends:
+    def test_set_and_get(self, cache):
+        cache.set(_entry(content=b'{"a": 1}', headers={"ETag": "x"}))
+        entry = cache.get(URL)
+        assert entry.content == b'{"a": 1}'
+        assert entry.etag == "x"
+        assert cache.get(URL + "/missing") is None
+
+    def test_lru_eviction(self, cache):
+        for i in range(3):
+            cache.set(_entry(url=f"{URL}?page={i}"))
+            time.sleep(0.001)
+        cache.get(f"{URL}?page=0")
+        cache.set(_entry(url=f"{URL}?page=3"))
+
+        assert cache.get(f"{URL}?page=1") is None
+        assert cache.get(f"{URL}?page=0") is not None
+        assert len(cache) == 3
+        assert cache.stats["evictions"] == 1
+
+    def test_touch_refreshes_entry(self, cache):
+        cache.set(_entry(stored_at=time.time() - 100))
+        cache.touch(URL)
+        assert cache.get(URL).is_fresh(60)
+
+    def test_invalidate(self, cache):
+        cache.set(_entry(url=URL + "?limit=100"))
+        cache.set(_entry(url=URL + "/w1"))
+        cache.set(_entry(url=URL + "_templates"))
+
+        cache.invalidate(URL, children=False)
+        assert cache.get(URL + "?limit=100") is None
+        assert cache.get(URL + "/w1") is not None
+        assert cache.get(URL + "_templates") is not None
+
+        cache.invalidate(URL)
+        assert cache.get(URL + "/w1") is None
+        assert cache.get(URL + "_templates") is not None
+
+    def test_keyed_by_credentials(self, cache):
+        key_1 = cache_key(URL, "api.mist.com\nToken t1")
+        key_2 = cache_key(URL, "api.mist.com\nToken t2")
+        cache.set(CacheEntry(URL, 200, {}, b"[1]", key=key_1))
+        assert cache.get(key_2) is None
+        assert cache.get(URL) is None
+        entry = cache.get(key_1)
+        assert entry.content == b"[1]"
+        assert entry.url == URL
+        assert entry.to_response().url == URL
+
+        cache.set(CacheEntry(URL, 200, {}, b"[2]", key=key_2))
+        cache.set(_entry(url=URL + "_templates"))
+        cache.invalidate(URL, children=False)
+        assert cache.get(key_1) is None
+        assert cache.get(key_2) is None
+        assert cache.get(URL + "_templates") is not None
+
+    def test_clear(self, cache):
+        cache.set(_entry())
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_invalid_max_entries(self):
+        with pytest.raises(ValueError):
+            MemoryCache(max_entries=0)
+
+    def test_backends_implement_all_methods(self):
+        class _IncompleteCache(ResponseCache):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            _IncompleteCache()
+
+
+class TestSQLiteCache:
+    def test_persisted_between_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        first = SQLiteCache(path)
+        first.set(_entry(content=b"[1]"))
+        first.close()
+
+        second = SQLiteCache(path)
+        assert second.get(URL).content == b"[1]"
+        second.close()
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_file_is_private(self, tmp_path):
+        path = tmp_path / "cache.db"
+        SQLiteCache(str(path)).close()
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
@@ -0,0 +1,227 @@
+# tests/unit/test_websocket_backpressure.py
+"""
+Unit tests for the WebSocket queue backpressure policies
+(mistapi.websockets.__backpressure) and their use by _MistWebsocket and
+ShardedStream.
+"""
+
+import json
+import queue
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.websockets import ShardedStream
+from mistapi.websockets.__backpressure import (
+    _BackpressureQueue,
+    default_coalesce_key,
+)
+from mistapi.websockets.__ws_client import _MistWebsocket
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+def _stats(mac: str, value: int, channel: str = "/sites/s1/stats/devices") -> dict:
+    return {
+        "event": "data",
+        "channel": channel,
+        "data": json.dumps({"mac": mac, "value": value}),
+    }
+
+
+def _drain(q: queue.Queue) -> list:
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+class TestPolicies:
+    def test_drop_newest(self) -> None:
+        q = _BackpressureQueue(maxsize=2)
+        assert q.offer(1) and q.offer(2)
+        assert not q.offer(3)
+        assert _drain(q) == [1, 2]
+        assert q.get_counters()["dropped_newest"] == 1
+
+    def test_drop_oldest(self) -> None:
+        q = _BackpressureQueue(maxsize=2, policy="drop_oldest")
+        q.offer(1)
+        q.offer(2)
+        assert not q.offer(3)
+        assert _drain(q) == [2, 3]
+        assert q.get_counters()["dropped_oldest"] == 1
+
+    def test_coalesce_keeps_latest_per_device(self) -> None:
+        q = _BackpressureQueue(policy="coalesce")
+        for value in range(3):
+            q.offer(_stats("aa", value))
+            q.offer(_stats("bb", value))
+        q.offer({"event": "channel_subscribed", "channel": "/x"})
+
+        items = _drain(q)
+        assert [json.loads(m["data"]) for m in items[:2]] == [
+            {"mac": "aa", "value": 2},
+            {"mac": "bb", "value": 2},
+        ]
+        assert items[2]["event"] == "channel_subscribed"
+        assert q.get_counters()["coalesced"] == 4
+
+    def test_coalesce_after_get(self) -> None:
+        q = _BackpressureQueue(policy="coalesce")
+        q.offer(_stats("aa", 0))
+        assert json.loads(q.get_nowait()["data"])["value"] == 0
+        q.offer(_stats("aa", 1))
+        assert json.loads(q.get_nowait()["data"])["value"] == 1
+
+    def test_coalesce_full_drops_oldest(self) -> None:
+        q = _BackpressureQueue(maxsize=2, policy="coalesce")
+        q.offer(_stats("aa", 0))
+        q.offer(_stats("bb", 0))
+        assert not q.offer(_stats("cc", 0))
+        assert q.offer(_stats("cc", 1))
+        assert [json.loads(m["data"]) for m in _drain(q)] == [
+            {"mac": "bb", "value": 0},
+            {"mac": "cc", "value": 1},
+        ]
+
+    def test_coalesce_custom_key(self) -> None:
+        q = _BackpressureQueue(policy="coalesce", coalesce_key=lambda m: m["id"])
+        q.offer({"id": 1, "v": "a"})
+        q.offer({"id": 1, "v": "b"})
+        assert _drain(q) == [{"id": 1, "v": "b"}]
+
+    def test_block_waits_for_room(self) -> None:
+        q = _BackpressureQueue(maxsize=1, policy="block", timeout=5)
+        q.offer(1)
+        threading.Timer(0.05, q.get).start()
+        assert q.offer(2)
+        assert _drain(q) == [2]
+        assert q.get_counters()["blocked"] == 1
+
+    def test_block_timeout(self) -> None:
+        q = _BackpressureQueue(maxsize=1, policy="block", timeout=0.05)
+        q.offer(1)
+        assert not q.offer(2)
+        counters = q.get_counters()
+        assert counters["blocked"] == 1
+        assert counters["block_timeouts"] == 1
+
+    def test_spill_keeps_order(self, tmp_path) -> None:
+        q = _BackpressureQueue(maxsize=2, policy="spill", spill_dir=str(tmp_path))
+        for i in range(10):
+            assert q.offer({"i": i})
+        assert q.qsize() == 2
+        assert q.get_counters()["spilled"] == 8
+        assert q.get_nowait() == {"i": 0}
+        assert q.offer({"i": 10})
+        assert [m["i"] for m in _drain(q)] == list(range(1, 11))
+        assert q._spill_count == 0
+
+    def test_sentinel_bypasses_policy(self) -> None:
+        q = _BackpressureQueue(policy="coalesce")
+        q.offer(_stats("aa", 0))
+        q.put_nowait(None)
+        q.put_nowait(None)
+        assert len(_drain(q)) == 3
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"policy": "unknown"},
+            {"policy": "drop_oldest"},
+            {"policy": "block"},
+            {"policy": "spill"},
+            {"maxsize": 1, "policy": "block", "timeout": -1},
+        ],
+    )
+    def test_invalid_settings(self, kwargs) -> None:
+        with pytest.raises(ValueError):
+            _BackpressureQueue(**kwargs)
+
+
+class TestDefaultCoalesceKey:
+    def test_string_payload(self) -> None:
+        assert default_coalesce_key(_stats("aa", 0)) == (
+            "/sites/s1/stats/devices",
+            "aa",
+        )
+
+    def test_decoded_payload(self) -> None:
+        message = {"channel": "/c", "data": {"mac": "aa"}}
+        assert default_coalesce_key(message) == ("/c", "aa")
+
+    def test_struct_payload(self) -> None:
+        message = {"channel": "/c", "data": Mock(mac="aa")}
+        assert default_coalesce_key(message) == ("/c", "aa")
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            None,
+            {"event": "channel_subscribed", "channel": "/c"},
+            {"channel": "/c", "data": "not json"},
+            {"channel": "/c", "data": json.dumps({"id": 1})},
+        ],
+    )
+    def test_no_key(self, message) -> None:
+        assert default_coalesce_key(message) is None
+
+
+class TestClientBackpressure:
+    def test_default_policy_unchanged(self, mock_session) -> None:
+        client = _MistWebsocket(mock_session, channels=["/ch"], queue_maxsize=1)
+        client._handle_message(Mock(), '{"event": "first"}')
+        client._handle_message(Mock(), '{"event": "dropped"}')
+        assert client._queue.get_nowait() == {"event": "first"}
+        assert client._messages_dropped == 1
+        assert client.get_backpressure_counters()["dropped_newest"] == 1
+
+    def test_coalesce_on_receive_queue(self, mock_session) -> None:
+        client = _MistWebsocket(mock_session, channels=["/ch"])
+        client.set_backpressure("coalesce")
+        for value in range(5):
+            client._handle_message(Mock(), json.dumps(_stats("aa", value)))
+        assert client._queue.qsize() == 1
+        assert client._messages_dropped == 0
+        assert client.get_backpressure_counters()["coalesced"] == 4
+
+    def test_drop_oldest_counts_dropped(self, mock_session) -> None:
+        client = _MistWebsocket(mock_session, channels=["/ch"], queue_maxsize=1)
+        client.set_backpressure("drop_oldest")
+        client._handle_message(Mock(), '{"event": "first"}')
+        client._handle_message(Mock(), '{"event": "second"}')
+        assert client._queue.get_nowait() == {"event": "second"}
+        assert client._messages_dropped == 1
+
+    def test_policy_requires_queue_maxsize(self, mock_session) -> None:
+        client = _MistWebsocket(mock_session, channels=["/ch"])
+        with pytest.raises(ValueError):
+            client.set_backpressure("spill")
+
+    def test_set_while_running_raises(self, mock_session) -> None:
+        client = _MistWebsocket(mock_session, channels=["/ch"])
+        client._finished.clear()
+        with pytest.raises(RuntimeError):
+            client.set_backpressure("coalesce")
+
+    def test_sharded_stream(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, ["/a", "/b"], queue_maxsize=1)
+        stream.set_backpressure("drop_oldest")
+        stream._enqueue_message({"a": 1})
+        stream._enqueue_message({"b": 2})
+        assert stream._queue.get_nowait() == {"b": 2}
+        assert stream.get_backpressure_counters()["dropped_oldest"] == 1
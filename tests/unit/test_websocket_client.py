@@ -15,7 +15,7 @@ from unittest.mock import Mock, call, patch
 
 import pytest
 
-from mistapi.websockets.__ws_client import _MistWebsocket
+from mistapi.websockets.__ws_client import _MistWebsocket, _MistWebsocketBase
 from mistapi.websockets.location import (
     BleAssetsEvents,
     ConnectedClientsEvents,
@@ -422,6 +422,132 @@ class TestHandleMessage:
         assert item["raw"] == "hello\ufffd\ufffdworld"
 
 
+class TestPayloadDecoding:
+    """Tests for set_payload_decoding()."""
+
+    @staticmethod
+    def _frame(channel: str, data) -> str:
+        return json.dumps(
+            {
+                "event": "data",
+                "channel": channel,
+                "data": data if isinstance(data, str) else json.dumps(data),
+            }
+        )
+
+    def test_disabled_by_default(self, ws_client) -> None:
+        ws_client._handle_message(Mock(), self._frame("/test/channel1", {"a": 1}))
+        assert ws_client._queue.get_nowait()["data"] == '{"a": 1}'
+
+    def test_decodes_nested_payload(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        ws_client._handle_message(Mock(), self._frame("/test/channel1", {"a": 1}))
+        assert ws_client._queue.get_nowait()["data"] == {"a": 1}
+
+    def test_decodes_binary_frame(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        frame = self._frame("/test/channel1", [1, 2]).encode() + b"\x00"
+        ws_client._handle_message(Mock(), frame)
+        assert ws_client._queue.get_nowait()["data"] == [1, 2]
+
+    def test_keeps_non_json_payload(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        ws_client._handle_message(Mock(), self._frame("/test/channel1", "not json"))
+        assert ws_client._queue.get_nowait()["data"] == "not json"
+
+    def test_invalid_envelope_uses_raw(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        ws_client._handle_message(Mock(), b"hello\xff")
+        assert ws_client._queue.get_nowait() == {"raw": "hello\ufffd"}
+
+    def test_subscription_events_still_processed(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        ws_client._handle_message(
+            Mock(),
+            json.dumps({"event": "channel_subscribed", "channel": "/test/channel1"}),
+        )
+        assert ws_client._subscribed_channels == {"/test/channel1"}
+
+    def test_can_be_disabled(self, ws_client) -> None:
+        ws_client.set_payload_decoding()
+        ws_client.set_payload_decoding(enabled=False)
+        ws_client._handle_message(Mock(), self._frame("/test/channel1", {"a": 1}))
+        assert ws_client._queue.get_nowait()["data"] == '{"a": 1}'
+
+    def test_invalid_data_type(self, ws_client) -> None:
+        with pytest.raises(ValueError):
+            ws_client.set_payload_decoding(data_type="typed")
+
+    def test_auto_typed_structs(self, mock_session) -> None:
+        models = pytest.importorskip("mistapi.websockets.models")
+        channels = [
+            "/sites/s1/stats/devices",
+            "/sites/s1/stats/clients",
+            "/sites/s1/stats/maps/m1/clients",
+            "/sites/s1/devices",
+        ]
+        client = _MistWebsocket(mock_session, channels=channels)
+        client.set_payload_decoding(data_type="auto")
+        payload = {"mac": "aabbcc", "x": 1.5, "rssi": -60, "extra": {"a": 1}}
+        for channel in channels:
+            client._handle_message(Mock(), self._frame(channel, payload))
+        results = [client._queue.get_nowait()["data"] for _ in channels]
+
+        assert isinstance(results[0], models.DeviceStats)
+        assert results[0].mac == "aabbcc"
+        assert isinstance(results[1], models.ClientStats)
+        assert results[1].rssi == -60
+        assert isinstance(results[2], models.LocationStats)
+        assert results[2].x == 1.5
+        assert results[0].extra == {"rssi": -60, "extra": {"a": 1}}
+        assert results[2].extra == {"extra": {"a": 1}}
+        assert results[3] == payload  # channel without typed structure
+
+    def test_auto_keeps_undeclared_fields(self, mock_session) -> None:
+        models = pytest.importorskip("mistapi.websockets.models")
+        client = _MistWebsocket(mock_session, channels=["/sites/s1/stats/devices"])
+        client.set_payload_decoding(data_type="auto")
+        payload = {
+            "mac": "aabbcc",
+            "uptime": 10,
+            "cpu_stat": {"idle": 90},
+            "port_stat": {"eth0": {"up": True}},
+            "radio_stat": {"band_5": {"channel": 36}},
+        }
+        client._handle_message(Mock(), self._frame("/sites/s1/stats/devices", payload))
+        stats = client._queue.get_nowait()["data"]
+        assert stats == models.DeviceStats(
+            mac="aabbcc",
+            uptime=10,
+            extra={
+                "cpu_stat": {"idle": 90},
+                "port_stat": {"eth0": {"up": True}},
+                "radio_stat": {"band_5": {"channel": 36}},
+            },
+        )
+
+    def test_typed_mismatch_falls_back_to_dict(self, mock_session) -> None:
+        pytest.importorskip("msgspec")
+        client = _MistWebsocket(mock_session, channels=["/sites/s1/stats/devices"])
+        client.set_payload_decoding(data_type="auto")
+        payload = {"mac": ["not", "a", "string"]}
+        client._handle_message(Mock(), self._frame("/sites/s1/stats/devices", payload))
+        assert client._queue.get_nowait()["data"] == payload
+
+    def test_custom_type(self, ws_client) -> None:
+        msgspec = pytest.importorskip("msgspec")
+
+        class Point(msgspec.Struct):
+            x: int
+            y: int
+
+        ws_client.set_payload_decoding(data_type=Point)
+        ws_client._handle_message(
+            Mock(), self._frame("/test/channel1", {"x": 1, "y": 2})
+        )
+        assert ws_client._queue.get_nowait()["data"] == Point(1, 2)
+
+
 class TestHandleError:
     """Tests for _handle_error()."""
 
@@ -645,6 +771,198 @@ class TestReceive:
         assert results == []
 
 
+# ---------------------------------------------------------------------------
+# Batches (on_batch / receive_batches)
+# ---------------------------------------------------------------------------
+
+
+class TestBatches:
+    """Tests for on_batch() and the receive_batches() generator."""
+
+    def test_receive_batches_max_items(self, ws_client) -> None:
+        ws_client._connected.set()
+        for i in range(5):
+            ws_client._queue.put({"i": i})
+        ws_client._queue.put(None)
+
+        batches = list(ws_client.receive_batches(max_items=2, max_latency_ms=0))
+        assert batches == [
+            [{"i": 0}, {"i": 1}],
+            [{"i": 2}, {"i": 3}],
+            [{"i": 4}],
+        ]
+
+    def test_receive_batches_max_latency(self, ws_client) -> None:
+        ws_client._connected.set()
+        ws_client._queue.put({"i": 0})
+        threading.Timer(0.3, ws_client._queue.put, args=({"i": 1},)).start()
+
+        gen = ws_client.receive_batches(max_items=10, max_latency_ms=50)
+        assert next(gen) == [{"i": 0}]
+        assert next(gen) == [{"i": 1}]
+
+    def test_receive_batches_waits_for_late_messages(self, ws_client) -> None:
+        ws_client._connected.set()
+        ws_client._queue.put({"i": 0})
+        threading.Timer(0.05, ws_client._queue.put, args=({"i": 1},)).start()
+
+        gen = ws_client.receive_batches(max_items=10, max_latency_ms=500)
+        assert next(gen) == [{"i": 0}, {"i": 1}]
+
+    def test_receive_batches_stops_when_disconnected(self, ws_client) -> None:
+        ws_client._connected.set()
+        ws_client._queue.put({"i": 0})
+
+        gen = ws_client.receive_batches(max_latency_ms=0)
+        assert next(gen) == [{"i": 0}]
+        ws_client._connected.clear()
+        assert list(gen) == []
+
+    def test_on_batch_delivers_lists(self, ws_client) -> None:
+        batches = []
+        done = threading.Event()
+
+        def _on_batch(batch):
+            batches.append(batch)
+            if sum(len(b) for b in batches) == 5:
+                done.set()
+
+        ws_client.on_batch(_on_batch, max_items=2, max_latency_ms=200)
+        ws_client._finished.clear()  # keep worker alive for this assertion
+        for i in range(5):
+            ws_client._handle_message(Mock(), json.dumps({"i": i}))
+
+        assert done.wait(timeout=2)
+        assert [m["i"] for b in batches for m in b] == [0, 1, 2, 3, 4]
+        assert all(len(b) <= 2 for b in batches)
+        assert ws_client._queue.empty()
+        ws_client.disconnect(wait=True, timeout=1)
+        assert ws_client._messages_processed == 5
+
+    def test_on_batch_exception_does_not_stop_worker(self, ws_client) -> None:
+        calls = []
+        done = threading.Event()
+
+        def _on_batch(batch):
+            calls.append(batch)
+            if len(calls) == 2:
+                done.set()
+            raise RuntimeError("boom")
+
+        ws_client.on_batch(_on_batch, max_items=1, max_latency_ms=0)
+        ws_client._finished.clear()
+        ws_client._handle_message(Mock(), '{"i": 0}')
+        ws_client._handle_message(Mock(), '{"i": 1}')
+
+        assert done.wait(timeout=2)
+        ws_client.disconnect(wait=True, timeout=1)
+
+    def test_receive_raises_when_batch_callback_registered(self, ws_client) -> None:
+        ws_client.on_batch(Mock())
+        ws_client._connected.set()
+        with pytest.raises(RuntimeError, match="on_batch callback"):
+            list(ws_client.receive())
+        with pytest.raises(RuntimeError, match="on_batch callback"):
+            list(ws_client.receive_batches())
+
+    @pytest.mark.parametrize("kwargs", [{"max_items": 0}, {"max_latency_ms": -1}])
+    def test_invalid_batch_settings(self, ws_client, kwargs) -> None:
+        with pytest.raises(ValueError):
+            ws_client.on_batch(Mock(), **kwargs)
+        with pytest.raises(ValueError):
+            next(ws_client.receive_batches(**kwargs))
+
+
+# ---------------------------------------------------------------------------
+# Subscriptions
+# ---------------------------------------------------------------------------
+
+
+class TestSubscriptions:
+    """Tests for subscribe() / unsubscribe()."""
+
+    def test_subscribe_before_connect(self, ws_client) -> None:
+        ws_client.subscribe(["/test/channel3", "/test/channel1"])
+        assert ws_client._channels == [
+            "/test/channel1",
+            "/test/channel2",
+            "/test/channel3",
+        ]
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        assert mock_ws.send.call_count == 3
+        ws_client._cancel_subscription_watchdog()
+
+    def test_subscribe_sends_only_new_channels(self, ws_client) -> None:
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        mock_ws.send.reset_mock()
+        ws_client.subscribe(["/test/channel2", "/test/channel3"])
+        mock_ws.send.assert_called_once_with(
+            json.dumps({"subscribe": "/test/channel3"})
+        )
+        assert ws_client._subscription_watchdog is not None
+        for channel in ws_client._channels:
+            ws_client._handle_message(
+                mock_ws,
+                json.dumps({"event": "channel_subscribed", "channel": channel}),
+            )
+        assert ws_client._subscribed_channels == set(ws_client._channels)
+        assert ws_client._subscription_watchdog is None
+
+    def test_unsubscribe_sends_only_removed_channels(self, ws_client) -> None:
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        mock_ws.send.reset_mock()
+        ws_client.unsubscribe(["/test/channel1", "/unknown"])
+        mock_ws.send.assert_called_once_with(
+            json.dumps({"unsubscribe": "/test/channel1"})
+        )
+        assert ws_client._channels == ["/test/channel2"]
+        assert ws_client._expected_channels == {"/test/channel2"}
+        ws_client._cancel_subscription_watchdog()
+
+    def test_unsubscribe_cancels_watchdog(self, ws_client) -> None:
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        ws_client._handle_message(
+            mock_ws,
+            json.dumps({"event": "channel_subscribed", "channel": "/test/channel1"}),
+        )
+        assert ws_client._subscription_watchdog is not None
+        ws_client.unsubscribe(["/test/channel2"])
+        assert ws_client._subscription_watchdog is None
+
+    def test_reconnect_subscribes_current_set(self, ws_client) -> None:
+        ws_client._handle_open(Mock())
+        ws_client.unsubscribe(["/test/channel1"])
+        ws_client.subscribe(["/test/channel3"])
+        ws_client._handle_close(Mock(), 1006, "lost")
+        ws_client.subscribe(["/test/channel4"])  # nothing to send while closed
+
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        assert [c.args[0] for c in mock_ws.send.call_args_list] == [
+            json.dumps({"subscribe": c})
+            for c in ("/test/channel2", "/test/channel3", "/test/channel4")
+        ]
+        ws_client._cancel_subscription_watchdog()
+
+    def test_send_failure_is_logged(self, ws_client) -> None:
+        mock_ws = Mock()
+        ws_client._handle_open(mock_ws)
+        mock_ws.send.side_effect = ConnectionError("closed")
+        ws_client.subscribe(["/test/channel3"])  # should not raise
+        ws_client.unsubscribe(["/test/channel3"])
+        assert "/test/channel3" not in ws_client._channels
+        ws_client._cancel_subscription_watchdog()
+
+    def test_channel_limit(self, ws_client) -> None:
+        with pytest.raises(ValueError):
+            ws_client.subscribe([f"/ch/{i}" for i in range(2000)])
+        assert len(ws_client._channels) == 2
+
+
 # ---------------------------------------------------------------------------
 # Context manager
 # ---------------------------------------------------------------------------
@@ -720,6 +1038,10 @@ class TestInit:
         assert single_channel_client._ping_interval == 15
         assert single_channel_client._ping_timeout == 5
 
+    def test_base_class_is_abstract(self, mock_session) -> None:
+        with pytest.raises(TypeError):
+            _MistWebsocketBase(mock_session, channels=["/test/channel"])  # type: ignore[abstract]
+
     def test_queue_starts_empty(self, ws_client) -> None:
         assert ws_client._queue.empty()
 
@@ -0,0 +1,301 @@
+# tests/unit/test_websocket_dispatcher.py
+"""
+Unit tests for mistapi.websockets.StreamDispatcher: one WebSocket stream
+delivered to several filtered consumers.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.websockets import (
+    AsyncStreamConsumer,
+    ShardedStream,
+    StreamConsumer,
+    StreamDispatcher,
+)
+from mistapi.websockets.__async_ws_client import _AsyncMistWebsocket
+from mistapi.websockets.__ws_client import _MistWebsocket
+from mistapi.websockets.replay import StreamRecorder, replay_into
+from mistapi.websockets.sites import DeviceStatsEvents
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+@pytest.fixture
+def ws_client(mock_session):
+    return _MistWebsocket(mock_session, channels=["/sites/s1/stats/devices"])
+
+
+def _message(site: str, mac: str, event: str = "data", decoded: bool = False) -> dict:
+    data = {"mac": mac, "site": site}
+    return {
+        "event": event,
+        "channel": f"/sites/{site}/stats/devices",
+        "data": data if decoded else json.dumps(data),
+    }
+
+
+def _drain(consumer: StreamConsumer) -> list[dict]:
+    consumer.close()
+    return list(consumer.receive())
+
+
+class TestFilters:
+    def test_channel_prefix(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer(channel_prefix=["/sites/s1/", "/sites/s3/"])
+        for site in ("s1", "s2", "s3"):
+            dispatcher._dispatch(_message(site, "aa"))
+        assert [m["data"] for m in _drain(consumer)] == [
+            _message("s1", "aa")["data"],
+            _message("s3", "aa")["data"],
+        ]
+
+    def test_event(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer(event="data")
+        dispatcher._dispatch({"event": "channel_subscribed", "channel": "/a"})
+        dispatcher._dispatch(_message("s1", "aa"))
+        assert [m["event"] for m in _drain(consumer)] == ["data"]
+
+    @pytest.mark.parametrize("decoded", [False, True])
+    def test_mac(self, ws_client, decoded) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer(mac=["5C:5B:35:00:00:01"])
+        dispatcher._dispatch(_message("s1", "5c5b35000001", decoded=decoded))
+        dispatcher._dispatch(_message("s1", "5c5b35000002", decoded=decoded))
+        dispatcher._dispatch({"event": "channel_subscribed", "channel": "/a"})
+        assert len(_drain(consumer)) == 1
+
+    def test_predicate(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer(
+            predicate=lambda m: m["channel"].endswith("devices"), event="data"
+        )
+        failing = dispatcher.add_consumer(predicate=lambda m: 1 / 0)
+        dispatcher._dispatch(_message("s1", "aa"))
+        dispatcher._dispatch(_message("s1", "aa", event="other"))
+        assert len(_drain(consumer)) == 1
+        assert _drain(failing) == []
+
+    def test_no_filter_gets_everything(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer()
+        dispatcher._dispatch({"event": "channel_subscribed", "channel": "/a"})
+        dispatcher._dispatch(_message("s1", "aa"))
+        assert len(_drain(consumer)) == 2
+
+
+class TestDispatcher:
+    def test_each_consumer_gets_its_messages(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        everything = dispatcher.add_consumer(name="storage")
+        device = dispatcher.add_consumer(mac="bb", name="alerting")
+        for mac in ("aa", "bb", "aa"):
+            dispatcher._dispatch(_message("s1", mac))
+        assert len(_drain(everything)) == 3
+        assert len(_drain(device)) == 1
+        assert [c.name for c in dispatcher.consumers] == ["storage", "alerting"]
+
+    def test_full_consumer_queue_only_drops_its_messages(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        slow = dispatcher.add_consumer(queue_maxsize=2)
+        fast = dispatcher.add_consumer(queue_maxsize=0)
+        for i in range(5):
+            dispatcher._dispatch(_message("s1", f"{i:02x}"))
+        counters = dispatcher.get_counters()
+        assert counters["consumers"][slow.name] == {
+            "messages_received": 5,
+            "messages_dropped": 3,
+            "queue_size": 2,
+        }
+        assert counters["consumers"][fast.name]["messages_dropped"] == 0
+        assert len(_drain(fast)) == 5
+
+    def test_consumer_backpressure_policy(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        latest = dispatcher.add_consumer(queue_maxsize=2, backpressure="drop_oldest")
+        for i in range(4):
+            dispatcher._dispatch(_message("s1", f"{i:02x}"))
+        latest.close()
+        assert [json.loads(m["data"])["mac"] for m in latest.receive()] == [
+            "02",
+            "03",
+        ]
+
+    def test_unmatched_counter(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        dispatcher.add_consumer(mac="aa")
+        dispatcher._dispatch(_message("s1", "bb"))
+        assert dispatcher.get_counters()["messages_unmatched"] == 1
+
+    def test_callback_consumer(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        received = []
+        consumer = dispatcher.add_consumer(callback=received.append)
+        failing = dispatcher.add_consumer(callback=Mock(side_effect=ValueError))
+        dispatcher._dispatch(_message("s1", "aa"))
+        dispatcher._dispatch(_message("s1", "bb"))
+        consumer.close()
+        consumer.join(timeout=5)
+        failing.close()
+        failing.join(timeout=5)
+        assert len(received) == 2
+        assert failing._callback.call_count == 2
+        with pytest.raises(RuntimeError):
+            next(consumer.receive())
+
+    def test_slow_callback_does_not_block_others(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        release = threading.Event()
+        dispatcher.add_consumer(callback=lambda m: release.wait(5))
+        fast = dispatcher.add_consumer()
+        started = time.monotonic()
+        for _ in range(3):
+            dispatcher._dispatch(_message("s1", "aa"))
+        assert len(_drain(fast)) == 3
+        assert time.monotonic() - started < 1
+        release.set()
+
+    def test_remove_consumer(self, ws_client) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer()
+        dispatcher._dispatch(_message("s1", "aa"))
+        dispatcher.remove_consumer(consumer)
+        dispatcher._dispatch(_message("s1", "bb"))
+        assert consumer.closed
+        assert dispatcher.consumers == []
+        assert len(list(consumer.receive())) == 1
+
+    def test_stream_close_closes_consumers(self, ws_client) -> None:
+        previous = Mock()
+        ws_client.on_close(previous)
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer()
+        ws_client._on_close_cb(1000, "bye")
+        assert consumer.closed
+        previous.assert_called_once_with(1000, "bye")
+
+        registered = Mock()
+        dispatcher.on_close(registered)
+        ws_client._on_close_cb(1000, "bye")
+        registered.assert_called_once_with(1000, "bye")
+
+    def test_stream_close_with_blocked_worker(
+        self, ws_client, monkeypatch, caplog
+    ) -> None:
+        monkeypatch.setattr("mistapi.websockets.__dispatcher.CLOSE_DRAIN_TIMEOUT", 0.05)
+        release = threading.Event()
+        worker = threading.Thread(target=release.wait, args=(5,), daemon=True)
+        worker.start()
+        ws_client._callback_thread = worker
+        dispatcher = StreamDispatcher(ws_client)
+        consumer = dispatcher.add_consumer()
+        try:
+            started = time.monotonic()
+            with caplog.at_level("WARNING", logger="mistapi"):
+                ws_client._on_close_cb(1000, "bye")
+            assert time.monotonic() - started < 1
+            assert consumer.closed
+            assert "not dispatched" in caplog.text
+        finally:
+            release.set()
+            worker.join(timeout=5)
+
+    def test_stream_receive_is_rejected(self, ws_client) -> None:
+        StreamDispatcher(ws_client)
+        with pytest.raises(RuntimeError):
+            next(ws_client.receive())
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"queue_maxsize": -1},
+            {"backpressure": "unknown"},
+            {"backpressure": "block", "queue_maxsize": 0},
+        ],
+    )
+    def test_invalid_arguments(self, ws_client, kwargs) -> None:
+        dispatcher = StreamDispatcher(ws_client)
+        with pytest.raises(ValueError):
+            dispatcher.add_consumer(**kwargs)
+
+    def test_sharded_stream(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, ["/a", "/b"], min_connections=2)
+        dispatcher = StreamDispatcher(stream)
+        assert stream._on_message_cb == dispatcher._dispatch
+
+
+class TestReplayedStream:
+    def test_one_connection_many_consumers(self, tmp_path, mock_session) -> None:
+        path = str(tmp_path / "rec.mwsr")
+        with StreamRecorder(path) as recorder:
+            for i in range(30):
+                recorder.write(json.dumps(_message("s1", f"{i % 3:02x}")))
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        ws.set_payload_decoding()
+        replay_into(ws, path, speed=None)
+        dispatcher = StreamDispatcher(ws)
+        storage = []
+        dispatcher.add_consumer(callback=storage.append, event="data")
+        device = dispatcher.add_consumer(mac="01", event="data")
+
+        ws.connect()
+        device_messages = list(device.receive())  # ends with the replay
+        ws.disconnect(wait=True, timeout=5)
+        for consumer in dispatcher.consumers:
+            consumer.join(timeout=5)
+
+        assert len(storage) == 30
+        assert len(device_messages) == 10
+        assert all(m["data"]["mac"] == "01" for m in device_messages)
+
+
+class TestAsyncDispatcher:
+    def test_async_consumers(self, mock_session) -> None:
+        async def _run():
+            client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+            dispatcher = StreamDispatcher(client)
+            received = []
+
+            async def _store(message):
+                await asyncio.sleep(0)
+                received.append(message)
+
+            storage = dispatcher.add_consumer(callback=_store)
+            device = dispatcher.add_consumer(mac="bb", queue_maxsize=1)
+            for mac in ("aa", "bb", "bb"):
+                await client._handle_message(Mock(), json.dumps(_message("s1", mac)))
+            client._on_close_cb(1000, "closed")
+            device_messages = [m async for m in device]
+            await storage.join(timeout=5)
+            return dispatcher, device, received, device_messages
+
+        dispatcher, device, received, device_messages = asyncio.run(_run())
+        assert all(isinstance(c, AsyncStreamConsumer) for c in dispatcher.consumers)
+        assert len(received) == 3
+        assert len(device_messages) == 1
+        assert device.get_counters()["messages_dropped"] == 1
+
+    def test_async_consumer_backpressure(self, mock_session) -> None:
+        client = _AsyncMistWebsocket(mock_session, channels=["/ch"])
+        dispatcher = StreamDispatcher(client)
+        with pytest.raises(ValueError):
+            dispatcher.add_consumer(backpressure="drop_oldest")
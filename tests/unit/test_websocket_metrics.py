@@ -0,0 +1,261 @@
+# tests/unit/test_websocket_metrics.py
+"""
+Unit tests for the WebSocket client metrics (stats()) and their Prometheus
+and OpenTelemetry export (mistapi.websockets.metrics).
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.websockets import ShardedStream, metrics
+from mistapi.websockets.__ws_client import _MistWebsocket
+from mistapi.websockets.metrics import (
+    _frame_size,
+    _StreamStats,
+    merge_stats,
+    to_prometheus,
+)
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+@pytest.fixture
+def ws_client(mock_session):
+    return _MistWebsocket(mock_session, channels=["/test/channel1", "/test/channel2"])
+
+
+def _frame(channel: str, **payload) -> str:
+    return json.dumps({"event": "data", "channel": channel, "data": payload})
+
+
+class TestStreamStats:
+    def test_per_channel_counts(self) -> None:
+        stats = _StreamStats()
+        stats.record_message({"channel": "/a"}, 10)
+        stats.record_message({"channel": "/a"}, 20)
+        stats.record_message({"channel": "/b"}, 5)
+        stats.record_message({"event": "channel_subscribed"}, 50)
+
+        snapshot = stats.snapshot()
+        assert snapshot["channels"]["/a"]["messages"] == 2
+        assert snapshot["channels"]["/a"]["bytes"] == 30
+        assert snapshot["channels"]["/a"]["rate"] > 0
+        assert snapshot["channels"]["/b"]["messages"] == 1
+        assert snapshot["bytes_received"] == 35
+
+    @pytest.mark.parametrize("scale", [1, 1000])
+    def test_lag(self, scale) -> None:
+        stats = _StreamStats()
+        stats.record_message(
+            {"channel": "/a", "data": {"timestamp": (time.time() - 2) * scale}}, 1
+        )
+        lag = stats.snapshot()["channels"]["/a"]["lag"]
+        assert lag["count"] == 1
+        assert 1.5 < lag["last"] < 5
+        assert lag["max"] == lag["last"] == lag["avg"]
+
+    def test_lag_from_last_seen(self) -> None:
+        stats = _StreamStats()
+        payload = Mock(spec=["last_seen"], last_seen=time.time() - 1)
+        stats.record_message({"channel": "/a", "data": payload}, 1)
+        assert stats.snapshot()["channels"]["/a"]["lag"]["count"] == 1
+
+    def test_no_lag_for_string_payload(self) -> None:
+        stats = _StreamStats()
+        stats.record_message({"channel": "/a", "data": '{"timestamp": 1}'}, 1)
+        lag = stats.snapshot()["channels"]["/a"]["lag"]
+        assert lag == {"count": 0, "sum": 0.0, "avg": None, "max": None, "last": None}
+
+    def test_queue_high_water(self) -> None:
+        stats = _StreamStats()
+        for depth in (1, 5, 3):
+            stats.record_queue_depth("receive", depth)
+        assert stats.snapshot()["queue_high_water"] == {"receive": 5}
+
+    def test_callback_histogram(self) -> None:
+        stats = _StreamStats()
+        stats.record_callback(0.0001)
+        stats.record_callback(0.02)
+        stats.record_callback(10)
+        latency = stats.snapshot()["callback_latency"]
+        assert latency["count"] == 3
+        assert latency["buckets"][0.0005] == 1
+        assert latency["buckets"][0.05] == 2
+        assert latency["buckets"][float("inf")] == 3
+
+    def test_reconnects_and_subscription_time(self) -> None:
+        stats = _StreamStats()
+        stats.record_open()
+        stats.record_subscribed()
+        stats.record_open()
+        snapshot = stats.snapshot()
+        assert snapshot["reconnects"] == 1
+        assert snapshot["subscription_time"] >= 0
+
+    def test_merge(self) -> None:
+        first = _StreamStats()
+        first.record_message({"channel": "/a"}, 1)
+        first.record_open()
+        first.record_open()
+        second = _StreamStats()
+        second.record_message({"channel": "/b"}, 2)
+        second.record_callback(0.002)
+        merged = merge_stats([first.snapshot(), second.snapshot()], messages_received=7)
+        assert set(merged["channels"]) == {"/a", "/b"}
+        assert merged["bytes_received"] == 3
+        assert merged["reconnects"] == 1
+        assert merged["messages_received"] == 7
+        assert merged["callback_latency"]["count"] == 1
+
+
+class TestClientStats:
+    def test_handle_message_records_metrics(self, ws_client) -> None:
+        frame = _frame("/sites/s1/stats/devices", mac="aa", last_seen=time.time())
+        ws_client._handle_message(Mock(), frame)
+        ws_client._handle_message(Mock(), frame)
+
+        stats = ws_client.stats()
+        channel = stats["channels"]["/sites/s1/stats/devices"]
+        assert stats["messages_received"] == 2
+        assert channel["messages"] == 2
+        assert channel["bytes"] == 2 * len(frame)
+        assert channel["lag"]["count"] == 2
+        assert stats["queue_high_water"] == {"receive": 2}
+
+    def test_bytes_of_non_ascii_frames(self, ws_client) -> None:
+        frame = json.dumps(
+            {"event": "data", "channel": "/a", "data": {"name": "café ☕"}},
+            ensure_ascii=False,
+        )
+        ws_client._handle_message(Mock(), frame)
+        ws_client._handle_message(Mock(), frame.encode("utf-8"))
+        expected = len(frame.encode("utf-8"))
+        assert expected > len(frame)
+        assert ws_client.stats()["channels"]["/a"]["bytes"] == 2 * expected
+        assert _frame_size("abc") == _frame_size(b"abc") == 3
+
+    def test_concurrent_snapshots(self, ws_client) -> None:
+        stop = threading.Event()
+
+        def _read() -> None:
+            while not stop.is_set():
+                ws_client.stats()
+
+        reader = threading.Thread(target=_read)
+        reader.start()
+        try:
+            for i in range(2000):
+                ws_client._handle_message(Mock(), _frame(f"/c{i % 50}", n=i))
+        finally:
+            stop.set()
+            reader.join()
+        channels = ws_client.stats()["channels"]
+        assert len(channels) == 50
+        assert sum(c["messages"] for c in channels.values()) == 2000
+
+    def test_callback_latency(self, ws_client) -> None:
+        done = threading.Event()
+        ws_client.on_message(lambda msg: done.set())
+        ws_client._finished.clear()
+        ws_client._handle_message(Mock(), _frame("/a"))
+        assert done.wait(timeout=1)
+        ws_client.disconnect(wait=True, timeout=1)
+
+        stats = ws_client.stats()
+        assert stats["callback_latency"]["count"] == 1
+        assert stats["messages_processed"] == 1
+
+    def test_subscription_time(self, ws_client) -> None:
+        ws_client._handle_open(Mock())
+        for channel in ws_client._channels:
+            ws_client._handle_message(
+                Mock(),
+                json.dumps({"event": "channel_subscribed", "channel": channel}),
+            )
+        ws_client._cancel_subscription_watchdog()
+        assert ws_client.stats()["subscription_time"] is not None
+
+    def test_sharded_stream_stats(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, ["/a", "/b"], min_connections=2)
+        for shard, channel in zip(stream.shards, ("/a", "/b")):
+            shard._handle_message(Mock(), _frame(channel))
+        stats = stream.stats()
+        assert set(stats["channels"]) == {"/a", "/b"}
+        assert stats["messages_received"] == 2
+        assert stats["queue_high_water"] == {"stream": 2}
+
+
+class TestPrometheus:
+    def test_format(self) -> None:
+        stats = _StreamStats()
+        stats.record_message(
+            {"channel": '/a"b', "data": {"timestamp": time.time()}}, 10
+        )
+        stats.record_queue_depth("receive", 3)
+        stats.record_callback(0.001)
+        text = to_prometheus(
+            stats.snapshot(messages_received=1, messages_dropped=0),
+            labels={"stream": "devices"},
+        )
+        lines = text.splitlines()
+        assert "# TYPE mistapi_ws_messages_received_total counter" in lines
+        assert 'mistapi_ws_messages_received_total{stream="devices"} 1.0' in lines
+        assert (
+            'mistapi_ws_channel_messages_total{stream="devices",channel="/a\\"b"} 1.0'
+            in lines
+        )
+        assert (
+            'mistapi_ws_queue_high_water{stream="devices",queue="receive"} 3.0' in lines
+        )
+        assert (
+            'mistapi_ws_callback_latency_seconds_bucket{stream="devices",le="+Inf"} 1.0'
+            in lines
+        )
+        assert any(
+            line.startswith("mistapi_ws_channel_lag_seconds_sum") for line in lines
+        )
+
+    def test_empty_stats(self) -> None:
+        text = to_prometheus(_StreamStats().snapshot())
+        assert "channel_messages_total" not in text
+
+
+class TestOpenTelemetry:
+    def test_observable_instruments(self, ws_client) -> None:
+        sdk_metrics = pytest.importorskip("opentelemetry.sdk.metrics")
+        export = pytest.importorskip("opentelemetry.sdk.metrics.export")
+        reader = export.InMemoryMetricReader()
+        provider = sdk_metrics.MeterProvider(metric_readers=[reader])
+        ws_client._handle_message(Mock(), _frame("/a"))
+
+        instruments = metrics.register_opentelemetry(
+            ws_client, meter=provider.get_meter("test")
+        )
+        data = reader.get_metrics_data()
+        points = {
+            metric.name: list(metric.data.data_points)
+            for resource in data.resource_metrics
+            for scope in resource.scope_metrics
+            for metric in scope.metrics
+        }
+        assert len(instruments) == 8
+        assert points["mistapi.ws.messages_received"][0].value == 1
+        channel_points = points["mistapi.ws.channel.messages"]
+        assert channel_points[0].attributes == {"channel": "/a"}
+        assert channel_points[0].value == 1
@@ -0,0 +1,260 @@
+# tests/unit/test_websocket_pacing.py
+"""
+Unit tests for the subscription pacing (mistapi.websockets.__pacing) and the
+reconnect jitter of the WebSocket clients.
+"""
+
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mistapi.websockets import ShardedStream
+from mistapi.websockets.__pacing import _SubscriptionPacer
+from mistapi.websockets.__ws_client import _MistWebsocket
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+def _channels(count: int) -> list[str]:
+    return [f"/sites/{i}/stats/devices" for i in range(count)]
+
+
+def _ack(ws_client, ws, channels: list[str]) -> None:
+    for channel in channels:
+        ws_client._handle_message(
+            ws, json.dumps({"event": "channel_subscribed", "channel": channel})
+        )
+
+
+def _wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSubscriptionPacer:
+    def test_batches(self) -> None:
+        pacer = _SubscriptionPacer(100, 4, None)
+        assert [len(b) for b in pacer.batches(_channels(10))] == [4, 4, 2]
+
+    def test_batches_include_appended_channels(self) -> None:
+        pacer = _SubscriptionPacer(100, 4, None)
+        channels = _channels(6)
+        sizes = []
+        for batch in pacer.batches(channels, start=2):
+            sizes.append(len(batch))
+            if len(channels) == 6:
+                channels.extend(_channels(9)[6:])
+        assert sizes == [4, 3]
+
+    def test_delay_from_rate(self) -> None:
+        pacer = _SubscriptionPacer(100, 10, None)
+        assert pacer.next_delay(10, 0) == pytest.approx(0.1)
+
+    def test_unlimited_rate(self) -> None:
+        pacer = _SubscriptionPacer(0, 10, 5)
+        assert pacer.next_delay(10, 5) == 0.0
+        assert pacer.next_delay(10, 4) is None
+
+    def test_slowdown_and_recovery(self) -> None:
+        pacer = _SubscriptionPacer(100, 10, 10)
+        assert pacer.next_delay(20, 0) is None
+        assert pacer.next_delay(20, 0) is None  # halved only once per wait
+        assert pacer.rate == 50
+        assert pacer.slowdowns == 1
+        assert pacer.next_delay(20, 10) == pytest.approx(0.2)
+        pacer.next_delay(30, 20)
+        assert pacer.rate == 60
+
+    def test_minimum_rate(self) -> None:
+        pacer = _SubscriptionPacer(160, 1, 1)
+        for sent in range(2, 20, 2):
+            assert pacer.next_delay(sent, 0) is None
+            pacer.next_delay(sent, sent)
+        assert pacer.rate == 10
+
+
+class TestSubscriptionPacing:
+    def test_paced_subscriptions(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(30))
+        ws_client.set_subscription_pacing(frames_per_second=200, batch_size=10)
+        ws = Mock()
+        started = time.monotonic()
+        ws_client._handle_open(ws)
+        assert ws.send.call_count < 30
+        assert ws_client._subscription_watchdog is None
+        assert ws_client._connected.is_set()
+
+        assert _wait_for(lambda: ws_client._subscription_watchdog is not None)
+        assert time.monotonic() - started >= 0.09
+        assert [c.args[0] for c in ws.send.call_args_list] == [
+            json.dumps({"subscribe": c}) for c in _channels(30)
+        ]
+        ws_client._cancel_subscription_watchdog()
+
+    def test_waits_for_acknowledgements(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(6))
+        ws_client.set_subscription_pacing(
+            frames_per_second=0, batch_size=2, max_pending_acks=1
+        )
+        ws = Mock()
+        ws_client._handle_open(ws)
+        assert _wait_for(lambda: ws.send.call_count == 2)
+        time.sleep(0.1)
+        assert ws.send.call_count == 2
+
+        _ack(ws_client, ws, _channels(1))
+        assert _wait_for(lambda: ws.send.call_count == 4)
+        _ack(ws_client, ws, _channels(4)[1:])
+        assert _wait_for(lambda: ws.send.call_count == 6)
+        _ack(ws_client, ws, _channels(6)[4:])
+        assert ws_client._subscribed_channels == set(_channels(6))
+        ws_client._cancel_subscription_watchdog()
+
+    def test_acknowledgement_timeout(self, mock_session) -> None:
+        ws_client = _MistWebsocket(
+            mock_session, channels=_channels(4), subscription_watchdog_timeout=0.1
+        )
+        ws_client.set_subscription_pacing(
+            frames_per_second=0, batch_size=1, max_pending_acks=1
+        )
+        errors = []
+        ws_client.on_error(errors.append)
+        ws = Mock()
+        with ws_client._lock:
+            ws_client._ws = ws
+        ws_client._handle_open(ws)
+
+        assert _wait_for(lambda: ws.close.called)
+        assert ws.send.call_count == 2
+        assert isinstance(errors[0], TimeoutError)
+        assert ws_client._last_close_code == 1008
+
+    def test_subscribe_while_pacing(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(20))
+        ws_client.set_subscription_pacing(frames_per_second=100, batch_size=5)
+        ws = Mock()
+        ws_client._handle_open(ws)
+        assert _wait_for(lambda: ws.send.call_count >= 5)
+        ws_client.subscribe(["/sites/new/stats/devices"])
+        # the watchdog is only armed once the pacer sent every channel
+        assert ws_client._subscription_watchdog is None
+        assert ws.send.call_count < 21
+
+        assert _wait_for(lambda: ws_client._subscription_watchdog is not None)
+        assert [c.args[0] for c in ws.send.call_args_list] == [
+            json.dumps({"subscribe": c})
+            for c in [*_channels(20), "/sites/new/stats/devices"]
+        ]
+        assert ws_client._paced_channels is None
+        ws_client._cancel_subscription_watchdog()
+
+        # without a pacer run in progress, the channels are sent right away
+        ws_client.subscribe(["/sites/other/stats/devices"])
+        assert ws.send.call_args.args[0] == json.dumps(
+            {"subscribe": "/sites/other/stats/devices"}
+        )
+        assert ws_client._subscription_watchdog is not None
+        ws_client._cancel_subscription_watchdog()
+
+    def test_close_stops_pacing(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(20))
+        ws_client.set_subscription_pacing(frames_per_second=10, batch_size=5)
+        ws = Mock()
+        ws_client._handle_open(ws)
+        assert _wait_for(lambda: ws.send.call_count == 5)
+        ws_client._handle_close(ws, 1006, "lost")
+        time.sleep(0.6)
+        assert ws.send.call_count == 5
+        assert ws_client._subscription_watchdog is None
+
+    def test_send_failure_closes_connection(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(2))
+        ws_client.set_subscription_pacing()
+        ws = Mock()
+        ws.send.side_effect = ConnectionError("closed")
+        ws_client._handle_open(ws)
+        assert _wait_for(lambda: ws.close.called)
+
+    def test_disable(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=_channels(3))
+        ws_client.set_subscription_pacing()
+        ws_client.set_subscription_pacing(frames_per_second=0)
+        ws = Mock()
+        ws_client._handle_open(ws)
+        assert ws.send.call_count == 3
+        ws_client._cancel_subscription_watchdog()
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"frames_per_second": -1},
+            {"batch_size": 0},
+            {"max_pending_acks": 0},
+        ],
+    )
+    def test_invalid_settings(self, mock_session, kwargs) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=["/a"])
+        with pytest.raises(ValueError):
+            ws_client.set_subscription_pacing(**kwargs)
+
+
+class TestReconnectJitter:
+    def test_no_jitter_by_default(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=["/a"], reconnect_backoff=2)
+        assert ws_client._next_reconnect_delay() == 2
+
+    @pytest.mark.parametrize("random_value, expected", [(0.0, 4.0), (1.0, 6.0)])
+    def test_jitter_range(self, mock_session, random_value, expected) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=["/a"], reconnect_backoff=2)
+        ws_client.set_reconnect_jitter(0.5)
+        ws_client._reconnect_attempts = 1
+        with patch("mistapi.websockets.__ws_client.random.random") as random:
+            random.return_value = random_value
+            assert ws_client._next_reconnect_delay() == expected
+
+    def test_jitter_spreads_delays(self, mock_session) -> None:
+        delays = set()
+        for _ in range(20):
+            ws_client = _MistWebsocket(mock_session, channels=["/a"])
+            ws_client.set_reconnect_jitter()
+            delays.add(ws_client._next_reconnect_delay())
+        assert len(delays) > 1
+        assert all(2 <= d <= 3 for d in delays)
+
+    def test_invalid_jitter(self, mock_session) -> None:
+        ws_client = _MistWebsocket(mock_session, channels=["/a"])
+        with pytest.raises(ValueError):
+            ws_client.set_reconnect_jitter(-0.1)
+
+
+class TestShardedStreamPacing:
+    def test_settings_forwarded_to_shards(self, mock_session) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(4), max_channels_per_connection=2
+        )
+        stream.set_subscription_pacing(frames_per_second=50, max_pending_acks=20)
+        stream.set_reconnect_jitter(0.2)
+        stream.subscribe(_channels(6))
+        assert len(stream.shards) == 3
+        assert all(
+            s._subscription_pacing == (50, 10, 20) and s._reconnect_jitter == 0.2
+            for s in stream.shards
+        )
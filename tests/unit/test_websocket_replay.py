@@ -0,0 +1,240 @@
+# tests/unit/test_websocket_replay.py
+"""
+Unit tests for the WebSocket stream recording and replay
+(mistapi.websockets.replay).
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mistapi.websockets import ShardedStream
+from mistapi.websockets.replay import (
+    FILE_HEADER,
+    StreamRecorder,
+    read_recording,
+    replay_into,
+)
+from mistapi.websockets.sites import DeviceStatsEvents
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+def _frame(i: int) -> str:
+    return json.dumps(
+        {
+            "event": "data",
+            "channel": "/sites/s1/stats/devices",
+            "data": json.dumps({"mac": f"aa{i:04x}"}),
+        }
+    )
+
+
+def _record(path, count: int, interval: float = 0.0, compress: bool = False) -> None:
+    with StreamRecorder(str(path), compress=compress) as recorder:
+        recorder.write(
+            json.dumps(
+                {"event": "channel_subscribed", "channel": "/sites/s1/stats/devices"}
+            ),
+            timestamp=1000.0,
+        )
+        for i in range(count):
+            recorder.write(_frame(i), timestamp=1000.0 + i * interval)
+
+
+class TestRecording:
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip(self, tmp_path, compress) -> None:
+        if compress:
+            pytest.importorskip("zstandard")
+        path = tmp_path / "rec.mwsr"
+        with StreamRecorder(str(path), compress=compress) as recorder:
+            recorder.write("text", timestamp=1.5)
+            recorder.write(b"\x00binary", timestamp=2.5)
+        assert recorder.frames == 2
+        assert list(read_recording(str(path))) == [(1.5, "text"), (2.5, b"\x00binary")]
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_append(self, tmp_path, compress) -> None:
+        if compress:
+            pytest.importorskip("zstandard")
+        path = tmp_path / "rec.mwsr"
+        for i in range(2):
+            with StreamRecorder(str(path), compress=compress) as recorder:
+                recorder.write(f"frame-{i}", timestamp=i)
+        assert [f for _, f in read_recording(str(path))] == ["frame-0", "frame-1"]
+
+    def test_compressed_is_smaller(self, tmp_path) -> None:
+        pytest.importorskip("zstandard")
+        _record(tmp_path / "raw.mwsr", 200)
+        _record(tmp_path / "zstd.mwsr", 200, compress=True)
+        assert (tmp_path / "zstd.mwsr").stat().st_size < (
+            tmp_path / "raw.mwsr"
+        ).stat().st_size
+
+    def test_truncated_last_frame_ignored(self, tmp_path) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 3)
+        path.write_bytes(path.read_bytes()[:-5])
+        assert len(list(read_recording(str(path)))) == 3
+
+    def test_invalid_file(self, tmp_path) -> None:
+        path = tmp_path / "rec.mwsr"
+        path.write_bytes(b"not a recording")
+        with pytest.raises(ValueError):
+            list(read_recording(str(path)))
+
+    def test_write_after_close_is_ignored(self, tmp_path) -> None:
+        path = tmp_path / "rec.mwsr"
+        recorder = StreamRecorder(str(path))
+        recorder.close()
+        recorder.write("late")
+        assert path.read_bytes() == FILE_HEADER
+
+    def test_client_records_raw_frames(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        with StreamRecorder(str(path)) as recorder:
+            ws.set_recorder(recorder)
+            ws._handle_message(Mock(), _frame(1))
+            ws.set_recorder(None)
+            ws._handle_message(Mock(), _frame(2))
+        assert [f for _, f in read_recording(str(path))] == [_frame(1)]
+
+    def test_sharded_stream_records_all_shards(self, tmp_path, mock_session) -> None:
+        stream = ShardedStream(mock_session, ["/a", "/b"], min_connections=2)
+        with StreamRecorder(str(tmp_path / "rec.mwsr")) as recorder:
+            stream.set_recorder(recorder)
+            assert all(shard._recorder is recorder for shard in stream.shards)
+
+
+class TestReplay:
+    def test_replay_at_max_speed(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 50, interval=10)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path), speed=None)
+        received = []
+        closed = Mock()
+        ws.on_message(received.append)
+        ws.on_close(closed)
+
+        started = time.monotonic()
+        ws.connect(run_in_background=False)
+        ws.disconnect(wait=True, timeout=5)
+
+        assert time.monotonic() - started < 5
+        assert [m["event"] for m in received].count("channel_subscribed") == 1
+        assert [m["data"] for m in received if m["event"] == "data"] == [
+            json.loads(_frame(i))["data"] for i in range(50)
+        ]
+        assert ws._subscribed_channels == {"/sites/s1/stats/devices"}
+        closed.assert_called_once_with(1000, "replay finished")
+
+    def test_replay_pacing(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 3, interval=1.0)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path), speed=10)
+
+        started = time.monotonic()
+        ws.connect(run_in_background=False)
+        assert 0.15 < time.monotonic() - started < 2
+
+    def test_disconnect_stops_replay(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 3, interval=60)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path))
+        ws.connect()
+        threading.Event().wait(0.1)
+        ws.disconnect(wait=True, timeout=5)
+        assert ws._finished.is_set()
+
+    def test_ready_during_replay(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 3, interval=60)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path))
+        assert not ws.ready()
+        ws.connect()
+        deadline = time.monotonic() + 5
+        while not ws.ready() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ws.ready()
+        ws.disconnect(wait=True, timeout=5)
+        assert not ws.ready()
+
+    def test_data_mentioning_subscription_is_replayed(
+        self, tmp_path, mock_session
+    ) -> None:
+        path = tmp_path / "rec.mwsr"
+        data = json.dumps(
+            {
+                "event": "data",
+                "channel": "/sites/s1/stats/devices",
+                "data": json.dumps({"last_event": "channel_subscribed"}),
+            }
+        )
+        with StreamRecorder(str(path)) as recorder:
+            recorder.write(data)
+            recorder.write(data.encode())
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path), speed=None)
+        ws.connect()
+        events = [msg["event"] for msg in ws.receive()]
+        assert events == ["channel_subscribed", "data", "data"]
+
+    def test_unreadable_recording(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        path.write_bytes(b"not a recording")
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path), speed=None)
+        errors = []
+        closed = Mock()
+        ws.on_error(errors.append)
+        ws.on_close(closed)
+        ws.connect(run_in_background=False)
+        assert isinstance(errors[0], ValueError)
+        closed.assert_called_once()
+        assert closed.call_args.args[0] == -1
+
+    def test_receive_generator(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 5)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path), speed=0)
+        ws.connect()
+        events = [msg["event"] for msg in ws.receive()]
+        assert events == ["channel_subscribed"] + ["data"] * 5
+
+    def test_restore_cloud_connection(self, tmp_path, mock_session) -> None:
+        path = tmp_path / "rec.mwsr"
+        _record(path, 1)
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        replay_into(ws, str(path))
+        replay_into(ws, None)
+        assert ws._ws_app_factory is None
+
+    def test_invalid_arguments(self, tmp_path, mock_session) -> None:
+        ws = DeviceStatsEvents(mock_session, site_ids=["s1"])
+        with pytest.raises(ValueError):
+            replay_into(ws, str(tmp_path / "missing.mwsr"))
+        _record(tmp_path / "rec.mwsr", 1)
+        with pytest.raises(ValueError):
+            replay_into(ws, str(tmp_path / "rec.mwsr"), speed=-1)
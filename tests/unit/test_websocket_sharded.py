@@ -0,0 +1,320 @@
+# tests/unit/test_websocket_sharded.py
+"""
+Unit tests for mistapi.websockets.ShardedStream.
+
+The WebSocketApp is replaced by a fake which acknowledges the subscriptions,
+sends one message per channel and then waits until it is closed, so the
+shards run their real background threads and reconnect logic.
+"""
+
+import itertools
+import json
+import threading
+from typing import ClassVar
+from unittest.mock import Mock, patch
+
+import pytest
+
+import mistapi
+from mistapi.websockets import ShardedStream
+from mistapi.websockets.__sharded_stream import _partition
+
+
+@pytest.fixture
+def mock_session():
+    session = Mock()
+    session._cloud_uri = "api.mist.com"
+    session._apitoken = ["test_token"]
+    session._apitoken_index = 0
+    requests_session = Mock()
+    requests_session.cookies = []
+    requests_session.verify = True
+    requests_session.cert = None
+    session._session = requests_session
+    return session
+
+
+class _FakeWebSocketApp:
+    """Stand-in for websocket.WebSocketApp"""
+
+    instances: ClassVar[list["_FakeWebSocketApp"]] = []
+    lock = threading.Lock()
+
+    def __init__(self, url, on_open, on_message, on_close, **kwargs) -> None:
+        self._on_open = on_open
+        self._on_message = on_message
+        self._on_close = on_close
+        self.subscribed: list[str] = []
+        self.closed = threading.Event()
+        self.finished = threading.Event()
+        with self.lock:
+            self.instances.append(self)
+
+    def send(self, payload: str) -> None:
+        channel = json.loads(payload).get("subscribe")
+        if channel:
+            self.subscribed.append(channel)
+
+    def run_forever(self, **kwargs) -> None:
+        self._on_open(self)
+        for channel in self.subscribed:
+            self._on_message(
+                self,
+                json.dumps({"event": "channel_subscribed", "channel": channel}),
+            )
+        for channel in self.subscribed:
+            self._on_message(self, json.dumps({"channel": channel, "data": "{}"}))
+        self.closed.wait(timeout=5)
+        try:
+            self._on_close(self, 1000, "closed")
+        finally:
+            self.finished.set()
+
+    def close(self) -> None:
+        self.closed.set()
+
+    def ready(self) -> bool:
+        return not self.closed.is_set()
+
+
+@pytest.fixture
+def fake_ws_app():
+    # A subclass per test: the instances of a test are never mixed with those
+    # of a previous one, and they are all closed and joined on teardown
+    fake = type(
+        "_FakeWebSocketApp",
+        (_FakeWebSocketApp,),
+        {"instances": [], "lock": threading.Lock()},
+    )
+    with patch("mistapi.websockets.__ws_client.websocket.WebSocketApp", fake):
+        yield fake
+    for ws in list(fake.instances):
+        ws.close()
+    for ws in list(fake.instances):
+        assert ws.finished.wait(timeout=5)
+
+
+def _channels(count: int) -> list[str]:
+    return [f"/sites/{i}/stats/devices" for i in range(count)]
+
+
+class TestPartition:
+    def test_balanced_chunks(self) -> None:
+        chunks = _partition(list(range(10)), 3)
+        assert [len(c) for c in chunks] == [4, 3, 3]
+        assert list(itertools.chain.from_iterable(chunks)) == list(range(10))
+
+
+class TestShardedStreamInit:
+    def test_shard_count_from_cap(self, mock_session) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(6000), max_channels_per_connection=1500
+        )
+        assert [len(s._channels) for s in stream.shards] == [1500] * 4
+
+    def test_default_cap(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(2500))
+        assert [len(s._channels) for s in stream.shards] == [834, 833, 833]
+
+    def test_min_connections(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(10), min_connections=4)
+        assert [len(s._channels) for s in stream.shards] == [3, 3, 2, 2]
+
+    def test_min_connections_capped_by_channel_count(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(2), min_connections=5)
+        assert len(stream.shards) == 2
+
+    def test_duplicates_are_removed(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, ["/a", "/b", "/a"])
+        assert stream.shards[0]._channels == ["/a", "/b"]
+
+    def test_shard_settings(self, mock_session) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(4), min_connections=2, auto_reconnect=True
+        )
+        assert all(s._auto_reconnect for s in stream.shards)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"max_channels_per_connection": 0},
+            {"max_channels_per_connection": 2001},
+            {"min_connections": 0},
+            {"queue_maxsize": -1},
+            {"ping_interval": -1},
+        ],
+    )
+    def test_invalid_arguments(self, mock_session, kwargs) -> None:
+        with pytest.raises(ValueError):
+            ShardedStream(mock_session, _channels(4), **kwargs)
+
+    def test_empty_channels(self, mock_session) -> None:
+        with pytest.raises(ValueError):
+            ShardedStream(mock_session, [])
+
+    def test_exported_from_websockets(self) -> None:
+        assert mistapi.websockets.ShardedStream is ShardedStream
+
+
+class TestShardedStreamMessages:
+    def test_receive_merges_all_shards(self, mock_session, fake_ws_app) -> None:
+        channels = _channels(30)
+        stream = ShardedStream(mock_session, channels, max_channels_per_connection=10)
+        stream.connect()
+        received = []
+        for msg in stream.receive():
+            if "data" in msg:
+                received.append(msg["channel"])
+            if len(received) == len(channels):
+                stream.disconnect()
+
+        assert sorted(received) == sorted(channels)
+        assert len(fake_ws_app.instances) == 3
+        subscribed = itertools.chain.from_iterable(
+            ws.subscribed for ws in fake_ws_app.instances
+        )
+        assert sorted(subscribed) == sorted(channels)
+
+    def test_callback_receives_all_shards(self, mock_session, fake_ws_app) -> None:
+        channels = _channels(6)
+        done = threading.Event()
+        received = []
+        closed = Mock()
+
+        def _on_message(msg):
+            if "data" in msg:
+                received.append(msg["channel"])
+            if len(received) == len(channels):
+                done.set()
+
+        stream = ShardedStream(mock_session, channels, max_channels_per_connection=2)
+        stream.on_message(_on_message)
+        stream.on_close(closed)
+        stream.connect()
+        assert done.wait(timeout=5)
+        stream.disconnect(wait=True, timeout=5)
+
+        assert sorted(received) == sorted(channels)
+        closed.assert_called_once_with(1000, "closed")
+
+    def test_receive_rejected_with_callback(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(2))
+        stream.on_message(lambda msg: None)
+        with pytest.raises(RuntimeError):
+            next(stream.receive())
+
+    def test_payload_decoding_applies_to_all_shards(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(4), min_connections=2)
+        stream.set_payload_decoding()
+        assert all(s._decode_payload for s in stream.shards)
+
+    def test_full_queue_drops_messages(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(2), queue_maxsize=1)
+        stream._enqueue_message({"a": 1})
+        stream._enqueue_message({"b": 2})
+        assert stream._messages_dropped == 1
+
+
+class TestShardedStreamLifecycle:
+    def test_shards_reconnect_independently(self, mock_session, fake_ws_app) -> None:
+        stream = ShardedStream(
+            mock_session,
+            _channels(4),
+            max_channels_per_connection=2,
+            auto_reconnect=True,
+            reconnect_backoff=0.01,
+        )
+        stream.connect()
+        first, second = stream.shards
+        for _ in range(100):
+            if first._connected.is_set() and second._connected.is_set():
+                break
+            threading.Event().wait(0.01)
+        with first._lock:
+            first_ws = first._ws
+        with second._lock:
+            second_ws = second._ws
+
+        first_ws.close()  # server side close of the first shard only
+        for _ in range(100):
+            with first._lock:
+                if first._ws is not first_ws and first._connected.is_set():
+                    break
+            threading.Event().wait(0.01)
+
+        with first._lock:
+            assert first._ws is not first_ws
+        with second._lock:
+            assert second._ws is second_ws
+        assert not stream._finished.is_set()
+        stream.disconnect(wait=True, timeout=5)
+        assert stream._finished.is_set()
+
+    def test_connect_twice_raises(self, mock_session, fake_ws_app) -> None:
+        stream = ShardedStream(mock_session, _channels(2))
+        stream.connect()
+        with pytest.raises(RuntimeError):
+            stream.connect()
+        stream.disconnect(wait=True, timeout=5)
+
+    def test_blocking_connect(self, mock_session, fake_ws_app) -> None:
+        stream = ShardedStream(mock_session, _channels(4), min_connections=2)
+        threading.Timer(0.2, stream.disconnect).start()
+        stream.connect(run_in_background=False)
+        assert stream._finished.is_set()
+
+    def test_context_manager_disconnects(self, mock_session, fake_ws_app) -> None:
+        with ShardedStream(mock_session, _channels(2)) as stream:
+            stream.connect()
+        assert all(s._user_disconnect.is_set() for s in stream.shards)
+
+
+class TestShardedStreamSubscriptions:
+    def test_subscribe_fills_least_loaded_shards(self, mock_session) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(5), max_channels_per_connection=4
+        )
+        assert [len(s._channels) for s in stream.shards] == [3, 2]
+        stream.subscribe(_channels(8))
+        assert [len(s._channels) for s in stream.shards] == [4, 4]
+        assert stream._channels == _channels(8)
+
+    def test_subscribe_adds_shards_when_full(self, mock_session) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(2), max_channels_per_connection=2
+        )
+        stream.set_payload_decoding()
+        stream.subscribe(_channels(5))
+        assert [s._channels for s in stream.shards] == [
+            _channels(2),
+            _channels(4)[2:],
+            _channels(5)[4:],
+        ]
+        assert [s._index for s in stream.shards] == [0, 1, 2]
+        assert all(s._decode_payload for s in stream.shards)
+
+    def test_unsubscribe(self, mock_session) -> None:
+        stream = ShardedStream(mock_session, _channels(4), min_connections=2)
+        stream.unsubscribe(_channels(3))
+        assert stream._channels == _channels(4)[3:]
+        assert [s._channels for s in stream.shards] == [[], _channels(4)[3:]]
+        stream.subscribe(["/new"])
+        assert stream.shards[0]._channels == ["/new"]
+
+    def test_subscribe_while_running(self, mock_session, fake_ws_app) -> None:
+        stream = ShardedStream(
+            mock_session, _channels(2), max_channels_per_connection=2
+        )
+        stream.connect()
+        stream.subscribe(_channels(3))
+        new_shard = stream.shards[-1]
+        for _ in range(100):
+            if new_shard._connected.is_set():
+                break
+            threading.Event().wait(0.01)
+        assert new_shard._connected.is_set()
+        with new_shard._lock:
+            assert new_shard._ws.subscribed == _channels(3)[2:]
+
+        stream.disconnect(wait=True, timeout=5)
+        assert stream._finished.is_set()
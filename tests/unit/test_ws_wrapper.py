@@ -4,8 +4,13 @@ Unit tests for WebSocketWrapper._extract_raw() — ANSI stripping (stream mode)
 and VT100 screen-buffer rendering (screen mode).
 """
 
+import json
+import threading
+import time
 from unittest.mock import Mock
 
+import pytest
+
 from mistapi.device_utils.__tools.__ws_wrapper import (
     WebSocketWrapper,
     UtilResponse,
@@ -184,6 +189,71 @@ class TestVT100Screen:
         assert rendered == "A"
         assert not rendered.endswith(" ")
 
+    def test_sequence_split_across_chunks(self) -> None:
+        s = _VT100Screen(rows=5, cols=20)
+        s.feed("AB\x1b[2")
+        s.feed(";3HC\x1b")
+        s.feed("[1;1HX")
+        assert s.render() == "XB\n  C"
+
+    def test_private_mode_ignored(self) -> None:
+        s = _VT100Screen(rows=5, cols=20)
+        s.feed("\x1b[?25lHello\x1b[?25h")
+        assert s.render() == "Hello"
+
+    def test_text_beyond_last_column_dropped(self) -> None:
+        s = _VT100Screen(rows=2, cols=5)
+        s.feed("HelloWorld\r\nX")
+        assert s.render() == "Hello\nX"
+
+    def test_scroll(self) -> None:
+        s = _VT100Screen(rows=2, cols=10)
+        s.feed("A\nB")
+        assert s.render() == "A\nB"
+        s.feed("\nC")
+        assert s.render() == "B\nC"
+
+    def test_changed(self) -> None:
+        s = _VT100Screen(rows=5, cols=20)
+        assert not s.changed
+        s.feed("\x1b[1;1HA")
+        assert s.changed
+        s.render()
+        s.feed("\x1b[1;1HA\x1b[3;1H\x1b[1m")  # same content, cursor moves
+        assert not s.changed
+
+    def test_render_diff(self) -> None:
+        s = _VT100Screen(rows=5, cols=20)
+        s.feed("\x1b[H\x1b[2Jcpu 10%\r\nmem 20%")
+        assert s.render_diff() == {0: "cpu 10%", 1: "mem 20%"}
+        s.feed("\x1b[1;1Hcpu 11%\x1b[2;1Hmem 20%")
+        assert s.render_diff() == {0: "cpu 11%"}
+        assert s.render_diff() == {}
+        s.feed("\x1b[2J")
+        assert s.render_diff() == {0: "", 1: ""}
+
+    def test_diff_changed(self) -> None:
+        s = _VT100Screen(rows=5, cols=20)
+        s.feed("\x1b[1;1HA")
+        assert s.diff_changed
+        s.render_diff()
+        assert not s.diff_changed
+        # render() and render_diff() are tracked separately
+        assert s.changed
+        s.feed("\x1b[1;1HA")  # same content
+        assert not s.diff_changed
+        assert s.render_diff() == {}
+        s.render()
+        s.feed("\x1b[1;1HB")
+        assert s.diff_changed and s.changed
+
+    def test_large_geometry(self) -> None:
+        s = _VT100Screen(rows=60, cols=200)
+        s.feed("\x1b[60;190Hend")
+        lines = s.render().split("\n")
+        assert len(lines) == 60
+        assert lines[59] == " " * 189 + "end"
+
 
 # ------------------------------------------------------------------
 # ws_error / ws_close_code (issue #29): let consumers distinguish a clean
@@ -257,3 +327,174 @@ class TestStartWithTriggerWsError:
         w.util_response.wait(timeout=5)
         assert w.util_response.done
         assert "factory kaboom" in (w.util_response.ws_error or "")
+
+
+class TestScreenRendering:
+    """UtilResponse.set_screen_rendering() options of screen-mode output."""
+
+    def test_unchanged_screen_not_emitted(self) -> None:
+        w = _make_wrapper()
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[H\x1b[2Jtop"}})
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Htop"}})
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Htop2"}})
+        assert w.util_response.ws_data == ["top", "top2"]
+
+    def test_diffs(self) -> None:
+        w = _make_wrapper()
+        w.util_response.set_screen_rendering(diffs=True, rows=10, cols=100)
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[H\x1b[2JA\r\nB"}})
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[2;1HC"}})
+        assert w.util_response.ws_data == [{0: "A", 1: "B"}, {1: "C"}]
+        assert w._screen.cols == 100
+
+    def test_frame_interval(self) -> None:
+        received = []
+        w = WebSocketWrapper(Mock(), UtilResponse(), on_message=received.append)
+        w.util_response.set_screen_rendering(frame_interval=60)
+        for i in range(5):
+            raw = f"\x1b[1;1Hframe {i}"
+            w._handle_message({"event": "data", "data": {"raw": raw}})
+        assert received == ["frame 0"]
+        # the last changes are emitted when the stream closes
+        w._on_close(1000, "done")
+        assert received == ["frame 0", "frame 4"]
+        assert w._screen_flush_timer is None
+
+    def test_frame_interval_with_diffs(self) -> None:
+        received = []
+        w = WebSocketWrapper(Mock(), UtilResponse(), on_message=received.append)
+        w.util_response.set_screen_rendering(frame_interval=60, diffs=True)
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Hframe 0"}})
+        frame_at = w._screen_frame_at
+        for i in range(1, 5):
+            raw = f"\x1b[1;1Hframe {i}"
+            w._handle_message({"event": "data", "data": {"raw": raw}})
+            timer = w._screen_flush_timer
+            w._handle_message({"event": "data", "data": {"raw": raw}})
+            # unchanged screen: the flush timer is not re-armed
+            assert w._screen_flush_timer is timer
+        assert received == [{0: "frame 0"}]
+        assert w._screen_frame_at == frame_at
+        w._on_close(1000, "done")
+        assert received == [{0: "frame 0"}, {0: "frame 4"}]
+
+    def test_flushed_frame_emitted_in_order(self) -> None:
+        lock_free = []
+
+        def _probe() -> None:
+            acquired = w._screen_lock.acquire(blocking=False)
+            lock_free.append(acquired)
+            if acquired:
+                w._screen_lock.release()
+
+        def on_message(_frame) -> None:
+            # the frame is emitted with the screen lock held, so a message
+            # processed meanwhile cannot emit a newer frame before this one
+            probe = threading.Thread(target=_probe)
+            probe.start()
+            probe.join()
+
+        w = WebSocketWrapper(Mock(), UtilResponse(), on_message=on_message)
+        w.util_response.set_screen_rendering(frame_interval=60)
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Hframe 0"}})
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Hframe 1"}})
+        w._flush_screen()
+        assert w.util_response.ws_data == ["frame 0", "frame 1"]
+        assert lock_free == [False, False]
+
+    def test_frame_interval_flush(self) -> None:
+        w = _make_wrapper()
+        w.util_response.set_screen_rendering(frame_interval=0.05)
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Hframe 0"}})
+        w._handle_message({"event": "data", "data": {"raw": "\x1b[1;1Hframe 1"}})
+        deadline = time.monotonic() + 5
+        while len(w.util_response.ws_data) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert w.util_response.ws_data == ["frame 0", "frame 1"]
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"frame_interval": -1}, {"rows": 0}, {"cols": 0}]
+    )
+    def test_invalid_settings(self, kwargs) -> None:
+        with pytest.raises(ValueError):
+            UtilResponse().set_screen_rendering(**kwargs)
+
+
+def _feed(w: WebSocketWrapper, count: int) -> None:
+    for i in range(count):
+        w._handle_message({"event": "data", "data": {"raw": f"line {i}"}})
+
+
+class TestOutputRetention:
+    """UtilResponse.set_retention() bounds the output kept in memory."""
+
+    def test_all_by_default(self) -> None:
+        w = _make_wrapper()
+        _feed(w, 5)
+        assert w.util_response.ws_data == [f"line {i}" for i in range(5)]
+        assert len(w.util_response.ws_raw_events) == 5
+        assert w.data is w.util_response.ws_data
+
+    def test_ring(self) -> None:
+        w = _make_wrapper()
+        _feed(w, 3)
+        w.util_response.set_retention("ring", max_messages=2)
+        _feed(w, 2)
+        w._on_close(1000, "done")
+        assert list(w.util_response.ws_data) == ["line 0", "line 1"]
+        assert len(w.util_response.ws_raw_events) == 2
+        # receive() keeps the last messages too
+        assert list(w.util_response.receive()) == ["line 0", "line 1"]
+        assert w.util_response.ws_messages_dropped == 3
+
+    def test_none(self) -> None:
+        received = []
+        w = WebSocketWrapper(Mock(), UtilResponse(), on_message=received.append)
+        w.util_response.set_retention("none", max_messages=10)
+        _feed(w, 20)
+        assert w.util_response.ws_data == []
+        assert w.util_response.ws_raw_events == []
+        assert len(received) == 20
+        assert w.util_response._queue.qsize() == 10
+
+    def test_file(self, tmp_path) -> None:
+        path = tmp_path / "output.jsonl"
+        w = _make_wrapper()
+        _feed(w, 2)
+        w.util_response.set_retention("file", max_messages=1, path=str(path))
+        _feed(w, 1)
+        w._handle_message({"event": "data", "data": {"pcap_dict": {"len": 60}}})
+        w._on_close(1000, "done")
+        assert w.util_response.ws_data_path == str(path)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines == ["line 0", "line 1", "line 0", {"len": 60}]
+        assert list(w.util_response.ws_data) == [{"len": 60}]
+
+    def test_default_retention(self, tmp_path) -> None:
+        UtilResponse.set_default_retention("file", path=str(tmp_path))
+        try:
+            response = UtilResponse()
+            trigger_only = UtilResponse(api_response=Mock())
+        finally:
+            UtilResponse.set_default_retention()
+        w = WebSocketWrapper(Mock(), response)
+        _feed(w, 1)
+        w._on_close(1000, "done")
+        assert response.ws_data_path.startswith(str(tmp_path))
+        assert trigger_only.ws_data_path is None
+        assert len(list(tmp_path.iterdir())) == 1
+        assert UtilResponse().ws_data == []
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"mode": "unknown"},
+            {"mode": "ring", "max_messages": 0},
+            {"mode": "file"},
+        ],
+    )
+    def test_invalid_retention(self, kwargs) -> None:
+        with pytest.raises(ValueError):
+            UtilResponse().set_retention(**kwargs)
+        with pytest.raises(ValueError):
+            UtilResponse.set_default_retention(**kwargs)